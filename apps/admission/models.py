@@ -593,6 +593,8 @@ class OnlineApplication(BaseModel):
 
     def generate_application_number(self):
         """Generate unique application number"""
+        from apps.core.utils.sequences import sequences
+        
         if not self.tenant:
             # Try to get tenant one more time
             from apps.core.utils.tenant import get_current_tenant
@@ -600,33 +602,7 @@ class OnlineApplication(BaseModel):
             if current_tenant:
                 self.tenant = current_tenant
         
-        if not self.tenant:
-            # Fallback: create without tenant prefix
-            prefix = f"APP-{self.admission_cycle.code}-"
-        else:
-            prefix = f"APP-{self.admission_cycle.code}-"
-        
-        # Get last application (filter by tenant if exists)
-        if self.tenant:
-            last_app = OnlineApplication.objects.filter(
-                application_number__startswith=prefix,
-                tenant=self.tenant
-            ).order_by('application_number').last()
-        else:
-            last_app = OnlineApplication.objects.filter(
-                application_number__startswith=prefix
-            ).order_by('application_number').last()
-        
-        if last_app:
-            try:
-                last_num = int(last_app.application_number.split('-')[-1])
-                new_num = last_num + 1
-            except (ValueError, IndexError, AttributeError):
-                new_num = 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        return sequences.next_number('application', self.tenant, cycle=self.admission_cycle.code)
 
     @property
     def full_name(self):
@@ -0,0 +1,169 @@
+# apps/analytics/management/commands/benchmark_audit_rollups.py
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django_tenants.utils import schema_context
+
+from apps.core.models import AuditLog
+from apps.tenants.models import Tenant
+from apps.analytics.models import AuditMetric
+from apps.analytics.utils.analyzer import AuditAnalyzer
+from apps.analytics.utils.rollup import AuditRollup
+
+
+ACTIONS = ['READ', 'READ', 'READ', 'UPDATE', 'CREATE', 'LOGIN', 'API_CALL', 'DELETE', 'LOGIN_FAILED']
+RESOURCE_TYPES = ['Student', 'Attendance', 'Invoice', 'Payment', 'Staff', 'Exam', 'Notice', 'User']
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare AuditAnalyzer summaries computed from raw audit_logs scans '
+        'with the hourly/daily rollups, on synthetic audit rows'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', required=True, help='Tenant schema that holds the benchmark rollups')
+        parser.add_argument('--rows', type=int, default=10_000_000, help='Synthetic audit rows to generate')
+        parser.add_argument('--days', type=int, default=30, help='Days the rows are spread over')
+        parser.add_argument('--users', type=int, default=500, help='Distinct synthetic users')
+        parser.add_argument('--batch-size', type=int, default=1_000_000, help='Rows per INSERT statement')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per read path')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic rows and rollups')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The audit rollup benchmark requires PostgreSQL')
+        try:
+            tenant = Tenant.objects.get(schema_name=options['schema'])
+        except Tenant.DoesNotExist:
+            raise CommandError(f"Tenant {options['schema']} does not exist")
+
+        # Synthetic rows get their own audit_logs.tenant_id and metric, so
+        # the tenant's real audit trail and rollups are not touched
+        source_id = f"benchmark-{uuid.uuid4().hex[:12]}"
+        rollup = AuditRollup(
+            tenant, metric_name=f'Audit events ({source_id})', source_tenant_id=source_id
+        )
+        days = options['days']
+
+        try:
+            self._generate(source_id, options)
+
+            raw = AuditAnalyzer(tenant_id=source_id, include_archived=False, use_rollups=False)
+            raw_ms, raw_result = self._time(
+                lambda: raw.get_user_activity_summary(days=days), options['repeat']
+            )
+
+            started = time.perf_counter()
+            rolled = rollup.catch_up()
+            backfill_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            rollup.catch_up()
+            incremental_ms = (time.perf_counter() - started) * 1000
+
+            fast = AuditAnalyzer(tenant_id=source_id, include_archived=False, rollup=rollup)
+            rollup_ms, rollup_result = self._time(
+                lambda: fast.get_user_activity_summary(days=days), options['repeat']
+            )
+
+            with schema_context(tenant.schema_name):
+                buckets = rollup.get_metric().values.count()
+
+            self.stdout.write(f"Rows rolled up:           {rolled} into {buckets} buckets")
+            self.stdout.write(f"Rollup backfill:          {backfill_s:.1f} s")
+            self.stdout.write(f"Incremental catch-up:     {incremental_ms:.0f} ms")
+            self.stdout.write(f"{days}-day summary, raw:     {raw_ms:.0f} ms")
+            self.stdout.write(f"{days}-day summary, rollup:  {rollup_ms:.0f} ms")
+            self.stdout.write(f"Speed-up:                 {raw_ms / max(rollup_ms, 0.001):.1f}x")
+
+            self._compare(raw_result, rollup_result)
+        finally:
+            if not options['keep']:
+                self._cleanup(tenant, source_id, rollup.metric_name)
+
+    def _generate(self, source_id, options):
+        rows, batch_size = options['rows'], options['batch_size']
+        # Keep every row inside both summary windows: (days - 1) days back,
+        # ending a minute before now
+        span_seconds = max(options['days'] - 1, 1) * 86400
+        self.stdout.write(f"Generating {rows} audit rows for {source_id}...")
+
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            for offset in range(0, rows, batch_size):
+                cursor.execute(
+                    f"""
+                    INSERT INTO {AuditLog._meta.db_table} (
+                        id, "timestamp", user_id, user_email, action, severity,
+                        status, resource_type, tenant_id, request_id
+                    )
+                    SELECT
+                        md5(%(source)s || g::text)::uuid,
+                        now() - interval '1 minute' - (random() * %(span)s) * interval '1 second',
+                        'user-' || (g %% %(users)s),
+                        'user' || (g %% %(users)s) || '@benchmark.local',
+                        (%(actions)s::text[])[1 + (g / 7) %% %(action_count)s],
+                        'INFO',
+                        CASE WHEN g %% 50 = 0 THEN 'FAILURE' ELSE 'SUCCESS' END,
+                        (%(resources)s::text[])[1 + (g / 3) %% %(resource_count)s],
+                        %(source)s,
+                        'audit-rollup-benchmark'
+                    FROM generate_series(%(first)s, %(last)s) AS g
+                    """,
+                    {
+                        'source': source_id,
+                        'span': span_seconds,
+                        'users': options['users'],
+                        'actions': ACTIONS,
+                        'action_count': len(ACTIONS),
+                        'resources': RESOURCE_TYPES,
+                        'resource_count': len(RESOURCE_TYPES),
+                        'first': offset + 1,
+                        'last': min(offset + batch_size, rows),
+                    },
+                )
+                self.stdout.write(f"  {min(offset + batch_size, rows)} rows")
+            cursor.execute(f"ANALYZE {AuditLog._meta.db_table}")
+        self.stdout.write(f"Generated in {time.perf_counter() - started:.1f} s")
+
+    @staticmethod
+    def _time(func, repeat):
+        """Best of ``repeat`` runs in ms, with the last result"""
+        best, result = None, None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            result = func()
+            elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def _compare(self, raw, rolled):
+        checks = {
+            'total_events': (raw['total_events'], rolled['total_events']),
+            'active_users': (raw['active_users'], rolled['active_users']),
+            'action_distribution': (
+                {row['action']: row['count'] for row in raw['action_distribution']},
+                {row['action']: row['count'] for row in rolled['action_distribution']},
+            ),
+            'hourly_distribution': (
+                {row['hour']: row['count'] for row in raw['hourly_distribution']},
+                {row['hour']: row['count'] for row in rolled['hourly_distribution']},
+            ),
+        }
+        for name, (expected, actual) in checks.items():
+            if expected == actual:
+                self.stdout.write(self.style.SUCCESS(f"{name}: match"))
+            else:
+                self.stdout.write(self.style.ERROR(f"{name}: raw and rollup results differ"))
+
+    def _cleanup(self, tenant, source_id, metric_name):
+        self.stdout.write('Removing synthetic rows and rollups...')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {AuditLog._meta.db_table} WHERE tenant_id = %s", [source_id]
+            )
+        with schema_context(tenant.schema_name):
+            AuditMetric.objects.filter(tenant=tenant, name=metric_name).delete()
@@ -0,0 +1,40 @@
+# apps/analytics/management/commands/install_audit_patterns.py
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from apps.tenants.models import Tenant
+from apps.analytics.models import AuditPattern
+from apps.analytics.utils.stream_detector import DEFAULT_STREAM_PATTERNS
+
+
+class Command(BaseCommand):
+    help = 'Create the default streaming AuditPatterns for tenants that do not have them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema',
+            help='Only install for this tenant schema (default: all active tenants)',
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.filter(is_active=True).exclude(
+            schema_name=get_public_schema_name()
+        )
+        if options['schema']:
+            tenants = tenants.filter(schema_name=options['schema'])
+            if not tenants.exists():
+                raise CommandError(f"No active tenant with schema {options['schema']}")
+
+        created = 0
+        for tenant in tenants:
+            with schema_context(tenant.schema_name):
+                for definition in DEFAULT_STREAM_PATTERNS:
+                    _, was_created = AuditPattern.objects.get_or_create(
+                        tenant=tenant,
+                        name=definition['name'],
+                        defaults={key: value for key, value in definition.items() if key != 'name'},
+                    )
+                    created += was_created
+            self.stdout.write(f"Checked audit patterns for {tenant.schema_name}")
+
+        self.stdout.write(self.style.SUCCESS(f'Created {created} audit patterns'))
@@ -0,0 +1,31 @@
+# apps/analytics/management/commands/rollup_audit_metrics.py
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_public_schema_name
+
+from apps.tenants.models import Tenant
+from apps.analytics.utils.rollup import AuditRollup
+
+
+class Command(BaseCommand):
+    help = 'Bring the hourly/daily audit log rollups up to date'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema',
+            help='Only roll up this tenant schema (default: all active tenants)',
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.filter(is_active=True).exclude(
+            schema_name=get_public_schema_name()
+        )
+        if options['schema']:
+            tenants = tenants.filter(schema_name=options['schema'])
+            if not tenants.exists():
+                raise CommandError(f"No active tenant with schema {options['schema']}")
+
+        total = 0
+        for tenant in tenants:
+            total += AuditRollup(tenant, stdout=self.stdout).catch_up()
+
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {total} audit rows'))
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_remove_dashboardwidget_analytics_d_widget__996b96_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditmetricvalue',
+            name='action',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='auditmetricvalue',
+            name='resource_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='auditmetricvalue',
+            name='status',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='auditmetricvalue',
+            name='user_email',
+            field=models.EmailField(blank=True, max_length=254, null=True),
+        ),
+        migrations.AddField(
+            model_name='auditmetricvalue',
+            name='user_id',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='auditmetricvalue',
+            constraint=models.UniqueConstraint(fields=('metric', 'period_type', 'period_start', 'user_id', 'action', 'resource_type', 'status'), name='unique_audit_metric_bucket'),
+        ),
+    ]
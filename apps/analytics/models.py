@@ -577,6 +577,14 @@ class AuditMetricValue(UUIDModel, TimeStampedModel):
     max_value = models.FloatField(null=True, blank=True)
     avg_value = models.FloatField(null=True, blank=True)
     
+    # Dimensions of audit log rollups (apps.analytics.utils.rollup);
+    # empty for metrics that are not broken down
+    user_id = models.CharField(max_length=100, blank=True, default='')
+    user_email = models.EmailField(null=True, blank=True)
+    action = models.CharField(max_length=50, blank=True, default='')
+    resource_type = models.CharField(max_length=100, blank=True, default='')
+    status = models.CharField(max_length=20, blank=True, default='')
+    
     class Meta:
         ordering = ['-timestamp']
         indexes = [
@@ -584,6 +592,13 @@ class AuditMetricValue(UUIDModel, TimeStampedModel):
             models.Index(fields=['tenant', 'metric', 'timestamp']),
             models.Index(fields=['period_type', 'timestamp']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric', 'period_type', 'period_start',
+                        'user_id', 'action', 'resource_type', 'status'],
+                name='unique_audit_metric_bucket'
+            ),
+        ]
         verbose_name = "Audit Metric Value"
         verbose_name_plural = "Audit Metric Values"
     
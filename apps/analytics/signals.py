@@ -0,0 +1,19 @@
+# apps/analytics/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.core.signals import audit_entries_written
+from apps.analytics.models import AuditPattern
+from apps.analytics.utils.stream_detector import stream_detector
+
+
+@receiver(audit_entries_written)
+def detect_audit_anomalies(sender, records, **kwargs):
+    """Run freshly written audit entries through the streaming detector"""
+    stream_detector.observe(records)
+
+
+@receiver([post_save, post_delete], sender=AuditPattern)
+def reload_stream_patterns(sender, instance, **kwargs):
+    """Thresholds or rules changed; other processes pick it up within the cache TTL"""
+    stream_detector.invalidate(instance.tenant_id)
@@ -0,0 +1,38 @@
+"""
+Background tasks for analytics operations using Celery
+"""
+
+import logging
+from typing import Dict
+
+from celery import shared_task
+from django_tenants.utils import get_public_schema_name
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rollup_audit_metrics() -> Dict:
+    """
+    Advance every active tenant's hourly/daily audit rollups to the last
+    complete hour
+    """
+    from apps.tenants.models import Tenant
+    from apps.analytics.utils.rollup import AuditRollup
+
+    tenants = Tenant.objects.filter(is_active=True).exclude(
+        schema_name=get_public_schema_name()
+    )
+
+    rolled, failed = 0, []
+    for tenant in tenants:
+        try:
+            rolled += AuditRollup(tenant).catch_up()
+        except Exception as e:
+            logger.error(
+                f"Error rolling up audit metrics for {tenant.schema_name}: {str(e)}",
+                exc_info=True
+            )
+            failed.append(tenant.schema_name)
+
+    return {'success': not failed, 'rows_rolled_up': rolled, 'failed_tenants': failed}
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase
+
+from apps.analytics.utils.rollup import AuditRollup, rollup_segments
+
+
+def at(day, hour=0, minute=0):
+    return datetime(2025, 3, day, hour, minute, tzinfo=timezone.utc)
+
+
+class RollupSegmentTests(SimpleTestCase):
+    def test_without_watermark_everything_is_raw(self):
+        self.assertEqual(
+            rollup_segments(at(1), at(5), None),
+            [('raw', at(1), at(5))]
+        )
+
+    def test_splits_into_partial_hours_whole_days_and_raw_tail(self):
+        segments = rollup_segments(at(1, 10, 30), at(10, 15, 5), covered_until=at(10, 14))
+        self.assertEqual(segments, [
+            ('raw', at(1, 10, 30), at(1, 11)),
+            ('hour', at(1, 11), at(2)),
+            ('day', at(2), at(10)),
+            ('hour', at(10), at(10, 14)),
+            ('raw', at(10, 14), at(10, 15, 5)),
+        ])
+
+    def test_hourly_reads_skip_day_buckets(self):
+        segments = rollup_segments(at(1, 10), at(4), covered_until=at(5), use_days=False)
+        self.assertEqual(segments, [('hour', at(1, 10), at(4))])
+
+    def test_segments_are_contiguous(self):
+        start, end = at(3, 7, 12), at(9, 2, 44)
+        segments = rollup_segments(start, end, covered_until=at(8, 23))
+        self.assertEqual(segments[0][1], start)
+        self.assertEqual(segments[-1][2], end)
+        for previous, following in zip(segments, segments[1:]):
+            self.assertEqual(previous[2], following[1])
+
+    def test_range_inside_one_hour_stays_raw(self):
+        self.assertEqual(
+            rollup_segments(at(1, 10, 5), at(1, 10, 50), covered_until=at(2)),
+            [('raw', at(1, 10, 5), at(1, 10, 50))]
+        )
+
+
+class RollupMergeTests(SimpleTestCase):
+    def test_null_and_empty_dimensions_share_a_bucket(self):
+        rows = [
+            {'user_id': None, 'action': 'LOGIN', 'resource_type': 'User', 'status': 'SUCCESS',
+             'count': 2, 'last_seen': at(1, 9), 'email': None},
+            {'user_id': '', 'action': 'LOGIN', 'resource_type': 'User', 'status': 'SUCCESS',
+             'count': 3, 'last_seen': at(1, 11), 'email': 'a@example.com'},
+        ]
+        merged = AuditRollup._merge(rows)
+        self.assertEqual(merged, {
+            ('', 'LOGIN', 'User', 'SUCCESS'): {
+                'count': 5, 'last_seen': at(1, 11), 'email': 'a@example.com'
+            }
+        })
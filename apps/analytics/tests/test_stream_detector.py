@@ -0,0 +1,95 @@
+import uuid
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from apps.analytics.utils.analyzer import RealTimeMonitor
+from apps.analytics.utils.stream_detector import SlidingWindowCounter, StreamRule, stream_detector
+
+
+def make_cache():
+    return LocMemCache(f'stream-{uuid.uuid4()}', {})
+
+
+def make_rule(cache, **rules):
+    return StreamRule(
+        pattern_id=1, tenant_id='t1', schema_name='school', name='Failed login spike',
+        severity='HIGH', threshold=3, time_window_minutes=5,
+        rules={'group_by': 'ip', 'actions': ['LOGIN_FAILED'], **rules},
+        slot_count=10, cache=cache,
+    )
+
+
+def failed_login(ip, hour=12):
+    return {
+        'action': 'LOGIN_FAILED', 'user_ip': ip,
+        'timestamp': datetime(2025, 3, 1, hour, tzinfo=timezone.utc),
+    }
+
+
+class SlidingWindowCounterTests(SimpleTestCase):
+    def setUp(self):
+        self.counter = SlidingWindowCounter('test', window_seconds=60, slot_count=6, cache=make_cache())
+
+    def add(self, when):
+        slot = self.counter.slot(when)
+        self.counter.add('key', slot)
+        return self.counter.total('key', slot)
+
+    def test_counts_within_window(self):
+        for second in (0, 10, 20, 59):
+            total = self.add(1000 + second)
+        self.assertEqual(total, 4)
+
+    def test_old_slots_drop_out_as_window_slides(self):
+        self.add(1000)
+        self.add(1010)
+        self.assertEqual(self.add(1065), 2)
+        self.assertEqual(self.add(1200), 1)
+
+    def test_alert_is_claimed_once(self):
+        self.assertTrue(self.counter.claim('key', 60))
+        self.assertFalse(self.counter.claim('key', 60))
+
+
+class StreamRuleTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = make_cache()
+
+    def test_fires_once_per_window_when_threshold_reached(self):
+        rule = make_rule(self.cache)
+        results = [rule.observe([(failed_login('10.0.0.1'), 1000 + i)]) for i in range(5)]
+        self.assertEqual([len(result) for result in results], [0, 0, 1, 0, 0])
+        self.assertEqual(results[2][0]['count'], 3)
+        self.assertEqual(results[2][0]['ip_address'], '10.0.0.1')
+
+    def test_workers_share_windows(self):
+        # One rule per worker process, counting into the same cache
+        workers = [make_rule(self.cache), make_rule(self.cache), make_rule(self.cache)]
+        results = [worker.observe([(failed_login('10.0.0.1'), 1000)]) for worker in workers]
+        self.assertEqual([len(result) for result in results], [0, 0, 1])
+
+    def test_batch_counts_once_per_key(self):
+        rule = make_rule(self.cache)
+        events = [(failed_login(ip), 1000) for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.1', '10.0.0.1')]
+        alerts = rule.observe(events)
+        self.assertEqual([(alert['ip_address'], alert['count']) for alert in alerts], [('10.0.0.1', 3)])
+
+    def test_ignores_other_actions(self):
+        rule = make_rule(self.cache)
+        record = dict(failed_login('10.0.0.1'), action='LOGIN')
+        self.assertEqual(rule.observe([(record, 1000 + i) for i in range(5)]), [])
+
+    def test_business_hours_are_skipped(self):
+        rule = make_rule(self.cache, business_hours=[9, 18])
+        self.assertEqual(rule.observe([(failed_login('10.0.0.1', hour=10), 1000 + i) for i in range(5)]), [])
+        self.assertTrue(rule.observe([(failed_login('10.0.0.1', hour=22), 2000 + i) for i in range(3)]))
+
+
+class RealTimeMonitorStreamTests(SimpleTestCase):
+    def test_falls_back_to_sql_detection_without_stream_patterns(self):
+        monitor = RealTimeMonitor(tenant_id='t1')
+        with mock.patch.object(stream_detector, 'rules_for', return_value=[]):
+            self.assertIsNone(monitor._streamed_alerts(datetime.now(timezone.utc), datetime.now(timezone.utc)))
@@ -9,28 +9,100 @@ from django.utils import timezone
 from django.db.models import Count, Q, Avg, Max, Min, F, Window
 from django.db.models.functions import TruncHour, TruncDay, TruncWeek, TruncMonth
 
-from apps.core.utils.audit import AuditLog
+from apps.core.models import AuditLog
+from apps.core.services.audit_archive import AuditArchive
+from apps.analytics.utils.rollup import AuditRollup
 
 
 class AuditAnalyzer:
     """Main analyzer class for audit logs"""
     
-    def __init__(self, tenant_id=None):
+    def __init__(self, tenant_id=None, include_archived=True, use_rollups=True, rollup=None):
         self.tenant_id = tenant_id
         self.base_query = AuditLog.objects.all()
         
         if tenant_id:
             self.base_query = self.base_query.filter(tenant_id=tenant_id)
+        
+        # Months moved out of audit_logs by maintain_audit_partitions
+        self.archive = AuditArchive() if include_archived else None
+        
+        # Hourly/daily counters kept by rollup_audit_metrics; they live in
+        # the tenant schema, so cross-tenant analysis always scans raw rows
+        self.use_rollups = use_rollups and (rollup is not None or bool(tenant_id))
+        self._rollup = rollup
+    
+    @property
+    def rollup(self):
+        if self._rollup is None and self.use_rollups:
+            self._rollup = AuditRollup.for_tenant_id(self.tenant_id)
+            self.use_rollups = self._rollup is not None
+        return self._rollup
+    
+    def _rollup_for(self, start):
+        """The rollup if it covers ranges starting at ``start``, else None"""
+        if not self.use_rollups or not isinstance(start, datetime):
+            return None
+        rollup = self.rollup
+        return rollup if rollup and rollup.covers(start) else None
+    
+    def _archived_summary(self, start, end=None):
+        """
+        Summarize archived rows in [start, end). Returns None when the range
+        is fully served by the live table, so recent dashboards never open
+        the archive.
+        """
+        if not self.archive:
+            return None
+        boundary = self.archive.oldest_live_boundary(tenant_id=self.tenant_id)
+        if boundary is None or start >= boundary:
+            return None
+        end = min(end or timezone.now(), boundary)
+        
+        summary = {
+            'total_events': 0,
+            'users': set(),
+            'resources': set(),
+            'actions': Counter(),
+            'hourly': Counter(),
+            'data_changes': defaultdict(Counter),
+        }
+        for row in self.archive.iter_records(start, end, tenant_id=self.tenant_id):
+            summary['total_events'] += 1
+            if row.get('user_id'):
+                summary['users'].add(row['user_id'])
+            summary['resources'].add(row.get('resource_type'))
+            action = row.get('action')
+            summary['actions'][action] += 1
+            summary['hourly'][row['timestamp'].replace(minute=0, second=0, microsecond=0)] += 1
+            if action == 'CREATE':
+                summary['data_changes'][row.get('resource_type')]['creates'] += 1
+            elif action == 'UPDATE':
+                summary['data_changes'][row.get('resource_type')]['updates'] += 1
+            elif action in ('DELETE', 'SOFT_DELETE'):
+                summary['data_changes'][row.get('resource_type')]['deletes'] += 1
+        return summary
+    
+    @staticmethod
+    def _merge_counts(rows, key, archived_counts, count_field='count'):
+        """Add archived Counter values into a list of {key, count} dicts"""
+        merged = Counter({row[key]: row[count_field] for row in rows})
+        merged.update(archived_counts)
+        return [{key: value, count_field: count} for value, count in merged.items()]
     
     def get_user_activity_summary(self, days=7, top_n=10):
         """Get summary of user activity"""
         since = timezone.now() - timedelta(days=days)
         
+        rollup = self._rollup_for(since)
+        if rollup:
+            return self._summarize_rollups(rollup, since, days, top_n)
+        
         # User activity stats
         user_stats = (
             self.base_query
             .filter(timestamp__gte=since)
-            .values('user_email', 'user')
+            .values('user_email', 'user_id')
             .annotate(
                 total_actions=Count('id'),
                 last_activity=Max('timestamp'),
@@ -61,15 +133,84 @@ class AuditAnalyzer:
             .order_by('-count')
         )
         
-        return {
+        result = {
             'period_days': days,
             'total_events': self.base_query.filter(timestamp__gte=since).count(),
-            'active_users': self.base_query.filter(timestamp__gte=since).values('user').distinct().count(),
+            'active_users': self.base_query.filter(timestamp__gte=since).values('user_id').distinct().count(),
             'top_users': list(user_stats),
             'hourly_distribution': list(hourly_dist),
             'action_distribution': list(action_dist),
             'generated_at': timezone.now().isoformat()
         }
+        
+        # Fold in months that have been archived out of the live table
+        archived = self._archived_summary(since)
+        if archived and archived['total_events']:
+            live_users = set(
+                self.base_query.filter(timestamp__gte=since)
+                .values_list('user_id', flat=True).distinct()
+            )
+            result['total_events'] += archived['total_events']
+            result['active_users'] = len(live_users | archived['users'])
+            result['hourly_distribution'] = sorted(
+                self._merge_counts(result['hourly_distribution'], 'hour', archived['hourly']),
+                key=lambda row: row['hour']
+            )
+            result['action_distribution'] = sorted(
+                self._merge_counts(result['action_distribution'], 'action', archived['actions']),
+                key=lambda row: -row['count']
+            )
+        
+        return result
+    
+    def _summarize_rollups(self, rollup, since, days, top_n):
+        """get_user_activity_summary answered from the rollup buckets"""
+        now = timezone.now()
+        
+        users = {}
+        actions = Counter()
+        for row in rollup.totals(since, now):
+            actions[row['action']] += row['count']
+            user = users.setdefault(row['user_id'], {
+                'user_email': row['user_email'],
+                'user_id': row['user_id'] or None,
+                'total_actions': 0,
+                'last_activity': row['last_seen'],
+                'resources': set(),
+                'create_count': 0,
+                'update_count': 0,
+                'delete_count': 0,
+            })
+            user['user_email'] = user['user_email'] or row['user_email']
+            user['total_actions'] += row['count']
+            user['last_activity'] = max(user['last_activity'], row['last_seen'])
+            user['resources'].add(row['resource_type'])
+            if row['action'] == 'CREATE':
+                user['create_count'] += row['count']
+            elif row['action'] == 'UPDATE':
+                user['update_count'] += row['count']
+            elif row['action'] in ('DELETE', 'SOFT_DELETE'):
+                user['delete_count'] += row['count']
+        
+        top_users = sorted(users.values(), key=lambda user: -user['total_actions'])[:top_n]
+        for user in top_users:
+            user['distinct_resources'] = len(user.pop('resources'))
+        
+        return {
+            'period_days': days,
+            'total_events': sum(actions.values()),
+            'active_users': len(users),
+            'top_users': top_users,
+            'hourly_distribution': [
+                {'hour': hour, 'count': count}
+                for hour, count in sorted(rollup.hourly(since, now).items())
+            ],
+            'action_distribution': [
+                {'action': action, 'count': count}
+                for action, count in actions.most_common()
+            ],
+            'generated_at': now.isoformat()
+        }
     
     def detect_anomalies(self, hours=24, threshold=3):
         """Detect anomalous activity patterns"""
@@ -180,6 +321,10 @@ class AuditAnalyzer:
             timestamp__range=[start_date, end_date]
         )
         
+        rollup = self._rollup_for(start_date)
+        if rollup:
+            return self._compliance_report_from_rollups(rollup, logs, start_date, end_date)
+        
         report = {
             'period': {
                 'start': start_date.isoformat(),
@@ -187,7 +332,7 @@ class AuditAnalyzer:
             },
             'summary': {
                 'total_events': logs.count(),
-                'unique_users': logs.values('user').distinct().count(),
+                'unique_users': logs.values('user_id').distinct().count(),
                 'unique_resources': logs.values('resource_type').distinct().count(),
             },
             'user_activity': self._get_user_compliance_activity(logs),
@@ -199,8 +344,100 @@ class AuditAnalyzer:
             'generated_at': timezone.now().isoformat()
         }
         
+        # Fold in months that have been archived out of the live table
+        archived = self._archived_summary(start_date, end_date)
+        if archived and archived['total_events']:
+            summary = report['summary']
+            summary['total_events'] += archived['total_events']
+            summary['unique_users'] = len(
+                set(logs.values_list('user_id', flat=True).distinct()) | archived['users']
+            )
+            summary['unique_resources'] = len(
+                set(logs.values_list('resource_type', flat=True).distinct()) | archived['resources']
+            )
+            summary['archived_events'] = archived['total_events']
+            
+            changes = {row['resource_type']: row for row in report['data_changes']}
+            for resource_type, counts in archived['data_changes'].items():
+                row = changes.setdefault(resource_type, {
+                    'resource_type': resource_type, 'creates': 0, 'updates': 0, 'deletes': 0
+                })
+                for key, value in counts.items():
+                    row[key] += value
+            report['data_changes'] = sorted(changes.values(), key=lambda row: -row['creates'])
+        
         return report
     
+    def _compliance_report_from_rollups(self, rollup, logs, start_date, end_date):
+        """
+        generate_compliance_report with the counting sections answered from
+        the rollup buckets; security events and access patterns need
+        columns that are not rolled up and still read ``logs``.
+        """
+        # timestamp__range is inclusive, rollup ranges are half-open
+        totals = rollup.totals(start_date, end_date + timedelta(microseconds=1))
+        
+        users = {}
+        changes = {}
+        deletions = Counter()
+        for row in totals:
+            action, count = row['action'], row['count']
+            user = users.setdefault(row['user_email'], {
+                'user_email': row['user_email'],
+                'total_actions': 0,
+                'last_login': None,
+                'password_changes': 0,
+                'permission_changes': 0,
+            })
+            user['total_actions'] += count
+            if action == 'LOGIN':
+                user['last_login'] = max(filter(None, [user['last_login'], row['last_seen']]))
+            elif action == 'PASSWORD_CHANGE':
+                user['password_changes'] += count
+            elif action == 'PERMISSION_CHANGE':
+                user['permission_changes'] += count
+            
+            if action in ('CREATE', 'UPDATE', 'DELETE', 'SOFT_DELETE'):
+                change = changes.setdefault(row['resource_type'], {
+                    'resource_type': row['resource_type'], 'creates': 0, 'updates': 0, 'deletes': 0
+                })
+                if action == 'CREATE':
+                    change['creates'] += count
+                elif action == 'UPDATE':
+                    change['updates'] += count
+                else:
+                    change['deletes'] += count
+                    deletions[(row['user_email'], row['resource_type'])] += count
+        
+        unusual_deletions = [
+            {
+                'user': user_email,
+                'resource': resource_type,
+                'deletions': count,
+                'description': f'Bulk deletion of {count} {resource_type} records'
+            }
+            for (user_email, resource_type), count in deletions.items() if count >= 10
+        ]
+        
+        return {
+            'period': {
+                'start': start_date.isoformat(),
+                'end': end_date.isoformat()
+            },
+            'summary': {
+                'total_events': sum(row['count'] for row in totals),
+                'unique_users': len({row['user_id'] for row in totals}),
+                'unique_resources': len({row['resource_type'] for row in totals}),
+            },
+            'user_activity': sorted(users.values(), key=lambda user: -user['total_actions']),
+            'data_changes': sorted(changes.values(), key=lambda change: -change['creates']),
+            'security_events': self._get_security_events(logs),
+            'access_patterns': self._get_access_patterns(logs),
+            'compliance_checks': self._run_compliance_checks(logs, unusual_deletions),
+            'recommendations': [],
+            'generated_at': timezone.now().isoformat()
+        }
+    
     def _get_user_compliance_activity(self, logs):
         """Get user activity for compliance"""
         user_stats = (
@@ -255,7 +492,7 @@ class AuditAnalyzer:
         
         return list(patterns)
     
-    def _run_compliance_checks(self, logs):
+    def _run_compliance_checks(self, logs, unusual_deletions=None):
         """Run compliance checks"""
         checks = []
         
@@ -270,7 +507,8 @@ class AuditAnalyzer:
             })
         
         # Check 2: Unusual deletion patterns
-        unusual_deletions = self._find_unusual_deletions(logs)
+        if unusual_deletions is None:
+            unusual_deletions = self._find_unusual_deletions(logs)
         if unusual_deletions:
             checks.append({
                 'check': 'UNUSUAL_DELETIONS',
@@ -342,6 +580,12 @@ class RealTimeMonitor:
         since = self.last_check
         now = timezone.now()
         
+        # Alerts the streaming detector raised as the events were written
+        streamed = self._streamed_alerts(since, now)
+        if streamed is not None:
+            self.last_check = now
+            return streamed
+        
         # Get recent logs
         recent_logs = self.analyzer.base_query.filter(
             timestamp__range=[since, now]
@@ -368,6 +612,54 @@ class RealTimeMonitor:
         
         return new_alerts
     
+    def _streamed_alerts(self, since, now):
+        """
+        REAL_TIME AuditAlerts created in [since, now), or None when the
+        streaming detector does not cover this monitor, including tenants
+        without installed stream patterns (see install_audit_patterns)
+        """
+        from django_tenants.utils import schema_context
+        from apps.tenants.models import Tenant
+        from apps.analytics.models import AuditAlert
+        from apps.analytics.utils.stream_detector import stream_detector
+        
+        if not self.analyzer.tenant_id or not stream_detector.config['STREAM_DETECTION_ENABLED']:
+            return None
+        if not stream_detector.rules_for(str(self.analyzer.tenant_id)):
+            return None
+        try:
+            tenant = Tenant.objects.filter(pk=self.analyzer.tenant_id).first()
+        except (ValueError, TypeError):
+            return None
+        if tenant is None:
+            return None
+        
+        with schema_context(tenant.schema_name):
+            alerts = list(AuditAlert.objects.filter(
+                tenant=tenant,
+                alert_type='REAL_TIME',
+                created_at__gte=since,
+                created_at__lt=now
+            ).order_by('created_at'))
+        
+        return [
+            {
+                'type': alert.details.get('type', alert.alert_type),
+                'severity': alert.severity,
+                'title': alert.title,
+                'details': alert.details,
+                'timestamp': alert.created_at,
+                'is_new': alert.status == 'NEW'
+            }
+            for alert in alerts
+        ]
+    
+    def _count_since(self, since, now):
+        rollup = self.analyzer._rollup_for(since)
+        if rollup:
+            return rollup.total(since, now)
+        return self.analyzer.base_query.filter(timestamp__gte=since).count()
+    
     def get_realtime_metrics(self):
         """Get real-time metrics dashboard"""
         now = timezone.now()
@@ -379,12 +671,10 @@ class RealTimeMonitor:
             'current_hour': self.analyzer.base_query.filter(
                 timestamp__gte=now - timedelta(hours=1)
             ).count(),
-            'current_day': self.analyzer.base_query.filter(
-                timestamp__gte=now - timedelta(days=1)
-            ).count(),
+            'current_day': self._count_since(now - timedelta(days=1), now),
             'active_users_now': self.analyzer.base_query.filter(
                 timestamp__gte=now - timedelta(minutes=5)
-            ).values('user').distinct().count(),
+            ).values('user_id').distinct().count(),
             'failed_logins_hour': self.analyzer.base_query.filter(
                 timestamp__gte=now - timedelta(hours=1),
                 action='LOGIN_FAILED'
@@ -0,0 +1,360 @@
+"""
+Streaming anomaly detection over audit events as they are written
+
+Each active AuditPattern whose detection_rules carry ``"stream": true`` is
+compiled into a StreamRule that keeps one sliding-window counter per key
+(an IP, or a user and action). Crossing the pattern's threshold within its
+time window raises a REAL_TIME AuditAlert.
+
+Counters live in the cache (STREAM_CACHE, Redis in production), not in
+the process: every worker only sees the events its own requests produce,
+so the windows have to be shared for a threshold to mean the same with
+one worker or many. A window is a ring of time slots, one cache counter
+per key and slot, bumped with incr() and expiring once the window slid
+past it; a batch of events costs one incr() per key and slot and one
+get_many() per key.
+"""
+
+import math
+import time
+import hashlib
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django_tenants.utils import schema_context
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_STREAM_SETTINGS = {
+    'STREAM_DETECTION_ENABLED': True,
+    # Ring size of every sliding window; the slot length is window / slots
+    'STREAM_WINDOW_SLOTS': 30,
+    # Cache alias holding the windows; shared by every worker
+    'STREAM_CACHE': 'default',
+    'STREAM_PATTERN_CACHE_SECONDS': 60,
+}
+
+# Patterns created by the install_audit_patterns command; they mirror the
+# checks AuditAnalyzer.detect_anomalies runs in SQL
+DEFAULT_STREAM_PATTERNS = [
+    {
+        'name': 'Failed login spike',
+        'pattern_type': 'SECURITY_THREAT',
+        'severity': 'HIGH',
+        'description': 'Repeated failed logins from one IP address',
+        'threshold': 5,
+        'time_window_minutes': 15,
+        'recommended_action': 'BLOCK_IP',
+        'detection_rules': {
+            'stream': True,
+            'alert_type': 'FAILED_LOGIN_SPIKE',
+            'group_by': 'ip',
+            'actions': ['LOGIN_FAILED'],
+        },
+    },
+    {
+        'name': 'Bulk operation',
+        'pattern_type': 'ANOMALY',
+        'severity': 'MEDIUM',
+        'description': 'Many creates or deletes by one user in a short time window',
+        'threshold': 20,
+        'time_window_minutes': 5,
+        'recommended_action': 'NOTIFY_ADMIN',
+        'detection_rules': {
+            'stream': True,
+            'alert_type': 'BULK_OPERATION',
+            'group_by': 'user_action',
+            'actions': ['CREATE', 'DELETE', 'SOFT_DELETE'],
+        },
+    },
+    {
+        'name': 'Unusual hour activity',
+        'pattern_type': 'BEHAVIOR_PATTERN',
+        'severity': 'MEDIUM',
+        'description': 'Updates or deletes outside business hours',
+        'threshold': 3,
+        'time_window_minutes': 60,
+        'recommended_action': 'NOTIFY_ADMIN',
+        'detection_rules': {
+            'stream': True,
+            'alert_type': 'UNUSUAL_HOUR_ACTIVITY',
+            'group_by': 'user_action',
+            'actions': ['UPDATE', 'DELETE', 'SOFT_DELETE'],
+            'business_hours': [9, 18],
+        },
+    },
+]
+
+
+class SlidingWindowCounter:
+    """Events per key in the last ``window_seconds``, in a ring of cached slots"""
+
+    def __init__(self, prefix: str, window_seconds: float, slot_count: int, cache):
+        self.prefix = prefix
+        self.slot_seconds = max(window_seconds / slot_count, 0.001)
+        self.slot_count = slot_count
+        self.cache = cache
+        # A slot is kept until the last window covering it has passed
+        self.timeout = math.ceil(window_seconds + self.slot_seconds)
+
+    def slot(self, when: float) -> int:
+        """Slot of an event at epoch ``when``"""
+        return int(when // self.slot_seconds)
+
+    def _key(self, key: str, slot: int) -> str:
+        return f'{self.prefix}:{key}:{slot}'
+
+    def add(self, key: str, slot: int, amount: int = 1) -> None:
+        """Count ``amount`` events of ``key`` in ``slot``"""
+        slot_key = self._key(key, slot)
+        if self.cache.add(slot_key, amount, self.timeout):
+            return
+        try:
+            # Keeps the expiry add() set
+            self.cache.incr(slot_key, amount)
+        except ValueError:
+            # Expired since add() found it
+            self.cache.add(slot_key, amount, self.timeout)
+
+    def total(self, key: str, slot: int) -> int:
+        """Events of ``key`` in the window ending with ``slot``"""
+        keys = [self._key(key, index) for index in range(slot - self.slot_count + 1, slot + 1)]
+        return sum(self.cache.get_many(keys).values())
+
+    def claim(self, key: str, timeout: float) -> bool:
+        """True for the first caller per ``key`` within ``timeout`` seconds, across workers"""
+        return self.cache.add(f'{self.prefix}:{key}:alerted', True, math.ceil(timeout))
+
+
+class StreamRule:
+    """An AuditPattern compiled for the streaming detector"""
+
+    def __init__(self, pattern_id, tenant_id, schema_name, name, severity,
+                 threshold, time_window_minutes, rules, slot_count=30, cache=None):
+        self.pattern_id = pattern_id
+        self.tenant_id = tenant_id
+        self.schema_name = schema_name
+        self.name = name
+        self.severity = severity
+        self.threshold = threshold
+        self.window_seconds = max(time_window_minutes, 1) * 60
+        self.alert_type = rules.get('alert_type', 'THRESHOLD_EXCEEDED')
+        self.group_by = rules.get('group_by', 'user_action')
+        self.actions = frozenset(rules.get('actions') or [])
+        self.business_hours = tuple(rules['business_hours']) if rules.get('business_hours') else None
+        # The window shape is part of the prefix, so an edited pattern
+        # starts from empty windows instead of misreading the old slots
+        self.counter = SlidingWindowCounter(
+            f'audit-stream:{pattern_id}:{self.group_by}:{self.window_seconds}:{slot_count}',
+            self.window_seconds, slot_count, cache if cache is not None else caches['default'],
+        )
+
+    @classmethod
+    def from_pattern(cls, pattern, schema_name, config):
+        return cls(
+            pattern_id=pattern.pk,
+            tenant_id=pattern.tenant_id,
+            schema_name=schema_name,
+            name=pattern.name,
+            severity=pattern.severity,
+            threshold=pattern.threshold,
+            time_window_minutes=pattern.time_window_minutes,
+            rules=pattern.detection_rules,
+            slot_count=config['STREAM_WINDOW_SLOTS'],
+            cache=caches[config['STREAM_CACHE']],
+        )
+
+    def key_for(self, record):
+        if self.group_by == 'ip':
+            return record.get('user_ip')
+        user = record.get('user_id') or record.get('user_email')
+        return (user, record.get('action')) if user else None
+
+    def match(self, record) -> Optional[str]:
+        """Cache-safe window key ``record`` counts towards, or None"""
+        if self.actions and record.get('action') not in self.actions:
+            return None
+        if self.business_hours:
+            hour = timezone.localtime(record.get('timestamp') or timezone.now()).hour
+            if self.business_hours[0] <= hour < self.business_hours[1]:
+                return None
+        key = self.key_for(record)
+        if key is None:
+            return None
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def observe(self, events) -> List[Dict]:
+        """
+        Count a batch of (record, epoch) events; returns the details of
+        the alerts they trigger, one per key per window across workers
+        """
+        counts = Counter()
+        latest = {}  # key -> (newest slot, its last record)
+        for record, when in events:
+            key = self.match(record)
+            if key is None:
+                continue
+            slot = self.counter.slot(when)
+            counts[key, slot] += 1
+            if key not in latest or slot >= latest[key][0]:
+                latest[key] = (slot, record)
+
+        for (key, slot), amount in counts.items():
+            self.counter.add(key, slot, amount)
+
+        fired = []
+        for key, (slot, record) in latest.items():
+            count = self.counter.total(key, slot)
+            if count >= self.threshold and self.counter.claim(key, self.window_seconds):
+                fired.append(self.details(record, count))
+        return fired
+
+    def details(self, record, count) -> Dict:
+        timestamp = record.get('timestamp') or timezone.now()
+        return {
+            'type': self.alert_type,
+            'count': count,
+            'threshold': self.threshold,
+            'time_window_minutes': self.window_seconds // 60,
+            'ip_address': record.get('user_ip'),
+            'user_id': record.get('user_id'),
+            'user_email': record.get('user_email'),
+            'action': record.get('action'),
+            'resource_type': record.get('resource_type'),
+            'last_event_at': timestamp.isoformat(),
+        }
+
+
+class StreamingAnomalyDetector:
+    """Feeds written audit records through the compiled patterns of their tenant"""
+
+    def __init__(self, config=None):
+        self._config_override = config
+        self._config = None
+        self._lock = threading.Lock()
+        # tenant_id -> (loaded_at, [StreamRule])
+        self._rules: Dict[str, tuple] = {}
+
+    @property
+    def config(self):
+        if self._config is None:
+            config = dict(DEFAULT_STREAM_SETTINGS)
+            if self._config_override is not None:
+                config.update(self._config_override)
+            else:
+                config.update({
+                    key: value
+                    for key, value in getattr(settings, 'AUDIT_LOG_SETTINGS', {}).items()
+                    if key in DEFAULT_STREAM_SETTINGS
+                })
+            self._config = config
+        return self._config
+
+    def observe(self, records: List[Dict]) -> int:
+        """Count a batch of written audit records; returns the number of alerts raised"""
+        if not self.config['STREAM_DETECTION_ENABLED']:
+            return 0
+
+        tenant_ids = {str(record['tenant_id']) for record in records if record.get('tenant_id')}
+        rules = {tenant_id: self.rules_for(tenant_id) for tenant_id in tenant_ids}
+
+        events = defaultdict(list)  # tenant_id -> [(record, epoch)]
+        now = time.time()
+        for record in records:
+            tenant_id = str(record.get('tenant_id'))
+            if rules.get(tenant_id):
+                timestamp = record.get('timestamp')
+                events[tenant_id].append((record, timestamp.timestamp() if timestamp else now))
+
+        fired = []
+        for tenant_id, tenant_events in events.items():
+            for rule in rules[tenant_id]:
+                fired.extend((rule, details) for details in rule.observe(tenant_events))
+
+        for rule, details in fired:
+            self.raise_alert(rule, details)
+        return len(fired)
+
+    # ---------------- patterns ----------------
+
+    def rules_for(self, tenant_id: str) -> List[StreamRule]:
+        cached = self._rules.get(tenant_id)
+        if cached and time.monotonic() - cached[0] < self.config['STREAM_PATTERN_CACHE_SECONDS']:
+            return cached[1]
+
+        rules = self._load_rules(tenant_id)
+        with self._lock:
+            self._rules[tenant_id] = (time.monotonic(), rules)
+        return rules
+
+    def invalidate(self, tenant_id=None):
+        """Reload patterns on next use, e.g. after an AuditPattern changed"""
+        with self._lock:
+            if tenant_id is None:
+                self._rules.clear()
+            elif str(tenant_id) in self._rules:
+                rules = self._rules[str(tenant_id)][1]
+                self._rules[str(tenant_id)] = (float('-inf'), rules)
+
+    def _load_rules(self, tenant_id) -> List[StreamRule]:
+        from apps.tenants.models import Tenant
+        from apps.analytics.models import AuditPattern
+
+        try:
+            schema_name = Tenant.objects.filter(pk=tenant_id).values_list(
+                'schema_name', flat=True
+            ).first()
+            if not schema_name:
+                return []
+            with schema_context(schema_name):
+                patterns = list(AuditPattern.objects.filter(
+                    tenant_id=tenant_id, is_active=True, detection_rules__stream=True
+                ))
+        except (ValueError, ValidationError):
+            return []
+        except Exception as e:
+            logger.error(f"Failed to load audit patterns for tenant {tenant_id}: {e}")
+            return []
+
+        return [StreamRule.from_pattern(pattern, schema_name, self.config) for pattern in patterns]
+
+    # ---------------- alerts ----------------
+
+    def raise_alert(self, rule: StreamRule, details: Dict):
+        from apps.analytics.models import AuditAlert, AuditPattern
+
+        subject = details['ip_address'] if rule.group_by == 'ip' else details['user_email'] or details['user_id']
+        now = timezone.now()
+        try:
+            with schema_context(rule.schema_name):
+                AuditAlert.objects.create(
+                    tenant_id=rule.tenant_id,
+                    alert_type='REAL_TIME',
+                    pattern_id=rule.pattern_id,
+                    title=f"{rule.name}: {details['count']} events from {subject}"[:200],
+                    description=(
+                        f"{details['count']} {details['action']} events from {subject} within "
+                        f"{details['time_window_minutes']} minutes (threshold {rule.threshold:g})"
+                    ),
+                    details=details,
+                    severity=rule.severity,
+                )
+                AuditPattern.objects.filter(pk=rule.pattern_id).update(
+                    occurrence_count=F('occurrence_count') + 1,
+                    first_detected=Coalesce('first_detected', Value(now)),
+                    last_detected=now,
+                )
+        except Exception as e:
+            logger.error(f"Failed to raise audit alert for pattern {rule.name}: {e}", exc_info=True)
+
+
+stream_detector = StreamingAnomalyDetector()
@@ -0,0 +1,38 @@
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .serializers import KioskBatchSerializer
+from .utils.kiosk import kiosk_ingest
+
+
+class CanRecordKioskScans(permissions.BasePermission):
+    """
+    Kiosk accounts need permission to add kiosk scan events
+    """
+    def has_permission(self, request, view):
+        return bool(
+            request.user and request.user.is_authenticated
+            and request.user.has_perm('attendance.add_kioskscanevent')
+        )
+
+
+@api_view(['POST'])
+@permission_classes([CanRecordKioskScans])
+def kiosk_scan_batch(request):
+    """
+    Record a batch of kiosk scans. Each event gets an outcome (MARKED,
+    MERGED, ALREADY_MARKED or UNKNOWN); posting the same events again
+    returns the same outcomes without changing any attendance.
+    """
+    serializer = KioskBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    result = kiosk_ingest.ingest(
+        request.tenant,
+        serializer.validated_data['device_id'],
+        [dict(event) for event in serializer.validated_data['events']],
+        marked_by=request.user,
+    )
+    return Response(result, status=status.HTTP_200_OK)
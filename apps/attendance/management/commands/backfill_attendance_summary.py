@@ -0,0 +1,74 @@
+# apps/attendance/management/commands/backfill_attendance_summary.py
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from apps.academics.models import StudentAttendance
+from apps.hr.models import StaffAttendance
+from apps.tenants.models import Tenant
+from apps.attendance.utils.summary import STAFF, STUDENT, attendance_summary
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = 'Rebuild AttendanceDailySummary rows from the student and staff attendance tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema',
+            help='Only backfill this tenant schema (default: all active tenants)',
+        )
+        parser.add_argument('--start', help='First day, YYYY-MM-DD (default: earliest attendance record)')
+        parser.add_argument('--end', help='Last day, YYYY-MM-DD (default: today)')
+        parser.add_argument(
+            '--population', choices=[STUDENT, STAFF],
+            help='Only rebuild student or staff rows (default: both)',
+        )
+        parser.add_argument('--chunk-days', type=int, default=31, help='Days recounted per transaction')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.filter(is_active=True).exclude(
+            schema_name=get_public_schema_name()
+        )
+        if options['schema']:
+            tenants = tenants.filter(schema_name=options['schema'])
+            if not tenants.exists():
+                raise CommandError(f"No active tenant with schema {options['schema']}")
+
+        end = _parse_date(options['end']) if options['end'] else timezone.now().date()
+        populations = [options['population']] if options['population'] else [STUDENT, STAFF]
+
+        total = 0
+        for tenant in tenants:
+            with schema_context(tenant.schema_name):
+                start = _parse_date(options['start']) if options['start'] else self._first_day(tenant)
+                if start is None or start > end:
+                    self.stdout.write(f"{tenant.schema_name}: no attendance to summarise")
+                    continue
+                written = attendance_summary.backfill(
+                    tenant.pk, start, end,
+                    chunk_days=max(options['chunk_days'], 1),
+                    populations=populations,
+                )
+            self.stdout.write(f"{tenant.schema_name}: {written} summary rows for {start} to {end}")
+            total += written
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {total} attendance summary rows'))
+
+    @staticmethod
+    def _first_day(tenant):
+        days = [
+            model._base_manager.filter(tenant=tenant).aggregate(first=Min('date'))['first']
+            for model in (StudentAttendance, StaffAttendance)
+        ]
+        days = [day for day in days if isinstance(day, date)]
+        return min(days) if days else None
@@ -0,0 +1,46 @@
+# apps/attendance/management/commands/build_face_index.py
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from apps.tenants.models import Tenant
+from apps.attendance.utils.face_index import STAFF, STUDENT, face_index, index_people
+
+
+class Command(BaseCommand):
+    help = 'Extract ORB face descriptors of staff and student photos into the per-tenant face index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema',
+            help='Only build this tenant schema (default: all active tenants)',
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Re-extract every photo instead of reusing descriptors of unchanged ones',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            import cv2  # noqa: F401
+        except ImportError:
+            raise CommandError('OpenCV (opencv-python) is required to extract face descriptors')
+
+        tenants = Tenant.objects.filter(is_active=True).exclude(
+            schema_name=get_public_schema_name()
+        )
+        if options['schema']:
+            tenants = tenants.filter(schema_name=options['schema'])
+            if not tenants.exists():
+                raise CommandError(f"No active tenant with schema {options['schema']}")
+
+        for tenant in tenants:
+            with schema_context(tenant.schema_name):
+                people = [*index_people(STAFF), *index_people(STUDENT)]
+                index = face_index.rebuild(tenant.schema_name, people, reuse=not options['full'])
+            indexed = len({(entry['kind'], entry['person_id']) for entry in index.entries})
+            self.stdout.write(
+                f"{tenant.schema_name}: {indexed} people, {index.manifest['rows']} descriptors "
+                f"(version {index.version})"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Face index built'))
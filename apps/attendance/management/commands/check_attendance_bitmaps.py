@@ -0,0 +1,53 @@
+# apps/attendance/management/commands/check_attendance_bitmaps.py
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from apps.academics.models import AcademicYear
+from apps.tenants.models import Tenant
+from apps.attendance.utils.bitmap import attendance_bitmap
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare student attendance bitmaps with the StudentAttendance rows; '
+        'with --fix, rebuild the bitmaps that are missing or differ'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema',
+            help='Only check this tenant schema (default: all active tenants)',
+        )
+        parser.add_argument('--year', help='Academic year code (default: every academic year)')
+        parser.add_argument('--fix', action='store_true', help='Rebuild inconsistent bitmaps')
+        parser.add_argument('--show', type=int, default=10, help='Inconsistent students listed per year')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.filter(is_active=True).exclude(
+            schema_name=get_public_schema_name()
+        )
+        if options['schema']:
+            tenants = tenants.filter(schema_name=options['schema'])
+            if not tenants.exists():
+                raise CommandError(f"No active tenant with schema {options['schema']}")
+
+        inconsistent = 0
+        for tenant in tenants:
+            with schema_context(tenant.schema_name):
+                years = AcademicYear.objects.filter(tenant=tenant).order_by('start_date')
+                if options['year']:
+                    years = years.filter(code=options['year'])
+                for year in years.values_list('id', 'start_date', 'end_date', 'code'):
+                    mismatched = attendance_bitmap.check(tenant.pk, year[:3], fix=options['fix'])
+                    inconsistent += len(mismatched)
+                    status = 'rebuilt' if options['fix'] else 'inconsistent'
+                    self.stdout.write(
+                        f"{tenant.schema_name} {year[3]}: {len(mismatched)} bitmaps {status}"
+                    )
+                    for row in mismatched[:options['show']]:
+                        self.stdout.write(f"  student {row['student_id']}: {row['days']} days differ")
+
+        if inconsistent and not options['fix']:
+            self.stdout.write(self.style.WARNING(f'{inconsistent} inconsistent bitmaps; run with --fix to rebuild'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Attendance bitmaps are consistent'))
@@ -0,0 +1,152 @@
+# apps/attendance/management/commands/kiosk_load_test.py
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django_tenants.utils import schema_context
+
+from apps.tenants.models import Tenant
+
+
+def _percentile(samples, percent):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulate concurrent attendance kiosks posting scan batches to the kiosk '
+        'ingestion API and report request latency percentiles'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', required=True, help='Kiosk endpoint, e.g. https://school.example.com/attendance/api/kiosk/scans/')
+        parser.add_argument('--token', required=True, help='JWT access token of a kiosk account')
+        parser.add_argument('--schema', required=True, help='Tenant schema whose students and staff are scanned')
+        parser.add_argument('--kiosks', type=int, default=10, help='Concurrent kiosks')
+        parser.add_argument('--batches', type=int, default=20, help='Batches posted by each kiosk')
+        parser.add_argument('--batch-size', type=int, default=25, help='Scans per batch')
+        parser.add_argument(
+            '--replay', type=float, default=0.1,
+            help='Share of batches posted twice, as a device retrying after a timeout',
+        )
+        parser.add_argument('--qr', action='store_true', help='Send admission-number QR payloads instead of ids')
+        parser.add_argument('--timeout', type=float, default=30, help='Request timeout in seconds')
+
+    def handle(self, *args, **options):
+        if options['kiosks'] < 1 or options['batches'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--kiosks, --batches and --batch-size must be positive')
+
+        people = self._people(options['schema'], options['qr'])
+        if not people:
+            raise CommandError(f"No active students or staff in {options['schema']}")
+
+        self.options = options
+        self.people = people
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['kiosks']) as executor:
+            runs = list(executor.map(self._run_kiosk, range(options['kiosks'])))
+        elapsed = time.perf_counter() - started
+
+        latencies = [latency for run in runs for latency in run['latencies']]
+        errors = Counter()
+        outcomes = Counter()
+        for run in runs:
+            errors.update(run['errors'])
+            outcomes.update(run['outcomes'])
+        scans = sum(run['scans'] for run in runs)
+
+        self.stdout.write(f"Kiosks:       {options['kiosks']}")
+        self.stdout.write(f"Requests:     {len(latencies)} ({sum(errors.values())} failed)")
+        self.stdout.write(f"Scans sent:   {scans} ({scans / elapsed:.1f}/s)")
+        self.stdout.write(f"Elapsed:      {elapsed:.2f}s")
+        self.stdout.write(
+            'Latency (ms): p50 {:.1f}  p90 {:.1f}  p99 {:.1f}  max {:.1f}'.format(
+                _percentile(latencies, 50) * 1000, _percentile(latencies, 90) * 1000,
+                _percentile(latencies, 99) * 1000, max(latencies, default=0) * 1000,
+            )
+        )
+        self.stdout.write('Outcomes:     ' + ', '.join(f'{key} {value}' for key, value in sorted(outcomes.items())))
+        for error, count in errors.most_common():
+            self.stdout.write(self.style.WARNING(f'{count} x {error}'))
+
+    @staticmethod
+    def _people(schema_name, qr):
+        """(kind, person_id or None, qr payload or None) of every active person"""
+        from apps.hr.models import Staff
+        from apps.students.models import Student
+
+        tenant = Tenant.objects.filter(schema_name=schema_name).first()
+        if tenant is None:
+            raise CommandError(f'No tenant with schema {schema_name}')
+        with schema_context(schema_name):
+            students = Student.objects.filter(tenant=tenant, status='ACTIVE')
+            staff = Staff.objects.filter(tenant=tenant, employment_status='ACTIVE')
+            if qr:
+                return (
+                    [('STUDENT', None, code) for code in students.values_list('admission_number', flat=True)]
+                    + [('STAFF', None, code) for code in staff.values_list('employee_id', flat=True)]
+                )
+            return (
+                [('STUDENT', str(pk), None) for pk in students.values_list('pk', flat=True)]
+                + [('STAFF', str(pk), None) for pk in staff.values_list('pk', flat=True)]
+            )
+
+    def _batch(self, device_id, number):
+        now = timezone.now()
+        events = []
+        for position, (kind, person_id, payload) in enumerate(
+            random.choices(self.people, k=self.options['batch_size'])
+        ):
+            event = {
+                'event_id': f'{number}-{position}-{uuid.uuid4().hex[:12]}',
+                'kind': kind,
+                'scanned_at': (now - timedelta(seconds=random.randint(0, 600))).isoformat(),
+            }
+            if person_id:
+                event['person_id'] = person_id
+            else:
+                event['qr'] = payload
+            events.append(event)
+        return json.dumps({'device_id': device_id, 'events': events}).encode()
+
+    def _post(self, body):
+        request = Request(self.options['url'], data=body, method='POST', headers={
+            'Content-Type': 'application/json',
+            'Authorization': f"Bearer {self.options['token']}",
+        })
+        with urlopen(request, timeout=self.options['timeout']) as response:
+            return json.loads(response.read())
+
+    def _run_kiosk(self, number):
+        device_id = f'load-test-{number:03d}'
+        run = {'latencies': [], 'errors': Counter(), 'outcomes': Counter(), 'scans': 0}
+        for batch in range(self.options['batches']):
+            body = self._batch(device_id, batch)
+            posts = 2 if random.random() < self.options['replay'] else 1
+            for _ in range(posts):
+                started = time.perf_counter()
+                try:
+                    result = self._post(body)
+                except HTTPError as e:
+                    run['errors'][f'HTTP {e.code}'] += 1
+                    continue
+                except (URLError, OSError, ValueError) as e:
+                    run['errors'][type(e).__name__] += 1
+                    continue
+                finally:
+                    run['latencies'].append(time.perf_counter() - started)
+                run['scans'] += len(result.get('results', []))
+                run['outcomes'].update(item['outcome'] for item in result.get('results', []))
+        return run
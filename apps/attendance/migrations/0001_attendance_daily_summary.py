@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('hr', '0008_remove_employmenthistory_details'),
+        ('tenants', '0003_tenantconfiguration_audit_retention_days'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('academics', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDailySummary',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True, verbose_name='Universal ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Creation Timestamp')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='Last Modification Timestamp')),
+                ('date', models.DateField(db_index=True, verbose_name='Date')),
+                ('population', models.CharField(choices=[('STUDENT', 'Students'), ('STAFF', 'Staff')], max_length=10, verbose_name='Population')),
+                ('scope_key', models.CharField(max_length=80, verbose_name='Scope Key')),
+                ('present', models.PositiveIntegerField(default=0, verbose_name='Present')),
+                ('absent', models.PositiveIntegerField(default=0, verbose_name='Absent')),
+                ('late', models.PositiveIntegerField(default=0, verbose_name='Late')),
+                ('half_day', models.PositiveIntegerField(default=0, verbose_name='Half Day')),
+                ('holiday', models.PositiveIntegerField(default=0, verbose_name='Holiday')),
+                ('on_leave', models.PositiveIntegerField(default=0, verbose_name='On Leave')),
+                ('weekly_off', models.PositiveIntegerField(default=0, verbose_name='Weekly Off')),
+                ('active_population', models.PositiveIntegerField(default=0, verbose_name='Active Population')),
+                ('class_name', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='academics.schoolclass', verbose_name='Class')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='hr.department', verbose_name='Department')),
+                ('section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='academics.section', verbose_name='Section')),
+                ('tenant', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s_records', to='tenants.tenant', verbose_name='Owning Tenant')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Last Modified By')),
+            ],
+            options={
+                'verbose_name': 'Attendance Daily Summary',
+                'verbose_name_plural': 'Attendance Daily Summaries',
+                'ordering': ['-date', 'population'],
+                'indexes': [models.Index(fields=['tenant', 'population', 'date'], name='attendance__tenant__fa10f7_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='attendancedailysummary',
+            constraint=models.UniqueConstraint(fields=('tenant', 'date', 'population', 'scope_key'), name='unique_attendance_daily_summary'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tenants', '0003_tenantconfiguration_audit_retention_days'),
+        ('attendance', '0001_attendance_daily_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KioskScanEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True, verbose_name='Universal ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Creation Timestamp')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='Last Modification Timestamp')),
+                ('device_id', models.CharField(max_length=64, verbose_name='Device ID')),
+                ('event_id', models.CharField(max_length=64, verbose_name='Event ID')),
+                ('kind', models.CharField(choices=[('STUDENT', 'Student'), ('STAFF', 'Staff')], max_length=10, verbose_name='Kind')),
+                ('person_id', models.UUIDField(blank=True, null=True, verbose_name='Person ID')),
+                ('payload', models.CharField(blank=True, max_length=255, verbose_name='QR Payload')),
+                ('scanned_at', models.DateTimeField(verbose_name='Scanned At')),
+                ('outcome', models.CharField(choices=[('MARKED', 'Marked'), ('MERGED', 'Merged With Another Scan'), ('ALREADY_MARKED', 'Already Marked'), ('UNKNOWN', 'Unknown Person')], max_length=20, verbose_name='Outcome')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+                ('tenant', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s_records', to='tenants.tenant', verbose_name='Owning Tenant')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Last Modified By')),
+            ],
+            options={
+                'verbose_name': 'Kiosk Scan Event',
+                'verbose_name_plural': 'Kiosk Scan Events',
+                'ordering': ['-scanned_at'],
+                'indexes': [models.Index(fields=['tenant', 'scanned_at'], name='attendance__tenant__211f37_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='kioskscanevent',
+            constraint=models.UniqueConstraint(fields=('tenant', 'device_id', 'event_id'), name='unique_kiosk_scan_event'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tenants', '0003_tenantconfiguration_audit_retention_days'),
+        ('academics', '0002_initial'),
+        ('attendance', '0002_kiosk_scan_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentAttendanceBitmap',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True, verbose_name='Universal ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Creation Timestamp')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='Last Modification Timestamp')),
+                ('start_date', models.DateField(verbose_name='Start Date')),
+                ('days', models.PositiveSmallIntegerField(verbose_name='Days')),
+                ('bits', models.BinaryField(verbose_name='Status Bits')),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='academics.academicyear', verbose_name='Academic Year')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='students.student', verbose_name='Student')),
+                ('tenant', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s_records', to='tenants.tenant', verbose_name='Owning Tenant')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Last Modified By')),
+            ],
+            options={
+                'verbose_name': 'Student Attendance Bitmap',
+                'verbose_name_plural': 'Student Attendance Bitmaps',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='studentattendancebitmap',
+            constraint=models.UniqueConstraint(fields=('tenant', 'student', 'academic_year'), name='unique_student_attendance_bitmap'),
+        ),
+    ]
@@ -1,2 +1,172 @@
-
 from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.core.models import UUIDModel, TimeStampedModel, TenantAwareModel
+
+
+class AttendanceDailySummary(UUIDModel, TimeStampedModel, TenantAwareModel):
+    """
+    Daily attendance counts per class section (students) or department
+    (staff), maintained by apps.attendance.utils.summary
+    """
+    POPULATION_CHOICES = (
+        ("STUDENT", _("Students")),
+        ("STAFF", _("Staff")),
+    )
+
+    date = models.DateField(db_index=True, verbose_name=_("Date"))
+    population = models.CharField(
+        max_length=10,
+        choices=POPULATION_CHOICES,
+        verbose_name=_("Population")
+    )
+    # "<class id>:<section id>" or "<department id>" ('' for staff without
+    # a department); unlike the nullable foreign keys it is never NULL, so
+    # it can take part in the unique key
+    scope_key = models.CharField(max_length=80, verbose_name=_("Scope Key"))
+
+    class_name = models.ForeignKey(
+        "academics.SchoolClass",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="attendance_summaries",
+        verbose_name=_("Class")
+    )
+    section = models.ForeignKey(
+        "academics.Section",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="attendance_summaries",
+        verbose_name=_("Section")
+    )
+    department = models.ForeignKey(
+        "hr.Department",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="attendance_summaries",
+        verbose_name=_("Department")
+    )
+
+    # Records per status
+    present = models.PositiveIntegerField(default=0, verbose_name=_("Present"))
+    absent = models.PositiveIntegerField(default=0, verbose_name=_("Absent"))
+    late = models.PositiveIntegerField(default=0, verbose_name=_("Late"))
+    half_day = models.PositiveIntegerField(default=0, verbose_name=_("Half Day"))
+    holiday = models.PositiveIntegerField(default=0, verbose_name=_("Holiday"))
+    on_leave = models.PositiveIntegerField(default=0, verbose_name=_("On Leave"))
+    weekly_off = models.PositiveIntegerField(default=0, verbose_name=_("Weekly Off"))
+
+    # Active students of the section / staff of the department when the
+    # row was last recounted
+    active_population = models.PositiveIntegerField(default=0, verbose_name=_("Active Population"))
+
+    class Meta:
+        verbose_name = _("Attendance Daily Summary")
+        verbose_name_plural = _("Attendance Daily Summaries")
+        ordering = ["-date", "population"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant', 'date', 'population', 'scope_key'],
+                name='unique_attendance_daily_summary'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['tenant', 'population', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_population_display()} {self.date} ({self.scope_key or '-'})"
+
+    @property
+    def total(self):
+        """Attendance records counted in this row"""
+        return (
+            self.present + self.absent + self.late + self.half_day
+            + self.holiday + self.on_leave + self.weekly_off
+        )
+
+
+class KioskScanEvent(UUIDModel, TimeStampedModel, TenantAwareModel):
+    """
+    A scan received from an attendance kiosk, kept so that devices can
+    replay their offline buffer without marking anyone twice
+    """
+    KIND_CHOICES = (
+        ("STUDENT", _("Student")),
+        ("STAFF", _("Staff")),
+    )
+
+    OUTCOME_CHOICES = (
+        ("MARKED", _("Marked")),
+        ("MERGED", _("Merged With Another Scan")),
+        ("ALREADY_MARKED", _("Already Marked")),
+        ("UNKNOWN", _("Unknown Person")),
+    )
+
+    device_id = models.CharField(max_length=64, verbose_name=_("Device ID"))
+    # Assigned by the device, unique per device
+    event_id = models.CharField(max_length=64, verbose_name=_("Event ID"))
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name=_("Kind"))
+    person_id = models.UUIDField(null=True, blank=True, verbose_name=_("Person ID"))
+    payload = models.CharField(max_length=255, blank=True, verbose_name=_("QR Payload"))
+    scanned_at = models.DateTimeField(verbose_name=_("Scanned At"))
+    outcome = models.CharField(max_length=20, choices=OUTCOME_CHOICES, verbose_name=_("Outcome"))
+
+    class Meta:
+        verbose_name = _("Kiosk Scan Event")
+        verbose_name_plural = _("Kiosk Scan Events")
+        ordering = ["-scanned_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant', 'device_id', 'event_id'],
+                name='unique_kiosk_scan_event'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['tenant', 'scanned_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.device_id}/{self.event_id} ({self.get_outcome_display()})"
+
+
+class StudentAttendanceBitmap(UUIDModel, TimeStampedModel, TenantAwareModel):
+    """
+    A student's attendance over one academic year packed at three bits
+    per day, maintained by apps.attendance.utils.bitmap
+    """
+    student = models.ForeignKey(
+        "students.Student",
+        on_delete=models.CASCADE,
+        related_name="attendance_bitmaps",
+        verbose_name=_("Student")
+    )
+    academic_year = models.ForeignKey(
+        "academics.AcademicYear",
+        on_delete=models.CASCADE,
+        related_name="attendance_bitmaps",
+        verbose_name=_("Academic Year")
+    )
+    # Day 0 of the bitmap and number of days covered; copied from the
+    # academic year so that decoding needs no join
+    start_date = models.DateField(verbose_name=_("Start Date"))
+    days = models.PositiveSmallIntegerField(verbose_name=_("Days"))
+    # Three bit planes of ceil(days / 8) bytes each, least significant
+    # bit first (the order of PostgreSQL's set_bit/get_bit)
+    bits = models.BinaryField(verbose_name=_("Status Bits"))
+
+    class Meta:
+        verbose_name = _("Student Attendance Bitmap")
+        verbose_name_plural = _("Student Attendance Bitmaps")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant', 'student', 'academic_year'],
+                name='unique_student_attendance_bitmap'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} {self.start_date} (+{self.days} days)"
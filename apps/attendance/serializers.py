@@ -0,0 +1,36 @@
+from django.utils import timezone
+from rest_framework import serializers
+
+from .utils.kiosk import KINDS, kiosk_ingest
+
+
+class KioskScanSerializer(serializers.Serializer):
+    """
+    One buffered kiosk scan: a face match (person_id) or a QR payload
+    """
+    event_id = serializers.CharField(max_length=64)
+    kind = serializers.ChoiceField(choices=KINDS)
+    person_id = serializers.UUIDField(required=False, allow_null=True)
+    qr = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    scanned_at = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        if not attrs.get('person_id') and not attrs.get('qr'):
+            raise serializers.ValidationError('Either person_id or qr is required')
+        if attrs['scanned_at'] > timezone.now() + timezone.timedelta(minutes=5):
+            raise serializers.ValidationError({'scanned_at': 'Scan time is in the future'})
+        return attrs
+
+
+class KioskBatchSerializer(serializers.Serializer):
+    """
+    A batch of scans posted by one kiosk
+    """
+    device_id = serializers.CharField(max_length=64)
+    events = KioskScanSerializer(many=True, allow_empty=False)
+
+    def validate_events(self, value):
+        limit = kiosk_ingest.kiosk_config['MAX_EVENTS']
+        if len(value) > limit:
+            raise serializers.ValidationError(f'At most {limit} events per batch')
+        return value
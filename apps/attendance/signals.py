@@ -0,0 +1,216 @@
+# apps/attendance/signals.py
+import logging
+
+from django.db import connection, transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from django_tenants.utils import get_public_schema_name
+
+from apps.academics.models import StudentAttendance
+from apps.hr.models import Staff, StaffAttendance, StaffDocument
+from apps.students.models import Student, StudentDocument
+from apps.users.models import User
+from apps.attendance.utils.face_index import STAFF as FACE_STAFF, STUDENT as FACE_STUDENT
+from apps.attendance.utils.bitmap import attendance_bitmap
+from apps.attendance.utils.summary import STAFF, STUDENT, attendance_summary
+
+logger = logging.getLogger(__name__)
+
+
+def _apply(population, bucket, deltas):
+    """Counters that fail to update are repaired by the nightly recount"""
+    tenant_id, day, dimensions = bucket
+    try:
+        attendance_summary.apply(tenant_id, population, day, deltas, **dimensions)
+    except Exception as e:
+        logger.error(f"Failed to update attendance summary for {day}: {e}", exc_info=True)
+
+
+def _apply_change(population, before, after):
+    """Move one record from the ``before`` (bucket, status) to ``after``"""
+    if before == after:
+        return
+    if before and after and before[0] == after[0]:
+        _apply(population, after[0], {before[1]: -1, after[1]: 1})
+        return
+    if before:
+        _apply(population, before[0], {before[1]: -1})
+    if after:
+        _apply(population, after[0], {after[1]: 1})
+
+
+# ---------------- StudentAttendance ----------------
+
+# Read from __dict__ so deferred fields are never loaded just to track them
+STUDENT_STATE_FIELDS = ('tenant_id', 'date', 'status', 'is_active', 'class_name_id', 'section_id')
+
+
+def _student_state(instance):
+    return tuple(instance.__dict__.get(field) for field in STUDENT_STATE_FIELDS)
+
+
+def _student_entry(state):
+    """((tenant_id, date, dimensions), status) of a record that is counted"""
+    tenant_id, day, status, is_active, class_id, section_id = state
+    if not (tenant_id and day and is_active):
+        return None
+    return (tenant_id, day, {'class_id': class_id, 'section_id': section_id}), status
+
+
+@receiver(post_init, sender=StudentAttendance)
+def remember_student_attendance_state(sender, instance, **kwargs):
+    instance._summary_state = _student_state(instance)
+
+
+@receiver(post_save, sender=StudentAttendance)
+def update_summary_on_student_attendance_save(sender, instance, created, **kwargs):
+    state = _student_state(instance)
+    previous = None if created else getattr(instance, '_summary_state', None)
+    instance._summary_state = state
+    if state == previous:
+        return
+    _apply_change(STUDENT, _student_entry(previous) if previous else None, _student_entry(state))
+
+
+@receiver(post_delete, sender=StudentAttendance)
+def update_summary_on_student_attendance_delete(sender, instance, **kwargs):
+    _apply_change(STUDENT, _student_entry(_student_state(instance)), None)
+
+
+
+# ---------------- StudentAttendance bitmaps ----------------
+
+BITMAP_STATE_FIELDS = ('tenant_id', 'student_id', 'date', 'session', 'status', 'is_active')
+
+
+def _bitmap_state(instance):
+    return tuple(instance.__dict__.get(field) for field in BITMAP_STATE_FIELDS)
+
+
+def _refresh_bitmap_days(*states):
+    """Rewrite the (student, day) of each state from the attendance rows"""
+    days = {(state[0], state[1], state[2]) for state in states if state and all(state[:3])}
+    for tenant_id, student_id, day in days:
+        try:
+            attendance_bitmap.refresh_day(tenant_id, day, [student_id])
+        except Exception as e:
+            logger.error(f"Failed to update attendance bitmap for {day}: {e}", exc_info=True)
+
+
+@receiver(post_init, sender=StudentAttendance)
+def remember_student_attendance_bitmap_state(sender, instance, **kwargs):
+    instance._bitmap_state = _bitmap_state(instance)
+
+
+@receiver(post_save, sender=StudentAttendance)
+def update_bitmap_on_student_attendance_save(sender, instance, created, **kwargs):
+    state = _bitmap_state(instance)
+    previous = None if created else getattr(instance, '_bitmap_state', None)
+    instance._bitmap_state = state
+    if state != previous:
+        _refresh_bitmap_days(previous, state)
+
+
+@receiver(post_delete, sender=StudentAttendance)
+def update_bitmap_on_student_attendance_delete(sender, instance, **kwargs):
+    _refresh_bitmap_days(_bitmap_state(instance))
+
+# ---------------- StaffAttendance ----------------
+
+STAFF_STATE_FIELDS = ('tenant_id', 'date', 'status', 'is_active', 'staff_id')
+
+
+def _staff_state(instance):
+    return tuple(instance.__dict__.get(field) for field in STAFF_STATE_FIELDS)
+
+
+def _staff_department(instance, staff_id):
+    staff = instance._state.fields_cache.get('staff')
+    if staff is not None and staff.pk == staff_id:
+        return staff.department_id
+    return Staff._base_manager.filter(pk=staff_id).values_list('department_id', flat=True).first()
+
+
+def _staff_entry(instance, state):
+    tenant_id, day, status, is_active, staff_id = state
+    if not (tenant_id and day and is_active and staff_id):
+        return None
+    department_id = _staff_department(instance, staff_id)
+    return (tenant_id, day, {'department_id': department_id}), status
+
+
+@receiver(post_init, sender=StaffAttendance)
+def remember_staff_attendance_state(sender, instance, **kwargs):
+    instance._summary_state = _staff_state(instance)
+
+
+@receiver(post_save, sender=StaffAttendance)
+def update_summary_on_staff_attendance_save(sender, instance, created, **kwargs):
+    state = _staff_state(instance)
+    previous = None if created else getattr(instance, '_summary_state', None)
+    instance._summary_state = state
+    if state == previous:
+        return
+    _apply_change(
+        STAFF, _staff_entry(instance, previous) if previous else None, _staff_entry(instance, state)
+    )
+
+
+@receiver(post_delete, sender=StaffAttendance)
+def update_summary_on_staff_attendance_delete(sender, instance, **kwargs):
+    _apply_change(STAFF, _staff_entry(instance, _staff_state(instance)), None)
+
+
+
+# ---------------- Face descriptor index ----------------
+
+def _refresh_face_descriptors(kind, person_id):
+    """Re-extract one person's descriptors once the photo change is committed"""
+    from apps.attendance.tasks import refresh_face_descriptors
+
+    schema_name = getattr(connection, 'schema_name', get_public_schema_name())
+
+    def enqueue():
+        try:
+            refresh_face_descriptors.delay(schema_name, kind, str(person_id))
+        except Exception as e:
+            logger.error(f"Failed to queue face index refresh for {kind} {person_id}: {e}", exc_info=True)
+
+    transaction.on_commit(enqueue)
+
+
+@receiver(post_save, sender=StaffDocument)
+@receiver(post_delete, sender=StaffDocument)
+def refresh_face_index_on_staff_photo(sender, instance, **kwargs):
+    if instance.document_type == 'PHOTOGRAPH' and instance.staff_id:
+        _refresh_face_descriptors(FACE_STAFF, instance.staff_id)
+
+
+@receiver(post_save, sender=StudentDocument)
+@receiver(post_delete, sender=StudentDocument)
+def refresh_face_index_on_student_photo(sender, instance, **kwargs):
+    if instance.doc_type == 'PHOTO' and instance.student_id:
+        _refresh_face_descriptors(FACE_STUDENT, instance.student_id)
+
+
+@receiver(post_init, sender=User)
+def remember_user_avatar(sender, instance, **kwargs):
+    avatar = instance.__dict__.get('avatar')
+    instance._face_avatar = getattr(avatar, 'name', avatar)
+
+
+@receiver(post_save, sender=User)
+def refresh_face_index_on_avatar_change(sender, instance, created, **kwargs):
+    avatar = instance.__dict__.get('avatar')
+    name = getattr(avatar, 'name', avatar)
+    previous = getattr(instance, '_face_avatar', None)
+    instance._face_avatar = name
+    if name == previous or (created and not name):
+        return
+    # Users also live in the public schema, where there is no staff or student table
+    if getattr(connection, 'schema_name', get_public_schema_name()) == get_public_schema_name():
+        return
+    for staff_id in Staff.objects.filter(user_id=instance.pk).values_list('pk', flat=True):
+        _refresh_face_descriptors(FACE_STAFF, staff_id)
+    for student_id in Student.objects.filter(user_id=instance.pk).values_list('pk', flat=True):
+        _refresh_face_descriptors(FACE_STUDENT, student_id)
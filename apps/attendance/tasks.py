@@ -0,0 +1,108 @@
+"""
+Background tasks for attendance operations using Celery
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict
+
+from celery import shared_task
+from django.utils import timezone
+from django_tenants.utils import get_public_schema_name, schema_context
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_attendance_summaries(days: int = 7) -> Dict:
+    """
+    Recount the last ``days`` days of every active tenant's attendance
+    summary, repairing counters that missed a write (queryset updates,
+    staff moved between departments)
+    """
+    from apps.tenants.models import Tenant
+    from apps.attendance.utils.summary import attendance_summary
+
+    tenants = Tenant.objects.filter(is_active=True).exclude(
+        schema_name=get_public_schema_name()
+    )
+    end = timezone.now().date()
+    start = end - timedelta(days=max(days, 1) - 1)
+
+    written, failed = 0, []
+    for tenant in tenants:
+        try:
+            with schema_context(tenant.schema_name):
+                written += attendance_summary.refresh(tenant.pk, start, end)
+        except Exception as e:
+            logger.error(
+                f"Error refreshing attendance summaries for {tenant.schema_name}: {str(e)}",
+                exc_info=True
+            )
+            failed.append(tenant.schema_name)
+
+    return {'success': not failed, 'written': written, 'failed_tenants': failed}
+
+
+@shared_task
+def refresh_face_descriptors(schema_name: str, kind: str, person_id: str) -> Dict:
+    """
+    Re-extract the face descriptors of one staff member or student after
+    their photos changed; people no longer active are dropped from the index
+    """
+    from apps.attendance.utils.face_index import (
+        STAFF, face_index, staff_photo_sources, student_photo_sources,
+    )
+
+    try:
+        with schema_context(schema_name):
+            if kind == STAFF:
+                from apps.hr.models import Staff
+                person = Staff.objects.filter(
+                    pk=person_id, employment_status='ACTIVE'
+                ).select_related('user').first()
+                sources = staff_photo_sources(person) if person else []
+            else:
+                from apps.students.models import Student
+                person = Student.objects.filter(
+                    pk=person_id, status='ACTIVE'
+                ).select_related('user').first()
+                sources = student_photo_sources(person) if person else []
+            rows = face_index.update_person(schema_name, kind, person_id, sources)
+    except Exception as e:
+        logger.error(
+            f"Error refreshing face descriptors of {kind} {person_id} in {schema_name}: {str(e)}",
+            exc_info=True
+        )
+        return {'success': False, 'error': str(e)}
+
+    return {'success': True, 'rows': rows}
+
+
+@shared_task
+def rebuild_face_indexes() -> Dict:
+    """
+    Rebuild every active tenant's face index, picking up photos changed
+    outside the model signals; unchanged photos keep their descriptors
+    """
+    from apps.tenants.models import Tenant
+    from apps.attendance.utils.face_index import STAFF, STUDENT, face_index, index_people
+
+    tenants = Tenant.objects.filter(is_active=True).exclude(
+        schema_name=get_public_schema_name()
+    )
+
+    rows, failed = 0, []
+    for tenant in tenants:
+        try:
+            with schema_context(tenant.schema_name):
+                people = [*index_people(STAFF), *index_people(STUDENT)]
+                rows += face_index.rebuild(tenant.schema_name, people).manifest['rows']
+        except Exception as e:
+            logger.error(
+                f"Error rebuilding face index for {tenant.schema_name}: {str(e)}",
+                exc_info=True
+            )
+            failed.append(tenant.schema_name)
+
+    return {'success': not failed, 'rows': rows, 'failed_tenants': failed}
@@ -0,0 +1,61 @@
+import uuid
+from datetime import date
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from apps.attendance.utils.bitmap import (
+    STATUS_CODES, AttendanceBitmapService, codes_from_rows, decode, encode, plane_bytes,
+    status_counts, streaks,
+)
+
+P, A, L, H = (STATUS_CODES[status] for status in ('PRESENT', 'ABSENT', 'LATE', 'HOLIDAY'))
+
+
+class BitmapEncodingTests(SimpleTestCase):
+    def test_round_trip_of_a_school_year(self):
+        codes = np.random.default_rng(3).integers(0, 7, size=365, dtype=np.uint8)
+        bits = encode(codes)
+        self.assertEqual(len(bits), 3 * plane_bytes(365))
+        np.testing.assert_array_equal(decode(bits, 365), codes)
+
+    def test_bits_follow_postgres_set_bit_numbering(self):
+        # Day 9 LATE (0b011): bit 9 of the first two planes, bit n of a
+        # bytea being bit n % 8 of byte n // 8
+        codes = np.zeros(16, dtype=np.uint8)
+        codes[9] = L
+        self.assertEqual(encode(codes), bytes([0, 0b10, 0, 0b10, 0, 0]))
+
+    def test_counts_and_streaks(self):
+        codes = np.array([P, P, 0, L, A, P, H, P, P, 0], dtype=np.uint8)
+        self.assertEqual(status_counts(codes)['PRESENT'], 5)
+        self.assertEqual(status_counts(codes)['LEAVE'], 0)
+        # Unmarked days and holidays neither extend nor break a streak
+        self.assertEqual(streaks(codes), (3, 3))
+        self.assertEqual(streaks(np.array([P, A], dtype=np.uint8)), (0, 1))
+        self.assertEqual(streaks(np.zeros(5, dtype=np.uint8)), (0, 0))
+
+
+class BitmapSourceTests(SimpleTestCase):
+    def test_full_day_session_decides_the_day(self):
+        student = uuid.uuid4()
+        codes = codes_from_rows([
+            (student, date(2024, 6, 3), 'FULL_DAY', 'ABSENT'),
+            (student, date(2024, 6, 3), 'MORNING', 'PRESENT'),
+            (student, date(2024, 6, 4), 'AFTERNOON', 'LATE'),
+            (student, date(2024, 6, 4), 'MORNING', 'PRESENT'),
+            (student, date(2025, 1, 1), 'FULL_DAY', 'PRESENT'),
+        ], date(2024, 6, 1), 30)
+        self.assertEqual(codes[student][2:4].tolist(), [A, P])
+        self.assertEqual(int(np.count_nonzero(codes[student])), 2)
+
+    def test_compare_counts_differing_days(self):
+        start, expected = date(2024, 6, 1), np.array([P, A, 0, P], dtype=np.uint8)
+        stored = expected.copy()
+        stored[1] = P
+        compare = AttendanceBitmapService.compare
+        self.assertEqual(compare(expected, (start, 4, encode(expected)), start, 4), 0)
+        self.assertEqual(compare(expected, (start, 4, encode(stored)), start, 4), 1)
+        self.assertEqual(compare(expected, None, start, 4), 3)
+        # A bitmap left over from before the academic year was edited
+        self.assertEqual(compare(expected, (date(2024, 5, 1), 4, encode(expected)), start, 4), 4)
@@ -0,0 +1,78 @@
+import uuid
+from datetime import date, time
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.academics.models import StudentAttendance
+from apps.attendance.utils.bulk import BulkAttendanceService
+from apps.hr.models import StaffAttendance
+from apps.tenants.models import Tenant
+
+
+class BulkAttendanceUpsertTests(SimpleTestCase):
+    def setUp(self):
+        self.service = BulkAttendanceService(config={'BATCH_SIZE': 100})
+        self.tenant = Tenant(id=uuid.uuid4(), schema_name='school')
+        self.day = date(2024, 5, 6)
+
+    def upsert(self, model, key_field, scope, changes, existing=(), prepare=None):
+        key_attname = f'{key_field}_id'
+        marked = {getattr(row, key_attname): row for row in existing}
+        with mock.patch.object(self.service, '_marked_rows', return_value=marked), \
+                mock.patch.object(model, 'objects') as manager:
+            result = self.service._upsert(model, key_field, scope, changes, self.tenant, None, prepare)
+        return result, manager.bulk_create
+
+    def test_new_and_marked_rows_are_written_in_one_upsert(self):
+        new_student, marked_student = uuid.uuid4(), uuid.uuid4()
+        marked = StudentAttendance(
+            student_id=marked_student, date=self.day, session='FULL_DAY',
+            status='ABSENT', is_active=False,
+        )
+        scope = {'date': self.day, 'session': 'FULL_DAY'}
+        result, bulk_create = self.upsert(
+            StudentAttendance, 'student', scope,
+            {new_student: {'status': 'PRESENT'}, marked_student: {'status': 'LATE'}},
+            existing=[marked],
+        )
+
+        self.assertEqual(result, {'created': 1, 'updated': 1})
+        bulk_create.assert_called_once()
+        rows = bulk_create.call_args.args[0]
+        kwargs = bulk_create.call_args.kwargs
+        self.assertIs(rows[1], marked)
+        self.assertEqual(marked.status, 'LATE')
+        self.assertTrue(marked.is_active)
+        self.assertEqual(rows[0].tenant_id, self.tenant.id)
+        self.assertEqual((rows[0].student_id, rows[0].date, rows[0].status), (new_student, self.day, 'PRESENT'))
+        self.assertTrue(kwargs['update_conflicts'])
+        self.assertEqual(kwargs['unique_fields'], ['student', 'date', 'session'])
+        self.assertIn('data_signature', kwargs['update_fields'])
+        self.assertTrue({'id', 'created_at', 'created_by', 'tenant', 'student'}.isdisjoint(kwargs['update_fields']))
+
+    def test_nothing_to_write(self):
+        result, bulk_create = self.upsert(StudentAttendance, 'student', {'date': self.day}, {})
+        self.assertEqual(result, {'created': 0, 'updated': 0})
+        bulk_create.assert_not_called()
+
+    def test_staff_hours_are_prepared_before_writing(self):
+        staff_id = uuid.uuid4()
+        _, bulk_create = self.upsert(
+            StaffAttendance, 'staff', {'date': self.day},
+            {staff_id: {'status': 'PRESENT', 'check_in': time(8, 0), 'check_out': time(16, 30)}},
+            prepare=StaffAttendance.calculate_total_hours,
+        )
+        row = bulk_create.call_args.args[0][0]
+        self.assertEqual(row.total_hours, Decimal('8.50'))
+
+    def test_invalid_ids_and_statuses_are_skipped(self):
+        valid = uuid.uuid4()
+        entries, skipped = self.service._clean_entries(StudentAttendance, {
+            str(valid): {'status': 'PRESENT'},
+            'not-a-uuid': {'status': 'PRESENT'},
+            str(uuid.uuid4()): {'status': 'MAYBE'},
+        })
+        self.assertEqual(list(entries), [valid])
+        self.assertEqual(len(skipped), 2)
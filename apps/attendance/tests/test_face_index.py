@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from apps.attendance.utils.face_index import (
+    DEFAULT_FACE_INDEX, STAFF, STUDENT, FaceIndexService, hamming_distances,
+)
+
+
+def descriptors(rng, rows):
+    return rng.integers(0, 256, size=(rows, 32), dtype=np.uint8)
+
+
+def flip_bits(array, bits, rng):
+    """Copy of ``array`` with ``bits`` random bits flipped in every row"""
+    noisy = np.unpackbits(array, axis=1)
+    for row in noisy:
+        row[rng.choice(256, size=bits, replace=False)] ^= 1
+    return np.packbits(noisy, axis=1)
+
+
+class FaceIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.service = FaceIndexService(dict(DEFAULT_FACE_INDEX, ROOT=self.root, CHUNK_ROWS=64, WORKERS=2))
+        self.rng = np.random.default_rng(7)
+        self.photos = {}
+        patcher = mock.patch.object(self.service, 'extract', side_effect=lambda path: self.photos.get(path))
+        self.extract = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def add(self, kind, person_id, path, rows=200):
+        self.photos[path] = descriptors(self.rng, rows)
+        self.service.update_person('school', kind, person_id, [('avatar', path, f'{path}:1')])
+
+    def test_hamming_distances_match_bit_counts(self):
+        query, rows = descriptors(self.rng, 3), descriptors(self.rng, 4)
+        expected = [
+            [sum(bin(a ^ b).count('1') for a, b in zip(q, r)) for r in rows] for q in query
+        ]
+        self.assertEqual(hamming_distances(query, rows).tolist(), expected)
+
+    def test_updates_write_a_new_version(self):
+        self.add(STAFF, 'a', 'a.jpg')
+        self.add(STAFF, 'b', 'b.jpg', rows=800)
+        index = self.service.load('school')
+        self.assertEqual(index.version, 2)
+        # MAX_DESCRIPTORS_PER_IMAGE caps the second photo
+        self.assertEqual(index.manifest['rows'], 700)
+        self.assertEqual(os.listdir(os.path.join(self.root, 'school')).count('descriptors-2.u8'), 1)
+        # The previous generation survives one write for readers of the old manifest
+        self.assertIn('descriptors-1.u8', os.listdir(os.path.join(self.root, 'school')))
+
+        self.service.remove_person('school', STAFF, 'a')
+        self.assertNotIn('descriptors-1.u8', os.listdir(os.path.join(self.root, 'school')))
+        index = self.service.load('school')
+        self.assertEqual([entry['person_id'] for entry in index.entries], ['b'])
+        np.testing.assert_array_equal(index.rows(index.entries[0]), self.photos['b.jpg'][:500])
+
+    def test_load_retries_when_the_data_file_was_removed(self):
+        self.add(STAFF, 'a', 'a.jpg')
+        self.service._loaded.clear()
+        real_map = self.service._map_descriptors
+        with mock.patch.object(
+            self.service, '_map_descriptors', side_effect=[FileNotFoundError, real_map('school', {'rows': 0})]
+        ) as map_descriptors:
+            self.service.load('school')
+        self.assertEqual(map_descriptors.call_count, 2)
+
+    def test_prefilter_ranks_the_photographed_person_first(self):
+        for number in range(20):
+            self.add(STUDENT, f'student-{number}', f'{number}.jpg')
+        self.add(STAFF, 'teacher', 'teacher.jpg')
+        probe = flip_bits(self.photos['7.jpg'][:100], bits=10, rng=self.rng)
+
+        index = self.service.load('school')
+        scores = self.service.prefilter(index, index.entries_for(STUDENT), probe)
+        self.assertEqual(max(scores, key=scores.get), 'student-7')
+        self.assertEqual(scores['student-7'], 64)
+        self.assertNotIn('teacher', scores)
+
+        candidates = index.entries_for(STUDENT, ['student-1', 'student-2'])
+        self.assertNotIn('student-7', self.service.prefilter(index, candidates, probe))
+
+    def test_rebuild_reuses_unchanged_photos(self):
+        self.add(STAFF, 'a', 'a.jpg')
+        self.photos['b.jpg'] = descriptors(self.rng, 50)
+        self.extract.reset_mock()
+
+        index = self.service.rebuild('school', [
+            (STAFF, 'a', [('avatar', 'a.jpg', 'a.jpg:1')]),
+            (STAFF, 'b', [('avatar', 'b.jpg', 'b.jpg:1')]),
+        ])
+        self.extract.assert_called_once_with('b.jpg')
+        self.assertEqual(index.manifest['rows'], 250)
+        np.testing.assert_array_equal(index.rows(index.entries_for(STAFF, ['a'])[0]), self.photos['a.jpg'])
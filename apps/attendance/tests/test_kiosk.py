@@ -0,0 +1,106 @@
+import uuid
+from datetime import date, datetime, time, timezone as dt_timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.attendance.serializers import KioskBatchSerializer
+from apps.attendance.utils.kiosk import (
+    ALREADY_MARKED, MARKED, MERGED, KioskIngestService, plan_visits, qr_code,
+)
+from apps.attendance.utils.summary import STAFF, STUDENT
+
+
+def scan(event_id, kind, person_id, hour, minute=0, day=6):
+    return {
+        'event_id': event_id, 'kind': kind, 'person_id': person_id,
+        'scanned_at': datetime(2024, 5, day, hour, minute, tzinfo=dt_timezone.utc),
+        'class_name_id': 'class', 'section_id': 'section',
+    }
+
+
+class KioskPlanningTests(SimpleTestCase):
+    def test_qr_payload_yields_the_admission_number(self):
+        self.assertEqual(qr_code('Name: Ada\nAdmission No: adm-2024-school_1-0042\n'), 'ADM-2024-SCHOOL_1-0042')
+        self.assertEqual(qr_code(' reg-77 '), 'REG-77')
+
+    def test_scans_are_grouped_per_person_per_day(self):
+        student = uuid.uuid4()
+        visits = plan_visits([
+            scan('b', STUDENT, student, 8, 5),
+            scan('a', STUDENT, student, 7, 55),
+            scan('c', STUDENT, student, 8, day=7),
+            scan('d', STUDENT, None, 8),
+        ])
+        self.assertEqual(
+            {key: [event['event_id'] for event in events] for key, events in visits.items()},
+            {(STUDENT, student, date(2024, 5, 6)): ['a', 'b'], (STUDENT, student, date(2024, 5, 7)): ['c']},
+        )
+
+
+class KioskChangeTests(SimpleTestCase):
+    def setUp(self):
+        self.service = KioskIngestService(config={'MAX_EVENTS': 10, 'CHECK_OUT_AFTER_MINUTES': 60, 'REMARKS': 'Kiosk'})
+        self.day = date(2024, 5, 6)
+
+    def changes(self, method, people, existing):
+        outcomes = {}
+        with mock.patch.object(self.service, '_marked_rows', return_value=existing):
+            changes = getattr(self.service, method)(self.day, people, outcomes)
+        return changes, outcomes
+
+    def test_marked_students_are_left_alone(self):
+        marked, new = uuid.uuid4(), uuid.uuid4()
+        changes, outcomes = self.changes('_student_changes', {
+            marked: [scan('a', STUDENT, marked, 8)],
+            new: [scan('b', STUDENT, new, 8)],
+        }, {marked: SimpleNamespace(is_active=True)})
+        self.assertEqual(list(changes), [new])
+        self.assertEqual(changes[new]['status'], 'PRESENT')
+        self.assertEqual(outcomes, {'a': ALREADY_MARKED, 'b': MARKED})
+
+    def test_staff_check_in_and_check_out(self):
+        staff, double = uuid.uuid4(), uuid.uuid4()
+        changes, outcomes = self.changes('_staff_changes', {
+            staff: [scan('a', STAFF, staff, 8), scan('b', STAFF, staff, 16, 30)],
+            double: [scan('c', STAFF, double, 8), scan('d', STAFF, double, 8, 1)],
+        }, {})
+        self.assertEqual((changes[staff]['check_in'], changes[staff]['check_out']), (time(8), time(16, 30)))
+        self.assertNotIn('check_out', changes[double])
+        self.assertEqual(outcomes, {'a': MARKED, 'c': MARKED})
+
+    def test_marked_staff_only_move_check_out_forward(self):
+        staff = uuid.uuid4()
+        row = SimpleNamespace(is_active=True, check_in=time(8), check_out=time(17))
+        people = {staff: [scan('a', STAFF, staff, 12)]}
+        self.assertEqual(self.changes('_staff_changes', people, {staff: row}), ({}, {'a': ALREADY_MARKED}))
+
+        people = {staff: [scan('b', STAFF, staff, 18)]}
+        changes, _ = self.changes('_staff_changes', people, {staff: row})
+        self.assertEqual(changes, {staff: {'check_out': time(18)}})
+
+    def test_merged_scans_are_reported(self):
+        student = uuid.uuid4()
+        outcomes = {}
+        with mock.patch.object(self.service, '_student_changes', return_value={}) as changes:
+            self.service._record_visits(None, plan_visits([
+                scan('a', STUDENT, student, 8), scan('b', STUDENT, student, 9),
+            ]), outcomes, None)
+        changes.assert_called_once()
+        self.assertEqual(outcomes, {'b': MERGED})
+
+
+class KioskBatchSerializerTests(SimpleTestCase):
+    def test_events_need_a_person_or_a_qr_payload(self):
+        serializer = KioskBatchSerializer(data={'device_id': 'gate-1', 'events': [
+            {'event_id': '1', 'kind': STUDENT, 'scanned_at': '2024-05-06T08:00:00Z'},
+        ]})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('events', serializer.errors)
+
+    def test_valid_batch(self):
+        serializer = KioskBatchSerializer(data={'device_id': 'gate-1', 'events': [
+            {'event_id': '1', 'kind': STAFF, 'qr': 'EMP2024SCI001', 'scanned_at': '2024-05-06T08:00:00Z'},
+        ]})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
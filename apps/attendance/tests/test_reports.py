@@ -0,0 +1,63 @@
+import io
+from datetime import date
+from unittest import mock
+
+import openpyxl
+from django.test import SimpleTestCase
+
+from apps.attendance.utils.reports import STAFF_EXPORT_COLUMNS, AttendanceCalendar, export_rows
+from apps.core.utils.streaming import stream_csv, write_xlsx
+
+
+def calendar(weekdays=frozenset(range(5)), staff_holidays=(), school_holidays=(), class_holidays=None):
+    with mock.patch.object(AttendanceCalendar, '_load_weekdays', return_value=weekdays), \
+            mock.patch.object(AttendanceCalendar, '_load_staff_holidays', return_value=set(staff_holidays)), \
+            mock.patch.object(AttendanceCalendar, '_load_school_holidays',
+                              return_value=(set(school_holidays), class_holidays or {})):
+        # May 2024 starts on a Wednesday and has 23 weekdays
+        return AttendanceCalendar(None, date(2024, 5, 1), date(2024, 5, 31))
+
+
+class AttendanceCalendarTests(SimpleTestCase):
+    def test_weekdays_follow_the_work_schedule(self):
+        self.assertEqual(calendar().staff_working_days, 23)
+        self.assertEqual(calendar(weekdays=frozenset(range(6))).staff_working_days, 27)
+
+    def test_holidays_on_working_days_are_excluded(self):
+        # 1 May is a Wednesday, 4 May a Saturday
+        staff = calendar(staff_holidays={date(2024, 5, 1), date(2024, 5, 4)})
+        self.assertEqual(staff.staff_working_days, 22)
+
+    def test_class_holidays_only_affect_their_class(self):
+        cal = calendar(
+            school_holidays={date(2024, 5, 1)},
+            class_holidays={'grade-10': {date(2024, 5, 2), date(2024, 5, 3)}},
+        )
+        self.assertEqual(cal.school_days(), 22)
+        self.assertEqual(cal.school_days('grade-10'), 20)
+        self.assertEqual(cal.school_days('grade-9'), 22)
+
+
+class ReportExportTests(SimpleTestCase):
+    def setUp(self):
+        self.report = [{
+            'employee_id': 'EMP001', 'staff_name': 'Ada Obi', 'department': 'Science',
+            'designation': 'Teacher', 'present_days': 20, 'absent_days': 1, 'late_days': 1,
+            'half_day_days': 0, 'leave_days': 1, 'working_days': 23, 'attendance_percent': 87.0,
+        }]
+        self.header = [title for title, _ in STAFF_EXPORT_COLUMNS]
+
+    def test_csv_streams_header_and_rows(self):
+        response = stream_csv('report.csv', self.header, export_rows(iter(self.report), STAFF_EXPORT_COLUMNS))
+        content = b''.join(response.streaming_content).decode()
+        lines = content.splitlines()
+        self.assertEqual(lines[0].split(',')[:2], ['Employee ID', 'Staff Name'])
+        self.assertEqual(lines[1], 'EMP001,Ada Obi,Science,Teacher,20,1,1,0,1,23,87.0')
+        self.assertIn('attachment; filename="report.csv"', response['Content-Disposition'])
+
+    def test_xlsx_is_written_in_write_only_mode(self):
+        buffer = io.BytesIO()
+        write_xlsx(buffer, self.header, export_rows(iter(self.report), STAFF_EXPORT_COLUMNS), title='Staff')
+        buffer.seek(0)
+        sheet = openpyxl.load_workbook(buffer)['Staff']
+        self.assertEqual([cell.value for cell in sheet[2]][:5], ['EMP001', 'Ada Obi', 'Science', 'Teacher', 20])
@@ -0,0 +1,84 @@
+import uuid
+from datetime import date
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.academics.models import StudentAttendance
+from apps.attendance import signals
+from apps.attendance.utils.summary import STUDENT, AttendanceSummaryService, student_scope_key
+
+
+@mock.patch('apps.attendance.signals._apply')
+class StudentAttendanceSummarySignalTests(SimpleTestCase):
+    def setUp(self):
+        self.tenant_id = uuid.uuid4()
+        self.day = date(2024, 5, 6)
+        self.class_id, self.section_id = uuid.uuid4(), uuid.uuid4()
+
+    def record(self):
+        instance = StudentAttendance(
+            tenant_id=self.tenant_id, date=self.day, status='PRESENT',
+            class_name_id=self.class_id, section_id=self.section_id,
+        )
+        instance._summary_state = signals._student_state(instance)
+        return instance
+
+    def bucket(self, section_id=None):
+        return (self.tenant_id, self.day, {'class_id': self.class_id, 'section_id': section_id or self.section_id})
+
+    def save(self, instance, created=False):
+        signals.update_summary_on_student_attendance_save(StudentAttendance, instance, created=created)
+
+    def test_new_record_is_counted(self, apply):
+        self.save(self.record(), created=True)
+        apply.assert_called_once_with(STUDENT, self.bucket(), {'PRESENT': 1})
+
+    def test_status_change_moves_the_count(self, apply):
+        instance = self.record()
+        instance.status = 'ABSENT'
+        self.save(instance)
+        apply.assert_called_once_with(STUDENT, self.bucket(), {'PRESENT': -1, 'ABSENT': 1})
+
+    def test_section_change_moves_between_rows(self, apply):
+        instance = self.record()
+        new_section = uuid.uuid4()
+        instance.section_id = new_section
+        self.save(instance)
+        self.assertEqual(apply.call_args_list, [
+            mock.call(STUDENT, self.bucket(), {'PRESENT': -1}),
+            mock.call(STUDENT, self.bucket(new_section), {'PRESENT': 1}),
+        ])
+
+    def test_soft_delete_uncounts(self, apply):
+        instance = self.record()
+        instance.is_active = False
+        self.save(instance)
+        apply.assert_called_once_with(STUDENT, self.bucket(), {'PRESENT': -1})
+
+    def test_unrelated_change_is_ignored(self, apply):
+        instance = self.record()
+        instance.remarks = 'Arrived with a note'
+        self.save(instance)
+        apply.assert_not_called()
+
+
+class SummaryBuildTests(SimpleTestCase):
+    def test_grouped_counts_become_one_row_per_day_and_section(self):
+        tenant_id, class_id, section_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        day = date(2024, 5, 6)
+        grouped = [
+            {'date': day, 'class_name_id': class_id, 'section_id': section_id, 'status': 'PRESENT', 'count': 28},
+            {'date': day, 'class_name_id': class_id, 'section_id': section_id, 'status': 'LEAVE', 'count': 2},
+            {'date': day, 'class_name_id': class_id, 'section_id': section_id, 'status': 'UNKNOWN', 'count': 5},
+        ]
+        rows = AttendanceSummaryService._build(
+            tenant_id, STUDENT, grouped,
+            key=lambda row: (row['class_name_id'], row['section_id']),
+            fields=lambda key: {'scope_key': student_scope_key(*key), 'active_population': 31},
+        )
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertEqual((row.present, row.on_leave, row.total), (28, 2, 30))
+        self.assertEqual(row.scope_key, f'{class_id}:{section_id}')
+        self.assertEqual(row.active_population, 31)
@@ -1,6 +1,6 @@
 # attendance/urls.py
 from django.urls import path
-from . import views
+from . import views, api_views
 
 app_name = 'attendance'
 
@@ -28,6 +28,7 @@ urlpatterns = [
     path('mark/', views.MarkAttendanceView.as_view(), name='mark_attendance'),
     path('report/', views.AttendanceReportView.as_view(), name='report'),
     path('qr-scan/', views.QRCodeAttendanceView.as_view(), name='qr_attendance'),
+    path('api/kiosk/scans/', api_views.kiosk_scan_batch, name='api_kiosk_scans'),
     
     # Analytics & Reports
     path('analytics/', views.AttendanceAnalyticsView.as_view(), name='analytics'),
@@ -0,0 +1,340 @@
+# apps/attendance/utils/bitmap.py
+"""
+Per-student attendance bitmaps
+
+Each student has one StudentAttendanceBitmap per academic year: the
+status of every day packed at three bits per day, stored as three bit
+planes so that a day is updated in the database with PostgreSQL's
+set_bit() and decoded for a whole year with one np.unpackbits() call.
+
+Portal pages read a student's month, streaks and percentages from one
+row instead of counting StudentAttendance once per status. Row-level
+writes keep the bitmaps current through signals, bulk writes refresh
+the days they touched, and ``check`` compares bitmaps with the source
+rows (the check_attendance_bitmaps command).
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import BinaryField, F, Func, Value
+from django.utils import timezone
+
+BITS_PER_DAY = 3
+
+# Status -> 3-bit code; 0 means no attendance recorded that day
+STATUS_CODES = {
+    'PRESENT': 1,
+    'ABSENT': 2,
+    'LATE': 3,
+    'HALF_DAY': 4,
+    'HOLIDAY': 5,
+    'LEAVE': 6,
+}
+CODE_STATUSES = {code: status for status, code in STATUS_CODES.items()}
+
+# The session that stands for the day when a student has several records
+SESSION_PRECEDENCE = {'AFTERNOON': 0, 'MORNING': 1, 'FULL_DAY': 2}
+
+# Days counted as attended by streaks
+ATTENDED_CODES = (STATUS_CODES['PRESENT'], STATUS_CODES['LATE'])
+# Days that neither extend nor break a streak
+NEUTRAL_CODES = (0, STATUS_CODES['HOLIDAY'])
+
+STUDENT_CHUNK_SIZE = 500
+
+
+def plane_bytes(days: int) -> int:
+    return (days + 7) // 8
+
+
+def encode(codes: np.ndarray) -> bytes:
+    """Pack one code per day into three little-endian bit planes"""
+    codes = np.asarray(codes, dtype=np.uint8)
+    planes = np.stack([(codes >> plane) & 1 for plane in range(BITS_PER_DAY)])
+    return np.packbits(planes, axis=1, bitorder='little').tobytes()
+
+
+def decode(bits, days: int) -> np.ndarray:
+    """One uint8 code per day from the packed planes"""
+    planes = np.frombuffer(bytes(bits), dtype=np.uint8).reshape(BITS_PER_DAY, plane_bytes(days))
+    planes = np.unpackbits(planes, axis=1, bitorder='little')[:, :days]
+    codes = planes[0].copy()
+    for plane in range(1, BITS_PER_DAY):
+        codes |= planes[plane] << plane
+    return codes
+
+
+def status_counts(codes: np.ndarray) -> Dict[str, int]:
+    """``{status: days}`` for every status, zero included"""
+    counts = np.bincount(codes, minlength=len(STATUS_CODES) + 1)
+    return {status: int(counts[code]) for status, code in STATUS_CODES.items()}
+
+
+def streaks(codes: np.ndarray) -> Tuple[int, int]:
+    """
+    (current, longest) runs of attended days, skipping days without
+    attendance and holidays
+    """
+    marked = codes[~np.isin(codes, NEUTRAL_CODES)]
+    attended = np.isin(marked, ATTENDED_CODES).astype(np.int8)
+    if not attended.any():
+        return 0, 0
+    edges = np.diff(np.concatenate(([0], attended, [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    longest = int((ends - starts).max())
+    current = int(ends[-1] - starts[-1]) if ends[-1] == len(attended) else 0
+    return current, longest
+
+
+def codes_from_rows(rows: Iterable[Sequence], start: date, days: int) -> Dict[object, np.ndarray]:
+    """
+    ``{student_id: codes}`` from (student_id, date, session, status)
+    rows; the session with the highest precedence decides the day
+    """
+    chosen = {}
+    for student_id, day, session, status in rows:
+        offset = (day - start).days
+        if not 0 <= offset < days or status not in STATUS_CODES:
+            continue
+        precedence = SESSION_PRECEDENCE.get(session, -1)
+        current = chosen.get((student_id, offset))
+        if current is None or precedence >= current[0]:
+            chosen[(student_id, offset)] = (precedence, STATUS_CODES[status])
+
+    result = defaultdict(lambda: np.zeros(days, dtype=np.uint8))
+    for (student_id, offset), (_, code) in chosen.items():
+        result[student_id][offset] = code
+    return dict(result)
+
+
+def _set_day(offset: int, size: int, code: int):
+    """set_bit() expression writing ``code`` at ``offset`` in each plane"""
+    expression = F('bits')
+    for plane in range(BITS_PER_DAY):
+        expression = Func(
+            expression, Value(plane * size * 8 + offset), Value((code >> plane) & 1),
+            function='set_bit', output_field=BinaryField(),
+        )
+    return expression
+
+
+class AttendanceBitmapService:
+    """Keeps StudentAttendanceBitmap rows in step with StudentAttendance"""
+
+    # ---------------- academic years ----------------
+
+    @staticmethod
+    def year_for(tenant_id, day: date) -> Optional[Tuple]:
+        """(id, start_date, end_date) of the academic year containing ``day``"""
+        from apps.academics.models import AcademicYear
+
+        return AcademicYear._base_manager.filter(
+            tenant_id=tenant_id, is_active=True, start_date__lte=day, end_date__gte=day
+        ).order_by('-is_current', '-start_date').values_list('id', 'start_date', 'end_date').first()
+
+    # ---------------- writing ----------------
+
+    def refresh_day(self, tenant_id, day: date, student_ids: Iterable) -> None:
+        """
+        Rewrite one day of the given students' bitmaps from their
+        attendance rows: one set_bit() UPDATE per status; students without
+        a bitmap for the year get one built from their whole year
+        """
+        from apps.academics.models import StudentAttendance
+        from apps.attendance.models import StudentAttendanceBitmap
+
+        student_ids = list(set(student_ids))
+        year = self.year_for(tenant_id, day) if student_ids else None
+        if year is None:
+            return
+        year_id, start, end = year
+        days = (end - start).days + 1
+        offset = (day - start).days
+
+        rows = StudentAttendance._base_manager.filter(
+            tenant_id=tenant_id, is_active=True, date=day, student_id__in=student_ids
+        ).values_list('student_id', 'date', 'session', 'status')
+        codes = codes_from_rows(rows, day, 1)
+
+        bitmaps = StudentAttendanceBitmap.objects.filter(
+            tenant_id=tenant_id, academic_year_id=year_id, start_date=start, days=days
+        )
+        with transaction.atomic():
+            stored = set(bitmaps.filter(student_id__in=student_ids).values_list('student_id', flat=True))
+            by_code = defaultdict(list)
+            for student_id in stored:
+                by_code[int(codes[student_id][0]) if student_id in codes else 0].append(student_id)
+            for code, ids in by_code.items():
+                bitmaps.filter(student_id__in=ids).update(
+                    bits=_set_day(offset, plane_bytes(days), code), updated_at=timezone.now()
+                )
+            missing = [student_id for student_id in student_ids if student_id not in stored]
+            if missing:
+                self.build(tenant_id, year, missing)
+
+    def build(self, tenant_id, year: Tuple, student_ids: Optional[Sequence] = None) -> int:
+        """
+        Rebuild the bitmaps of one academic year from the attendance rows,
+        for ``student_ids`` or every student with attendance in the year.
+        Returns the number of bitmaps written.
+        """
+        from apps.attendance.models import StudentAttendanceBitmap
+
+        year_id, start, end = year
+        days = (end - start).days + 1
+        if student_ids is None:
+            student_ids = self._students_with_attendance(tenant_id, start, end)
+
+        written = 0
+        for chunk in self._chunks(student_ids):
+            codes = self._source_codes(tenant_id, start, days, chunk)
+            rows = [
+                StudentAttendanceBitmap(
+                    tenant_id=tenant_id, student_id=student_id, academic_year_id=year_id,
+                    start_date=start, days=days,
+                    bits=encode(codes.get(student_id, np.zeros(days, dtype=np.uint8))),
+                )
+                for student_id in chunk
+            ]
+            StudentAttendanceBitmap.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['tenant', 'student', 'academic_year'],
+                update_fields=['start_date', 'days', 'bits', 'updated_at'],
+            )
+            written += len(rows)
+        return written
+
+    # ---------------- reading ----------------
+
+    def codes_between(self, tenant_id, student_id, start: date, end: date) -> Optional[np.ndarray]:
+        """
+        The student's codes for [start, end] from the bitmaps overlapping
+        it (one query), or None when no bitmap covers any of it
+        """
+        from apps.attendance.models import StudentAttendanceBitmap
+
+        bitmaps = StudentAttendanceBitmap.objects.filter(
+            tenant_id=tenant_id, student_id=student_id, start_date__lte=end
+        ).values_list('start_date', 'days', 'bits')
+
+        codes = np.zeros((end - start).days + 1, dtype=np.uint8)
+        covered = False
+        for bitmap_start, days, bits in bitmaps:
+            first = max(start, bitmap_start)
+            last = min(end, bitmap_start + timedelta(days=days - 1))
+            if first > last:
+                continue
+            decoded = decode(bits, days)
+            codes[(first - start).days:(last - start).days + 1] = \
+                decoded[(first - bitmap_start).days:(last - bitmap_start).days + 1]
+            covered = True
+        return codes if covered else None
+
+    def month(self, tenant_id, student_id, year: int, month: int) -> Optional[Dict]:
+        """
+        Calendar and totals of one month: ``{'days': [(date, status)],
+        'counts': {status: days}, 'current_streak', 'longest_streak'}``
+        """
+        start = date(year, month, 1)
+        end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        codes = self.codes_between(tenant_id, student_id, start, end)
+        if codes is None:
+            return None
+        current, longest = streaks(codes)
+        return {
+            'days': [
+                (start + timedelta(days=offset), CODE_STATUSES.get(int(code)))
+                for offset, code in enumerate(codes)
+            ],
+            'counts': status_counts(codes),
+            'current_streak': current,
+            'longest_streak': longest,
+        }
+
+    # ---------------- consistency ----------------
+
+    def check(self, tenant_id, year: Tuple, fix: bool = False) -> List[Dict]:
+        """
+        Compare the bitmaps of an academic year with the attendance rows.
+        Returns ``[{'student_id', 'days'}]`` for every student whose
+        bitmap is missing, stale or differs on ``days`` days; ``fix``
+        rebuilds them.
+        """
+        from apps.attendance.models import StudentAttendanceBitmap
+
+        year_id, start, end = year
+        days = (end - start).days + 1
+        stored_ids = set(
+            StudentAttendanceBitmap.objects.filter(
+                tenant_id=tenant_id, academic_year_id=year_id
+            ).values_list('student_id', flat=True)
+        )
+        student_ids = sorted(stored_ids | set(self._students_with_attendance(tenant_id, start, end)), key=str)
+
+        mismatched = []
+        for chunk in self._chunks(student_ids):
+            expected = self._source_codes(tenant_id, start, days, chunk)
+            stored = {
+                student_id: (bitmap_start, bitmap_days, bits)
+                for student_id, bitmap_start, bitmap_days, bits in StudentAttendanceBitmap.objects.filter(
+                    tenant_id=tenant_id, academic_year_id=year_id, student_id__in=chunk
+                ).values_list('student_id', 'start_date', 'days', 'bits')
+            }
+            for student_id in chunk:
+                differing = self.compare(
+                    expected.get(student_id, np.zeros(days, dtype=np.uint8)),
+                    stored.get(student_id), start, days,
+                )
+                if differing:
+                    mismatched.append({'student_id': student_id, 'days': differing})
+
+        if fix and mismatched:
+            self.build(tenant_id, year, [row['student_id'] for row in mismatched])
+        return mismatched
+
+    @staticmethod
+    def compare(expected: np.ndarray, stored: Optional[Tuple], start: date, days: int) -> int:
+        """Days on which a stored (start_date, days, bits) bitmap is wrong"""
+        if stored is None:
+            return int(np.count_nonzero(expected))
+        stored_start, stored_days, bits = stored
+        if stored_start != start or stored_days != days:
+            return days
+        return int(np.count_nonzero(decode(bits, days) != expected))
+
+    # ---------------- internals ----------------
+
+    @staticmethod
+    def _source_codes(tenant_id, start: date, days: int, student_ids: Sequence) -> Dict:
+        from apps.academics.models import StudentAttendance
+
+        rows = StudentAttendance._base_manager.filter(
+            tenant_id=tenant_id, is_active=True, student_id__in=student_ids,
+            date__range=(start, start + timedelta(days=days - 1)),
+        ).values_list('student_id', 'date', 'session', 'status').iterator(chunk_size=5000)
+        return codes_from_rows(rows, start, days)
+
+    @staticmethod
+    def _students_with_attendance(tenant_id, start: date, end: date) -> List:
+        from apps.academics.models import StudentAttendance
+
+        return list(
+            StudentAttendance._base_manager.filter(
+                tenant_id=tenant_id, is_active=True, date__range=(start, end)
+            )
+            .order_by().values_list('student_id', flat=True).distinct()
+        )
+
+    @staticmethod
+    def _chunks(items: Sequence):
+        items = list(items)
+        for index in range(0, len(items), STUDENT_CHUNK_SIZE):
+            yield items[index:index + STUDENT_CHUNK_SIZE]
+
+
+attendance_bitmap = AttendanceBitmapService()
@@ -0,0 +1,220 @@
+# apps/attendance/utils/bulk.py
+"""
+Set-based attendance marking
+
+A class register or a whole staff roll is written with one validation
+query, one query for the rows already marked and one INSERT ... ON
+CONFLICT DO UPDATE per batch, instead of a get() plus update_or_create()
+(and a full_clean()) per person.
+"""
+
+import uuid
+import logging
+from typing import Dict, Mapping, Optional
+
+from django.conf import settings
+
+from apps.attendance.utils.bitmap import attendance_bitmap
+from apps.attendance.utils.summary import STAFF, STUDENT, attendance_summary
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BULK_ATTENDANCE = {
+    'BATCH_SIZE': 1000,
+}
+
+# Fields a staff attendance entry may set
+STAFF_ENTRY_FIELDS = ('status', 'check_in', 'check_out', 'remarks')
+
+# Kept from the first insert when an existing row is updated
+PRESERVED_FIELDS = frozenset({'created_at', 'created_by', 'tenant'})
+
+
+def _bulk_attendance_settings():
+    config = dict(DEFAULT_BULK_ATTENDANCE)
+    config.update(getattr(settings, 'BULK_ATTENDANCE', {}))
+    return config
+
+
+def _parse_id(value) -> Optional[uuid.UUID]:
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class BulkAttendanceService:
+    """
+    Marks attendance for many students or staff members of one tenant.
+
+    Every call returns ``{'created': n, 'updated': n, 'skipped': [...]}``;
+    ``skipped`` lists the submitted ids that were not written because
+    they are unknown, outside the section, or carry an invalid status.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or _bulk_attendance_settings()
+
+    # ---------------- public API ----------------
+
+    def mark_students(self, tenant, date, class_name, section, statuses: Mapping,
+                      marked_by=None, session: str = 'FULL_DAY') -> Dict:
+        """
+        Mark ``{student_id: status}`` for one section. Students not
+        currently in ``section`` are skipped.
+        """
+        from apps.academics.models import StudentAttendance
+        from apps.students.models import Student
+
+        entries, skipped = self._clean_entries(
+            StudentAttendance, {key: {'status': status} for key, status in statuses.items()}
+        )
+        enrolled = set(
+            Student.objects.filter(tenant=tenant, section=section, pk__in=list(entries))
+            .values_list('pk', flat=True)
+        )
+        skipped.extend(str(pk) for pk in entries if pk not in enrolled)
+
+        changes = {
+            pk: dict(values, class_name=class_name, section=section)
+            for pk, values in entries.items() if pk in enrolled
+        }
+        result = self._upsert(
+            StudentAttendance, 'student', {'date': date, 'session': session},
+            changes, tenant, marked_by,
+        )
+        if changes:
+            self._refresh_summary(tenant, date, [STUDENT], section_id=section.pk)
+            self._refresh_bitmaps(tenant, date, list(changes))
+        result['skipped'] = skipped
+        return result
+
+    def mark_staff(self, tenant, date, entries: Mapping, marked_by=None) -> Dict:
+        """
+        Mark ``{staff_id: status}`` or ``{staff_id: {'status': ...,
+        'check_in': ..., 'check_out': ..., 'remarks': ...}}`` for one day.
+        Inactive or unknown staff are skipped.
+        """
+        from apps.hr.models import Staff, StaffAttendance
+
+        entries, skipped = self._clean_entries(StaffAttendance, {
+            key: {
+                field: value for field, value in (
+                    entry.items() if isinstance(entry, Mapping) else [('status', entry)]
+                ) if field in STAFF_ENTRY_FIELDS
+            }
+            for key, entry in entries.items()
+        })
+        employed = set(
+            Staff.objects.filter(tenant=tenant, pk__in=list(entries)).values_list('pk', flat=True)
+        )
+        skipped.extend(str(pk) for pk in entries if pk not in employed)
+
+        changes = {pk: values for pk, values in entries.items() if pk in employed}
+        result = self._upsert(
+            StaffAttendance, 'staff', {'date': date}, changes, tenant, marked_by,
+            prepare=StaffAttendance.calculate_total_hours,
+        )
+        if changes:
+            self._refresh_summary(tenant, date, [STAFF])
+        result['skipped'] = skipped
+        return result
+
+    # ---------------- internals ----------------
+
+    @staticmethod
+    def _clean_entries(model, entries: Mapping):
+        """Parse the ids and drop entries whose status is not a valid choice"""
+        statuses = {value for value, _ in model._meta.get_field('status').choices}
+        cleaned, skipped = {}, []
+        for key, values in entries.items():
+            pk = _parse_id(key)
+            if pk is None or values.get('status') not in statuses:
+                skipped.append(str(key))
+                continue
+            cleaned[pk] = values
+        return cleaned, skipped
+
+    def _upsert(self, model, key_field: str, scope: Dict, changes: Dict, tenant,
+                marked_by, prepare=None) -> Dict:
+        """
+        Write ``changes`` (``{key_id: {field: value}}``) as rows of
+        ``model`` identified by ``key_field`` plus the ``scope`` lookups.
+
+        Rows already marked are loaded once and updated in place, so their
+        id, creation audit fields and signature stay consistent with what
+        is stored; the rest are inserted. Both go through a single
+        bulk_create(update_conflicts=True), which signs the rows and turns
+        a row inserted concurrently into an update.
+        """
+        if not changes:
+            return {'created': 0, 'updated': 0}
+
+        key_attname = model._meta.get_field(key_field).attname
+        existing = self._marked_rows(model, key_attname, list(changes), scope)
+
+        rows = []
+        for pk, values in changes.items():
+            row = existing.get(pk)
+            if row is None:
+                row = model(tenant=tenant, created_by=marked_by, **{key_attname: pk}, **scope)
+            elif not row.is_active:
+                # Marking again brings back a soft-deleted record
+                row.is_active = True
+                row.deleted_at = None
+            for field, value in values.items():
+                setattr(row, field, value)
+            row.marked_by = marked_by
+            row.updated_by = marked_by
+            if prepare is not None:
+                prepare(row)
+            rows.append(row)
+
+        unique_fields = list(model._meta.unique_together[0])
+        update_fields = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key
+            and field.name not in unique_fields
+            and field.name not in PRESERVED_FIELDS
+        ]
+        # bulk_create() runs every batch in one transaction
+        model.objects.bulk_create(
+            rows,
+            batch_size=self.config['BATCH_SIZE'],
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+        return {'created': len(rows) - len(existing), 'updated': len(existing)}
+
+    @staticmethod
+    def _refresh_summary(tenant, date, populations, **scope):
+        """
+        bulk_create() sends no signals, so the day's summary rows are
+        recounted instead; a failure is repaired by the nightly recount
+        """
+        try:
+            attendance_summary.refresh(tenant.pk, date, date, populations=populations, **scope)
+        except Exception as e:
+            logger.error(f"Failed to refresh attendance summary for {date}: {e}", exc_info=True)
+
+    @staticmethod
+    def _refresh_bitmaps(tenant, date, student_ids):
+        """Rewrite the day in the students' attendance bitmaps"""
+        try:
+            attendance_bitmap.refresh_day(tenant.pk, date, student_ids)
+        except Exception as e:
+            logger.error(f"Failed to refresh attendance bitmaps for {date}: {e}", exc_info=True)
+
+    @staticmethod
+    def _marked_rows(model, key_attname: str, keys, scope: Dict) -> Dict:
+        """Rows already marked for ``keys``, soft-deleted ones included"""
+        return {
+            getattr(row, key_attname): row
+            for row in model._base_manager.filter(**{f'{key_attname}__in': keys}, **scope)
+        }
+
+
+bulk_attendance = BulkAttendanceService()
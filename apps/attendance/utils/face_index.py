@@ -0,0 +1,456 @@
+# apps/attendance/utils/face_index.py
+"""
+Per-tenant ORB descriptor index for face attendance
+
+Descriptors are extracted once, when a photo is uploaded, and stored as
+one uint8 matrix (32 bytes per ORB descriptor) in a memory-mapped file
+per tenant schema, next to a JSON manifest that maps row ranges to
+people:
+
+    <ROOT>/<schema>/manifest.json
+    <ROOT>/<schema>/descriptors-<version>.u8
+
+Every change writes a new data file and then swaps the manifest in with
+os.replace(), so readers always see a complete version; processes reload
+when the manifest changes.
+
+Matching a probe photo first scores everyone with a vectorized Hamming
+prefilter (how many of a person's descriptors have a near neighbour
+among the probe's strongest descriptors), optionally fanned out over a
+thread pool, and then runs OpenCV's cross-checked brute-force matcher on
+the best few candidates only.
+"""
+
+import os
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTOR_BYTES = 32
+MANIFEST_NAME = 'manifest.json'
+FORMAT_VERSION = 1
+
+STAFF = 'staff'
+STUDENT = 'student'
+
+DEFAULT_FACE_INDEX = {
+    'ROOT': os.path.join(settings.BASE_DIR, 'face_index'),
+    'NFEATURES': 1000,
+    # Strongest descriptors kept per indexed photo
+    'MAX_DESCRIPTORS_PER_IMAGE': 500,
+    # Probe descriptors used by the prefilter
+    'PREFILTER_QUERY_DESCRIPTORS': 64,
+    # People passed from the prefilter to the exact matcher
+    'PREFILTER_CANDIDATES': 10,
+    'GOOD_DISTANCE': 50,
+    'MATCH_THRESHOLD': 15,
+    # Index rows per prefilter chunk, and threads the chunks fan out to
+    'CHUNK_ROWS': 4096,
+    'WORKERS': 4,
+}
+
+if hasattr(np, 'bitwise_count'):
+    def _popcount(values: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(values)
+else:
+    _POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+    def _popcount(values: np.ndarray) -> np.ndarray:
+        return _POPCOUNT[values]
+
+
+def _face_index_settings():
+    config = dict(DEFAULT_FACE_INDEX)
+    config.update(getattr(settings, 'FACE_INDEX', {}))
+    return config
+
+
+def hamming_distances(query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """(len(query), len(rows)) Hamming distances between uint8 descriptors"""
+    xor = np.bitwise_xor(query[:, None, :], rows[None, :, :])
+    return _popcount(xor).sum(axis=2, dtype=np.uint16)
+
+
+class FaceDescriptorIndex:
+    """One loaded version of a tenant's index"""
+
+    def __init__(self, manifest: Dict, descriptors: np.ndarray):
+        self.manifest = manifest
+        self.version = manifest['version']
+        self.entries = manifest['entries']
+        self.descriptors = descriptors
+
+    @classmethod
+    def empty(cls) -> 'FaceDescriptorIndex':
+        return cls(
+            {'format': FORMAT_VERSION, 'version': 0, 'rows': 0, 'data_file': None, 'entries': []},
+            np.empty((0, DESCRIPTOR_BYTES), dtype=np.uint8),
+        )
+
+    def entries_for(self, kind: str, person_ids: Optional[Iterable] = None) -> List[Dict]:
+        wanted = None if person_ids is None else {str(pk) for pk in person_ids}
+        return [
+            entry for entry in self.entries
+            if entry['kind'] == kind and entry['count']
+            and (wanted is None or entry['person_id'] in wanted)
+        ]
+
+    def rows(self, entry: Dict) -> np.ndarray:
+        return self.descriptors[entry['offset']:entry['offset'] + entry['count']]
+
+
+class FaceIndexService:
+    """Builds, stores and searches the per-tenant descriptor indexes"""
+
+    def __init__(self, config=None):
+        self.config = config or _face_index_settings()
+        self._loaded: Dict[str, Tuple[int, FaceDescriptorIndex]] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    # ---------------- extraction ----------------
+
+    def extract(self, image) -> Optional[np.ndarray]:
+        """
+        ORB descriptors of a grayscale image (a path or a decoded array),
+        strongest first, or None when no features are found
+        """
+        import cv2
+
+        if isinstance(image, (str, os.PathLike)):
+            image = cv2.imread(os.fspath(image), cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                return None
+        orb = cv2.ORB_create(nfeatures=self.config['NFEATURES'])
+        keypoints, descriptors = orb.detectAndCompute(image, None)
+        if descriptors is None:
+            return None
+        order = np.argsort([-keypoint.response for keypoint in keypoints], kind='stable')
+        return np.ascontiguousarray(descriptors[order], dtype=np.uint8)
+
+    # ---------------- storage ----------------
+
+    def _directory(self, schema_name: str) -> str:
+        return os.path.join(os.fspath(self.config['ROOT']), schema_name)
+
+    def load(self, schema_name: str) -> FaceDescriptorIndex:
+        """The current index of a schema, reloaded when the manifest changes"""
+        path = os.path.join(self._directory(schema_name), MANIFEST_NAME)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return FaceDescriptorIndex.empty()
+
+        cached = self._loaded.get(schema_name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        for attempt in range(3):
+            with open(path) as fh:
+                manifest = json.load(fh)
+            try:
+                descriptors = self._map_descriptors(schema_name, manifest)
+                break
+            except FileNotFoundError:
+                # A writer replaced the manifest and removed this data file
+                # after we read it; the fresh manifest names a newer one
+                if attempt == 2:
+                    raise
+                mtime = os.stat(path).st_mtime_ns
+        index = FaceDescriptorIndex(manifest, descriptors)
+        self._loaded[schema_name] = (mtime, index)
+        return index
+
+    def _map_descriptors(self, schema_name: str, manifest: Dict) -> np.ndarray:
+        if not manifest['rows']:
+            return np.empty((0, DESCRIPTOR_BYTES), dtype=np.uint8)
+        return np.memmap(
+            os.path.join(self._directory(schema_name), manifest['data_file']),
+            dtype=np.uint8, mode='r', shape=(manifest['rows'], DESCRIPTOR_BYTES),
+        )
+
+    def _write(self, schema_name: str, current: FaceDescriptorIndex,
+               kept: Sequence[Dict], added: Sequence[Tuple[Dict, np.ndarray]]) -> FaceDescriptorIndex:
+        """Write kept entries of ``current`` plus ``added`` as the next version"""
+        directory = self._directory(schema_name)
+        version = current.version + 1
+        data_file = f'descriptors-{version}.u8'
+        rows = sum(entry['count'] for entry in kept) + sum(len(array) for _, array in added)
+
+        entries = []
+        if rows:
+            data = np.memmap(
+                os.path.join(directory, data_file), dtype=np.uint8, mode='w+',
+                shape=(rows, DESCRIPTOR_BYTES),
+            )
+            offset = 0
+            for entry in kept:
+                data[offset:offset + entry['count']] = current.rows(entry)
+                entries.append(dict(entry, offset=offset))
+                offset += entry['count']
+            for entry, array in added:
+                data[offset:offset + len(array)] = array
+                entries.append(dict(entry, offset=offset, count=len(array)))
+                offset += len(array)
+            data.flush()
+            del data
+
+        manifest = {
+            'format': FORMAT_VERSION,
+            'version': version,
+            'rows': rows,
+            'data_file': data_file if rows else None,
+            'entries': entries,
+        }
+        tmp_path = os.path.join(directory, f'{MANIFEST_NAME}.{version}.tmp')
+        with open(tmp_path, 'w') as fh:
+            json.dump(manifest, fh)
+        os.replace(tmp_path, os.path.join(directory, MANIFEST_NAME))
+
+        # The previous generation stays until the next write, so a process
+        # that read the old manifest can still map its file; processes
+        # already mapping an older file keep reading it until they reload
+        keep = {data_file, current.manifest.get('data_file')}
+        for name in os.listdir(directory):
+            if name.startswith('descriptors-') and name not in keep:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+        return self.load(schema_name)
+
+    def _locked(self, schema_name: str):
+        directory = self._directory(schema_name)
+        os.makedirs(directory, exist_ok=True)
+        return _DirectoryLock(os.path.join(directory, '.lock'))
+
+    # ---------------- updating ----------------
+
+    def update_person(self, schema_name: str, kind: str, person_id,
+                      sources: Sequence[Tuple[str, str, str]]) -> int:
+        """
+        Replace a person's descriptors with those of ``sources``, a list of
+        (source name, image path, fingerprint). Returns the rows stored.
+        """
+        person_id = str(person_id)
+        extracted = []
+        for source, path, fingerprint in sources:
+            descriptors = self.extract(path)
+            if descriptors is None:
+                continue
+            extracted.append((
+                {'kind': kind, 'person_id': person_id, 'source': source, 'fingerprint': fingerprint},
+                descriptors[:self.config['MAX_DESCRIPTORS_PER_IMAGE']],
+            ))
+
+        with self._locked(schema_name):
+            current = self.load(schema_name)
+            kept = [
+                entry for entry in current.entries
+                if not (entry['kind'] == kind and entry['person_id'] == person_id)
+            ]
+            if len(kept) == len(current.entries) and not extracted:
+                return 0
+            self._write(schema_name, current, kept, extracted)
+        return sum(len(array) for _, array in extracted)
+
+    def remove_person(self, schema_name: str, kind: str, person_id) -> None:
+        self.update_person(schema_name, kind, person_id, [])
+
+    def rebuild(self, schema_name: str, people: Iterable[Tuple[str, object, Sequence]],
+                reuse: bool = True) -> FaceDescriptorIndex:
+        """
+        Write a fresh index from ``(kind, person_id, sources)`` tuples.
+        Photos whose fingerprint did not change reuse their stored rows
+        unless ``reuse`` is False.
+        """
+        with self._locked(schema_name):
+            current = self.load(schema_name)
+            stored = {
+                (entry['kind'], entry['person_id'], entry['source'], entry['fingerprint']): entry
+                for entry in current.entries
+            } if reuse else {}
+            kept, added = [], []
+            for kind, person_id, sources in people:
+                for source, path, fingerprint in sources:
+                    key = (kind, str(person_id), source, fingerprint)
+                    if key in stored:
+                        kept.append(stored[key])
+                        continue
+                    descriptors = self.extract(path)
+                    if descriptors is not None:
+                        added.append((
+                            {'kind': kind, 'person_id': str(person_id), 'source': source,
+                             'fingerprint': fingerprint},
+                            descriptors[:self.config['MAX_DESCRIPTORS_PER_IMAGE']],
+                        ))
+            return self._write(schema_name, current, kept, added)
+
+    # ---------------- matching ----------------
+
+    def prefilter(self, index: FaceDescriptorIndex, entries: List[Dict],
+                  query: np.ndarray) -> Dict[str, int]:
+        """
+        ``{person_id: hits}`` where hits counts the person's descriptors
+        lying within GOOD_DISTANCE of one of the strongest probe
+        descriptors; people without hits are left out
+        """
+        if not entries or not len(query):
+            return {}
+        query = query[:self.config['PREFILTER_QUERY_DESCRIPTORS']]
+        threshold = self.config['GOOD_DISTANCE']
+        chunk_rows = max(self.config['CHUNK_ROWS'], 1)
+
+        # Split every entry into chunks of at most chunk_rows rows
+        chunks = []
+        for position, entry in enumerate(entries):
+            for start in range(0, entry['count'], chunk_rows):
+                chunks.append((position, entry['offset'] + start,
+                               min(chunk_rows, entry['count'] - start)))
+
+        def count_hits(chunk):
+            position, offset, count = chunk
+            distances = hamming_distances(query, index.descriptors[offset:offset + count])
+            return position, int((distances.min(axis=0) < threshold).sum())
+
+        executor = self._pool() if len(chunks) > 1 else None
+        results = executor.map(count_hits, chunks) if executor else map(count_hits, chunks)
+
+        per_entry = [0] * len(entries)
+        for position, hits in results:
+            per_entry[position] += hits
+        scores: Dict[str, int] = {}
+        for entry, hits in zip(entries, per_entry):
+            if hits:
+                scores[entry['person_id']] = max(scores.get(entry['person_id'], 0), hits)
+        return scores
+
+    def match(self, schema_name: str, kind: str, query: np.ndarray,
+              candidate_ids: Optional[Iterable] = None) -> Dict:
+        """
+        Best match for the probe descriptors among ``kind`` people
+        (optionally only ``candidate_ids``). Returns ``{'person_id',
+        'score', 'indexed'}``; person_id is None without a match and
+        indexed is the number of people with photos considered.
+        """
+        import cv2
+
+        index = self.load(schema_name)
+        entries = index.entries_for(kind, candidate_ids)
+        indexed = len({entry['person_id'] for entry in entries})
+        result = {'person_id': None, 'score': 0, 'indexed': indexed}
+
+        scores = self.prefilter(index, entries, query)
+        candidates = sorted(scores, key=scores.get, reverse=True)[:self.config['PREFILTER_CANDIDATES']]
+        if not candidates:
+            return result
+
+        matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+        by_person: Dict[str, List[Dict]] = {}
+        for entry in entries:
+            by_person.setdefault(entry['person_id'], []).append(entry)
+
+        for person_id in candidates:
+            for entry in by_person[person_id]:
+                matches = matcher.match(query, np.asarray(index.rows(entry)))
+                score = sum(1 for m in matches if m.distance < self.config['GOOD_DISTANCE'])
+                if score > result['score'] and score >= self.config['MATCH_THRESHOLD']:
+                    result.update(person_id=person_id, score=score)
+        return result
+
+    def _pool(self) -> Optional[ThreadPoolExecutor]:
+        """Shared thread pool; numpy releases the GIL while it computes"""
+        workers = self.config['WORKERS']
+        if workers <= 1:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='face-index')
+        return self._executor
+
+
+class _DirectoryLock:
+    """Exclusive lock serialising writers of one tenant's index"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fh = None
+
+    def __enter__(self):
+        self.fh = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.fh, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.fh, fcntl.LOCK_UN)
+        self.fh.close()
+
+
+# ---------------- photo sources ----------------
+
+def _file_source(source: str, field_file) -> Optional[Tuple[str, str, str]]:
+    """(source, path, fingerprint) of a stored photo that exists on disk"""
+    if not field_file:
+        return None
+    try:
+        path = field_file.path
+        stat = os.stat(path)
+    except (ValueError, NotImplementedError, OSError):
+        return None
+    return source, path, f'{field_file.name}:{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def staff_photo_sources(staff) -> List[Tuple[str, str, str]]:
+    """The avatar and latest PHOTOGRAPH document of a staff member"""
+    sources = []
+    user = staff.user if staff.user_id else None
+    avatar = _file_source('avatar', user.avatar) if user else None
+    if avatar:
+        sources.append(avatar)
+    document = staff.documents.filter(document_type='PHOTOGRAPH').order_by('-created_at').first()
+    photo = _file_source('document', document.file) if document else None
+    if photo:
+        sources.append(photo)
+    return sources
+
+
+def student_photo_sources(student) -> List[Tuple[str, str, str]]:
+    """The avatar of a student, or else their latest PHOTO document"""
+    user = student.user if student.user_id else None
+    avatar = _file_source('avatar', user.avatar) if user else None
+    if avatar:
+        return [avatar]
+    document = student.documents.filter(doc_type='PHOTO').order_by('-created_at').first()
+    photo = _file_source('document', document.file) if document else None
+    return [photo] if photo else []
+
+
+def index_people(kind: str):
+    """``(kind, person_id, sources)`` for every active person of ``kind`` in the current schema"""
+    if kind == STAFF:
+        from apps.hr.models import Staff
+        people = Staff.objects.filter(employment_status='ACTIVE')
+        sources = staff_photo_sources
+    else:
+        from apps.students.models import Student
+        people = Student.objects.filter(status='ACTIVE')
+        sources = student_photo_sources
+    for person in people.select_related('user').iterator(chunk_size=500):
+        yield kind, person.pk, sources(person)
+
+
+face_index = FaceIndexService()
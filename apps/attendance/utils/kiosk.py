@@ -0,0 +1,291 @@
+# apps/attendance/utils/kiosk.py
+"""
+Batch ingestion of attendance kiosk scans
+
+Gate kiosks buffer QR and face check-ins and post them in batches,
+possibly long after the scans happened when they were offline. A batch
+is written with one query to drop events the device already delivered,
+one query per kind to resolve QR payloads and person ids, one set-based
+upsert per kind and day, and one INSERT of the event log, whatever the
+number of scans.
+
+Scans are de-duplicated per person per day: the first scan of a day
+marks the person present (and is a staff member's check-in), later ones
+only move a staff member's check-out. Replaying a batch changes nothing.
+"""
+
+import re
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Mapping
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Upper
+from django.utils import timezone
+
+from apps.attendance.utils.bulk import BulkAttendanceService, _parse_id
+from apps.attendance.utils.summary import STAFF, STUDENT
+
+# Admission numbers embedded in student ID card QR codes
+ADMISSION_NUMBER_PATTERN = re.compile(r'(ADM-\d{4}-[A-Za-z0-9_]+-\d+)', re.IGNORECASE)
+
+KINDS = (STUDENT, STAFF)
+
+MARKED = 'MARKED'
+MERGED = 'MERGED'
+ALREADY_MARKED = 'ALREADY_MARKED'
+UNKNOWN = 'UNKNOWN'
+
+DEFAULT_KIOSK_INGEST = {
+    'MAX_EVENTS': 500,
+    # A later scan of a staff member only counts as check-out this long
+    # after the check-in, so a double scan at the gate is ignored
+    'CHECK_OUT_AFTER_MINUTES': 60,
+    'REMARKS': 'Kiosk check-in',
+}
+
+
+def _kiosk_settings():
+    config = dict(DEFAULT_KIOSK_INGEST)
+    config.update(getattr(settings, 'KIOSK_INGEST', {}))
+    return config
+
+
+def qr_code(payload: str) -> str:
+    """The lookup code in a scanned QR payload, upper-cased"""
+    payload = (payload or '').strip()
+    match = ADMISSION_NUMBER_PATTERN.search(payload)
+    return (match.group(1) if match else payload).upper()
+
+
+def plan_visits(events: Iterable[Dict]) -> 'OrderedDict':
+    """
+    Group resolved scans into visits, ``{(kind, person_id, day):
+    [events, earliest first]}``; scans of unknown people are left out
+    """
+    visits = OrderedDict()
+    for event in sorted(events, key=lambda event: event['scanned_at']):
+        if event.get('person_id') is None:
+            continue
+        day = timezone.localdate(event['scanned_at'])
+        visits.setdefault((event['kind'], event['person_id'], day), []).append(event)
+    return visits
+
+
+class KioskIngestService(BulkAttendanceService):
+    """
+    Records batches of kiosk scans for one tenant.
+
+    Events are dicts with ``event_id``, ``kind`` (STUDENT or STAFF),
+    ``scanned_at`` (an aware datetime) and either ``person_id`` (a face
+    match) or ``qr`` (a scanned payload). ``ingest`` returns
+    ``{'results': [{'event_id', 'outcome', 'person_id'}], 'marked': n}``
+    with one result per submitted event, in order.
+    """
+
+    def __init__(self, config=None, bulk_config=None):
+        super().__init__(bulk_config)
+        self.kiosk_config = config or _kiosk_settings()
+
+    # ---------------- public API ----------------
+
+    def ingest(self, tenant, device_id: str, events: List[Dict], marked_by=None) -> Dict:
+        from apps.attendance.models import KioskScanEvent
+
+        # Events replayed by the device keep the outcome they got the first time
+        delivered = {
+            event_id: (outcome, person_id)
+            for event_id, outcome, person_id in KioskScanEvent.objects.filter(
+                tenant=tenant, device_id=device_id,
+                event_id__in=[event['event_id'] for event in events],
+            ).values_list('event_id', 'outcome', 'person_id')
+        }
+        fresh = OrderedDict()
+        for event in events:
+            if event['event_id'] not in delivered:
+                fresh.setdefault(event['event_id'], dict(event))
+        fresh = list(fresh.values())
+
+        for kind in KINDS:
+            self._resolve(tenant, kind, [event for event in fresh if event['kind'] == kind])
+
+        outcomes = {}
+        with transaction.atomic():
+            marked = self._record_visits(tenant, plan_visits(fresh), outcomes, marked_by)
+            KioskScanEvent.objects.bulk_create([
+                KioskScanEvent(
+                    tenant=tenant,
+                    created_by=marked_by,
+                    device_id=device_id,
+                    event_id=event['event_id'],
+                    kind=event['kind'],
+                    person_id=event.get('person_id'),
+                    payload=(event.get('qr') or '')[:255],
+                    scanned_at=event['scanned_at'],
+                    outcome=outcomes.get(event['event_id'], UNKNOWN),
+                )
+                for event in fresh
+            ], batch_size=self.config['BATCH_SIZE'], ignore_conflicts=True)
+
+        resolved = {
+            event['event_id']: (outcomes.get(event['event_id'], UNKNOWN), event.get('person_id'))
+            for event in fresh
+        }
+        results = []
+        for event in events:
+            outcome, person_id = delivered.get(event['event_id']) or resolved[event['event_id']]
+            results.append({
+                'event_id': event['event_id'],
+                'outcome': outcome,
+                'person_id': str(person_id) if person_id else None,
+            })
+        return {'results': results, 'marked': marked}
+
+    # ---------------- resolution ----------------
+
+    @staticmethod
+    def _resolve(tenant, kind: str, events: List[Dict]) -> None:
+        """
+        Set ``person_id`` (None when unknown) and, for students, the
+        current class and section on every event, in one query
+        """
+        if not events:
+            return
+        ids, codes = set(), set()
+        for event in events:
+            if event.get('person_id'):
+                event['person_id'] = _parse_id(event['person_id'])
+                if event['person_id']:
+                    ids.add(event['person_id'])
+            elif event.get('qr'):
+                event['code'] = qr_code(event['qr'])
+                codes.add(event['code'])
+
+        if kind == STUDENT:
+            from apps.students.models import Student
+            people = Student.objects.filter(tenant=tenant, status='ACTIVE').annotate(
+                admission_code=Upper('admission_number'), reg_code=Upper('reg_no'),
+            ).filter(
+                Q(pk__in=ids) | Q(admission_code__in=codes) | Q(reg_code__in=codes)
+            ).values('pk', 'admission_code', 'reg_code', 'current_class_id', 'section_id')
+        else:
+            from apps.hr.models import Staff
+            people = Staff.objects.filter(tenant=tenant, employment_status='ACTIVE').annotate(
+                employee_code=Upper('employee_id'),
+            ).filter(Q(pk__in=ids) | Q(employee_code__in=codes)).values('pk', 'employee_code')
+
+        by_pk, by_code = {}, {}
+        for person in people:
+            by_pk[person['pk']] = person
+            for field in ('admission_code', 'reg_code', 'employee_code'):
+                if person.get(field):
+                    by_code.setdefault(person[field], person)
+
+        for event in events:
+            person = by_pk.get(event.get('person_id')) or by_code.get(event.pop('code', None))
+            if kind == STUDENT and person and not (person['current_class_id'] and person['section_id']):
+                person = None
+            event['person_id'] = person['pk'] if person else None
+            if person and kind == STUDENT:
+                event['class_name_id'] = person['current_class_id']
+                event['section_id'] = person['section_id']
+
+    # ---------------- writing ----------------
+
+    def _record_visits(self, tenant, visits: Mapping, outcomes: Dict, marked_by) -> int:
+        """Upsert one attendance row per visit; fills ``outcomes`` per event id"""
+        by_day = OrderedDict()
+        for (kind, person_id, day), scans in visits.items():
+            by_day.setdefault((kind, day), {})[person_id] = scans
+            for scan in scans[1:]:
+                outcomes[scan['event_id']] = MERGED
+
+        marked = 0
+        for (kind, day), people in by_day.items():
+            if kind == STUDENT:
+                changes = self._student_changes(day, people, outcomes)
+            else:
+                changes = self._staff_changes(day, people, outcomes)
+            if not changes:
+                continue
+            if kind == STUDENT:
+                from apps.academics.models import StudentAttendance
+                self._upsert(
+                    StudentAttendance, 'student', {'date': day, 'session': 'FULL_DAY'},
+                    changes, tenant, marked_by,
+                )
+            else:
+                from apps.hr.models import StaffAttendance
+                self._upsert(
+                    StaffAttendance, 'staff', {'date': day}, changes, tenant, marked_by,
+                    prepare=StaffAttendance.calculate_total_hours,
+                )
+            self._refresh_summary(tenant, day, [kind])
+            if kind == STUDENT:
+                self._refresh_bitmaps(tenant, day, list(changes))
+            marked += len(changes)
+        return marked
+
+    def _student_changes(self, day, people: Mapping, outcomes: Dict) -> Dict:
+        """Students not yet marked for the day become PRESENT"""
+        from apps.academics.models import StudentAttendance
+
+        existing = self._marked_rows(
+            StudentAttendance, 'student_id', list(people), {'date': day, 'session': 'FULL_DAY'}
+        )
+        changes = {}
+        for person_id, scans in people.items():
+            row = existing.get(person_id)
+            if row is not None and row.is_active:
+                outcomes[scans[0]['event_id']] = ALREADY_MARKED
+                continue
+            changes[person_id] = {
+                'status': 'PRESENT',
+                'class_name_id': scans[0]['class_name_id'],
+                'section_id': scans[0]['section_id'],
+                'remarks': self.kiosk_config['REMARKS'],
+            }
+            outcomes[scans[0]['event_id']] = MARKED
+        return changes
+
+    def _staff_changes(self, day, people: Mapping, outcomes: Dict) -> Dict:
+        """
+        The first scan of the day is the check-in, the last one (far
+        enough after it) the check-out; a record already marked keeps its
+        status and check-in and only moves its check-out forward
+        """
+        from apps.hr.models import StaffAttendance
+
+        gap = timedelta(minutes=self.kiosk_config['CHECK_OUT_AFTER_MINUTES'])
+        existing = self._marked_rows(StaffAttendance, 'staff_id', list(people), {'date': day})
+        changes = {}
+        for person_id, scans in people.items():
+            first = timezone.localtime(scans[0]['scanned_at'])
+            last = timezone.localtime(scans[-1]['scanned_at'])
+            row = existing.get(person_id)
+
+            if row is None or not row.is_active:
+                values = {'status': 'PRESENT', 'check_in': first.time(), 'remarks': self.kiosk_config['REMARKS']}
+                if last - first >= gap:
+                    values['check_out'] = last.time()
+            else:
+                values = {}
+                check_in = row.check_in
+                if check_in is None:
+                    values['check_in'] = check_in = first.time()
+                check_in_at = timezone.make_aware(datetime.combine(day, check_in), first.tzinfo)
+                check_out = row.check_out
+                if last - check_in_at >= gap and (check_out is None or last.time() > check_out):
+                    values['check_out'] = last.time()
+
+            if values:
+                changes[person_id] = values
+                outcomes[scans[0]['event_id']] = MARKED
+            else:
+                outcomes[scans[0]['event_id']] = ALREADY_MARKED
+        return changes
+
+
+kiosk_ingest = KioskIngestService()
@@ -0,0 +1,249 @@
+# apps/attendance/utils/reports.py
+"""
+Student-wise and staff-wise attendance reports
+
+Each report is one grouped query: people LEFT JOIN their attendance in
+the period (a FilteredRelation), with one Count(filter=...) per status.
+Working days come from an AttendanceCalendar built once per report.
+Rows are produced from a server-side iterator, so exports can stream
+them without holding the report in memory.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Iterator, Optional, Set
+
+from django.db.models import Count, FilteredRelation, Q
+from django.utils.functional import cached_property
+
+# Report column -> attendance status
+STATUS_COLUMNS = (
+    ('present_days', 'PRESENT'),
+    ('absent_days', 'ABSENT'),
+    ('late_days', 'LATE'),
+    ('half_day_days', 'HALF_DAY'),
+    ('leave_days', 'LEAVE'),
+)
+
+# Monday to Friday, when no default WorkSchedule is configured
+DEFAULT_WORKING_WEEKDAYS = frozenset(range(5))
+
+ITERATOR_CHUNK_SIZE = 2000
+
+
+def _days(start: date, end: date) -> Iterator[date]:
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def _percent(part: int, whole: int) -> float:
+    return round((part / whole * 100), 1) if whole > 0 else 0
+
+
+class AttendanceCalendar:
+    """
+    Working days of [start, end] for one tenant.
+
+    Weekdays come from the default hr.WorkSchedule. Staff working days
+    exclude hr.Holiday dates (recurring ones every year); school days
+    exclude academics.Holiday ranges, per class for holidays limited to
+    some classes. Three or four queries, whatever the report size.
+    """
+
+    def __init__(self, tenant, start: date, end: date):
+        self.tenant = tenant
+        self.start = start
+        self.end = end
+        self.weekdays = self._load_weekdays()
+        self.staff_holidays = self._load_staff_holidays()
+        self.school_holidays, self.class_holidays = self._load_school_holidays()
+        self._school_days: Dict[Optional[object], int] = {}
+
+    # ---------------- loading ----------------
+
+    def _load_weekdays(self) -> frozenset:
+        from apps.hr.models import WorkSchedule
+
+        working_days = WorkSchedule.objects.filter(
+            tenant=self.tenant, is_default=True
+        ).values_list('working_days', flat=True).first()
+        weekdays = frozenset(
+            int(day) for day in working_days or () if str(day).isdigit() and 0 <= int(day) <= 6
+        )
+        return weekdays or DEFAULT_WORKING_WEEKDAYS
+
+    def _load_staff_holidays(self) -> Set[date]:
+        from apps.hr.models import Holiday
+
+        holidays = Holiday.objects.filter(tenant=self.tenant).filter(
+            Q(date__range=(self.start, self.end)) | Q(is_recurring=True)
+        ).values_list('date', 'is_recurring')
+
+        days = set()
+        for day, is_recurring in holidays:
+            if not is_recurring:
+                days.add(day)
+                continue
+            for year in range(self.start.year, self.end.year + 1):
+                try:
+                    days.add(day.replace(year=year))
+                except ValueError:
+                    # 29 February in a non-leap year
+                    continue
+        return {day for day in days if self.start <= day <= self.end}
+
+    def _load_school_holidays(self):
+        from apps.academics.models import Holiday
+
+        holidays = list(
+            Holiday.objects.filter(
+                tenant=self.tenant, start_date__lte=self.end, end_date__gte=self.start
+            ).values_list('id', 'start_date', 'end_date')
+        )
+        affected = {}
+        if holidays:
+            through = Holiday.affected_classes.through
+            for holiday_id, class_id in through.objects.filter(
+                holiday_id__in=[holiday[0] for holiday in holidays]
+            ).values_list('holiday_id', 'schoolclass_id'):
+                affected.setdefault(holiday_id, []).append(class_id)
+
+        everyone, per_class = set(), {}
+        for holiday_id, start, end in holidays:
+            days = set(_days(max(start, self.start), min(end, self.end)))
+            if holiday_id not in affected:
+                everyone |= days
+            for class_id in affected.get(holiday_id, ()):
+                per_class.setdefault(class_id, set()).update(days)
+        return everyone, per_class
+
+    # ---------------- counting ----------------
+
+    @property
+    def calendar_days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    @cached_property
+    def staff_working_days(self) -> int:
+        return sum(
+            1 for day in _days(self.start, self.end)
+            if day.weekday() in self.weekdays and day not in self.staff_holidays
+        )
+
+    def school_days(self, class_id=None) -> int:
+        """School days of the period for a class (or for every class)"""
+        if class_id not in self._school_days:
+            closed = self.school_holidays | self.class_holidays.get(class_id, set())
+            self._school_days[class_id] = sum(
+                1 for day in _days(self.start, self.end)
+                if day.weekday() in self.weekdays and day not in closed
+            )
+        return self._school_days[class_id]
+
+
+def _status_counts(relation: str) -> Dict:
+    return {
+        column: Count(relation, filter=Q(**{f'{relation}__status': status}))
+        for column, status in STATUS_COLUMNS
+    }
+
+
+def _period(relation: str, start: date, end: date) -> FilteredRelation:
+    return FilteredRelation(relation, condition=Q(**{
+        f'{relation}__date__range': (start, end),
+        f'{relation}__is_active': True,
+    }))
+
+
+def student_report(tenant, start: date, end: date, class_id=None,
+                   calendar: Optional[AttendanceCalendar] = None) -> Iterator[Dict]:
+    """One row per active student with status counts over [start, end]"""
+    from apps.students.models import Student
+
+    calendar = calendar or AttendanceCalendar(tenant, start, end)
+    students = Student.objects.filter(tenant=tenant, status='ACTIVE')
+    if class_id:
+        students = students.filter(current_class_id=class_id)
+
+    rows = students.annotate(period=_period('attendances', start, end)).values(
+        'id', 'first_name', 'middle_name', 'last_name', 'admission_number',
+        'current_class_id', 'current_class__name', 'section__name',
+    ).annotate(**_status_counts('period')).order_by('first_name', 'last_name', 'id')
+
+    for row in rows.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        total_days = calendar.school_days(row['current_class_id'])
+        yield {
+            'student_id': row['id'],
+            'student_name': ' '.join(filter(None, (row['first_name'], row['middle_name'], row['last_name']))),
+            'admission_number': row['admission_number'],
+            'class': row['current_class__name'] or '',
+            'section': row['section__name'] or '',
+            **{column: row[column] for column, _ in STATUS_COLUMNS},
+            'total_days': total_days,
+            'attendance_percent': _percent(row['present_days'], total_days),
+        }
+
+
+def staff_report(tenant, start: date, end: date, department_id=None,
+                 calendar: Optional[AttendanceCalendar] = None) -> Iterator[Dict]:
+    """One row per active staff member with status counts over [start, end]"""
+    from apps.hr.models import Staff
+
+    calendar = calendar or AttendanceCalendar(tenant, start, end)
+    working_days = calendar.staff_working_days
+    staff = Staff.objects.filter(tenant=tenant, employment_status='ACTIVE')
+    if department_id:
+        staff = staff.filter(department_id=department_id)
+
+    rows = staff.annotate(period=_period('attendances', start, end)).values(
+        'id', 'employee_id', 'user__first_name', 'user__last_name',
+        'department__name', 'designation__title',
+    ).annotate(**_status_counts('period')).order_by('user__first_name', 'user__last_name', 'id')
+
+    for row in rows.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        yield {
+            'staff_id': row['id'],
+            'staff_name': f"{row['user__first_name'] or ''} {row['user__last_name'] or ''}".strip(),
+            'employee_id': row['employee_id'],
+            'department': row['department__name'] or '',
+            'designation': row['designation__title'] or '',
+            **{column: row[column] for column, _ in STATUS_COLUMNS},
+            'working_days': working_days,
+            'attendance_percent': _percent(row['present_days'], working_days),
+        }
+
+
+# Export layouts: (header, row key)
+STUDENT_EXPORT_COLUMNS = (
+    ('Admission Number', 'admission_number'),
+    ('Student Name', 'student_name'),
+    ('Class', 'class'),
+    ('Section', 'section'),
+    ('Present', 'present_days'),
+    ('Absent', 'absent_days'),
+    ('Late', 'late_days'),
+    ('Half Day', 'half_day_days'),
+    ('Leave', 'leave_days'),
+    ('School Days', 'total_days'),
+    ('Attendance %', 'attendance_percent'),
+)
+
+STAFF_EXPORT_COLUMNS = (
+    ('Employee ID', 'employee_id'),
+    ('Staff Name', 'staff_name'),
+    ('Department', 'department'),
+    ('Designation', 'designation'),
+    ('Present', 'present_days'),
+    ('Absent', 'absent_days'),
+    ('Late', 'late_days'),
+    ('Half Day', 'half_day_days'),
+    ('Leave', 'leave_days'),
+    ('Working Days', 'working_days'),
+    ('Attendance %', 'attendance_percent'),
+)
+
+
+def export_rows(report: Iterator[Dict], columns) -> Iterator[list]:
+    for row in report:
+        yield [row[key] for _, key in columns]
@@ -0,0 +1,275 @@
+# apps/attendance/utils/summary.py
+"""
+AttendanceDailySummary maintenance and reads
+
+Single writes apply a +1/-1 per status to the row of their day and
+section (students) or department (staff). Bulk writes and backfills
+recount whole days with one grouped query per population and upsert the
+result. Reports read day, class or department totals with one range
+query instead of counting attendance tables day by day.
+"""
+
+from collections import defaultdict
+from datetime import date as date_cls, timedelta
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+STUDENT = 'STUDENT'
+STAFF = 'STAFF'
+
+# Attendance status -> AttendanceDailySummary counter
+STATUS_FIELDS = {
+    'PRESENT': 'present',
+    'ABSENT': 'absent',
+    'LATE': 'late',
+    'HALF_DAY': 'half_day',
+    'HOLIDAY': 'holiday',
+    'LEAVE': 'on_leave',
+    'WEEKLY_OFF': 'weekly_off',
+}
+COUNTER_FIELDS = tuple(STATUS_FIELDS.values())
+
+# Filter value meaning "every section / department"
+ANY = object()
+
+
+def student_scope_key(class_id, section_id) -> str:
+    return f"{class_id}:{section_id}"
+
+
+def staff_scope_key(department_id) -> str:
+    return str(department_id or '')
+
+
+def empty_totals() -> Dict[str, int]:
+    totals = dict.fromkeys(COUNTER_FIELDS, 0)
+    totals.update(total=0, active_population=0)
+    return totals
+
+
+class AttendanceSummaryService:
+    """Keeps AttendanceDailySummary rows in step with attendance records"""
+
+    # ---------------- incremental ----------------
+
+    def apply(self, tenant_id, population: str, day, deltas: Dict[str, int],
+              class_id=None, section_id=None, department_id=None):
+        """
+        Add ``{status: delta}`` to one summary row. A row that does not
+        exist yet is recounted instead, from records that already include
+        the change.
+        """
+        from apps.attendance.models import AttendanceDailySummary
+
+        updates = {
+            STATUS_FIELDS[status]: F(STATUS_FIELDS[status]) + delta
+            for status, delta in deltas.items() if delta and status in STATUS_FIELDS
+        }
+        if not updates or not tenant_id or day is None:
+            return
+        if population == STUDENT:
+            scope_key = student_scope_key(class_id, section_id)
+        else:
+            scope_key = staff_scope_key(department_id)
+
+        # A savepoint, so a failure here does not break the caller's transaction
+        with transaction.atomic():
+            updated = AttendanceDailySummary.objects.filter(
+                tenant_id=tenant_id, date=day, population=population, scope_key=scope_key
+            ).update(updated_at=timezone.now(), **updates)
+            if not updated:
+                if population == STUDENT:
+                    self.refresh(tenant_id, day, day, populations=[STUDENT], section_id=section_id)
+                else:
+                    self.refresh(tenant_id, day, day, populations=[STAFF], department_id=department_id)
+
+    # ---------------- recounting ----------------
+
+    def refresh(self, tenant_id, start, end, populations: Iterable[str] = (STUDENT, STAFF),
+                section_id=ANY, department_id=ANY) -> int:
+        """
+        Recount [start, end] from the attendance tables, optionally for
+        one section or department, and drop rows left without records.
+        Returns the number of summary rows written.
+        """
+        from apps.attendance.models import AttendanceDailySummary
+
+        started = timezone.now()
+        written = 0
+        with transaction.atomic():
+            for population in populations:
+                if population == STUDENT:
+                    if department_id is not ANY:
+                        continue
+                    rows = self._count_students(tenant_id, start, end, section_id)
+                    scope = {} if section_id is ANY else {'section_id': section_id}
+                else:
+                    if section_id is not ANY:
+                        continue
+                    rows = self._count_staff(tenant_id, start, end, department_id)
+                    scope = {} if department_id is ANY else {'department_id': department_id}
+
+                if rows:
+                    AttendanceDailySummary.objects.bulk_create(
+                        rows,
+                        update_conflicts=True,
+                        unique_fields=['tenant', 'date', 'population', 'scope_key'],
+                        update_fields=[*COUNTER_FIELDS, 'active_population', 'updated_at'],
+                    )
+                    written += len(rows)
+                # Rows not rewritten above have no attendance left
+                AttendanceDailySummary.objects.filter(
+                    tenant_id=tenant_id, population=population, date__range=(start, end),
+                    updated_at__lt=started, **scope
+                ).delete()
+        return written
+
+    def backfill(self, tenant_id, start, end, chunk_days: int = 31,
+                 populations: Iterable[str] = (STUDENT, STAFF)) -> int:
+        """Recount a long range a chunk of days at a time"""
+        written = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+            written += self.refresh(tenant_id, chunk_start, chunk_end, populations=populations)
+            chunk_start = chunk_end + timedelta(days=1)
+        return written
+
+    def _count_students(self, tenant_id, start, end, section_id=ANY):
+        from apps.academics.models import StudentAttendance
+        from apps.students.models import Student
+
+        records = StudentAttendance._base_manager.filter(
+            tenant_id=tenant_id, is_active=True, date__range=(start, end)
+        )
+        students = Student._base_manager.filter(tenant_id=tenant_id, is_active=True, status='ACTIVE')
+        if section_id is not ANY:
+            records = records.filter(section_id=section_id)
+            students = students.filter(section_id=section_id)
+
+        population = dict(
+            students.order_by().values_list('section_id').annotate(count=Count('id'))
+        )
+        grouped = records.order_by().values(
+            'date', 'class_name_id', 'section_id', 'status'
+        ).annotate(count=Count('id'))
+        return self._build(
+            tenant_id, STUDENT, grouped,
+            key=lambda row: (row['class_name_id'], row['section_id']),
+            fields=lambda key: {
+                'scope_key': student_scope_key(*key),
+                'class_name_id': key[0],
+                'section_id': key[1],
+                'active_population': population.get(key[1], 0),
+            },
+        )
+
+    def _count_staff(self, tenant_id, start, end, department_id=ANY):
+        from apps.hr.models import Staff, StaffAttendance
+
+        records = StaffAttendance._base_manager.filter(
+            tenant_id=tenant_id, is_active=True, date__range=(start, end)
+        )
+        staff = Staff._base_manager.filter(tenant_id=tenant_id, is_active=True, employment_status='ACTIVE')
+        if department_id is not ANY:
+            records = records.filter(staff__department_id=department_id)
+            staff = staff.filter(department_id=department_id)
+
+        population = dict(
+            staff.order_by().values_list('department_id').annotate(count=Count('id'))
+        )
+        grouped = records.order_by().values(
+            'date', 'status', department_id=F('staff__department_id')
+        ).annotate(count=Count('id'))
+        return self._build(
+            tenant_id, STAFF, grouped,
+            key=lambda row: row['department_id'],
+            fields=lambda key: {
+                'scope_key': staff_scope_key(key),
+                'department_id': key,
+                'active_population': population.get(key, 0),
+            },
+        )
+
+    @staticmethod
+    def _build(tenant_id, population, grouped, key, fields):
+        from apps.attendance.models import AttendanceDailySummary
+
+        summaries = {}
+        for row in grouped:
+            counter = STATUS_FIELDS.get(row['status'])
+            if counter is None:
+                continue
+            bucket = (row['date'], key(row))
+            summary = summaries.get(bucket)
+            if summary is None:
+                summary = summaries[bucket] = AttendanceDailySummary(
+                    tenant_id=tenant_id, population=population, date=row['date'], **fields(bucket[1])
+                )
+            setattr(summary, counter, getattr(summary, counter) + row['count'])
+        return list(summaries.values())
+
+    # ---------------- reading ----------------
+
+    @staticmethod
+    def _sums():
+        sums = {field: Sum(field) for field in COUNTER_FIELDS}
+        sums['active_population'] = Sum('active_population')
+        return sums
+
+    @staticmethod
+    def _totals(row) -> Dict[str, int]:
+        totals = {field: row.get(field) or 0 for field in COUNTER_FIELDS}
+        totals['total'] = sum(totals.values())
+        totals['active_population'] = row.get('active_population') or 0
+        return totals
+
+    def daily_totals(self, tenant, start, end) -> Dict[date_cls, Dict[str, Dict[str, int]]]:
+        """``{date: {'STUDENT': totals, 'STAFF': totals}}`` for days with records"""
+        from apps.attendance.models import AttendanceDailySummary
+
+        rows = AttendanceDailySummary.objects.filter(
+            tenant=tenant, date__range=(start, end)
+        ).order_by().values('date', 'population').annotate(**self._sums())
+
+        days = defaultdict(lambda: {STUDENT: empty_totals(), STAFF: empty_totals()})
+        for row in rows:
+            days[row['date']][row['population']] = self._totals(row)
+        return dict(days)
+
+    def period_totals(self, tenant, start, end) -> Dict[str, Dict[str, int]]:
+        """Totals per population over [start, end]"""
+        from apps.attendance.models import AttendanceDailySummary
+
+        rows = AttendanceDailySummary.objects.filter(
+            tenant=tenant, date__range=(start, end)
+        ).order_by().values('population').annotate(**self._sums())
+
+        totals = {STUDENT: empty_totals(), STAFF: empty_totals()}
+        for row in rows:
+            totals[row['population']] = self._totals(row)
+        return totals
+
+    def totals_by(self, tenant, start, end, population: str, group_field: str) -> Dict[Optional[object], Dict[str, int]]:
+        """
+        Totals over [start, end] per ``group_field`` id (``class_name``,
+        ``section`` or ``department``). ``active_population`` is the
+        group's average daily size.
+        """
+        from apps.attendance.models import AttendanceDailySummary
+
+        rows = AttendanceDailySummary.objects.filter(
+            tenant=tenant, population=population, date__range=(start, end)
+        ).order_by().values(f'{group_field}_id').annotate(
+            days=Count('date', distinct=True), **self._sums()
+        )
+        groups = {}
+        for row in rows:
+            totals = groups[row[f'{group_field}_id']] = self._totals(row)
+            totals['active_population'] = round(totals['active_population'] / (row['days'] or 1))
+        return groups
+
+attendance_summary = AttendanceSummaryService()
@@ -1,5 +1,4 @@
 # attendance/views.py
-import csv
 import json
 from datetime import datetime, date, timedelta
 from calendar import monthrange
@@ -7,9 +6,10 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.views.generic import TemplateView, ListView, FormView, View
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
+from django.http import JsonResponse
 from django.db.models import Count, Q
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.views.decorators.csrf import csrf_exempt
 from django.core.exceptions import PermissionDenied
 
@@ -17,6 +17,37 @@ from apps.academics.models import  StudentAttendance, SchoolClass, Section, Acad
 from apps.hr.models import  StaffAttendance, Staff
 from apps.students.models import Student
 from .forms import StudentAttendanceForm, BulkAttendanceForm, AttendanceFilterForm, StaffBulkAttendanceForm
+from .utils.bitmap import attendance_bitmap
+from .utils.bulk import bulk_attendance
+from .utils.kiosk import ADMISSION_NUMBER_PATTERN
+from .utils.face_index import STAFF as FACE_STAFF, STUDENT as FACE_STUDENT, face_index
+from .utils.summary import STAFF, STUDENT, attendance_summary, empty_totals
+from .utils.reports import (
+    AttendanceCalendar,
+    STAFF_EXPORT_COLUMNS,
+    STUDENT_EXPORT_COLUMNS,
+    export_rows,
+    staff_report,
+    student_report,
+)
+from apps.core.utils.exports import Column
+from apps.core.utils.streaming import stream_csv, stream_xlsx
+from apps.core.views import ExportMixin
+
+
+class _CurrentTotals:
+    """Active student and staff head counts, queried once and only for days without a summary"""
+    
+    def __init__(self, tenant):
+        self.tenant = tenant
+    
+    @cached_property
+    def students(self):
+        return Student.objects.filter(tenant=self.tenant, status='ACTIVE').count()
+    
+    @cached_property
+    def staff(self):
+        return Staff.objects.filter(tenant=self.tenant, employment_status='ACTIVE').count()
 
 
 class AttendanceDashboardView(LoginRequiredMixin, TemplateView):
@@ -28,29 +59,28 @@ class AttendanceDashboardView(LoginRequiredMixin, TemplateView):
         tenant = self.request.tenant
         today = timezone.now().date()
         
-        # Today's student attendance summary
-        student_attendance_today = StudentAttendance.objects.filter(
-            tenant=tenant,
-            date=today
-        )
-        
-        # Today's staff attendance summary
-        staff_attendance_today = StaffAttendance.objects.filter(
-            tenant=tenant,
-            date=today
-        )
+        # Today's counts from the daily summary
+        day = attendance_summary.daily_totals(tenant, today, today).get(today)
+        student_day = day[STUDENT] if day else empty_totals()
+        staff_day = day[STAFF] if day else empty_totals()
         
         # Student stats
-        context['student_present'] = student_attendance_today.filter(status='PRESENT').count()
-        context['student_absent'] = student_attendance_today.filter(status='ABSENT').count()
-        context['student_late'] = student_attendance_today.filter(status='LATE').count()
-        context['student_total'] = Student.objects.filter(tenant=tenant, status='ACTIVE').count()
+        context['student_present'] = student_day['present']
+        context['student_absent'] = student_day['absent']
+        context['student_late'] = student_day['late']
+        context['student_total'] = (
+            student_day['active_population']
+            or Student.objects.filter(tenant=tenant, status='ACTIVE').count()
+        )
         
         # Staff stats
-        context['staff_present'] = staff_attendance_today.filter(status='PRESENT').count()
-        context['staff_absent'] = staff_attendance_today.filter(status='ABSENT').count()
-        context['staff_late'] = staff_attendance_today.filter(status='LATE').count()
-        context['staff_total'] = Staff.objects.filter(tenant=tenant, employment_status='ACTIVE').count()
+        context['staff_present'] = staff_day['present']
+        context['staff_absent'] = staff_day['absent']
+        context['staff_late'] = staff_day['late']
+        context['staff_total'] = (
+            staff_day['active_population']
+            or Staff.objects.filter(tenant=tenant, employment_status='ACTIVE').count()
+        )
         
         # Calculate percentages
         if context['student_total'] > 0:
@@ -203,34 +233,16 @@ class StudentBulkAttendanceMarkView(LoginRequiredMixin, PermissionRequiredMixin,
             section = form.cleaned_data['section']
             attendance_data = form.cleaned_data['attendance_data']
             
-            tenant = self.request.tenant
-            created_count = 0
-            updated_count = 0
-            
-            for student_id, status in attendance_data.items():
-                try:
-                    student = Student.objects.get(id=student_id, tenant=tenant)
-                    
-                    # Create or update attendance record
-                    attendance, created = StudentAttendance.objects.update_or_create(
-                        tenant=tenant,
-                        student=student,
-                        date=attendance_date,
-                        class_name=class_name,
-                        section=section,
-                        defaults={
-                            'status': status,
-                            'marked_by': self.request.user
-                        }
-                    )
-                    
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
-                        
-                except Student.DoesNotExist:
-                    continue
+            result = bulk_attendance.mark_students(
+                tenant=self.request.tenant,
+                date=attendance_date,
+                class_name=class_name,
+                section=section,
+                statuses=attendance_data,
+                marked_by=self.request.user,
+            )
+            created_count = result['created']
+            updated_count = result['updated']
             
             messages.success(
                 self.request,
@@ -366,13 +378,20 @@ class MyAttendanceView(LoginRequiredMixin, TemplateView):
             date__range=[month_start, month_end]
         ).order_by('date')
         
-        # Calculate statistics
+        # Calculate statistics from the student's attendance bitmap
         total_days = (month_end - month_start).days + 1
-        present_days = attendance_records.filter(status='PRESENT').count()
-        absent_days = attendance_records.filter(status='ABSENT').count()
-        late_days = attendance_records.filter(status='LATE').count()
-        half_days = attendance_records.filter(status='HALF_DAY').count()
-        leave_days = attendance_records.filter(status='LEAVE').count()
+        calendar = attendance_bitmap.month(tenant.pk, student.pk, today.year, today.month)
+        if calendar is not None:
+            counts = calendar['counts']
+        else:
+            counts = dict(
+                attendance_records.order_by().values_list('status').annotate(count=Count('id'))
+            )
+        present_days = counts.get('PRESENT', 0)
+        absent_days = counts.get('ABSENT', 0)
+        late_days = counts.get('LATE', 0)
+        half_days = counts.get('HALF_DAY', 0)
+        leave_days = counts.get('LEAVE', 0)
         
         # Calculate attendance percentage
         attended_days = present_days + late_days + (half_days * 0.5)
@@ -395,6 +414,9 @@ class MyAttendanceView(LoginRequiredMixin, TemplateView):
             'leave_days': leave_days,
             'attendance_percentage': round(attendance_percentage, 1),
             'current_month': today.strftime('%B %Y'),
+            'calendar_days': calendar['days'] if calendar else [],
+            'current_streak': calendar['current_streak'] if calendar else 0,
+            'longest_streak': calendar['longest_streak'] if calendar else 0,
         })
         
         return context
@@ -462,32 +484,14 @@ class StaffAttendanceMarkView(LoginRequiredMixin, PermissionRequiredMixin, FormV
             attendance_date = form.cleaned_data['date']
             attendance_data = form.cleaned_data['attendance_data']
             
-            tenant = self.request.tenant
-            created_count = 0
-            updated_count = 0
-            
-            for staff_id, status in attendance_data.items():
-                try:
-                    staff = Staff.objects.get(id=staff_id, tenant=tenant)
-                    
-                    # Create or update attendance record
-                    attendance, created = StaffAttendance.objects.update_or_create(
-                        tenant=tenant,
-                        staff=staff,
-                        date=attendance_date,
-                        defaults={
-                            'status': status,
-                            'marked_by': self.request.user
-                        }
-                    )
-                    
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
-                        
-                except Staff.DoesNotExist:
-                    continue
+            result = bulk_attendance.mark_staff(
+                tenant=self.request.tenant,
+                date=attendance_date,
+                entries=attendance_data,
+                marked_by=self.request.user,
+            )
+            created_count = result['created']
+            updated_count = result['updated']
             
             messages.success(
                 self.request,
@@ -623,14 +627,14 @@ class AttendanceReportView(LoginRequiredMixin, PermissionRequiredMixin, Template
         
         # Get report data based on type
         if report_type == 'student':
-            context['report_data'] = self.get_student_report(
+            context['report_data'] = list(self.get_student_report(
                 tenant, start_date_obj, end_date_obj, class_id
-            )
+            ))
             context['classes'] = SchoolClass.objects.filter(tenant=tenant)
         elif report_type == 'staff':
-            context['report_data'] = self.get_staff_report(
+            context['report_data'] = list(self.get_staff_report(
                 tenant, start_date_obj, end_date_obj, department_id
-            )
+            ))
             from apps.hr.models import Department
             context['departments'] = Department.objects.filter(tenant=tenant)
         else:  # daily
@@ -652,41 +656,30 @@ class AttendanceReportView(LoginRequiredMixin, PermissionRequiredMixin, Template
     def get_daily_report(self, tenant, start_date, end_date):
         """Generate daily attendance summary"""
         report_data = []
+        days = attendance_summary.daily_totals(tenant, start_date, end_date)
+        current_totals = _CurrentTotals(tenant)
         current_date = start_date
         
         while current_date <= end_date:
-            # Student attendance for the day
-            student_attendance = StudentAttendance.objects.filter(
-                tenant=tenant,
-                date=current_date
-            )
-            
-            # Staff attendance for the day
-            staff_attendance = StaffAttendance.objects.filter(
-                tenant=tenant,
-                date=current_date
-            )
-            
-            student_present = student_attendance.filter(status='PRESENT').count()
-            student_absent = student_attendance.filter(status='ABSENT').count()
-            student_late = student_attendance.filter(status='LATE').count()
-            student_total = Student.objects.filter(tenant=tenant, status='ACTIVE').count()
+            day = days.get(current_date)
+            student = day[STUDENT] if day else empty_totals()
+            staff = day[STAFF] if day else empty_totals()
             
-            staff_present = staff_attendance.filter(status='PRESENT').count()
-            staff_absent = staff_attendance.filter(status='ABSENT').count()
-            staff_late = staff_attendance.filter(status='LATE').count()
-            staff_total = Staff.objects.filter(tenant=tenant, employment_status='ACTIVE').count()
+            student_present = student['present']
+            student_total = student['active_population'] or current_totals.students
+            staff_present = staff['present']
+            staff_total = staff['active_population'] or current_totals.staff
             
             report_data.append({
                 'date': current_date,
                 'student_present': student_present,
-                'student_absent': student_absent,
-                'student_late': student_late,
+                'student_absent': student['absent'],
+                'student_late': student['late'],
                 'student_total': student_total,
                 'student_percent': round((student_present / student_total * 100), 1) if student_total > 0 else 0,
                 'staff_present': staff_present,
-                'staff_absent': staff_absent,
-                'staff_late': staff_late,
+                'staff_absent': staff['absent'],
+                'staff_late': staff['late'],
                 'staff_total': staff_total,
                 'staff_percent': round((staff_present / staff_total * 100), 1) if staff_total > 0 else 0,
             })
@@ -695,95 +688,44 @@ class AttendanceReportView(LoginRequiredMixin, PermissionRequiredMixin, Template
         
         return report_data
     
-    def get_student_report(self, tenant, start_date, end_date, class_id=None):
-        """Generate student-wise attendance report"""
-        report_data = []
-        
-        # Get students based on filters
-        students = Student.objects.filter(
-            tenant=tenant,
-            status='ACTIVE'
-        ).select_related('current_class', 'section', 'academic_year')
-        
-        if class_id:
-            students = students.filter(current_class_id=class_id)
-        
-        for student in students:
-            # Get attendance records for the period
-            attendance_records = StudentAttendance.objects.filter(
-                tenant=tenant,
-                student=student,
-                date__range=[start_date, end_date]
-            )
-            
-            present_days = attendance_records.filter(status='PRESENT').count()
-            absent_days = attendance_records.filter(status='ABSENT').count()
-            late_days = attendance_records.filter(status='LATE').count()
-            total_days = (end_date - start_date).days + 1
-            
-            report_data.append({
-                'student_id': student.id,
-                'student_name': student.full_name,
-                'admission_number': student.admission_number,
-                'class': student.current_class.name if student.current_class else '',
-                'section': student.section.name if student.section else '',
-                'present_days': present_days,
-                'absent_days': absent_days,
-                'late_days': late_days,
-                'total_days': total_days,
-                'attendance_percent': round((present_days / total_days * 100), 1) if total_days > 0 else 0,
-            })
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format')
+        if export_format in ('csv', 'xlsx') and request.GET.get('type') in ('student', 'staff'):
+            return self.export_report(request, export_format)
+        return super().get(request, *args, **kwargs)
+    
+    def export_report(self, request, export_format):
+        """Stream the student-wise or staff-wise report as CSV or XLSX"""
+        tenant = request.tenant
+        report_type = request.GET.get('type')
+        today = timezone.now().date()
+        try:
+            start_date = datetime.strptime(request.GET.get('start_date', ''), '%Y-%m-%d').date()
+            end_date = datetime.strptime(request.GET.get('end_date', ''), '%Y-%m-%d').date()
+        except ValueError:
+            start_date, end_date = today.replace(day=1), today
         
-        return report_data
+        if report_type == 'student':
+            report = self.get_student_report(tenant, start_date, end_date, request.GET.get('class'))
+            columns = STUDENT_EXPORT_COLUMNS
+        else:
+            report = self.get_staff_report(tenant, start_date, end_date, request.GET.get('department'))
+            columns = STAFF_EXPORT_COLUMNS
+        
+        header = [title for title, _ in columns]
+        rows = export_rows(report, columns)
+        filename = f"{report_type}_attendance_report_{start_date}_to_{end_date}.{export_format}"
+        if export_format == 'csv':
+            return stream_csv(filename, header, rows)
+        return stream_xlsx(filename, header, rows, title=f"{report_type.title()} Attendance")
+    
+    def get_student_report(self, tenant, start_date, end_date, class_id=None):
+        """Generate student-wise attendance report (a lazy iterator of rows)"""
+        return student_report(tenant, start_date, end_date, class_id=class_id or None)
     
     def get_staff_report(self, tenant, start_date, end_date, department_id=None):
-        """Generate staff-wise attendance report"""
-        report_data = []
-        
-        # Get staff based on filters
-        staff_list = Staff.objects.filter(
-            tenant=tenant,
-            employment_status='ACTIVE'
-        ).select_related('user', 'department', 'designation')
-        
-        if department_id:
-            staff_list = staff_list.filter(department_id=department_id)
-        
-        for staff in staff_list:
-            # Get attendance records for the period
-            attendance_records = StaffAttendance.objects.filter(
-                tenant=tenant,
-                staff=staff,
-                date__range=[start_date, end_date]
-            )
-            
-            present_days = attendance_records.filter(status='PRESENT').count()
-            absent_days = attendance_records.filter(status='ABSENT').count()
-            late_days = attendance_records.filter(status='LATE').count()
-            total_days = (end_date - start_date).days + 1
-            
-            # Calculate working days (exclude weekends)
-            working_days = 0
-            current_date = start_date
-            while current_date <= end_date:
-                if current_date.weekday() < 5:  # Monday to Friday
-                    working_days += 1
-                current_date += timedelta(days=1)
-            
-            report_data.append({
-                'staff_id': staff.id,
-                'staff_name': staff.full_name,
-                'employee_id': staff.employee_id,
-                'department': staff.department.name if staff.department else '',
-                'designation': staff.designation.title if staff.designation else '',
-                'present_days': present_days,
-                'absent_days': absent_days,
-                'late_days': late_days,
-                'working_days': working_days,
-                'attendance_percent': round((present_days / working_days * 100), 1) if working_days > 0 else 0,
-            })
-        
-        return report_data
+        """Generate staff-wise attendance report (a lazy iterator of rows)"""
+        return staff_report(tenant, start_date, end_date, department_id=department_id or None)
 
 
 class QRCodeAttendanceView(LoginRequiredMixin, TemplateView):
@@ -797,7 +739,6 @@ class QRCodeAttendanceView(LoginRequiredMixin, TemplateView):
 
     def post(self, request, *args, **kwargs):
         """Handle QR scan submission"""
-        import re
         reg_no_input = request.POST.get('reg_no', '').strip()
         
         if not reg_no_input:
@@ -809,7 +750,7 @@ class QRCodeAttendanceView(LoginRequiredMixin, TemplateView):
         # Try to parse complex QR format
         # Look for ADM-YYYY-SCHEMA-SEQ pattern specifically or Admission No: prefix
         # Pattern: ADM followed by anything until whitespace, newline or end
-        admission_match = re.search(r'(ADM-\d{4}-[A-Za-z0-9_]+-\d+)', reg_no_input, re.IGNORECASE)
+        admission_match = ADMISSION_NUMBER_PATTERN.search(reg_no_input)
         
         if admission_match:
             search_term = admission_match.group(1).strip()
@@ -897,31 +838,23 @@ class AttendanceAnalyticsView(LoginRequiredMixin, PermissionRequiredMixin, Templ
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=30)
         
-        # Student attendance trends
-        student_attendance = StudentAttendance.objects.filter(
-            tenant=tenant,
-            date__range=[start_date, end_date]
-        )
-        
-        # Staff attendance trends
-        staff_attendance = StaffAttendance.objects.filter(
-            tenant=tenant,
-            date__range=[start_date, end_date]
-        )
+        days = attendance_summary.daily_totals(tenant, start_date, end_date)
+        current_totals = _CurrentTotals(tenant)
         
         # Calculate daily trends
         daily_trends = []
         current_date = start_date
         
         while current_date <= end_date:
-            day_student_att = student_attendance.filter(date=current_date)
-            day_staff_att = staff_attendance.filter(date=current_date)
+            day = days.get(current_date)
+            student = day[STUDENT] if day else empty_totals()
+            staff = day[STAFF] if day else empty_totals()
             
-            student_present = day_student_att.filter(status='PRESENT').count()
-            student_total = Student.objects.filter(tenant=tenant, status='ACTIVE').count()
+            student_present = student['present']
+            student_total = student['active_population'] or current_totals.students
             
-            staff_present = day_staff_att.filter(status='PRESENT').count()
-            staff_total = Staff.objects.filter(tenant=tenant, employment_status='ACTIVE').count()
+            staff_present = staff['present']
+            staff_total = staff['active_population'] or current_totals.staff
             
             student_percent = round((student_present / student_total * 100), 1) if student_total > 0 else 0
             staff_percent = round((staff_present / staff_total * 100), 1) if staff_total > 0 else 0
@@ -938,12 +871,13 @@ class AttendanceAnalyticsView(LoginRequiredMixin, PermissionRequiredMixin, Templ
         
         # Class-wise attendance
         class_attendance = []
+        class_totals = attendance_summary.totals_by(tenant, start_date, end_date, STUDENT, 'class_name')
         classes = SchoolClass.objects.filter(tenant=tenant)
         
         for class_obj in classes:
-            class_att = student_attendance.filter(class_name=class_obj)
-            total_records = class_att.count()
-            present_records = class_att.filter(status='PRESENT').count()
+            totals = class_totals.get(class_obj.pk) or empty_totals()
+            total_records = totals['total']
+            present_records = totals['present']
             
             if total_records > 0:
                 class_rate = round((present_records / total_records) * 100, 1)
@@ -961,13 +895,16 @@ class AttendanceAnalyticsView(LoginRequiredMixin, PermissionRequiredMixin, Templ
         department_attendance = []
         from apps.hr.models import Department
         
+        department_totals = attendance_summary.totals_by(tenant, start_date, end_date, STAFF, 'department')
+        department_staff = dict(
+            Staff.objects.filter(tenant=tenant, employment_status='ACTIVE')
+            .order_by().values_list('department_id').annotate(count=Count('id'))
+        )
         departments = Department.objects.filter(tenant=tenant)
         for dept in departments:
-            dept_staff = Staff.objects.filter(department=dept, employment_status='ACTIVE')
-            dept_att = staff_attendance.filter(staff__department=dept)
-            
-            total_records = dept_att.count()
-            present_records = dept_att.filter(status='PRESENT').count()
+            totals = department_totals.get(dept.pk) or empty_totals()
+            total_records = totals['total']
+            present_records = totals['present']
             
             if total_records > 0:
                 dept_rate = round((present_records / total_records) * 100, 1)
@@ -977,7 +914,7 @@ class AttendanceAnalyticsView(LoginRequiredMixin, PermissionRequiredMixin, Templ
             department_attendance.append({
                 'department': dept.name,
                 'rate': dept_rate,
-                'total_staff': dept_staff.count(),
+                'total_staff': department_staff.get(dept.pk, 0),
                 'present': present_records
             })
         
@@ -987,116 +924,75 @@ class AttendanceAnalyticsView(LoginRequiredMixin, PermissionRequiredMixin, Templ
             'daily_trends': daily_trends,
             'class_attendance': class_attendance,
             'department_attendance': department_attendance,
-            'total_student_days': student_attendance.count(),
-            'total_staff_days': staff_attendance.count(),
+            'total_student_days': sum(day[STUDENT]['total'] for day in days.values()),
+            'total_staff_days': sum(day[STAFF]['total'] for day in days.values()),
         })
         
         return context
 
 
-class AttendanceExportView(LoginRequiredMixin, PermissionRequiredMixin, View):
-    """Export attendance data to CSV"""
+class AttendanceExportView(ExportMixin, LoginRequiredMixin, PermissionRequiredMixin, View):
+    """Export attendance data as CSV or Excel"""
     permission_required = ['academics.view_attendance', 'hr.view_attendance']
     
+    student_export_columns = (
+        Column('Date', 'date'),
+        Column('Admission Number', 'student__admission_number'),
+        Column('Student Name', 'student__first_name', 'student__middle_name', 'student__last_name'),
+        Column('Class', 'class_name__name'),
+        Column('Section', 'section__name'),
+        Column('Status', 'status', display=True),
+        Column('Remarks', 'remarks'),
+        Column('Marked By', 'marked_by__first_name', 'marked_by__last_name'),
+        Column('Marked At', 'created_at'),
+    )
+    staff_export_columns = (
+        Column('Date', 'date'),
+        Column('Employee ID', 'staff__employee_id'),
+        Column('Staff Name', 'staff__user__first_name', 'staff__user__last_name'),
+        Column('Department', 'staff__department__name'),
+        Column('Designation', 'staff__designation__title'),
+        Column('Status', 'status', display=True),
+        Column('Check In', 'check_in'),
+        Column('Check Out', 'check_out'),
+        Column('Total Hours', 'total_hours'),
+        Column('Late Minutes', 'late_minutes'),
+        Column('Remarks', 'remarks'),
+        Column('Marked By', 'marked_by__first_name', 'marked_by__last_name'),
+        Column('Marked At', 'created_at'),
+    )
+    
     def get(self, request, *args, **kwargs):
-        export_type = request.GET.get('type', 'student')
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
+        self.export_type = 'student' if request.GET.get('type', 'student') == 'student' else 'staff'
         
-        # Set default dates
+        # Default to the current month
         today = timezone.now().date()
-        if not start_date:
-            start_date = today.replace(day=1)
-        if not end_date:
-            end_date = today
-        
-        # Convert to date objects
         try:
-            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+            self.start_date = datetime.strptime(request.GET.get('start_date', ''), '%Y-%m-%d').date()
+            self.end_date = datetime.strptime(request.GET.get('end_date', ''), '%Y-%m-%d').date()
         except ValueError:
-            start_date_obj = today.replace(day=1)
-            end_date_obj = today
+            self.start_date, self.end_date = today.replace(day=1), today
         
-        if export_type == 'student':
-            return self.export_student_attendance(request.tenant, start_date_obj, end_date_obj)
-        else:
-            return self.export_staff_attendance(request.tenant, start_date_obj, end_date_obj)
+        return self.export(request, *args, **kwargs)
     
-    def export_student_attendance(self, tenant, start_date, end_date):
-        """Export student attendance as CSV"""
-        response = HttpResponse(content_type='text/csv')
-        filename = f"student_attendance_{start_date}_to_{end_date}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        writer = csv.writer(response)
-        
-        # Write headers
-        writer.writerow([
-            'Date', 'Admission Number', 'Student Name', 'Class', 
-            'Section', 'Status', 'Remarks', 'Marked By', 'Marked At'
-        ])
-        
-        # Get attendance records
-        attendance_list = StudentAttendance.objects.filter(
-            tenant=tenant,
-            date__range=[start_date, end_date]
-        ).select_related('student', 'class_name', 'section', 'marked_by').order_by('date', 'student__first_name')
-        
-        for attendance in attendance_list:
-            writer.writerow([
-                attendance.date,
-                attendance.student.admission_number,
-                attendance.student.full_name,
-                attendance.class_name.name if attendance.class_name else '',
-                attendance.section.name if attendance.section else '',
-                attendance.get_status_display(),
-                attendance.remarks or '',
-                attendance.marked_by.get_full_name() if attendance.marked_by else '',
-                attendance.created_at.strftime('%Y-%m-%d %H:%M:%S') if attendance.created_at else '',
-            ])
-        
-        return response
+    def get_export_columns(self):
+        if self.export_type == 'student':
+            return self.student_export_columns
+        return self.staff_export_columns
     
-    def export_staff_attendance(self, tenant, start_date, end_date):
-        """Export staff attendance as CSV"""
-        response = HttpResponse(content_type='text/csv')
-        filename = f"staff_attendance_{start_date}_to_{end_date}.csv"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        writer = csv.writer(response)
-        
-        # Write headers
-        writer.writerow([
-            'Date', 'Employee ID', 'Staff Name', 'Department', 
-            'Designation', 'Status', 'Check In', 'Check Out', 
-            'Total Hours', 'Late Minutes', 'Remarks', 'Marked By', 'Marked At'
-        ])
-        
-        # Get attendance records
-        attendance_list = StaffAttendance.objects.filter(
-            tenant=tenant,
-            date__range=[start_date, end_date]
-        ).select_related('staff', 'staff__department', 'staff__designation', 'marked_by').order_by('date', 'staff__user__first_name')
-        
-        for attendance in attendance_list:
-            writer.writerow([
-                attendance.date,
-                attendance.staff.employee_id,
-                attendance.staff.full_name,
-                attendance.staff.department.name if attendance.staff.department else '',
-                attendance.staff.designation.title if attendance.staff.designation else '',
-                attendance.get_status_display(),
-                attendance.check_in.strftime('%H:%M:%S') if attendance.check_in else '',
-                attendance.check_out.strftime('%H:%M:%S') if attendance.check_out else '',
-                attendance.total_hours or '',
-                attendance.late_minutes,
-                attendance.remarks or '',
-                attendance.marked_by.get_full_name() if attendance.marked_by else '',
-                attendance.created_at.strftime('%Y-%m-%d %H:%M:%S') if attendance.created_at else '',
-            ])
-        
-        return response
+    def get_export_queryset(self):
+        if self.export_type == 'student':
+            return StudentAttendance.objects.filter(
+                tenant=self.request.tenant,
+                date__range=[self.start_date, self.end_date]
+            ).order_by('date', 'student__first_name')
+        return StaffAttendance.objects.filter(
+            tenant=self.request.tenant,
+            date__range=[self.start_date, self.end_date]
+        ).order_by('date', 'staff__user__first_name')
+    
+    def get_export_filename(self):
+        return f"{self.export_type}_attendance_{self.start_date}_to_{self.end_date}"
 
 
 class DailyAttendanceReportView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
@@ -1211,34 +1107,20 @@ class MonthlyAttendanceReportView(LoginRequiredMixin, PermissionRequiredMixin, T
         month_start = date(year, month, 1)
         month_end = date(year, month, monthrange(year, month)[1])
         
-        # Get student attendance for the month
-        student_attendance = StudentAttendance.objects.filter(
-            tenant=tenant,
-            date__range=[month_start, month_end]
-        )
-        
-        # Get staff attendance for the month
-        staff_attendance = StaffAttendance.objects.filter(
-            tenant=tenant,
-            date__range=[month_start, month_end]
-        )
+        # Attendance for the month from the daily summary
+        month_totals = attendance_summary.period_totals(tenant, month_start, month_end)
         
         # Calculate student statistics
         total_students = Student.objects.filter(tenant=tenant, status='ACTIVE').count()
-        student_present_days = student_attendance.filter(status='PRESENT').count()
+        student_present_days = month_totals[STUDENT]['present']
         student_total_days = total_students * ((month_end - month_start).days + 1)
         
         # Calculate staff statistics
         total_staff = Staff.objects.filter(tenant=tenant, employment_status='ACTIVE').count()
-        staff_present_days = staff_attendance.filter(status='PRESENT').count()
+        staff_present_days = month_totals[STAFF]['present']
         
-        # Calculate working days (exclude weekends)
-        working_days = 0
-        current_date = month_start
-        while current_date <= month_end:
-            if current_date.weekday() < 5:  # Monday to Friday
-                working_days += 1
-            current_date += timedelta(days=1)
+        # Working days from the work schedule and staff holidays
+        working_days = AttendanceCalendar(tenant, month_start, month_end).staff_working_days
         
         staff_total_days = total_staff * working_days
         
@@ -1288,12 +1170,19 @@ class StudentAttendanceReportView(LoginRequiredMixin, PermissionRequiredMixin, T
             date__range=[month_start, month_end]
         ).order_by('date')
         
-        # Calculate statistics
+        # Calculate statistics from the student's attendance bitmap
         total_days = (month_end - month_start).days + 1
-        present_days = attendance_records.filter(status='PRESENT').count()
-        absent_days = attendance_records.filter(status='ABSENT').count()
-        late_days = attendance_records.filter(status='LATE').count()
-        half_days = attendance_records.filter(status='HALF_DAY').count()
+        calendar = attendance_bitmap.month(tenant.pk, student.pk, today.year, today.month)
+        if calendar is not None:
+            counts = calendar['counts']
+        else:
+            counts = dict(
+                attendance_records.order_by().values_list('status').annotate(count=Count('id'))
+            )
+        present_days = counts.get('PRESENT', 0)
+        absent_days = counts.get('ABSENT', 0)
+        late_days = counts.get('LATE', 0)
+        half_days = counts.get('HALF_DAY', 0)
         
         # Calculate attendance percentage
         attended_days = present_days + late_days + (half_days * 0.5)
@@ -1329,6 +1218,9 @@ class StudentAttendanceReportView(LoginRequiredMixin, PermissionRequiredMixin, T
             'attendance_percentage': round(attendance_percentage, 1),
             'class_percentage': class_percentage,
             'current_month': today.strftime('%B %Y'),
+            'calendar_days': calendar['days'] if calendar else [],
+            'current_streak': calendar['current_streak'] if calendar else 0,
+            'longest_streak': calendar['longest_streak'] if calendar else 0,
         })
         
         return context
@@ -1344,7 +1236,6 @@ def verify_face_attendance(request):
         import numpy as np
         import base64
         import cv2
-        import os
         from apps.hr.models import Staff
         
         data = json.loads(request.body)
@@ -1367,66 +1258,20 @@ def verify_face_attendance(request):
         except Exception as e:
              return JsonResponse({'error': f'Image format error: {str(e)}'}, status=400)
         
-        # Init Detector
-        orb = cv2.ORB_create(nfeatures=1000)
-        kp1, des1 = orb.detectAndCompute(unknown_gray, None)
-        
+        des1 = face_index.extract(unknown_gray)
         if des1 is None:
             return JsonResponse({'match': False, 'message': 'No features detected'})
-            
-        # Get Staff
+
+        # Compare against the tenant's precomputed descriptor index
         tenant = request.tenant
-        staff_list = Staff.objects.filter(
-            tenant=tenant, 
-            employment_status='ACTIVE'
-        ).select_related('user').prefetch_related('documents')
-        
-        bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
-        best_match_count = 0
+        result = face_index.match(tenant.schema_name, FACE_STAFF, des1)
+        valid_candidates = result['indexed']
         best_staff = None
-        MATCH_THRESHOLD = 15
-        
-        valid_candidates = 0
-        
-        for staff in staff_list:
-             try:
-                 image_paths = []
-                 # Priority 1: User Avatar
-                 if staff.user and staff.user.avatar and os.path.exists(staff.user.avatar.path):
-                     image_paths.append(staff.user.avatar.path)
-                 
-                 # Priority 2: Staff Document (PHOTOGRAPH)
-                 photo_doc = staff.documents.filter(document_type='PHOTOGRAPH').order_by('-created_at').first()
-                 if photo_doc and photo_doc.file and os.path.exists(photo_doc.file.path):
-                     image_paths.append(photo_doc.file.path)
-                     
-                 if not image_paths: continue
-                 
-                 valid_candidates += 1
-                 
-                 # Check against available images
-                 local_best_score = 0
-                 
-                 for img_path in image_paths:
-                     known_image = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-                     if known_image is None: continue
-                     
-                     kp2, des2 = orb.detectAndCompute(known_image, None)
-                     if des2 is not None:
-                         matches = bf.match(des1, des2)
-                         # Count close matches
-                         good_matches = [m for m in matches if m.distance < 50]
-                         if len(good_matches) > local_best_score:
-                             local_best_score = len(good_matches)
-                 
-                 if local_best_score > best_match_count and local_best_score >= MATCH_THRESHOLD:
-                     best_match_count = local_best_score
-                     best_staff = staff
-                     
-             except Exception as e:
-                 print(f"Error checking staff {staff.id}: {e}")
-                 continue
-                 
+        if result['person_id']:
+            best_staff = Staff.objects.filter(
+                tenant=tenant, employment_status='ACTIVE', pk=result['person_id']
+            ).select_related('user').first()
+
         if best_staff:
              # AUTO SAVE ATTENDANCE
              try:
@@ -1493,7 +1338,6 @@ def verify_student_face_attendance(request):
         import numpy as np
         import base64
         import cv2
-        import os
         from apps.students.models import Student
         
         data = json.loads(request.body)
@@ -1526,78 +1370,24 @@ def verify_student_face_attendance(request):
             print(f"DEBUG Error: {str(e)}")
             return JsonResponse({'error': f'Invalid image format: {str(e)}'}, status=400)
             
-        # Initialize ORB detector
-        orb = cv2.ORB_create(nfeatures=1000)
-        
-        # Detect keypoints and descriptors
-        kp1, des1 = orb.detectAndCompute(unknown_gray, None)
-        
+        # Detect descriptors of the probe frame
+        des1 = face_index.extract(unknown_gray)
+
         if des1 is None:
              return JsonResponse({'match': False, 'message': 'No features detected in frame'})
 
-        # Get candidates
+        # Compare against the tenant's precomputed descriptor index
         tenant = request.tenant
-        students_query = Student.objects.filter(
-            tenant=tenant, 
-            status='ACTIVE'
-        ).select_related('user').prefetch_related('documents')
-        
-        if candidate_ids:
-            students_query = students_query.filter(id__in=candidate_ids)
-            
-        student_list = list(students_query)
-        
-        # Matcher
-        bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
-        best_match_count = 0
+        result = face_index.match(
+            tenant.schema_name, FACE_STUDENT, des1, candidate_ids=candidate_ids or None
+        )
+        valid_candidates_with_images = result['indexed']
         best_student = None
-        
-        # Threshold: Number of "Good" feature matches needed
-        MATCH_THRESHOLD = 15 
-        
-        valid_candidates_with_images = 0
-        
-        for student in student_list:
-             try:
-                image_path = None
-                
-                # Priority 1: User Avatar
-                if student.user and student.user.avatar and os.path.exists(student.user.avatar.path):
-                    image_path = student.user.avatar.path
-                
-                # Priority 2: Student Document (PHOTO)
-                if not image_path:
-                    photo_doc = student.documents.filter(doc_type='PHOTO').order_by('-created_at').first()
-                    if photo_doc and photo_doc.file and os.path.exists(photo_doc.file.path):
-                        image_path = photo_doc.file.path
-                
-                if not image_path: 
-                    continue
-                    
-                valid_candidates_with_images += 1
-                
-                # Read file directly using cv2
-                known_image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-                if known_image is None: continue
-                
-                kp2, des2 = orb.detectAndCompute(known_image, None)
-                
-                if des2 is not None:
-                    matches = bf.match(des1, des2)
-                    matches = sorted(matches, key=lambda x: x.distance)
-                    
-                    # Count top matches
-                    good_matches = [m for m in matches if m.distance < 50]
-                    score = len(good_matches)
+        if result['person_id']:
+            best_student = Student.objects.filter(
+                tenant=tenant, status='ACTIVE', pk=result['person_id']
+            ).select_related('user', 'current_class', 'section').first()
 
-                    if score > best_match_count and score >= MATCH_THRESHOLD:
-                        best_match_count = score
-                        best_student = student
-                        
-             except Exception as e:
-                 print(f"Error processing student {student.id}: {e}")
-                 continue
-        
         if best_student:
              # Determine which image URL to show
              image_url = ""
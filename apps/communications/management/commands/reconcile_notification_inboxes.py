@@ -0,0 +1,38 @@
+# apps/communications/management/commands/reconcile_notification_inboxes.py
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from apps.tenants.models import Tenant
+from apps.communications.utils.inbox import inbox_service
+
+
+class Command(BaseCommand):
+    help = 'Recount notification inboxes and repair the ones that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema',
+            help='Only reconcile this tenant schema (default: all active tenants)',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Inbox rows read per query')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.filter(is_active=True).exclude(
+            schema_name=get_public_schema_name()
+        )
+        if options['schema']:
+            tenants = tenants.filter(schema_name=options['schema'])
+            if not tenants.exists():
+                raise CommandError(f"No active tenant with schema {options['schema']}")
+
+        checked = repaired = 0
+        for tenant in tenants:
+            with schema_context(tenant.schema_name):
+                result = inbox_service.reconcile(batch_size=options['batch_size'])
+            self.stdout.write(
+                f"{tenant.schema_name}: {result['repaired']} of {result['checked']} inboxes repaired"
+            )
+            checked += result['checked']
+            repaired += result['repaired']
+
+        self.stdout.write(self.style.SUCCESS(f'Repaired {repaired} of {checked} notification inboxes'))
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('communications', '0003_alter_communication_recipient_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationInbox',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True, verbose_name='Universal ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Creation Timestamp')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='Last Modification Timestamp')),
+                ('unread_communications', models.PositiveIntegerField(default=0, verbose_name='Unread Communications')),
+                ('unread_notifications', models.PositiveIntegerField(default=0, verbose_name='Unread Notifications')),
+                ('recent_communications', models.JSONField(blank=True, default=list, help_text='IDs of the latest header communications, newest first', verbose_name='Recent Communications')),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True, verbose_name='Last Recounted At')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Last Modified By')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_inbox', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Notification Inbox',
+                'verbose_name_plural': 'Notification Inboxes',
+                'db_table': 'communications_notification_inbox',
+            },
+        ),
+    ]
@@ -936,6 +936,47 @@ class Notification(BaseModel):
             raise ValidationError({'expires_at': _('Expiration date cannot be in the past')})
 
 
+class NotificationInbox(UUIDModel, TimeStampedModel):
+    """
+    Per-user unread counters and recent header communications, kept up to
+    date by the Communication/Notification signals so the header bell
+    reads one row instead of counting the user's history
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="notification_inbox",
+        verbose_name=_("User")
+    )
+    unread_communications = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Unread Communications")
+    )
+    unread_notifications = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Unread Notifications")
+    )
+    recent_communications = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name=_("Recent Communications"),
+        help_text=_("IDs of the latest header communications, newest first")
+    )
+    reconciled_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Last Recounted At")
+    )
+
+    class Meta:
+        db_table = "communications_notification_inbox"
+        verbose_name = _("Notification Inbox")
+        verbose_name_plural = _("Notification Inboxes")
+
+    def __str__(self):
+        return f"Inbox of {self.user_id}: {self.unread_communications}/{self.unread_notifications}"
+
+
 class MessageThread(BaseModel):
     """
     Message threads for conversations
@@ -0,0 +1,143 @@
+# apps/communications/signals.py
+import logging
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.communications.models import Communication, CommunicationChannel, Notification
+from apps.communications.utils.inbox import inbox_service
+from apps.communications.utils.notification_cache import notification_bell_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _apply(user_id, **changes):
+    """Counters that fail to update are repaired by the reconciliation job"""
+    try:
+        inbox_service.apply(user_id, **changes)
+    except Exception as e:
+        logger.error(f"Failed to update notification inbox of {user_id}: {e}", exc_info=True)
+
+
+def _invalidate_bell(user_id):
+    schema_name = getattr(connection, 'schema_name', None)
+    transaction.on_commit(lambda: notification_bell_cache.invalidate(user_id, schema_name))
+
+
+# ---------------- Communication ----------------
+
+# Fields that decide whether, and how, a communication is counted. Read
+# from __dict__ so deferred fields are never loaded just to track them.
+COMMUNICATION_STATE_FIELDS = ('recipient_type_id', 'recipient_id', 'channel_id', 'status', 'is_active')
+
+
+def _communication_state(instance):
+    return tuple(instance.__dict__.get(field) for field in COMMUNICATION_STATE_FIELDS)
+
+
+def _inbox_entry(instance, state):
+    """(user_id, unread) when the state puts the communication in a user's inbox"""
+    recipient_type_id, recipient_id, channel_id, status, is_active = state
+    if not (recipient_id and is_active and channel_id):
+        return None
+    if recipient_type_id != ContentType.objects.get_for_model(get_user_model()).pk:
+        return None
+    channel = instance._state.fields_cache.get('channel')
+    if channel is not None and channel.pk == channel_id:
+        channel_type = channel.channel_type
+    else:
+        channel_type = CommunicationChannel.objects.filter(pk=channel_id).values_list(
+            'channel_type', flat=True
+        ).first()
+    if channel_type not in inbox_service.config['CHANNEL_TYPES']:
+        return None
+    return recipient_id, status != 'READ'
+
+
+@receiver(post_init, sender=Communication)
+def remember_communication_state(sender, instance, **kwargs):
+    instance._inbox_state = _communication_state(instance)
+
+
+@receiver(post_save, sender=Communication)
+def update_inbox_on_communication_save(sender, instance, created, **kwargs):
+    """Keep the recipient's unread count and header list in step with the row"""
+    state = _communication_state(instance)
+    previous = None if created else getattr(instance, '_inbox_state', None)
+    instance._inbox_state = state
+    if state == previous:
+        return
+
+    before = _inbox_entry(instance, previous) if previous else None
+    after = _inbox_entry(instance, state)
+    if before == after:
+        return
+
+    if before and after and before[0] == after[0]:
+        # Same inbox, read status changed
+        _apply(after[0], communications=int(after[1]) - int(before[1]))
+    else:
+        if before:
+            _apply(before[0], communications=-int(before[1]), remove_recent=instance.pk)
+        if after:
+            _apply(
+                after[0], communications=int(after[1]), add_recent=instance.pk, newest=created
+            )
+    for user_id in {entry[0] for entry in (before, after) if entry}:
+        _invalidate_bell(user_id)
+
+
+@receiver(post_delete, sender=Communication)
+def update_inbox_on_communication_delete(sender, instance, **kwargs):
+    entry = _inbox_entry(instance, _communication_state(instance))
+    if entry:
+        _apply(entry[0], communications=-int(entry[1]), remove_recent=instance.pk)
+        _invalidate_bell(entry[0])
+
+
+# ---------------- Notification ----------------
+
+# Notification.is_active is a property (not read, dismissed or expired), not
+# the soft-delete field
+NOTIFICATION_STATE_FIELDS = ('recipient_id', 'is_read', 'is_dismissed')
+
+
+def _notification_state(instance):
+    return tuple(instance.__dict__.get(field) for field in NOTIFICATION_STATE_FIELDS)
+
+
+def _unread_recipient(state):
+    """The recipient when the state counts as an unread notification"""
+    recipient_id, is_read, is_dismissed = state
+    return recipient_id if recipient_id and not (is_read or is_dismissed) else None
+
+
+@receiver(post_init, sender=Notification)
+def remember_notification_state(sender, instance, **kwargs):
+    instance._inbox_state = _notification_state(instance)
+
+
+@receiver(post_save, sender=Notification)
+def update_inbox_on_notification_save(sender, instance, created, **kwargs):
+    state = _notification_state(instance)
+    previous = None if created else getattr(instance, '_inbox_state', None)
+    instance._inbox_state = state
+
+    before = _unread_recipient(previous) if previous else None
+    after = _unread_recipient(state)
+    if before == after:
+        return
+    if before:
+        _apply(before, notifications=-1)
+    if after:
+        _apply(after, notifications=1)
+
+
+@receiver(post_delete, sender=Notification)
+def update_inbox_on_notification_delete(sender, instance, **kwargs):
+    recipient_id = _unread_recipient(_notification_state(instance))
+    if recipient_id:
+        _apply(recipient_id, notifications=-1)
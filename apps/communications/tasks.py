@@ -0,0 +1,41 @@
+"""
+Background tasks for communications operations using Celery
+"""
+
+import logging
+from typing import Dict
+
+from celery import shared_task
+from django_tenants.utils import get_public_schema_name, schema_context
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_notification_inboxes() -> Dict:
+    """
+    Recount every active tenant's notification inboxes and repair drift,
+    including notifications that expired since they were counted
+    """
+    from apps.tenants.models import Tenant
+    from apps.communications.utils.inbox import inbox_service
+
+    tenants = Tenant.objects.filter(is_active=True).exclude(
+        schema_name=get_public_schema_name()
+    )
+
+    checked, repaired, failed = 0, 0, []
+    for tenant in tenants:
+        try:
+            with schema_context(tenant.schema_name):
+                result = inbox_service.reconcile()
+            checked += result['checked']
+            repaired += result['repaired']
+        except Exception as e:
+            logger.error(
+                f"Error reconciling notification inboxes for {tenant.schema_name}: {str(e)}",
+                exc_info=True
+            )
+            failed.append(tenant.schema_name)
+
+    return {'success': not failed, 'checked': checked, 'repaired': repaired, 'failed_tenants': failed}
@@ -0,0 +1,87 @@
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.communications import signals
+from apps.communications.models import Communication, CommunicationChannel, Notification
+from apps.communications.utils.inbox import NotificationInboxService
+
+
+USER_CONTENT_TYPE = SimpleNamespace(pk=7)
+
+
+@mock.patch('apps.communications.signals.transaction.on_commit', lambda func: None)
+@mock.patch('apps.communications.signals.ContentType.objects.get_for_model', return_value=USER_CONTENT_TYPE)
+@mock.patch('apps.communications.signals._apply')
+class CommunicationInboxSignalTests(SimpleTestCase):
+    def communication(self, channel_type='IN_APP', **fields):
+        channel = CommunicationChannel(channel_type=channel_type)
+        instance = Communication(
+            recipient_type_id=USER_CONTENT_TYPE.pk, recipient_id=uuid.uuid4(), status='SENT', **fields
+        )
+        instance.channel = channel
+        return instance
+
+    def save(self, instance, created=False):
+        signals.update_inbox_on_communication_save(Communication, instance, created=created)
+
+    def test_new_unread_communication_is_counted_and_listed(self, apply, get_for_model):
+        instance = self.communication()
+        self.save(instance, created=True)
+        apply.assert_called_once_with(
+            instance.recipient_id, communications=1, add_recent=instance.pk, newest=True
+        )
+
+    def test_marking_read_decrements(self, apply, get_for_model):
+        instance = self.communication()
+        instance._inbox_state = signals._communication_state(instance)
+        instance.status = 'READ'
+        self.save(instance)
+        apply.assert_called_once_with(instance.recipient_id, communications=-1)
+
+    def test_unrelated_change_is_ignored(self, apply, get_for_model):
+        instance = self.communication()
+        instance._inbox_state = signals._communication_state(instance)
+        instance.title = 'Renamed'
+        self.save(instance)
+        apply.assert_not_called()
+
+    def test_soft_delete_removes_from_inbox(self, apply, get_for_model):
+        instance = self.communication()
+        instance._inbox_state = signals._communication_state(instance)
+        instance.is_active = False
+        self.save(instance)
+        apply.assert_called_once_with(
+            instance.recipient_id, communications=-1, remove_recent=instance.pk
+        )
+
+    def test_email_channel_is_not_counted(self, apply, get_for_model):
+        self.save(self.communication(channel_type='EMAIL'), created=True)
+        apply.assert_not_called()
+
+
+@mock.patch('apps.communications.signals._apply')
+class NotificationInboxSignalTests(SimpleTestCase):
+    def save(self, instance, created=False):
+        signals.update_inbox_on_notification_save(Notification, instance, created=created)
+
+    def test_new_notification_increments(self, apply):
+        instance = Notification(recipient_id=uuid.uuid4())
+        self.save(instance, created=True)
+        apply.assert_called_once_with(instance.recipient_id, notifications=1)
+
+    def test_read_and_dismiss_decrement_once(self, apply):
+        instance = Notification(recipient_id=uuid.uuid4())
+        instance.is_read = True
+        self.save(instance)
+        instance.is_dismissed = True
+        self.save(instance)
+        apply.assert_called_once_with(instance.recipient_id, notifications=-1)
+
+
+class RecentListTests(SimpleTestCase):
+    def test_new_communication_goes_first_and_list_is_capped(self):
+        service = NotificationInboxService(config={'RECENT_SIZE': 3, 'CHANNEL_TYPES': ['IN_APP']})
+        self.assertEqual(service._add_recent(['b', 'c', 'd'], 'a', newest=True), ['a', 'b', 'c'])
@@ -0,0 +1,233 @@
+# apps/communications/utils/inbox.py
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NOTIFICATION_INBOX = {
+    'RECENT_SIZE': 20,
+    # Channels whose communications are counted in the inbox
+    'CHANNEL_TYPES': ['IN_APP', 'PUSH'],
+}
+
+
+def _inbox_settings():
+    config = dict(DEFAULT_NOTIFICATION_INBOX)
+    config.update(getattr(settings, 'NOTIFICATION_INBOX', {}))
+    return config
+
+
+class NotificationInboxService:
+    """
+    Maintains the NotificationInbox rows of one tenant schema.
+
+    Writes lock the user's row and apply a delta inside the caller's
+    transaction, so the counters commit or roll back with the change that
+    caused them. A user's first write builds the row from an exact count.
+    Deltas cannot see notifications expiring, so reconcile() recounts on
+    a schedule and repairs any drift.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or _inbox_settings()
+
+    # ---------------- reading ----------------
+
+    def get_inbox(self, user):
+        """The user's inbox row, built on first use"""
+        from apps.communications.models import NotificationInbox
+
+        inbox = NotificationInbox.objects.filter(user_id=user.pk).first()
+        return inbox or self.rebuild(user.pk)
+
+    def recent_communications(self, user, limit: int) -> List:
+        """The user's latest header communications, with their senders"""
+        from apps.communications.models import Communication
+
+        ids = self.get_inbox(user).recent_communications[:limit]
+        if not ids:
+            return []
+        return list(
+            Communication.objects.filter(pk__in=ids).select_related('sender').order_by('-created_at')
+        )
+
+    # ---------------- writing ----------------
+
+    def apply(self, user_id, communications: int = 0, notifications: int = 0,
+              add_recent=None, remove_recent=None, newest: bool = True):
+        """
+        Apply counter deltas to one user's inbox and add or drop a header
+        communication. ``newest`` says ``add_recent`` was just created, so
+        it goes first without re-sorting the list.
+        """
+        from apps.communications.models import NotificationInbox
+
+        if not user_id:
+            return
+        with transaction.atomic():
+            inbox = NotificationInbox.objects.select_for_update().filter(user_id=user_id).first()
+            if inbox is None and self._create(user_id):
+                # Built from counts that already include this change
+                return
+            if inbox is None:
+                inbox = NotificationInbox.objects.select_for_update().get(user_id=user_id)
+
+            inbox.unread_communications = max(inbox.unread_communications + communications, 0)
+            inbox.unread_notifications = max(inbox.unread_notifications + notifications, 0)
+            recent = inbox.recent_communications
+            if remove_recent is not None:
+                recent = [pk for pk in recent if pk != str(remove_recent)]
+            if add_recent is not None and str(add_recent) not in recent:
+                recent = self._add_recent(recent, str(add_recent), newest)
+            inbox.recent_communications = recent
+            inbox.save(update_fields=[
+                'unread_communications', 'unread_notifications', 'recent_communications', 'updated_at'
+            ])
+
+    def clear_notifications(self, user_id):
+        """All of the user's notifications were just marked read"""
+        from apps.communications.models import NotificationInbox
+
+        if not NotificationInbox.objects.filter(user_id=user_id).update(
+            unread_notifications=0, updated_at=timezone.now()
+        ):
+            self._create(user_id)
+
+    def _add_recent(self, recent: List[str], pk: str, newest: bool) -> List[str]:
+        from apps.communications.models import Communication
+
+        size = self.config['RECENT_SIZE']
+        if newest:
+            return ([pk] + recent)[:size]
+        # An older communication came back (restored, re-addressed): place
+        # it by creation time, reading at most RECENT_SIZE + 1 rows
+        ordered = Communication.objects.filter(pk__in=recent + [pk]).order_by('-created_at')
+        return [str(value) for value in ordered.values_list('pk', flat=True)[:size]]
+
+    # ---------------- rebuilding ----------------
+
+    def _create(self, user_id) -> bool:
+        """Create the user's row from exact counts; False if another writer got there first"""
+        from apps.communications.models import NotificationInbox
+
+        counts = self._count(user_id)
+        try:
+            with transaction.atomic():
+                NotificationInbox.objects.create(user_id=user_id, reconciled_at=timezone.now(), **counts)
+        except IntegrityError:
+            return False
+        return True
+
+    def rebuild(self, user_id):
+        """Recount one user's inbox under its row lock"""
+        from apps.communications.models import NotificationInbox
+
+        with transaction.atomic():
+            inbox = NotificationInbox.objects.select_for_update().filter(user_id=user_id).first()
+            if inbox is None and self._create(user_id):
+                return NotificationInbox.objects.get(user_id=user_id)
+            if inbox is None:
+                inbox = NotificationInbox.objects.select_for_update().get(user_id=user_id)
+            for field, value in self._count(user_id).items():
+                setattr(inbox, field, value)
+            inbox.reconciled_at = timezone.now()
+            inbox.save()
+            return inbox
+
+    def reconcile(self, batch_size: int = 1000) -> Dict:
+        """
+        Compare every inbox with set-based recounts and rebuild the ones
+        that drifted; users without a row yet get one built on first use
+        """
+        from apps.communications.models import NotificationInbox
+
+        expected = self._count_all()
+        checked = repaired = 0
+        inboxes = NotificationInbox.objects.order_by('pk').values_list(
+            'user_id', 'unread_communications', 'unread_notifications', 'recent_communications'
+        )
+        for user_id, communications, notifications, recent in inboxes.iterator(chunk_size=batch_size):
+            checked += 1
+            counts = expected.get(user_id, {})
+            if (communications, notifications, recent) != (
+                counts.get('unread_communications', 0),
+                counts.get('unread_notifications', 0),
+                counts.get('recent_communications', []),
+            ):
+                try:
+                    self.rebuild(user_id)
+                    repaired += 1
+                except Exception as e:
+                    logger.error(f"Failed to rebuild notification inbox of {user_id}: {e}", exc_info=True)
+        return {'checked': checked, 'repaired': repaired}
+
+    # ---------------- counting ----------------
+
+    def communications(self):
+        from apps.communications.models import Communication
+
+        return Communication.objects.filter(
+            recipient_type=ContentType.objects.get_for_model(get_user_model()),
+            channel__channel_type__in=self.config['CHANNEL_TYPES'],
+        )
+
+    def unread_notifications(self):
+        from apps.communications.models import Notification
+
+        return Notification.objects.filter(is_read=False, is_dismissed=False).exclude(
+            expires_at__lt=timezone.now()
+        )
+
+    def _recent(self, queryset) -> Iterable:
+        return (
+            queryset
+            .annotate(position=Window(
+                RowNumber(), partition_by=[F('recipient_id')], order_by=F('created_at').desc()
+            ))
+            .filter(position__lte=self.config['RECENT_SIZE'])
+            .order_by('recipient_id', 'position')
+            .values_list('recipient_id', 'pk')
+        )
+
+    def _count(self, user_id) -> Dict:
+        communications = self.communications().filter(recipient_id=user_id)
+        return {
+            'unread_communications': communications.exclude(status='READ').count(),
+            'unread_notifications': self.unread_notifications().filter(recipient_id=user_id).count(),
+            'recent_communications': [
+                str(pk) for pk in communications.order_by('-created_at').values_list(
+                    'pk', flat=True
+                )[:self.config['RECENT_SIZE']]
+            ],
+        }
+
+    def _count_all(self) -> Dict:
+        counts = {}
+
+        def entry(user_id):
+            return counts.setdefault(user_id, {})
+
+        for user_id, total in (
+            self.communications().exclude(status='READ')
+            .values_list('recipient_id').annotate(total=Count('id')).order_by()
+        ):
+            entry(user_id)['unread_communications'] = total
+        for user_id, total in (
+            self.unread_notifications()
+            .values_list('recipient_id').annotate(total=Count('id')).order_by()
+        ):
+            entry(user_id)['unread_notifications'] = total
+        for user_id, pk in self._recent(self.communications()):
+            entry(user_id).setdefault('recent_communications', []).append(str(pk))
+        return counts
+
+
+inbox_service = NotificationInboxService()
@@ -0,0 +1,112 @@
+# apps/communications/utils/notification_cache.py
+import uuid
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from apps.communications.utils.inbox import inbox_service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NOTIFICATION_BELL_CACHE = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'notification_bell',
+    'TTL': 300,             # seconds
+    'HEADER_SIZE': 5,
+}
+
+
+class NotificationBellCache:
+    """
+    Shared cache of each user's unread communication count and the recent
+    communications listed in the header, in front of their NotificationInbox.
+
+    Entries are keyed by a per-user generation token which invalidate()
+    replaces, so a value computed before a write can never be served after
+    it, even if it is stored after the invalidation ran.
+    """
+
+    def __init__(self, config=None):
+        self._config_override = config
+        self._config = None
+
+    # ---------------- configuration ----------------
+
+    @property
+    def config(self):
+        if self._config is None:
+            config = dict(DEFAULT_NOTIFICATION_BELL_CACHE)
+            config.update(
+                self._config_override if self._config_override is not None
+                else getattr(settings, 'NOTIFICATION_BELL_CACHE', {})
+            )
+            self._config = config
+        return self._config
+
+    @property
+    def enabled(self):
+        return self.config['ENABLED']
+
+    @property
+    def shared_cache(self):
+        return caches[self.config['CACHE_ALIAS']]
+
+    # ---------------- public API ----------------
+
+    def unread_count(self, user):
+        """Number of bell communications the user has not read"""
+        return self._cached(user, 'unread', lambda: inbox_service.get_inbox(user).unread_communications)
+
+    def header_notifications(self, user):
+        """Most recent bell communications of the user, with their senders"""
+        return self._cached(user, 'header', lambda: inbox_service.recent_communications(
+            user, self.config['HEADER_SIZE']
+        ))
+
+    def invalidate(self, user_id, schema_name=None):
+        """Drop the cached values of one user, e.g. after a Communication write"""
+        if not self.enabled or not user_id:
+            return
+        try:
+            # Outlives every entry stored under the previous token
+            self.shared_cache.set(
+                self._generation_key(user_id, schema_name), uuid.uuid4().hex[:12], self.config['TTL'] * 2
+            )
+        except Exception as e:
+            logger.warning(f"Notification bell cache invalidation failed for user {user_id}: {e}")
+
+    # ---------------- internals ----------------
+
+    def _user_prefix(self, user_id, schema_name=None):
+        schema_name = schema_name or getattr(connection, 'schema_name', 'public')
+        return f"{self.config['KEY_PREFIX']}:{schema_name}:{user_id}"
+
+    def _generation_key(self, user_id, schema_name=None):
+        return f"{self._user_prefix(user_id, schema_name)}:gen"
+
+    def _cached(self, user, name, compute):
+        if not self.enabled:
+            return compute()
+
+        cache = self.shared_cache
+        try:
+            generation = cache.get(self._generation_key(user.pk)) or '0'
+            key = f"{self._user_prefix(user.pk)}:{generation}:{name}"
+            value = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Notification bell cache unavailable: {e}")
+            return compute()
+
+        if value is None:
+            value = compute()
+            try:
+                cache.set(key, value, self.config['TTL'])
+            except Exception as e:
+                logger.warning(f"Notification bell cache write failed: {e}")
+        return value
+
+
+notification_bell_cache = NotificationBellCache()
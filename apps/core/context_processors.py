@@ -4,6 +4,7 @@ from django.conf import settings
 from django_tenants.utils import get_public_schema_name
 from apps.core.middleware import get_dynamic_tenant
 from apps.core.utils.tenant import get_current_tenant
+from apps.core.utils.request_context import RequestContext
 
 
 def tenant_context(request):
@@ -24,7 +25,7 @@ def tenant_context(request):
     cached_data = cache.get(cache_key)
     
     if cached_data:
-        return cached_data
+        return _with_request_values(request, cached_data)
     
     # Build comprehensive tenant context based on your model
     tenant_data = {
@@ -69,9 +70,6 @@ def tenant_context(request):
         'primary_color': '#3B82F6',
         'secondary_color': '#1E40AF',
         
-        # User count
-        'current_users': tenant.get_user_count() if hasattr(tenant, 'get_user_count') else 0,
-        
         # Public flag
         'is_public_tenant': False,
     }
@@ -127,18 +125,35 @@ def tenant_context(request):
     # Cache for 1 hour (3600 seconds)
     cache.set(cache_key, tenant_data, 3600)
     
-    return tenant_data
+    return _with_request_values(request, tenant_data)
+
+
+def _with_request_values(request, tenant_data):
+    """
+    Add the values that change between requests; they are computed lazily
+    and kept out of the cached tenant data
+    """
+    return {
+        **tenant_data,
+        'current_users': RequestContext.for_request(request).lazy('user_count'),
+    }
 
 
 def user_permissions(request):
     """
-    Add user permissions to template context
+    Add user permissions to template context.
+
+    Everything past the user's name is lazy and memoized per request, so
+    pages that don't show permissions, limits or notifications don't query
+    for them.
     """
     context = {}
     
     if not request.user.is_authenticated:
         return context
     
+    values = RequestContext.for_request(request)
+    
     # Add user info
     context.update({
         'user': request.user,
@@ -147,23 +162,10 @@ def user_permissions(request):
     })
     
     # Add permissions
-    try:
-        context['user_permissions'] = request.user.get_all_permissions()
-        
-        # Module access permissions
-        context['can_access'] = {
-            'academics': request.user.has_perm('academics.view_course'),
-            'finance': request.user.has_perm('finance.view_finance'),
-            'library': request.user.has_perm('library.view_book'),
-            'reports': request.user.has_perm('reports.view_report'),
-            'settings': request.user.has_perm('settings.change_settings'),
-            'inventory': request.user.has_perm('inventory.view_item'),
-        }
-        
-    except Exception as e:
-        # Fallback if permissions aren't available
-        context['user_permissions'] = set()
-        context['can_access'] = {}
+    context['user_permissions'] = values.lazy('permissions')
+    
+    # Module access permissions
+    context['can_access'] = values.lazy('can_access')
     
     # Add tenant-specific user data if tenant exists
     tenant = getattr(request, 'tenant', None)
@@ -171,53 +173,17 @@ def user_permissions(request):
         
         # Check user count against limits
         if hasattr(tenant, 'get_user_count') and hasattr(tenant, 'max_users'):
-            context['user_count'] = tenant.get_user_count()
+            context['user_count'] = values.lazy('user_count')
             context['user_limit'] = tenant.max_users
-            context['can_add_users'] = tenant.get_user_count() < tenant.max_users
+            context['can_add_users'] = values.lazy('can_add_users')
         
-        # Add notifications count if notifications app exists
-        # Add notifications count if communications app exists
-        try:
-            from django.contrib.contenttypes.models import ContentType
-            from apps.communications.models import Communication
-            from django.db.models import Q
-            
-            user_type = ContentType.objects.get_for_model(request.user)
-            
-            # Base query for user notifications
-            user_notifications = Communication.objects.filter(
-                recipient_type=user_type,
-                recipient_id=request.user.id,
-                channel__channel_type__in=['IN_APP', 'PUSH'] # Include PUSH as they often appear in-app too
-            )
-            
-            # Count unread (not READ status)
-            unread_count = user_notifications.exclude(status='READ').count()
-            context['unread_notifications_count'] = unread_count
-            
-            # Get latest 5 unread/recent notifications for header
-            # Prioritize unread, then recent
-            header_notifications = user_notifications.order_by(
-                'status', # 'DELIVERED/SENT' comes before 'READ'? No, depends on alpha. 
-                # Better to just order bycreated_at desc
-                '-created_at'
-            )[:5]
-            context['header_notifications'] = header_notifications
-            
-        except (ImportError, Exception) as e:
-            # print(f"Error fetching notifications: {e}") # Debug only
-            context['unread_notifications_count'] = 0
-            context['header_notifications'] = []
+        # Header bell; served from the notification cache, which
+        # Communication saves invalidate
+        context['unread_notifications_count'] = values.lazy('unread_notifications_count')
+        context['header_notifications'] = values.lazy('header_notifications')
         
         # Add cart items count if store module is enabled
-        if tenant.configuration and hasattr(tenant.configuration, 'enable_store'):
-            if tenant.configuration.enable_store:
-                try:
-                    from apps.store.models import Cart
-                    cart_items_count = Cart.objects.filter(user=request.user).count()
-                    context['cart_items_count'] = cart_items_count
-                except (ImportError, Exception):
-                    context['cart_items_count'] = 0
+        context['cart_items_count'] = values.lazy('cart_items_count')
     
     return context
 
@@ -0,0 +1,108 @@
+# apps/core/management/commands/benchmark_integrity.py
+import time
+import hashlib
+from contextlib import nullcontext
+from unittest import mock
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django_tenants.utils import schema_context
+
+from apps.tenants.models import Tenant
+from apps.core.utils import integrity
+from apps.core.utils.tenant import tenant_context
+
+
+def legacy_signature(obj):
+    """CryptographicModel.calculate_signature before signature plans"""
+    return hashlib.sha256(serializers.serialize('json', [obj]).encode()).hexdigest()
+
+
+def legacy_sign_for_save(obj, update_fields=None):
+    """The old save() behaviour: serialize once, on the first save"""
+    if not obj.data_signature:
+        obj.data_signature = legacy_signature(obj)
+    return update_fields
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare signing cost and save throughput of the JSON-serializer '
+        'signature, hashed signatures and deferred signing. Saves re-save '
+        'existing rows inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', nargs='?', default='students.Student', help='app_label.Model label')
+        parser.add_argument('--schema', required=True, help='Tenant schema to read rows from')
+        parser.add_argument('--rows', type=int, default=500, help='Rows signed and saved per run')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per case (best is kept)')
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options['model'])
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+        if not integrity.is_signed_model(model):
+            raise CommandError(f"{model._meta.label} has no data_signature")
+        try:
+            tenant = Tenant.objects.get(schema_name=options['schema'])
+        except Tenant.DoesNotExist:
+            raise CommandError(f"Tenant {options['schema']} does not exist")
+
+        with schema_context(tenant.schema_name), tenant_context(tenant):
+            rows = list(model._base_manager.all()[:options['rows']])
+            if not rows:
+                raise CommandError(f"No {model._meta.label} rows in {tenant.schema_name} to benchmark with")
+            self.stdout.write(f"{model._meta.label}: {len(rows)} rows from {tenant.schema_name}")
+
+            self.stdout.write('\nSignature computation (per row)')
+            legacy = self._best(lambda: [legacy_signature(row) for row in rows], options) / len(rows)
+            hashed = self._best(lambda: [integrity.compute_signature(row) for row in rows], options) / len(rows)
+            self.stdout.write(f"  JSON serializer:  {legacy * 1e6:9.1f} µs")
+            self.stdout.write(f"  signature plan:   {hashed * 1e6:9.1f} µs   ({legacy / hashed:.1f}x)")
+
+            self.stdout.write('\nsave() throughput')
+            cases = [
+                ('JSON serializer', mock.patch.object(integrity, 'sign_for_save', legacy_sign_for_save), 'save'),
+                ('hashed on save', nullcontext(), 'save'),
+                ('deferred', nullcontext(), 'deferred'),
+            ]
+            baseline = None
+            for name, patch, signing in cases:
+                with patch, override_settings(DATA_INTEGRITY={**integrity.integrity_settings(), 'SIGNING': signing}):
+                    seconds, queries = self._save_all(rows, options)
+                rate = len(rows) / seconds
+                baseline = baseline or rate
+                self.stdout.write(
+                    f"  {name:<16} {rate:9.0f} saves/s   {queries / len(rows):5.1f} queries/save"
+                    f"   ({rate / baseline:.2f}x)"
+                )
+
+    def _save_all(self, rows, options):
+        best, queries = None, 0
+        for _ in range(max(options['repeat'], 1)):
+            with transaction.atomic(), CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                for row in rows:
+                    # Legacy signing only ran while the signature was blank
+                    row.data_signature = ''
+                    row.save()
+                elapsed = time.perf_counter() - started
+                transaction.set_rollback(True)
+            best = elapsed if best is None else min(best, elapsed)
+            queries = len(captured)
+        return best, queries
+
+    @staticmethod
+    def _best(func, options):
+        best = None
+        for _ in range(max(options['repeat'], 1)):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,116 @@
+# apps/core/management/commands/benchmark_managers.py
+import timeit
+import uuid
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+from apps.core.utils.tenant import tenant_context
+
+
+# Models behind the hottest list views, invoice generation and attendance marking
+DEFAULT_MODELS = [
+    'students.Student',
+    'students.Guardian',
+    'academics.AcademicYear',
+    'academics.SchoolClass',
+    'academics.Section',
+    'academics.Subject',
+    'academics.StudentAttendance',
+    'academics.TimeTable',
+    'finance.FeeStructure',
+    'finance.Invoice',
+    'finance.InvoiceItem',
+    'finance.Payment',
+    'finance.FinancialTransaction',
+    'hr.Staff',
+    'hr.StaffAttendance',
+    'hr.Payroll',
+    'exams.Exam',
+    'exams.ExamResult',
+    'communications.Communication',
+    'communications.Notification',
+]
+
+
+class LegacyTenantSoftDeleteManager(models.Manager):
+    """TenantSoftDeleteManager.get_queryset before per-model filter flags"""
+
+    def _soft_delete_queryset(self):
+        queryset = super().get_queryset()
+        try:
+            self.model._meta.get_field('is_active')
+            return queryset.filter(is_active=True)
+        except Exception:
+            return queryset
+
+    def get_queryset(self):
+        try:
+            from apps.core.utils.tenant import get_current_tenant
+            current_tenant = get_current_tenant()
+        except ImportError:
+            current_tenant = None
+
+        queryset = self._soft_delete_queryset()
+
+        if current_tenant:
+            queryset = queryset.filter(tenant=current_tenant)
+
+        try:
+            self.model._meta.get_field('is_active')
+            return queryset.filter(is_active=True)
+        except Exception:
+            return queryset
+
+
+class Command(BaseCommand):
+    help = 'Measure queryset construction cost of the tenant/soft-delete managers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='app_label.Model labels (default: 20 hot models)')
+        parser.add_argument('--number', type=int, default=20000, help='Calls per measurement')
+        parser.add_argument('--repeat', type=int, default=5, help='Measurements per case (best is kept)')
+        parser.add_argument('--no-tenant', action='store_true', help='Measure without a current tenant')
+
+    def handle(self, *args, **options):
+        try:
+            model_list = [apps.get_model(label) for label in options['models'] or DEFAULT_MODELS]
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+
+        tenant = None
+        if not options['no_tenant']:
+            from apps.tenants.models import Tenant
+            tenant = Tenant(id=uuid.uuid4(), schema_name='benchmark')
+
+        header = f"{'model':<34}{'before µs':>12}{'after µs':>12}{'speed-up':>10}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        totals = [0.0, 0.0]
+        with tenant_context(tenant):
+            for model in model_list:
+                legacy = LegacyTenantSoftDeleteManager()
+                legacy.model = model
+                current = model._default_manager
+
+                before = self._measure(lambda: legacy.get_queryset().filter(pk=1), options)
+                after = self._measure(lambda: current.get_queryset().filter(pk=1), options)
+                totals[0] += before
+                totals[1] += after
+                self.stdout.write(
+                    f"{model._meta.label:<34}{before:>12.2f}{after:>12.2f}{before / after:>9.2f}x"
+                )
+
+        self.stdout.write('-' * len(header))
+        self.stdout.write(
+            f"{'total':<34}{totals[0]:>12.2f}{totals[1]:>12.2f}{totals[0] / totals[1]:>9.2f}x"
+        )
+
+    @staticmethod
+    def _measure(func, options):
+        """Best per-call time in microseconds"""
+        number = options['number']
+        best = min(timeit.repeat(func, number=number, repeat=options['repeat']))
+        return best / number * 1_000_000
@@ -0,0 +1,139 @@
+# apps/core/management/commands/benchmark_search.py
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.core.utils.search import DEFAULT_SEARCH_INDEX, search_terms
+
+FIRST_NAMES = (
+    'aarav', 'aditi', 'ananya', 'arjun', 'diya', 'ishaan', 'kabir', 'kavya', 'meera', 'nikhil',
+    'priya', 'rahul', 'riya', 'rohan', 'saanvi', 'sanjay', 'shreya', 'tanvi', 'vihaan', 'zara',
+    'ada', 'alan', 'grace', 'john', 'maria', 'omar', 'sofia', 'yusuf', 'lena', 'noah',
+)
+LAST_NAMES = (
+    'sharma', 'verma', 'iyer', 'nair', 'reddy', 'patel', 'gupta', 'khan', 'das', 'menon',
+    'singh', 'joshi', 'kapoor', 'mehta', 'pillai', 'rao', 'bose', 'chopra', 'lovelace', 'turing',
+)
+DEFAULT_QUERIES = ('ari', 'arjun sha', 'lovelace', 'adm-2024', '98765', 'shrey@', 'kavya menn')
+
+LEGACY_SQL = """
+    SELECT DISTINCT s.id FROM bench_student s
+    LEFT JOIN bench_guardian g ON g.student_id = s.id
+    WHERE s.admission_number ILIKE %(like)s OR s.first_name ILIKE %(like)s
+       OR s.last_name ILIKE %(like)s OR s.personal_email ILIKE %(like)s
+       OR s.mobile_primary ILIKE %(like)s OR g.full_name ILIKE %(like)s
+    LIMIT 20
+"""
+
+INDEXED_SQL = """
+    SELECT id FROM bench_student
+    WHERE search_vector @@ to_tsquery(%(config)s, %(tsquery)s) OR search_document %%> %(text)s
+    ORDER BY ts_rank(search_vector, to_tsquery(%(config)s, %(tsquery)s))
+             + word_similarity(%(text)s, search_document) DESC
+    LIMIT 20
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare icontains-style student search with the tsvector/trigram search '
+        'document on synthetic temporary tables (Postgres only)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000', help='Comma separated student counts')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query (median is reported)')
+        parser.add_argument('--query', action='append', help='Search query (repeatable)')
+        parser.add_argument('--explain', action='store_true', help='Print the plan of the first indexed query')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The search benchmark needs Postgres with pg_trgm')
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--sizes must be comma separated integers')
+
+        queries = options['query'] or list(DEFAULT_QUERIES)
+        self.config = DEFAULT_SEARCH_INDEX['CONFIG']
+        for size in sizes:
+            # Temporary tables vanish with the rolled back transaction
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    self._populate(cursor, size)
+                    self.stdout.write(f"\n{size} students")
+                    self.stdout.write(f"{'query':<16}{'icontains ms':>14}{'indexed ms':>12}")
+                    for number, query in enumerate(queries):
+                        legacy = self._time(cursor, LEGACY_SQL, {'like': f'%{query}%'}, options['repeat'])
+                        params = self._indexed_params(query)
+                        indexed = self._time(cursor, INDEXED_SQL, params, options['repeat'])
+                        self.stdout.write(f"{query:<16}{legacy:>14.2f}{indexed:>12.2f}")
+                        if options['explain'] and number == 0:
+                            cursor.execute('EXPLAIN ANALYZE ' + INDEXED_SQL, params)
+                            self.stdout.write('\n'.join(row[0] for row in cursor.fetchall()))
+                transaction.set_rollback(True)
+
+    def _indexed_params(self, query):
+        terms = search_terms(query)
+        return {
+            'config': self.config,
+            'tsquery': ' & '.join(f"'{term}':*" for term in terms),
+            'text': ' '.join(terms),
+        }
+
+    @staticmethod
+    def _time(cursor, sql, params, repeat):
+        samples = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples) * 1000
+
+    def _populate(self, cursor, size):
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public")
+        cursor.execute("SELECT setseed(0.42)")
+        cursor.execute("""
+            CREATE TEMPORARY TABLE bench_student (
+                id integer PRIMARY KEY, first_name text, last_name text, admission_number text,
+                personal_email text, mobile_primary text, search_document text, search_vector tsvector
+            ) ON COMMIT DROP
+        """)
+        cursor.execute("""
+            CREATE TEMPORARY TABLE bench_guardian (student_id integer, full_name text) ON COMMIT DROP
+        """)
+        cursor.execute("""
+            INSERT INTO bench_student (id, first_name, last_name, admission_number, personal_email, mobile_primary)
+            SELECT g, f, l, 'ADM-' || (2015 + g %% 10) || '-BENCH-' || lpad(g::text, 6, '0'),
+                   f || '.' || l || g || '@example.com', '+91' || (9000000000 + g * 7919 %% 999999999)
+            FROM (
+                SELECT g,
+                       (%(first)s::text[])[1 + floor(random() * %(first_count)s)::int] AS f,
+                       (%(last)s::text[])[1 + floor(random() * %(last_count)s)::int] AS l
+                FROM generate_series(1, %(size)s) AS g
+            ) AS people
+        """, {
+            'first': list(FIRST_NAMES), 'first_count': len(FIRST_NAMES),
+            'last': list(LAST_NAMES), 'last_count': len(LAST_NAMES), 'size': size,
+        })
+        cursor.execute("""
+            INSERT INTO bench_guardian (student_id, full_name)
+            SELECT s.id, (%(first)s::text[])[1 + floor(random() * %(first_count)s)::int] || ' ' || s.last_name
+            FROM bench_student s, generate_series(1, 2)
+        """, {'first': list(FIRST_NAMES), 'first_count': len(FIRST_NAMES)})
+        cursor.execute("""
+            UPDATE bench_student s SET search_document = lower(concat_ws(' ',
+                s.first_name, s.last_name, s.admission_number, s.personal_email, s.mobile_primary,
+                regexp_replace(s.mobile_primary, '\\D', '', 'g'),
+                (SELECT string_agg(g.full_name, ' ') FROM bench_guardian g WHERE g.student_id = s.id)
+            ))
+        """)
+        cursor.execute("UPDATE bench_student SET search_vector = to_tsvector(%s, search_document)", [self.config])
+        cursor.execute("CREATE INDEX ON bench_student USING gin (search_vector)")
+        cursor.execute("CREATE INDEX ON bench_student USING gin (search_document gin_trgm_ops)")
+        cursor.execute("CREATE INDEX ON bench_guardian (student_id)")
+        cursor.execute("ANALYZE bench_student")
+        cursor.execute("ANALYZE bench_guardian")
@@ -0,0 +1,96 @@
+# apps/core/management/commands/benchmark_sequences.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django_tenants.utils import schema_context
+
+from apps.core.utils.sequences import DEFAULT_DOCUMENT_SEQUENCES, sequences
+from apps.tenants.models import Tenant
+
+# Year of the benchmark counters; no real document number uses it
+BENCHMARK_YEAR = 9999
+
+
+def _percentile(samples, percent):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Issue document numbers from concurrent writers and report throughput, '
+        'latency and duplicates'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', required=True, help='Tenant schema to issue numbers for')
+        parser.add_argument(
+            '--kind', default='payment', choices=sorted(DEFAULT_DOCUMENT_SEQUENCES['TEMPLATES']),
+            help='Document kind (default: payment)',
+        )
+        parser.add_argument('--writers', type=int, default=32, help='Concurrent writers')
+        parser.add_argument('--numbers', type=int, default=200, help='Numbers issued by each writer')
+        parser.add_argument('--block', type=int, default=1, help='Numbers reserved per call')
+
+    def handle(self, *args, **options):
+        if options['writers'] < 1 or options['numbers'] < 1 or options['block'] < 1:
+            raise CommandError('--writers, --numbers and --block must be positive')
+
+        tenant = Tenant.objects.filter(schema_name=options['schema']).first()
+        if tenant is None:
+            raise CommandError(f"No tenant with schema {options['schema']}")
+
+        self.tenant = tenant
+        self.options = options
+        context = self._context()
+        prefix = sequences.prefix(options['kind'], tenant, **context)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['writers']) as executor:
+            runs = list(executor.map(self._run_writer, range(options['writers'])))
+        elapsed = time.perf_counter() - started
+
+        numbers = [number for run in runs for number in run['numbers']]
+        latencies = [latency for run in runs for latency in run['latencies']]
+        duplicates = len(numbers) - len(set(numbers))
+
+        self.stdout.write(f"Writers:      {options['writers']}")
+        self.stdout.write(f"Numbers:      {len(numbers)} in {len(latencies)} calls ({elapsed:.2f}s)")
+        self.stdout.write(f"Throughput:   {len(numbers) / elapsed:.0f} numbers/s")
+        self.stdout.write(
+            'Latency (ms): p50 {:.2f}  p90 {:.2f}  p99 {:.2f}  max {:.2f}'.format(
+                _percentile(latencies, 50) * 1000, _percentile(latencies, 90) * 1000,
+                _percentile(latencies, 99) * 1000, max(latencies, default=0) * 1000,
+            )
+        )
+        if duplicates:
+            self.stdout.write(self.style.ERROR(f'{duplicates} duplicate numbers issued'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No duplicate numbers'))
+
+        from apps.core.models import DocumentSequence
+        DocumentSequence.objects.filter(tenant=tenant, kind=options['kind'], prefix=prefix).delete()
+
+    def _context(self):
+        # Fields other templates need, e.g. the invoice prefix and admission cycle
+        return {'year': BENCHMARK_YEAR, 'prefix': 'BENCH', 'cycle': 'BENCH'}
+
+    def _run_writer(self, number):
+        run = {'numbers': [], 'latencies': []}
+        calls = -(-self.options['numbers'] // self.options['block'])
+        try:
+            with schema_context(self.tenant.schema_name):
+                for _ in range(calls):
+                    started = time.perf_counter()
+                    run['numbers'].extend(sequences.reserve(
+                        self.options['kind'], self.tenant, self.options['block'], **self._context()
+                    ))
+                    run['latencies'].append(time.perf_counter() - started)
+        finally:
+            connection.close()
+        return run
@@ -0,0 +1,43 @@
+# apps/core/management/commands/maintain_audit_partitions.py
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.services.audit_archive import AuditPartitionManager
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming audit_logs partitions and archive months past retention'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=None,
+            help='Number of future monthly partitions to keep created',
+        )
+        parser.add_argument(
+            '--skip-archive',
+            action='store_true',
+            help='Only create partitions, do not apply retention',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be created or archived without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        manager = AuditPartitionManager(stdout=self.stdout, dry_run=options['dry_run'])
+        if not manager.is_supported:
+            raise CommandError('audit_logs partitioning requires PostgreSQL')
+
+        created = manager.ensure_partitions(options['months_ahead'])
+        self.stdout.write(f'Partitions created: {len(created)}')
+
+        if not options['skip_archive']:
+            result = manager.apply_retention()
+            self.stdout.write(
+                f"Partitions archived: {result['partitions_archived']}, "
+                f"rows archived: {result['rows_archived']}"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Audit log partitions are up to date'))
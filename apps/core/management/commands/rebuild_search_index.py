@@ -0,0 +1,39 @@
+# apps/core/management/commands/rebuild_search_index.py
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from apps.core.utils.search import SEARCH_DOCUMENTS, search_index
+from apps.tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search documents of students and staff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema',
+            help='Only rebuild this tenant schema (default: all active tenants)',
+        )
+        parser.add_argument(
+            '--model', action='append', choices=sorted(SEARCH_DOCUMENTS),
+            help='Only rebuild this model (repeatable; default: all indexed models)',
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.filter(is_active=True).exclude(
+            schema_name=get_public_schema_name()
+        )
+        if options['schema']:
+            tenants = tenants.filter(schema_name=options['schema'])
+            if not tenants.exists():
+                raise CommandError(f"No active tenant with schema {options['schema']}")
+
+        models = [apps.get_model(label) for label in options['model'] or sorted(SEARCH_DOCUMENTS)]
+        for tenant in tenants:
+            with schema_context(tenant.schema_name):
+                for model in models:
+                    count = search_index.rebuild(model._base_manager.filter(tenant=tenant))
+                    self.stdout.write(f"{tenant.schema_name}: {count} {model._meta.verbose_name_plural}")
+
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
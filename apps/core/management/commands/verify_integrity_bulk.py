@@ -0,0 +1,113 @@
+# apps/core/management/commands/verify_integrity_bulk.py
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from apps.tenants.models import Tenant
+from apps.core.utils.integrity import (
+    integrity_settings,
+    is_signed_model,
+    iter_signatures,
+    sign_pending,
+)
+
+
+class Command(BaseCommand):
+    help = 'Stream signed tables and report rows whose data_signature does not match their data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='app_label.Model labels (default: every signed model)')
+        parser.add_argument('--schema', help='Only verify this schema (default: public and all active tenants)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows fetched per round trip')
+        parser.add_argument('--show', type=int, default=20, help='Mismatched primary keys listed per table')
+        parser.add_argument('--sign-missing', action='store_true', help='Sign rows that have no signature yet')
+        parser.add_argument(
+            '--rehash', action='store_true',
+            help='Overwrite mismatched signatures, e.g. rows signed by an older scheme',
+        )
+
+    def handle(self, *args, **options):
+        if options['models']:
+            try:
+                models = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+            unsigned = [model._meta.label for model in models if not is_signed_model(model)]
+            if unsigned:
+                raise CommandError(f"Not signed models: {', '.join(unsigned)}")
+        else:
+            models = [
+                model for model in apps.get_models()
+                if is_signed_model(model) and not model._meta.proxy
+            ]
+
+        batch_size = options['batch_size'] or integrity_settings()['BATCH_SIZE']
+        public = get_public_schema_name()
+        tenant_schemas = list(
+            Tenant.objects.filter(is_active=True).exclude(schema_name=public)
+            .values_list('schema_name', flat=True)
+        )
+
+        totals = {'rows': 0, 'mismatched': 0, 'unsigned': 0}
+        for model in models:
+            for schema_name in self._schemas_for(model, public, tenant_schemas, options['schema']):
+                with schema_context(schema_name):
+                    result = self._verify(model, batch_size, options)
+                for key in totals:
+                    totals[key] += result[key]
+                self._report(model, schema_name, result, options)
+
+        summary = (
+            f"{totals['rows']} rows verified, {totals['mismatched']} mismatched, "
+            f"{totals['unsigned']} unsigned"
+        )
+        style = self.style.ERROR if totals['mismatched'] else self.style.SUCCESS
+        self.stdout.write(style(summary))
+
+    @staticmethod
+    def _schemas_for(model, public, tenant_schemas, only):
+        app = model._meta.app_config.name
+        schemas = []
+        if app in settings.SHARED_APPS:
+            schemas.append(public)
+        if app in settings.TENANT_APPS:
+            schemas.extend(tenant_schemas)
+        return [schema for schema in schemas if not only or schema == only]
+
+    def _verify(self, model, batch_size, options):
+        queryset = model._base_manager.all()
+        result = {'rows': 0, 'mismatched': 0, 'unsigned': 0, 'sample': [], 'rehashed': 0, 'signed': 0}
+
+        for pk, stored, expected in iter_signatures(queryset, chunk_size=batch_size):
+            result['rows'] += 1
+            if not stored:
+                result['unsigned'] += 1
+            elif stored != expected:
+                result['mismatched'] += 1
+                if len(result['sample']) < options['show']:
+                    result['sample'].append(pk)
+                if options['rehash']:
+                    # Only if the row was not re-signed meanwhile
+                    result['rehashed'] += queryset.filter(pk=pk, data_signature=stored).update(
+                        data_signature=expected
+                    )
+
+        if options['sign_missing'] and result['unsigned']:
+            result['signed'] = sign_pending(queryset, batch_size=batch_size)
+        return result
+
+    def _report(self, model, schema_name, result, options):
+        if not result['rows']:
+            return
+        line = (
+            f"{schema_name}.{model._meta.db_table}: {result['rows']} rows, "
+            f"{result['mismatched']} mismatched, {result['unsigned']} unsigned"
+        )
+        if options['rehash']:
+            line += f", {result['rehashed']} rehashed"
+        if options['sign_missing']:
+            line += f", {result['signed']} signed"
+        self.stdout.write(self.style.WARNING(line) if result['mismatched'] else line)
+        for pk in result['sample']:
+            self.stdout.write(f"  mismatch: {pk}")
@@ -1,15 +1,90 @@
 # apps/core/managers.py (updated)
 from django.db import models
 from django.db.models import Q
+from django.db.models.signals import class_prepared
+from django.dispatch import receiver
 from django.utils import timezone
 from django.core.exceptions import FieldError
 
 
+# (has is_active, has tenant FK) per model. Resolved when the model class is
+# prepared so get_queryset() doesn't introspect _meta on every call.
+_model_filter_flags = {}
+
+# apps.core.utils.tenant.current_tenant, bound on first use: importing
+# apps.core.utils at module level would import the models using these managers
+_current_tenant = None
+
+
+def model_filter_flags(model):
+    """Which default filters apply to ``model``: (is_active, tenant)"""
+    flags = _model_filter_flags.get(model)
+    if flags is None:
+        fields = {field.name: field for field in model._meta.concrete_fields}
+        tenant_field = fields.get('tenant')
+        flags = _model_filter_flags[model] = (
+            'is_active' in fields,
+            tenant_field is not None and tenant_field.is_relation,
+        )
+    return flags
+
+
+@receiver(class_prepared)
+def _prepare_model_filter_flags(sender, **kwargs):
+    model_filter_flags(sender)
+
+
+def _get_current_tenant():
+    global _current_tenant
+    if _current_tenant is None:
+        from apps.core.utils.tenant import current_tenant
+        _current_tenant = current_tenant
+    return _current_tenant.get()
+
+
+class AuditQuerySet(models.QuerySet):
+    """
+    QuerySet of the audit managers: update() on a signed model re-signs
+    the rows it changed, since it bypasses save()
+    """
+    def update(self, **kwargs):
+        # Import inside method to avoid circular imports
+        from django.db import transaction
+        from apps.core.utils.integrity import integrity_settings, is_signed_model, resign_rows, signature_plan
+
+        if (
+            'data_signature' in kwargs
+            or not is_signed_model(self.model)
+            or signature_plan(self.model).names.isdisjoint(kwargs)
+        ):
+            return super().update(**kwargs)
+
+        with transaction.atomic(using=self.db):
+            # Locked so the rows re-signed below are exactly the rows updated
+            pks = list(self.select_for_update(of=('self',)).values_list('pk', flat=True))
+            if not pks:
+                return 0
+            changed = self.model._base_manager.using(self.db).filter(pk__in=pks)
+            updated = changed.update(**kwargs)
+            resign_rows(changed, batch_size=integrity_settings()['BATCH_SIZE'])
+        return updated
+
+
 class AuditManager(models.Manager):
     """
     Custom manager for models with audit trail functionality
     (Also aliased as AuditTrailManager)
+
+    Rows of signed models changed through this manager's update() are
+    re-signed; code updating through ``_base_manager`` must call
+    apps.core.utils.integrity.resign_rows itself.
     """
+    _queryset_class = AuditQuerySet
+
+    @property
+    def filter_flags(self):
+        return model_filter_flags(self.model)
+
     def create(self, **kwargs):
         """
         Override create to set created_by/created_at if available
@@ -42,11 +117,17 @@ class AuditManager(models.Manager):
         except ImportError:
             user = None
         
+        objs = list(objs)
         for obj in objs:
             if hasattr(obj, 'created_at') and not obj.created_at:
                 obj.created_at = current_time
             if hasattr(obj, 'created_by') and not obj.created_by and user and user.is_authenticated:
                 obj.created_by = user
+        
+        # bulk_create() bypasses save(), so sign the rows here
+        from apps.core.utils.integrity import is_signed_model, sign_objects
+        if is_signed_model(self.model):
+            sign_objects(objs)
                 
         return super().bulk_create(objs, **kwargs)
     
@@ -77,11 +158,9 @@ class SoftDeleteManager(AuditManager):  # Inherit from AuditManager
     """
     def get_queryset(self):
         queryset = super().get_queryset()
-        try:
-            self.model._meta.get_field('is_active')
+        if self.filter_flags[0]:
             return queryset.filter(is_active=True)
-        except Exception:
-            return queryset
+        return queryset
 
     def deleted(self):
         """
@@ -128,17 +207,11 @@ class TenantManager(AuditManager):  # Inherit from AuditManager
     Manager for tenant-aware models with automatic tenant filtering
     """
     def get_queryset(self):
-        # Import inside method to avoid circular imports
-        try:
-            from apps.core.utils.tenant import get_current_tenant
-            current_tenant = get_current_tenant()
-        except ImportError:
-            current_tenant = None
-        
         queryset = super().get_queryset()
-        
-        if current_tenant:
-            return queryset.filter(tenant=current_tenant)
+        if self.filter_flags[1]:
+            current_tenant = _get_current_tenant()
+            if current_tenant:
+                return queryset.filter(tenant=current_tenant)
         return queryset
 
     def for_tenant(self, tenant):
@@ -158,60 +231,34 @@ class TenantSoftDeleteManager(TenantManager, SoftDeleteManager):
     """
     Manager that combines both tenant filtering and soft delete functionality
     """
+    def _filtered(self, **lookups):
+        """
+        Unfiltered queryset narrowed to the current tenant plus ``lookups``,
+        applied in a single filter() call
+        """
+        queryset = super(SoftDeleteManager, self).get_queryset()
+        if self.filter_flags[1]:
+            current_tenant = _get_current_tenant()
+            if current_tenant:
+                lookups['tenant'] = current_tenant
+        return queryset.filter(**lookups) if lookups else queryset
+
     def get_queryset(self):
-        # Import inside method to avoid circular imports
-        try:
-            from apps.core.utils.tenant import get_current_tenant
-            current_tenant = get_current_tenant()
-        except ImportError:
-            current_tenant = None
-        
-        # Use parent class method
-        queryset = super(TenantManager, self).get_queryset()
-        
-        if current_tenant:
-            queryset = queryset.filter(tenant=current_tenant)
-        
-        try:
-            self.model._meta.get_field('is_active')
-            return queryset.filter(is_active=True)
-        except Exception:
-            return queryset
+        if self.filter_flags[0]:
+            return self._filtered(is_active=True)
+        return self._filtered()
 
     def deleted(self):
         """
         Return only deleted records for current tenant
         """
-        # Import inside method to avoid circular imports
-        try:
-            from apps.core.utils.tenant import get_current_tenant
-            current_tenant = get_current_tenant()
-        except ImportError:
-            current_tenant = None
-        
-        queryset = super(TenantManager, self).get_queryset()
-        
-        if current_tenant:
-            queryset = queryset.filter(tenant=current_tenant)
-        
-        return queryset.filter(is_active=False)
+        return self._filtered(is_active=False)
 
     def with_deleted(self):
         """
         Return all records including deleted ones for current tenant
         """
-        # Import inside method to avoid circular imports
-        try:
-            from apps.core.utils.tenant import get_current_tenant
-            current_tenant = get_current_tenant()
-        except ImportError:
-            current_tenant = None
-        
-        queryset = super(TenantManager, self).get_queryset()
-        
-        if current_tenant:
-            return queryset.filter(tenant=current_tenant)
-        return queryset
+        return self._filtered()
 
 
 class GlobalManager(models.Manager):
@@ -230,6 +277,7 @@ class GlobalSoftDeleteManager(SoftDeleteManager):
 
 
 __all__ = [
+    'AuditQuerySet',
     'AuditManager',
     'AuditTrailManager',
     'SoftDeleteManager',
@@ -61,8 +61,8 @@ class SafeAuditMiddleware(MiddlewareMixin):
                     severity = AuditLog.AuditSeverity.WARNING
                     status = 'FAILED'
                 
-                # Safely create audit entry
-                AuditService.create_audit_entry(
+                # Hand the entry to the buffered writer
+                AuditService.enqueue_audit_entry(
                     action=AuditLog.AuditAction.API_CALL,
                     resource_type='API',
                     user=request.user if request.user.is_authenticated else None,
@@ -92,7 +92,7 @@ class SafeAuditMiddleware(MiddlewareMixin):
     def process_exception(self, request, exception):
         """Log exceptions separately"""
         try:
-            AuditService.create_audit_entry(
+            AuditService.enqueue_audit_entry(
                 action=AuditLog.AuditAction.API_CALL,
                 resource_type='API',
                 user=request.user if hasattr(request, 'user') and request.user.is_authenticated else None,
@@ -1,24 +1,72 @@
 # apps/core/middleware/tenant.py
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django_tenants.utils import get_public_schema_name
 import jwt
 
+from apps.core.utils.tenant_cache import tenant_resolution_cache
+
 from apps.core.utils.tenant import (
     set_current_tenant, 
     clear_tenant, 
     get_current_tenant,
     set_current_user,
     clear_user,
-    get_current_user
+    get_current_user,
+    snapshot_context,
+    restore_context,
 )
 from apps.tenants.models import Tenant, Domain
 
 User = get_user_model()
 
 
-class TenantMiddleware(MiddlewareMixin):
+class ContextVarMiddlewareMixin(MiddlewareMixin):
+    """
+    MiddlewareMixin for middleware that sets the current tenant/user.
+
+    Under ASGI, process_request/process_response run in a worker thread.
+    The values process_request sets are re-applied to the request's own
+    context so async views, and the sync_to_async calls they make, see
+    them. On both paths the values from before the request are restored
+    once the response is produced.
+    """
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        outer = snapshot_context()
+        try:
+            return super().__call__(request)
+        finally:
+            restore_context(outer)
+
+    async def __acall__(self, request):
+        outer = snapshot_context()
+        try:
+            response, inner = await sync_to_async(
+                self._process_request_with_context,
+                thread_sensitive=True,
+            )(request)
+            restore_context(inner)
+            response = response or await self.get_response(request)
+            if hasattr(self, 'process_response'):
+                response = await sync_to_async(
+                    self.process_response,
+                    thread_sensitive=True,
+                )(request, response)
+            return response
+        finally:
+            restore_context(outer)
+
+    def _process_request_with_context(self, request):
+        response = self.process_request(request) if hasattr(self, 'process_request') else None
+        return response, snapshot_context()
+
+
+class TenantMiddleware(ContextVarMiddlewareMixin):
     """
     Comprehensive middleware to set tenant context for each request
     """
@@ -41,7 +89,7 @@ class TenantMiddleware(MiddlewareMixin):
         tenant = self.get_tenant_from_request(request)
         
         if tenant:
-            # Set tenant in thread-local storage
+            # Set tenant for this request's context
             set_current_tenant(tenant)
             
             # Attach tenant to request object
@@ -56,7 +104,7 @@ class TenantMiddleware(MiddlewareMixin):
             if hasattr(request, 'session'):
                 request.session.pop('tenant_id', None)
         
-        # Set current user in thread-local storage if user is authenticated
+        # Set current user for this request's context if user is authenticated
         if hasattr(request, 'user') and request.user.is_authenticated:
             set_current_user(request.user)
 
@@ -82,6 +130,13 @@ class TenantMiddleware(MiddlewareMixin):
         clear_tenant()
         clear_user()
 
+    @staticmethod
+    def cache_stats():
+        """
+        Hit/miss counters of the tenant resolution cache for this process
+        """
+        return tenant_resolution_cache.stats()
+
     def get_tenant_from_request(self, request):
         """
         Extract tenant from request using multiple strategies
@@ -89,10 +144,15 @@ class TenantMiddleware(MiddlewareMixin):
         # Strategy 1: Direct session/header override (for debugging/API)
         tenant_id = self._get_tenant_from_debug_header(request)
         if tenant_id:
-            try:
-                return Tenant.objects.get(id=tenant_id, is_active=True)
-            except (Tenant.DoesNotExist, ValueError):
-                pass
+            tenant = self._lookup_tenant_by_id(tenant_id)
+            if tenant:
+                return tenant
+
+        # Reuse the tenant django-tenants' TenantMainMiddleware already
+        # resolved from the hostname, instead of querying for it again
+        tenant = self._get_tenant_from_main_middleware(request)
+        if tenant:
+            return tenant
 
         # Strategy 2: Subdomain-based tenant identification (primary method)
         tenant = self._get_tenant_from_subdomain(request)
@@ -122,6 +182,67 @@ class TenantMiddleware(MiddlewareMixin):
         # No tenant found - will use public schema
         return None
 
+    def _get_tenant_from_main_middleware(self, request):
+        """
+        Get the tenant set on the request by TenantMainMiddleware, if it is
+        a real (non-public) and active tenant
+        """
+        tenant = getattr(request, 'tenant', None)
+        if not isinstance(tenant, Tenant):
+            return None
+        if tenant.schema_name == get_public_schema_name():
+            return None
+        if not tenant.is_active:
+            return None
+        return tenant
+
+    # ---------------- cached lookups ----------------
+
+    def _lookup_tenant_by_id(self, tenant_id):
+        """
+        Resolve an active tenant by primary key through the resolution cache
+        """
+        def load():
+            try:
+                return Tenant.objects.filter(id=tenant_id, is_active=True).first()
+            except (ValueError, ValidationError):
+                return None
+
+        return tenant_resolution_cache.resolve('id', tenant_id, load)
+
+    def _lookup_tenant_by_slug(self, slug):
+        """
+        Resolve an active tenant by slug through the resolution cache
+        """
+        def load():
+            try:
+                return Tenant.objects.get(slug=slug, is_active=True)
+            except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
+                return None
+
+        return tenant_resolution_cache.resolve('slug', slug, load)
+
+    def _lookup_tenant_by_host(self, host, subdomain):
+        """
+        Resolve an active tenant by domain name, falling back to the
+        subdomain as slug, through the resolution cache
+        """
+        def load():
+            try:
+                domain = Domain.objects.select_related('tenant').get(
+                    domain=host,
+                    tenant__is_active=True
+                )
+                return domain.tenant
+            except Domain.DoesNotExist:
+                pass
+            try:
+                return Tenant.objects.get(slug=subdomain, is_active=True)
+            except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
+                return None
+
+        return tenant_resolution_cache.resolve('host', host, load)
+
     def _get_tenant_from_debug_header(self, request):
         """
         Get tenant from debug header (for development/testing)
@@ -155,23 +276,9 @@ class TenantMiddleware(MiddlewareMixin):
             if subdomain in self.ignored_subdomains:
                 return None
             
-            # Check if this is a valid tenant domain
-            try:
-                # First, try to get by domain name
-                domain = Domain.objects.select_related('tenant').get(
-                    domain=host,
-                    tenant__is_active=True
-                )
-                return domain.tenant
-            except Domain.DoesNotExist:
-                # Fallback to tenant slug/schema name
-                try:
-                    return Tenant.objects.get(
-                        slug=subdomain,
-                        is_active=True
-                    )
-                except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
-                    pass
+            # Check if this is a valid tenant domain, falling back to the
+            # tenant slug/schema name
+            return self._lookup_tenant_by_host(host, subdomain)
         
         return None
 
@@ -184,20 +291,11 @@ class TenantMiddleware(MiddlewareMixin):
             tenant_header = request.headers.get('Tenant-ID')
         
         if tenant_header:
-            try:
-                return Tenant.objects.get(
-                    id=tenant_header,
-                    is_active=True
-                )
-            except (Tenant.DoesNotExist, ValueError):
-                # Try slug if ID doesn't work
-                try:
-                    return Tenant.objects.get(
-                        slug=tenant_header,
-                        is_active=True
-                    )
-                except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
-                    pass
+            # Try slug if ID doesn't work
+            return (
+                self._lookup_tenant_by_id(tenant_header) or
+                self._lookup_tenant_by_slug(tenant_header)
+            )
         
         return None
 
@@ -209,13 +307,9 @@ class TenantMiddleware(MiddlewareMixin):
             # Method 1: Direct user attribute
             tenant_id = getattr(request.user, 'tenant_id', None)
             if tenant_id:
-                try:
-                    return Tenant.objects.get(
-                        id=tenant_id,
-                        is_active=True
-                    )
-                except Tenant.DoesNotExist:
-                    pass
+                tenant = self._lookup_tenant_by_id(tenant_id)
+                if tenant:
+                    return tenant
             
             # Method 2: JWT token in Authorization header
             auth_header = request.headers.get('Authorization', '')
@@ -227,11 +321,8 @@ class TenantMiddleware(MiddlewareMixin):
                     decoded = jwt.decode(token, options={"verify_signature": False})
                     tenant_id = decoded.get('tenant_id')
                     if tenant_id:
-                        return Tenant.objects.get(
-                            id=tenant_id,
-                            is_active=True
-                        )
-                except (jwt.DecodeError, jwt.InvalidTokenError, Tenant.DoesNotExist):
+                        return self._lookup_tenant_by_id(tenant_id)
+                except (jwt.DecodeError, jwt.InvalidTokenError):
                     pass
         
         return None
@@ -243,13 +334,10 @@ class TenantMiddleware(MiddlewareMixin):
         if hasattr(request, 'session'):
             tenant_id = request.session.get('tenant_id')
             if tenant_id:
-                try:
-                    return Tenant.objects.get(
-                        id=tenant_id,
-                        is_active=True
-                    )
-                except (Tenant.DoesNotExist, ValueError):
-                    request.session.pop('tenant_id', None)
+                tenant = self._lookup_tenant_by_id(tenant_id)
+                if tenant:
+                    return tenant
+                request.session.pop('tenant_id', None)
         
         return None
 
@@ -270,18 +358,12 @@ class TenantMiddleware(MiddlewareMixin):
             
             # Check if this looks like a tenant slug
             if tenant_slug and tenant_slug not in ['static', 'media', 'auth', 'login', 'logout']:
-                try:
-                    return Tenant.objects.get(
-                        slug=tenant_slug,
-                        is_active=True
-                    )
-                except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
-                    pass
+                return self._lookup_tenant_by_slug(tenant_slug)
         
         return None
 
 
-class TenantContextMiddleware(MiddlewareMixin):
+class TenantContextMiddleware(ContextVarMiddlewareMixin):
     """
     Additional middleware to ensure tenant context is available
     even if the main tenant middleware fails
@@ -291,14 +373,14 @@ class TenantContextMiddleware(MiddlewareMixin):
         Ensure tenant is always available on request
         """
         if not hasattr(request, 'tenant'):
-            # Try to get tenant from current thread context
+            # Try to get tenant from the current context
             tenant = get_current_tenant()
             if tenant:
                 request.tenant = tenant
             else:
                 request.tenant = None
         
-        # Also ensure user is set in thread-local
+        # Also ensure user is set in the current context
         if hasattr(request, 'user') and request.user.is_authenticated:
             set_current_user(request.user)
     
@@ -313,6 +395,6 @@ class TenantContextMiddleware(MiddlewareMixin):
 # Helper function for context processors
 def get_dynamic_tenant():
     """
-    Get current tenant from thread-local storage
+    Get current tenant of the current context
     """
     return get_current_tenant()
\ No newline at end of file
@@ -0,0 +1,125 @@
+# Converts audit_logs into a table range-partitioned by month on "timestamp".
+#
+# Postgres requires the partition key in every unique constraint, so the
+# primary key becomes (id, timestamp). Django keeps treating "id" as the
+# primary key; foreign keys pointing at audit_logs (AuditAlert.related_logs)
+# lose their database constraint because "id" alone can no longer be unique.
+
+import re
+
+from django.db import migrations
+
+
+PARTITIONS_AHEAD = 3
+
+
+def _month_partitions(cursor, table):
+    """(name, start, end) for every month from the oldest row to now + PARTITIONS_AHEAD"""
+    cursor.execute(f"""
+        SELECT to_char(m, '"{table}_y"YYYY"m"MM'), m, m + interval '1 month'
+        FROM generate_series(
+            date_trunc('month', COALESCE((SELECT min("timestamp") FROM {table}_legacy), now())),
+            date_trunc('month', now()) + interval '{PARTITIONS_AHEAD} months',
+            interval '1 month'
+        ) AS m
+    """)
+    return cursor.fetchall()
+
+
+def _index_definitions(cursor, table):
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = %s "
+        "AND indexdef NOT LIKE 'CREATE UNIQUE INDEX%%'",
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _retarget(definition, table):
+    """Point an index definition from pg_indexes at another table"""
+    return re.sub(r' ON (ONLY )?(\S+\.)?\S+ ', f' ON {table} ', definition, count=1)
+
+
+def partition_audit_logs(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+        cursor.execute(
+            "ALTER TABLE audit_logs_legacy "
+            "RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey"
+        )
+        index_definitions = _index_definitions(cursor, 'audit_logs_legacy')
+
+        cursor.execute("""
+            CREATE TABLE audit_logs (
+                LIKE audit_logs_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+                PRIMARY KEY (id, "timestamp")
+            ) PARTITION BY RANGE ("timestamp")
+        """)
+        cursor.execute("""
+            ALTER TABLE audit_logs
+            ADD CONSTRAINT audit_logs_content_type_id_fk_django_content_type_id
+            FOREIGN KEY (content_type_id) REFERENCES django_content_type (id)
+            DEFERRABLE INITIALLY DEFERRED
+        """)
+
+        for name, start, end in _month_partitions(cursor, 'audit_logs'):
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF audit_logs "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+        cursor.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+        cursor.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_legacy")
+        cursor.execute("DROP TABLE audit_logs_legacy CASCADE")
+
+        for definition in index_definitions:
+            cursor.execute(_retarget(definition, 'audit_logs'))
+
+
+def unpartition_audit_logs(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    with connection.cursor() as cursor:
+        index_definitions = _index_definitions(cursor, 'audit_logs')
+
+        cursor.execute("""
+            CREATE TABLE audit_logs_plain (
+                LIKE audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+            )
+        """)
+        cursor.execute("INSERT INTO audit_logs_plain SELECT * FROM audit_logs")
+        cursor.execute("DROP TABLE audit_logs CASCADE")
+        cursor.execute("ALTER TABLE audit_logs_plain RENAME TO audit_logs")
+        cursor.execute("ALTER TABLE audit_logs ADD PRIMARY KEY (id)")
+        cursor.execute("""
+            ALTER TABLE audit_logs
+            ADD CONSTRAINT audit_logs_content_type_id_fk_django_content_type_id
+            FOREIGN KEY (content_type_id) REFERENCES django_content_type (id)
+            DEFERRABLE INITIALLY DEFERRED
+        """)
+        for definition in index_definitions:
+            cursor.execute(_retarget(
+                definition.replace('CREATE INDEX ', 'CREATE INDEX IF NOT EXISTS ', 1),
+                'audit_logs'
+            ))
+
+
+class Migration(migrations.Migration):
+
+    atomic = True
+
+    dependencies = [
+        ('core', '0002_audit_log_event_timestamp'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_audit_logs, unpartition_audit_logs),
+    ]
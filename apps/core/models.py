@@ -65,11 +65,9 @@ class CryptographicModel(models.Model):
 
     def calculate_signature(self):
         """Calculate SHA-256 signature for data integrity"""
-        import json
-        from django.core import serializers
-        
-        data = serializers.serialize('json', [self])
-        return hashlib.sha256(data.encode()).hexdigest()
+        from apps.core.utils.integrity import compute_signature
+
+        return compute_signature(self)
 
     def verify_integrity(self):
         """Verify data hasn't been tampered with"""
@@ -77,6 +75,16 @@ class CryptographicModel(models.Model):
             return self.data_signature == self.calculate_signature()
         return False
 
+    def save_base(self, *args, update_fields=None, **kwargs):
+        """
+        Sign the row as it is written: after the save() overrides of the
+        other base models (e.g. the tenant set from context) have run
+        """
+        from apps.core.utils.integrity import sign_for_save
+
+        update_fields = sign_for_save(self, update_fields)
+        super().save_base(*args, update_fields=update_fields, **kwargs)
+
 
 class TimeStampedModel(models.Model):
     """
@@ -299,20 +307,25 @@ class TenantAwareModel(models.Model):
                 'Tenant context is required for all tenant-aware models.'
             )
 
-        # Verify tenant exists and is active
-        try:
-            tenant = Tenant.objects.get(id=self.tenant_id)
-            if not tenant.is_active:
-                raise ValidationError(
-                    'Cannot create record for inactive tenant.'
-                )
-        except Tenant.DoesNotExist:
+        # Verify tenant exists and is active. The tenant instance already
+        # attached to the record or to the request is used when it is the
+        # same tenant, so only records saved outside a request query for it.
+        current_tenant = get_current_tenant()
+        tenant = self._state.fields_cache.get('tenant')
+        if tenant is None or tenant.pk != self.tenant_id:
+            tenant = current_tenant if current_tenant and current_tenant.pk == self.tenant_id else None
+        if tenant is None:
+            tenant = Tenant.objects.filter(id=self.tenant_id).first()
+        if tenant is None:
             raise ValidationError(
                 'Referenced tenant does not exist.'
             )
+        if not tenant.is_active:
+            raise ValidationError(
+                'Cannot create record for inactive tenant.'
+            )
 
         # Ensure tenant matches current context (security check)
-        current_tenant = get_current_tenant()
         if current_tenant and self.tenant_id != current_tenant.id:
             raise ValidationError(
                 'Tenant mismatch detected. Potential security violation.'
@@ -338,9 +351,19 @@ class TenantAwareModel(models.Model):
                 self.tenant = current_tenant
 
         # Only run full validation if tenant is set
-        # This allows forms to set tenant before validation
+        # This allows forms to set tenant before validation.
+        # clean() already checks the tenant, and the primary key is a fresh
+        # UUID enforced by the database, so neither field is validated again.
+        # Uniqueness runs separately: full_clean() would skip every per-tenant
+        # unique check because it touches the excluded tenant field.
         if self.tenant_id:
-            self.full_clean()
+            self.full_clean(
+                exclude=['id', 'tenant'],
+                validate_unique=False,
+                validate_constraints=False,
+            )
+            self.validate_unique(exclude=['id'])
+            self.validate_constraints(exclude=['id'])
         
         super().save(*args, **kwargs)
 
@@ -410,11 +433,6 @@ class BaseSharedModel(UUIDModel, CryptographicModel, TimeStampedModel,
     def __str__(self):
         return f"{self.__class__.__name__}[{self.short_id}]"
 
-    def save(self, *args, **kwargs):
-        if not self.data_signature:
-            self.data_signature = self.calculate_signature()
-        super().save(*args, **kwargs)
-
     def audit_log(self, action, user, details=None, severity='INFO'):
         from apps.security.models import AuditLog
         return AuditLog.objects.create(
@@ -447,16 +465,6 @@ class BaseModel(UUIDModel, CryptographicModel, TimeStampedModel,
     def __str__(self):
         return f"{self.__class__.__name__}[{self.short_id}]"
 
-    def save(self, *args, **kwargs):
-        """
-        Enhanced save with integrity protection
-        """
-        # Calculate data integrity signature
-        if not self.data_signature:
-            self.data_signature = self.calculate_signature()
-        
-        super().save(*args, **kwargs)
-
     @classmethod
     def get_secure_queryset(cls, user):
         """
@@ -543,7 +551,9 @@ class AuditLog(models.Model):
     
     # Basic Information
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Stamped when the entry is built rather than when it is written, so
+    # buffered entries keep their event time
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
     
     # User Information (as strings, not foreign keys)
     user_id = models.CharField(max_length=100, null=True, blank=True, db_index=True)
@@ -606,3 +616,35 @@ class AuditLog(models.Model):
     
     def __str__(self):
         return f"{self.timestamp} - {self.user_email or 'System'} - {self.action} - {self.resource_type}"
+
+
+class DocumentSequence(models.Model):
+    """
+    Last number issued per tenant, document kind and prefix (the part of
+    the number before the counter, e.g. "INV-2024-"), maintained by
+    apps.core.utils.sequences
+    """
+    tenant = models.ForeignKey(
+        'tenants.Tenant',
+        on_delete=models.CASCADE,
+        related_name='document_sequences',
+        verbose_name='Owning Tenant'
+    )
+    kind = models.CharField(max_length=40, verbose_name=_("Document Kind"))
+    prefix = models.CharField(max_length=100, verbose_name=_("Prefix"))
+    last_value = models.BigIntegerField(default=0, verbose_name=_("Last Value"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
+
+    class Meta:
+        db_table = 'document_sequences'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant', 'kind', 'prefix'],
+                name='unique_document_sequence'
+            ),
+        ]
+        verbose_name = _("Document Sequence")
+        verbose_name_plural = _("Document Sequences")
+
+    def __str__(self):
+        return f"{self.kind} {self.prefix}{self.last_value}"
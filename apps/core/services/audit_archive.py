@@ -0,0 +1,350 @@
+# apps/core/services/audit_archive.py
+import gzip
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta, date, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.core.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_ARCHIVE_SETTINGS = {
+    'RETENTION_DAYS': 365,
+    'PARTITIONS_AHEAD': 3,
+    'ARCHIVE_DIR': None,  # defaults to BASE_DIR / 'archives' / 'audit_logs'
+    'ARCHIVE_CHUNK_SIZE': 5000,
+}
+
+TABLE = AuditLog._meta.db_table
+
+
+def _audit_settings():
+    config = dict(DEFAULT_ARCHIVE_SETTINGS)
+    config.update({
+        key: value for key, value in getattr(settings, 'AUDIT_LOG_SETTINGS', {}).items()
+        if key in DEFAULT_ARCHIVE_SETTINGS
+    })
+    if not config['ARCHIVE_DIR']:
+        config['ARCHIVE_DIR'] = Path(settings.BASE_DIR) / 'archives' / 'audit_logs'
+    return config
+
+
+def month_start(value) -> date:
+    """First day of the month containing ``value``"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + value.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _aware(value: date) -> datetime:
+    return datetime(value.year, value.month, value.day, tzinfo=dt_timezone.utc)
+
+
+class AuditPartitionManager:
+    """
+    Maintains the monthly range partitions of audit_logs (see core migration
+    0003): creates upcoming months, and archives then drops months that
+    every tenant's retention window has passed.
+
+    Tenants with a shorter retention than the oldest live month have their
+    expired rows archived to per-tenant files and deleted in place.
+    """
+
+    def __init__(self, stdout=None, dry_run=False):
+        self.config = _audit_settings()
+        self.archive = AuditArchive(self.config['ARCHIVE_DIR'])
+        self.stdout = stdout
+        self.dry_run = dry_run
+
+    @property
+    def is_supported(self):
+        return connection.vendor == 'postgresql'
+
+    @staticmethod
+    def partition_name(month: date) -> str:
+        return f"{TABLE}_y{month.year:04d}m{month.month:02d}"
+
+    def _log(self, message):
+        logger.info(message)
+        if self.stdout:
+            self.stdout.write(message)
+
+    # ---------------- partitions ----------------
+
+    def list_partitions(self) -> List[str]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+                "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+                "JOIN pg_namespace ns ON parent.relnamespace = ns.oid "
+                "WHERE parent.relname = %s AND ns.nspname = current_schema() "
+                "ORDER BY child.relname",
+                [TABLE],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def live_months(self) -> List[date]:
+        prefix = f"{TABLE}_y"
+        months = []
+        for name in self.list_partitions():
+            if not name.startswith(prefix):
+                continue
+            try:
+                year, month = name[len(prefix):].split('m')
+                months.append(date(int(year), int(month), 1))
+            except ValueError:
+                continue
+        return sorted(months)
+
+    def ensure_partitions(self, months_ahead: Optional[int] = None) -> List[str]:
+        """Create partitions from the current month to ``months_ahead`` ahead"""
+        if months_ahead is None:
+            months_ahead = self.config['PARTITIONS_AHEAD']
+        existing = set(self.list_partitions())
+        current = month_start(timezone.now())
+        created = []
+
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            name = self.partition_name(month)
+            if name in existing:
+                continue
+            self._log(f"Creating partition {name}")
+            if not self.dry_run:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} "
+                        f"FOR VALUES FROM (%s) TO (%s)",
+                        [_aware(month), _aware(add_months(month, 1))],
+                    )
+            created.append(name)
+        return created
+
+    # ---------------- retention ----------------
+
+    def tenant_retention_days(self) -> Dict[str, int]:
+        """Retention window per tenant id, from TenantConfiguration"""
+        from apps.tenants.models import TenantConfiguration
+
+        default = self.config['RETENTION_DAYS']
+        retention = {}
+        for tenant_id, days in TenantConfiguration.objects.values_list(
+            'tenant_id', 'audit_retention_days'
+        ):
+            retention[str(tenant_id)] = days or default
+        return retention
+
+    def apply_retention(self) -> Dict[str, int]:
+        """
+        Archive and drop whole months older than the longest retention
+        window, then archive and delete expired rows of tenants with a
+        shorter window. Returns counts of affected partitions and rows.
+        """
+        now = timezone.now()
+        retention = self.tenant_retention_days()
+        longest = max(retention.values(), default=self.config['RETENTION_DAYS'])
+        longest = max(longest, self.config['RETENTION_DAYS'])
+        cutoff_month = month_start(now - timedelta(days=longest))
+
+        result = {'partitions_archived': 0, 'rows_archived': 0}
+
+        for month in self.live_months():
+            if add_months(month, 1) > cutoff_month:
+                break
+            result['rows_archived'] += self.archive_partition(month)
+            result['partitions_archived'] += 1
+
+        for tenant_id, days in retention.items():
+            if days >= longest:
+                continue
+            result['rows_archived'] += self.archive_tenant_rows(
+                tenant_id, before=now - timedelta(days=days)
+            )
+
+        return result
+
+    def archive_partition(self, month: date) -> int:
+        """Stream a month to the archive, then detach and drop its partition"""
+        name = self.partition_name(month)
+        queryset = AuditLog.objects.filter(
+            timestamp__gte=_aware(month),
+            timestamp__lt=_aware(add_months(month, 1)),
+        )
+        self._log(f"Archiving partition {name}")
+        if self.dry_run:
+            return queryset.count()
+
+        count = self.archive.write(month, 'all', queryset, self.config['ARCHIVE_CHUNK_SIZE'])
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+            cursor.execute(f"DROP TABLE {name}")
+        self._log(f"Archived {count} rows and dropped {name}")
+        return count
+
+    def archive_tenant_rows(self, tenant_id: str, before: datetime) -> int:
+        """Archive and delete one tenant's rows older than ``before``, month by month"""
+        total = 0
+        for month in self.live_months():
+            start = _aware(month)
+            if start >= before:
+                break
+            end = min(_aware(add_months(month, 1)), before)
+            queryset = AuditLog.objects.filter(
+                tenant_id=tenant_id, timestamp__gte=start, timestamp__lt=end
+            )
+            if self.dry_run:
+                total += queryset.count()
+                continue
+            count = self.archive.write(
+                month, f'tenant-{tenant_id}', queryset, self.config['ARCHIVE_CHUNK_SIZE']
+            )
+            if count:
+                # Plain DELETE: the ORM collector would follow AuditAlert's
+                # M2M into tenant schemas that are not on the search path
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'DELETE FROM {TABLE} WHERE tenant_id = %s '
+                        f'AND "timestamp" >= %s AND "timestamp" < %s',
+                        [tenant_id, start, end],
+                    )
+                self._log(f"Archived {count} rows of tenant {tenant_id} for {month:%Y-%m}")
+            total += count
+        return total
+
+
+class AuditArchive:
+    """
+    Archived audit log months on local disk.
+
+    Layout: ``<root>/<YYYY-MM>/<label>.jsonl.gz`` with a ``<label>.manifest.json``
+    next to each file. ``all`` holds a whole detached partition, ``tenant-<id>``
+    rows removed early under a tenant's shorter retention.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root or _audit_settings()['ARCHIVE_DIR'])
+
+    def month_dir(self, month: date) -> Path:
+        return self.root / f"{month:%Y-%m}"
+
+    def write(self, month: date, label: str, queryset, chunk_size: int = 5000) -> int:
+        """Stream ``queryset`` into a gzip'd JSONL file; returns the row count"""
+        directory = self.month_dir(month)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{label}.jsonl.gz"
+        if path.exists():
+            # Never overwrite an archive; append a new segment instead
+            segment = 1
+            while (directory / f"{label}.{segment}.jsonl.gz").exists():
+                segment += 1
+            path = directory / f"{label}.{segment}.jsonl.gz"
+
+        fields = [field.attname for field in AuditLog._meta.concrete_fields]
+        digest = hashlib.sha256()
+        count = 0
+        first = last = None
+
+        with gzip.open(path, 'wt', encoding='utf-8') as handle:
+            for row in queryset.order_by().values(*fields).iterator(chunk_size=chunk_size):
+                line = json.dumps(row, cls=DjangoJSONEncoder, separators=(',', ':'))
+                handle.write(line + '\n')
+                digest.update(line.encode())
+                count += 1
+                timestamp = row['timestamp']
+                first = timestamp if first is None or timestamp < first else first
+                last = timestamp if last is None or timestamp > last else last
+
+        if not count:
+            path.unlink()
+            return 0
+
+        manifest = {
+            'file': path.name,
+            'month': f"{month:%Y-%m}",
+            'label': label,
+            'rows': count,
+            'first_timestamp': first.isoformat(),
+            'last_timestamp': last.isoformat(),
+            'sha256': digest.hexdigest(),
+            'fields': fields,
+            'archived_at': timezone.now().isoformat(),
+        }
+        manifest_path = path.with_name(path.name.replace('.jsonl.gz', '.manifest.json'))
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+        return count
+
+    def archived_months(self) -> List[date]:
+        if not self.root.exists():
+            return []
+        months = []
+        for directory in self.root.iterdir():
+            try:
+                months.append(datetime.strptime(directory.name, '%Y-%m').date())
+            except ValueError:
+                continue
+        return sorted(months)
+
+    def iter_records(self, start: datetime, end: datetime,
+                     tenant_id: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yield archived rows with ``start <= timestamp < end`` as dicts,
+        optionally restricted to one tenant. Only the months overlapping the
+        range are opened.
+        """
+        tenant_id = str(tenant_id) if tenant_id else None
+        first_month, last_month = month_start(start), month_start(end)
+
+        for month in self.archived_months():
+            if month < first_month or month > last_month:
+                continue
+            for path in sorted(self.month_dir(month).glob('*.jsonl.gz')):
+                label = path.name.split('.', 1)[0]
+                if tenant_id and label.startswith('tenant-') and label != f'tenant-{tenant_id}':
+                    continue
+                with gzip.open(path, 'rt', encoding='utf-8') as handle:
+                    for line in handle:
+                        row = json.loads(line)
+                        if tenant_id and row.get('tenant_id') != tenant_id:
+                            continue
+                        # DjangoJSONEncoder writes UTC as 'Z', which fromisoformat() rejects before 3.11
+                        timestamp = parse_datetime(row['timestamp'])
+                        if start <= timestamp < end:
+                            row['timestamp'] = timestamp
+                            yield row
+
+    def oldest_live_boundary(self, tenant_id: Optional[str] = None) -> Optional[datetime]:
+        """
+        End of the newest archived month: ranges starting before this need
+        the archive, ranges after it are fully served by the live table.
+
+        With ``tenant_id`` only whole-partition archives and that tenant's
+        own files count, so another tenant's shorter retention does not push
+        this tenant's recent ranges onto the archive.
+        """
+        months = self.archived_months()
+        if tenant_id:
+            own_label = f'tenant-{tenant_id}'
+            months = [
+                month for month in months
+                if any(
+                    path.name.split('.', 1)[0] in ('all', own_label)
+                    for path in self.month_dir(month).glob('*.jsonl.gz')
+                )
+            ]
+        if not months:
+            return None
+        return _aware(add_months(months[-1], 1))
@@ -0,0 +1,294 @@
+# apps/core/services/audit_buffer.py
+import os
+import queue
+import socket
+import threading
+import time
+import atexit
+import logging
+from typing import Dict, Any, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction, close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_AUDIT_BUFFER_SETTINGS = {
+    # 'buffered' enqueues entries for the background flusher,
+    # 'sync' writes them inline (tests, management commands)
+    'WRITE_MODE': 'buffered',
+    'BUFFER_MAX_SIZE': 10000,
+    'FLUSH_BATCH_SIZE': 500,
+    'FLUSH_INTERVAL_SECONDS': 2.0,
+    # What to do when the buffer is full:
+    #   'spill' - write the entry synchronously on the caller (backpressure)
+    #   'drop'  - discard the entry and count it
+    #   'block' - wait up to BLOCK_TIMEOUT_SECONDS for room, then drop
+    'OVERFLOW_POLICY': 'spill',
+    'BLOCK_TIMEOUT_SECONDS': 0.05,
+    'METRICS_CACHE_TIMEOUT': 60,
+}
+
+
+class AuditBuffer:
+    """
+    Bounded in-process queue of audit records drained by a background thread
+    with AuditLog.objects.bulk_create.
+
+    Records are the plain field dicts built by AuditService.build_audit_record,
+    so nothing on the request path touches the database.
+    """
+
+    def __init__(self, config=None):
+        self._config_override = config
+        self._config = None
+        self._lock = threading.Lock()
+        self._queue = None
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._metrics = self._empty_metrics()
+
+    # ---------------- configuration ----------------
+
+    @property
+    def config(self):
+        if self._config is None:
+            config = dict(DEFAULT_AUDIT_BUFFER_SETTINGS)
+            if self._config_override is not None:
+                config.update(self._config_override)
+            else:
+                audit_settings = getattr(settings, 'AUDIT_LOG_SETTINGS', {})
+                config.update({
+                    key: value for key, value in audit_settings.items()
+                    if key in DEFAULT_AUDIT_BUFFER_SETTINGS
+                })
+            self._config = config
+        return self._config
+
+    @property
+    def is_buffered(self):
+        return self.config['WRITE_MODE'] == 'buffered'
+
+    # ---------------- public API ----------------
+
+    def enqueue(self, record: Dict[str, Any]) -> bool:
+        """
+        Queue an audit record for the background flusher.
+        Returns False if the record was dropped.
+        """
+        if not self.is_buffered:
+            self._incr('enqueued')
+            return self._write_batch([record]) == 1
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            return self._handle_overflow(record)
+
+        self._incr('enqueued')
+        if self._queue.qsize() >= self.config['FLUSH_BATCH_SIZE']:
+            self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """Synchronously drain everything currently queued"""
+        if self._queue is None:
+            return 0
+        written = 0
+        while True:
+            batch = self._drain(self.config['FLUSH_BATCH_SIZE'])
+            if not batch:
+                break
+            written += self._flush_batch(batch)
+        return written
+
+    def metrics(self) -> Dict[str, Any]:
+        """Process-local counters, queue depth and flush latency"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics['queue_depth'] = self._queue.qsize() if self._queue is not None else 0
+        metrics['queue_capacity'] = self.config['BUFFER_MAX_SIZE']
+        metrics['avg_flush_ms'] = (
+            metrics['total_flush_ms'] / metrics['flushes'] if metrics['flushes'] else 0.0
+        )
+        metrics['write_mode'] = self.config['WRITE_MODE']
+        metrics['pid'] = os.getpid()
+        return metrics
+
+    def reset_metrics(self):
+        with self._lock:
+            self._metrics = self._empty_metrics()
+
+    # ---------------- flusher thread ----------------
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == pid and self._thread.is_alive():
+                return
+            # First use, or we are in a freshly forked worker: the parent's
+            # queue and thread are not usable here
+            if self._pid != pid:
+                self._queue = queue.Queue(maxsize=self.config['BUFFER_MAX_SIZE'])
+                self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name='audit-buffer-flusher', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        interval = self.config['FLUSH_INTERVAL_SECONDS']
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Audit buffer flush failed: {e}", exc_info=True)
+            finally:
+                close_old_connections()
+
+    def _drain(self, limit) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush_batch(self, batch) -> int:
+        started = time.perf_counter()
+        written = self._write_batch(batch, switch_to_public=True)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._metrics['flushes'] += 1
+            self._metrics['last_flush_ms'] = elapsed_ms
+            self._metrics['max_flush_ms'] = max(self._metrics['max_flush_ms'], elapsed_ms)
+            self._metrics['total_flush_ms'] += elapsed_ms
+            self._metrics['last_flush_size'] = len(batch)
+            self._metrics['last_flush_at'] = time.time()
+        self._publish_metrics()
+        return written
+
+    # ---------------- writing ----------------
+
+    def _write_batch(self, batch, switch_to_public=False) -> int:
+        """
+        Bulk insert a batch of records; returns the number written.
+        Only the flusher thread owns its connection, so only it may switch
+        the schema; inline writes run on the request's connection.
+        """
+        from apps.core.models import AuditLog
+
+        try:
+            # audit_logs lives in the public schema
+            if switch_to_public and hasattr(connection, 'set_schema_to_public'):
+                connection.set_schema_to_public()
+
+            entries = [AuditLog(**self._to_model_fields(record)) for record in batch]
+            with transaction.atomic():
+                AuditLog.objects.bulk_create(
+                    entries, batch_size=self.config['FLUSH_BATCH_SIZE']
+                )
+        except Exception as e:
+            logger.error(
+                f"Failed to write {len(batch)} buffered audit entries: {e}",
+                exc_info=True
+            )
+            self._incr('failed', len(batch))
+            return 0
+
+        self._incr('written', len(batch))
+        self._notify_written(batch)
+        return len(batch)
+
+    @staticmethod
+    def _notify_written(batch):
+        from apps.core.models import AuditLog
+        from apps.core.signals import audit_entries_written
+
+        for receiver, response in audit_entries_written.send_robust(sender=AuditLog, records=batch):
+            if isinstance(response, Exception):
+                logger.error(f"audit_entries_written receiver {receiver} failed: {response}")
+
+    @staticmethod
+    def _to_model_fields(record):
+        from django.contrib.contenttypes.models import ContentType
+
+        fields = dict(record)
+        natural_key = fields.pop('content_type_key', None)
+        if natural_key:
+            try:
+                fields['content_type'] = ContentType.objects.get_by_natural_key(*natural_key)
+            except ContentType.DoesNotExist:
+                fields.pop('object_uuid', None)
+        return fields
+
+    def _handle_overflow(self, record) -> bool:
+        policy = self.config['OVERFLOW_POLICY']
+        if policy == 'spill':
+            self._incr('spilled')
+            return self._write_batch([record]) == 1
+        if policy == 'block':
+            try:
+                self._queue.put(record, timeout=self.config['BLOCK_TIMEOUT_SECONDS'])
+                self._incr('enqueued')
+                return True
+            except queue.Full:
+                pass
+        self._incr('dropped')
+        logger.warning("Audit buffer full, dropping audit entry")
+        return False
+
+    # ---------------- metrics ----------------
+
+    @staticmethod
+    def _empty_metrics():
+        return {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'spilled': 0,
+            'failed': 0,
+            'flushes': 0,
+            'last_flush_size': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+            'last_flush_at': None,
+        }
+
+    def _incr(self, counter, amount=1):
+        with self._lock:
+            self._metrics[counter] += amount
+
+    def metrics_cache_key(self):
+        return f"audit_buffer:metrics:{socket.gethostname()}:{os.getpid()}"
+
+    def _publish_metrics(self):
+        """Expose this process' metrics to monitoring through the shared cache"""
+        try:
+            cache.set(
+                self.metrics_cache_key(), self.metrics(),
+                self.config['METRICS_CACHE_TIMEOUT']
+            )
+        except Exception:
+            pass
+
+
+audit_buffer = AuditBuffer()
+
+
+@atexit.register
+def _flush_audit_buffer_on_exit():
+    try:
+        audit_buffer.flush()
+    except Exception:
+        pass
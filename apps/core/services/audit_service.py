@@ -67,8 +67,14 @@ class AuditService:
             }
     
     @classmethod
-    def get_tenant_info(cls, tenant_id: Optional[str] = None) -> Dict[str, Any]:
+    def get_tenant_info(cls, tenant_id: Optional[str] = None, tenant=None) -> Dict[str, Any]:
         """Get tenant information matching AuditLog model fields"""
+        if tenant is not None and (not tenant_id or str(tenant.id) == str(tenant_id)):
+            return {
+                'tenant_id': str(tenant.id),
+                'tenant_name': (getattr(tenant, 'name', None) or '')[:200] or None
+            }
+        
         if not tenant_id:
             return {'tenant_id': None, 'tenant_name': None}
         
@@ -88,7 +94,7 @@ class AuditService:
         }
     
     @classmethod
-    def create_audit_entry(
+    def build_audit_record(
         cls,
         action: str,
         resource_type: str,
@@ -107,113 +113,152 @@ class AuditService:
         duration_ms: Optional[float] = None,
         extra_data: Optional[Dict] = None,
         **kwargs
-    ) -> Optional[AuditLog]:
+    ) -> Dict[str, Any]:
         """
-        Create an audit log entry - UPDATED to match AuditLog model fields exactly
+        Build the AuditLog field values for an entry without touching the
+        database (apart from a tenant lookup when only tenant_id is known).
+        The content type is carried as a natural key under 'content_type_key'.
         """
-        try:
-            # Generate unique request ID if not provided
-            request_id = getattr(request, 'request_id', None) or str(uuid.uuid4())[:32]
+        # Generate unique request ID if not provided
+        request_id = getattr(request, 'request_id', None) or str(uuid.uuid4())[:32]
+        
+        # Get session ID
+        session_id = None
+        if request and hasattr(request, 'session'):
+            session_id = request.session.session_key
+        
+        # Get user information (matching model field names)
+        user_info = cls.get_user_info(user)
+        
+        # Get tenant information (matching model field names), reusing the
+        # tenant already resolved for the request when possible
+        tenant = kwargs.get('tenant') or getattr(request, 'tenant', None)
+        tenant_info = cls.get_tenant_info(tenant_id, tenant=tenant)
+        
+        # Prepare request information
+        request_path = None
+        request_method = None
+        user_ip = None
+        user_agent = None
+        
+        if request:
+            request_path = request.path[:500]  # Match model max_length
+            request_method = request.method[:10]  # Match model max_length
+            user_ip = cls.get_client_ip(request)
+            user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]  # Match model max_length
+        
+        # Get resource information from instance
+        if instance and not resource_id:
+            resource_id = str(getattr(instance, 'id', ''))[:100]  # Match model max_length
+        
+        if instance and not resource_name:
+            resource_name = str(instance)[:500]  # Match model max_length
+        
+        # Calculate changes if not provided
+        if changes is None and previous_state and new_state:
+            changes = cls._calculate_changes(previous_state, new_state)
+        
+        # Prepare audit data - EXACTLY matching AuditLog model fields
+        audit_data = {
+            'timestamp': timezone.now(),
             
-            # Get session ID
-            session_id = None
-            if request and hasattr(request, 'session'):
-                session_id = request.session.session_key
+            # User information - EXACT model field names
+            'user_id': user_info['user_id'],
+            'user_email': user_info['user_email'],
+            'user_display_name': user_info['user_display_name'],
             
-            # Get user information (matching model field names)
-            user_info = cls.get_user_info(user)
+            # Action information - EXACT model field names
+            'action': action,
+            'severity': severity,
+            'status': status,
             
-            # Get tenant information (matching model field names)
-            tenant_info = cls.get_tenant_info(tenant_id)
+            # Resource information - EXACT model field names
+            'resource_type': resource_type,
+            'resource_id': resource_id,
+            'resource_name': resource_name,
             
-            # Prepare request information
-            request_path = None
-            request_method = None
-            user_ip = None
-            user_agent = None
+            # State changes - EXACT model field names
+            'changes': changes,
+            'previous_state': previous_state,
+            'new_state': new_state,
             
-            if request:
-                request_path = request.path[:500]  # Match model max_length
-                request_method = request.method[:10]  # Match model max_length
-                user_ip = cls.get_client_ip(request)
-                user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]  # Match model max_length
+            # Request information - EXACT model field names
+            'request_id': request_id,
+            'session_id': session_id,
+            'user_ip': user_ip,
+            'user_agent': user_agent,
+            'request_method': request_method,
+            'request_path': request_path,
             
-            # Get resource information from instance
-            if instance and not resource_id:
-                resource_id = str(getattr(instance, 'id', ''))[:100]  # Match model max_length
+            # Error information - EXACT model field names
+            'error_message': error_message,
             
-            if instance and not resource_name:
-                resource_name = str(instance)[:500]  # Match model max_length
+            # Tenant information - EXACT model field names
+            'tenant_id': tenant_info['tenant_id'],
+            'tenant_name': tenant_info['tenant_name'],
             
-            # Calculate changes if not provided
-            if changes is None and previous_state and new_state:
-                changes = cls._calculate_changes(previous_state, new_state)
+            # Performance - EXACT model field names
+            'duration_ms': duration_ms,
             
-            # Prepare audit data - EXACTLY matching AuditLog model fields
-            audit_data = {
-                # User information - EXACT model field names
-                'user_id': user_info['user_id'],
-                'user_email': user_info['user_email'],
-                'user_display_name': user_info['user_display_name'],
-                
-                # Action information - EXACT model field names
-                'action': action,
-                'severity': severity,
-                'status': status,
-                
-                # Resource information - EXACT model field names
-                'resource_type': resource_type,
-                'resource_id': resource_id,
-                'resource_name': resource_name,
-                
-                # State changes - EXACT model field names
-                'changes': changes,
-                'previous_state': previous_state,
-                'new_state': new_state,
-                
-                # Request information - EXACT model field names
-                'request_id': request_id,
-                'session_id': session_id,
-                'user_ip': user_ip,
-                'user_agent': user_agent,
-                'request_method': request_method,
-                'request_path': request_path,
-                
-                # Error information - EXACT model field names
-                'error_message': error_message,
-                
-                # Tenant information - EXACT model field names
-                'tenant_id': tenant_info['tenant_id'],
-                'tenant_name': tenant_info['tenant_name'],
-                
-                # Performance - EXACT model field names
-                'duration_ms': duration_ms,
-                
-                # Extra data - EXACT model field names
-                'extra_data': extra_data or {},
-            }
-            
-            # Add stack trace if there's an error
-            if error_message:
-                audit_data['stack_trace'] = traceback.format_exc()[:10000]  # Limit length
+            # Extra data - EXACT model field names
+            'extra_data': extra_data or {},
+        }
+        
+        # Add stack trace if there's an error
+        if error_message:
+            audit_data['stack_trace'] = traceback.format_exc()[:10000]  # Limit length
+        
+        # Link to content object if available (resolved when written, so the
+        # entry needs no follow-up UPDATE)
+        if instance is not None and hasattr(instance, '_meta'):
+            audit_data['content_type_key'] = (
+                instance._meta.app_label, instance._meta.model_name
+            )
+            object_uuid = getattr(instance, 'id', None)
+            audit_data['object_uuid'] = str(object_uuid)[:100] if object_uuid else None
+        
+        # Remove None values (except for fields that can legitimately be None)
+        return {k: v for k, v in audit_data.items() if v is not None}
+    
+    @classmethod
+    def create_audit_entry(
+        cls,
+        action: str,
+        resource_type: str,
+        user=None,
+        request: Optional[HttpRequest] = None,
+        instance=None,
+        **kwargs
+    ) -> Optional[AuditLog]:
+        """
+        Create an audit log entry synchronously - UPDATED to match AuditLog model fields exactly
+        """
+        try:
+            audit_data = cls.build_audit_record(
+                action=action,
+                resource_type=resource_type,
+                user=user,
+                request=request,
+                instance=instance,
+                **kwargs
+            )
             
-            # Remove None values (except for fields that can legitimately be None)
-            audit_data = {k: v for k, v in audit_data.items() if v is not None}
+            natural_key = audit_data.pop('content_type_key', None)
+            if natural_key:
+                try:
+                    audit_data['content_type'] = ContentType.objects.get_for_model(instance.__class__)
+                except Exception:
+                    # Silently fail - optional feature
+                    audit_data.pop('object_uuid', None)
             
             # Create the audit entry
             with transaction.atomic():
                 audit_entry = AuditLog.objects.create(**audit_data)
-                
-                # Link to content object if available
-                if instance and hasattr(instance, '_meta'):
-                    try:
-                        content_type = ContentType.objects.get_for_model(instance.__class__)
-                        audit_entry.content_type = content_type
-                        audit_entry.object_uuid = getattr(instance, 'id', None)
-                        audit_entry.save(update_fields=['content_type', 'object_uuid'])
-                    except Exception:
-                        # Silently fail - optional feature
-                        pass
+            
+            # Imported here: apps.core.signals imports apps.core.utils, whose
+            # package init imports this module
+            from apps.core.signals import audit_entries_written
+            audit_entries_written.send_robust(sender=AuditLog, records=[audit_data])
             
             # Log success in development
             if settings.DEBUG:
@@ -222,30 +267,63 @@ class AuditService:
             return audit_entry
             
         except Exception as e:
-            # Comprehensive error handling
-            error_details = {
-                'error': str(e),
-                'action': action,
-                'resource_type': resource_type,
-                'user_email': getattr(user, 'email', None) if user else None,
-            }
-            
-            # Log to appropriate logger
-            import logging
-            logger = logging.getLogger('audit_service')
-            logger.error(
-                f"Failed to create audit entry: {error_details}",
-                exc_info=True,
-                extra=error_details
-            )
-            
-            # Development logging
-            if settings.DEBUG:
-                print(f"[AUDIT ERROR] Failed to create audit entry: {error_details}")
-                traceback.print_exc()
-            
+            cls._log_failure(e, action, resource_type, user)
             return None
     
+    @classmethod
+    def enqueue_audit_entry(
+        cls,
+        action: str,
+        resource_type: str,
+        user=None,
+        request: Optional[HttpRequest] = None,
+        **kwargs
+    ) -> bool:
+        """
+        Hand an audit entry to the buffered writer instead of inserting it on
+        the request path. Takes the same arguments as create_audit_entry.
+        Returns False if the entry could not be queued.
+        """
+        from apps.core.services.audit_buffer import audit_buffer
+        
+        try:
+            audit_data = cls.build_audit_record(
+                action=action,
+                resource_type=resource_type,
+                user=user,
+                request=request,
+                **kwargs
+            )
+            return audit_buffer.enqueue(audit_data)
+        except Exception as e:
+            cls._log_failure(e, action, resource_type, user)
+            return False
+    
+    @classmethod
+    def _log_failure(cls, exc, action, resource_type, user):
+        """Report an audit entry that could not be created"""
+        # Comprehensive error handling
+        error_details = {
+            'error': str(exc),
+            'action': action,
+            'resource_type': resource_type,
+            'user_email': getattr(user, 'email', None) if user else None,
+        }
+        
+        # Log to appropriate logger
+        import logging
+        logger = logging.getLogger('audit_service')
+        logger.error(
+            f"Failed to create audit entry: {error_details}",
+            exc_info=True,
+            extra=error_details
+        )
+        
+        # Development logging
+        if settings.DEBUG:
+            print(f"[AUDIT ERROR] Failed to create audit entry: {error_details}")
+            traceback.print_exc()
+    
     @classmethod
     def _calculate_changes(cls, old_state: Dict, new_state: Dict) -> Optional[Dict]:
         """Calculate changes between two states"""
@@ -21,6 +21,7 @@ from apps.communications.models import (
     Communication, CommunicationChannel, CommunicationTemplate,
     Notification, CommunicationPreference, Message, MessageRecipient
 )
+from apps.communications.utils.inbox import inbox_service
 from apps.students.models import Student
 from apps.academics.models import AcademicYear, SchoolClass, Section
 
@@ -1178,26 +1179,23 @@ class NotificationService:
     @staticmethod
     def mark_all_as_read(user: User) -> int:
         """Mark all notifications as read for user"""
-        updated = Notification.objects.filter(
-            recipient=user,
-            is_read=False
-        ).update(
-            is_read=True,
-            read_at=timezone.now()
-        )
+        with transaction.atomic():
+            updated = Notification.objects.filter(
+                recipient=user,
+                is_read=False
+            ).update(
+                is_read=True,
+                read_at=timezone.now()
+            )
+            # Queryset updates bypass the inbox signals
+            inbox_service.clear_notifications(user.pk)
         return updated
     
     @staticmethod
     def get_notification_stats(user: User) -> Dict:
         """Get notification statistics for user"""
         total = Notification.objects.filter(recipient=user).count()
-        unread = Notification.objects.filter(
-            recipient=user,
-            is_read=False,
-            is_dismissed=False
-        ).exclude(
-            expires_at__lt=timezone.now()
-        ).count()
+        unread = inbox_service.get_inbox(user).unread_notifications
         
         by_type = Notification.objects.filter(
             recipient=user
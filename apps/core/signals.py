@@ -0,0 +1,123 @@
+# apps/core/signals.py
+from functools import partial
+
+from celery.signals import before_task_publish, task_prerun, task_postrun
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+from django.utils.functional import SimpleLazyObject
+
+from apps.core.utils.tenant import (
+    snapshot_context,
+    restore_context,
+    set_current_tenant,
+    set_current_user,
+)
+from apps.core.utils.tenant_cache import tenant_resolution_cache
+from apps.tenants.models import Tenant, Domain, TenantConfiguration
+
+
+# Sent after audit entries are persisted, by the buffered flusher and by
+# AuditService.create_audit_entry. ``records`` is a list of AuditLog field
+# dicts as built by AuditService.build_audit_record.
+audit_entries_written = Signal()
+
+
+def _invalidate_tenant_caches(tenant):
+    """
+    Drop cached tenant resolutions and the cached template context of a tenant
+    """
+    tenant_resolution_cache.invalidate()
+    if tenant is not None:
+        try:
+            cache.delete(f"tenant_context_{tenant.schema_name}_{tenant.id}")
+        except Exception:
+            pass
+
+
+@receiver([post_save, post_delete], sender=Tenant)
+def invalidate_tenant_resolution_on_tenant_change(sender, instance, **kwargs):
+    """Tenant slug, status or activity changed"""
+    _invalidate_tenant_caches(instance)
+
+
+@receiver([post_save, post_delete], sender=Domain)
+def invalidate_tenant_resolution_on_domain_change(sender, instance, **kwargs):
+    """Domain added, removed or re-pointed"""
+    _invalidate_tenant_caches(getattr(instance, 'tenant', None))
+
+
+@receiver([post_save, post_delete], sender=TenantConfiguration)
+def invalidate_tenant_resolution_on_configuration_change(sender, instance, **kwargs):
+    """Cached tenants carry their configuration"""
+    _invalidate_tenant_caches(getattr(instance, 'tenant', None))
+
+
+# ---------------- Celery tenant/user propagation ----------------
+
+# Message header carrying the publisher's tenant and user into a task
+TASK_CONTEXT_HEADER = 'tenant_context'
+
+
+@before_task_publish.connect
+def attach_tenant_context_to_task(sender=None, headers=None, **kwargs):
+    """Record the publishing request's tenant and user on the task message"""
+    if headers is None or TASK_CONTEXT_HEADER in headers:
+        return
+    tenant, user = snapshot_context()
+    context = {}
+    if tenant is not None:
+        context['tenant_id'] = str(tenant.pk)
+    if user is not None and getattr(user, 'is_authenticated', False):
+        context['user_id'] = str(user.pk)
+    if context:
+        headers[TASK_CONTEXT_HEADER] = context
+
+
+def _task_context(request):
+    context = getattr(request, TASK_CONTEXT_HEADER, None)
+    if context is None:
+        context = (getattr(request, 'headers', None) or {}).get(TASK_CONTEXT_HEADER)
+    return context or {}
+
+
+def _load_user(user_id):
+    return get_user_model().objects.filter(pk=user_id).first()
+
+
+@task_prerun.connect
+def apply_tenant_context_to_task(sender=None, task=None, **kwargs):
+    """
+    Run the task as the tenant and user that published it. Worker threads
+    are reused across tasks, so tasks without a context start from a clean
+    one instead of whatever the previous task left behind.
+    """
+    request = task.request
+    if request.is_eager:
+        # Runs inline in the caller, which already has the right context
+        return
+    request.tenant_context_snapshot = snapshot_context()
+
+    context = _task_context(request)
+    tenant = None
+    if context.get('tenant_id'):
+        tenant = Tenant.objects.filter(pk=context['tenant_id']).first()
+    set_current_tenant(tenant)
+    if tenant is not None and hasattr(connection, 'set_tenant'):
+        connection.set_tenant(tenant)
+
+    user_id = context.get('user_id')
+    set_current_user(SimpleLazyObject(partial(_load_user, user_id)) if user_id else None)
+
+
+@task_postrun.connect
+def reset_tenant_context_after_task(sender=None, task=None, **kwargs):
+    request = task.request
+    snapshot = getattr(request, 'tenant_context_snapshot', None)
+    if snapshot is None:
+        return
+    restore_context(snapshot)
+    if hasattr(connection, 'set_schema_to_public'):
+        connection.set_schema_to_public()
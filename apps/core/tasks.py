@@ -0,0 +1,85 @@
+"""
+Background tasks for core operations using Celery
+"""
+
+import logging
+from typing import Dict
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def maintain_audit_partitions() -> Dict:
+    """
+    Create upcoming audit_logs partitions and archive months past retention
+    """
+    from apps.core.services.audit_archive import AuditPartitionManager
+
+    manager = AuditPartitionManager()
+    if not manager.is_supported:
+        return {'success': False, 'error': 'audit_logs partitioning requires PostgreSQL'}
+
+    try:
+        created = manager.ensure_partitions()
+        result = manager.apply_retention()
+    except Exception as e:
+        logger.error(f"Error maintaining audit partitions: {str(e)}", exc_info=True)
+        return {'success': False, 'error': str(e)}
+
+    return {'success': True, 'partitions_created': len(created), **result}
+
+
+@shared_task
+def sign_pending_records() -> Dict:
+    """
+    Sign the rows saved while DATA_INTEGRITY['SIGNING'] is 'deferred', in
+    the public schema and every active tenant
+    """
+    from django.apps import apps
+    from django.conf import settings
+    from django_tenants.utils import get_public_schema_name, schema_context
+    from apps.tenants.models import Tenant
+    from apps.core.utils.integrity import integrity_settings, is_signed_model, sign_pending
+
+    config = integrity_settings()
+    if config['SIGNING'] != 'deferred':
+        return {'success': True, 'signed': 0, 'skipped': 'signing on save'}
+
+    public = get_public_schema_name()
+    tenant_schemas = list(
+        Tenant.objects.filter(is_active=True).exclude(schema_name=public)
+        .values_list('schema_name', flat=True)
+    )
+    signed_models = [model for model in apps.get_models() if is_signed_model(model)]
+
+    signed, failed = 0, []
+    for model in signed_models:
+        app = model._meta.app_config.name
+        schemas = ([public] if app in settings.SHARED_APPS else []) + \
+            (tenant_schemas if app in settings.TENANT_APPS else [])
+        for schema_name in schemas:
+            try:
+                with schema_context(schema_name):
+                    signed += sign_pending(model._base_manager.all(), batch_size=config['BATCH_SIZE'])
+            except Exception as e:
+                logger.error(
+                    f"Error signing {model._meta.label} rows in {schema_name}: {str(e)}",
+                    exc_info=True
+                )
+                failed.append(f"{schema_name}.{model._meta.db_table}")
+
+    return {'success': not failed, 'signed': signed, 'failed': failed}
+
+
+@shared_task
+def delete_expired_exports() -> Dict:
+    """Delete stored exports older than EXPORTS['RETENTION_HOURS']"""
+    from apps.core.utils.exports import delete_expired_exports as delete_exports
+
+    try:
+        return {'success': True, 'deleted': delete_exports()}
+    except Exception as e:
+        logger.error(f"Error deleting expired exports: {str(e)}", exc_info=True)
+        return {'success': False, 'error': str(e)}
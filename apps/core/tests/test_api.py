@@ -0,0 +1,188 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django_tenants.utils import schema_context
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.academics.models import AcademicYear, SchoolClass
+from apps.core.utils.api import KeysetPagination, PageOrCursorPagination, requested_fields
+from apps.finance.models import Expense, ExpenseCategory, FeeStructure, Invoice, InvoiceItem, Payment
+from apps.finance.serializers import InvoiceSerializer
+from apps.finance.views import (
+    ExpenseAPIViewSet, FeeStructureAPIViewSet, InvoiceAPIViewSet, PaymentAPIViewSet,
+)
+from apps.students.models import Student
+from apps.tenants.models import Tenant
+from apps.users.models import User
+
+factory = APIRequestFactory()
+
+
+def api_request(path='/', method='get'):
+    return Request(getattr(factory, method)(path))
+
+
+# Only the first query after a schema switch sets the search path, so the
+# counts below are the API's own queries
+@override_settings(
+    TENANT_LIMIT_SET_CALLS=True,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class FinanceListQueryTests(TestCase):
+    ROWS = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(
+            schema_name='test_finance_api',
+            name='Test Finance API',
+            status='active',
+            subscription_ends_at=timezone.now() + timezone.timedelta(days=365),
+        )
+        today = timezone.now().date()
+        with schema_context(cls.tenant.schema_name):
+            cls.user = User.objects.create_user(
+                email='bursar@example.com', password='password123', first_name='Bursar',
+                last_name='User', tenant=cls.tenant, role='admin',
+            )
+            year = AcademicYear.objects.create(
+                name='2025-2026', code='2025-26', start_date=today,
+                end_date=today + timezone.timedelta(days=365), tenant=cls.tenant,
+            )
+            school_class = SchoolClass.objects.bulk_create([
+                SchoolClass(name='Grade 4', numeric_name=4, code='G4', order=4, tenant=cls.tenant),
+            ])[0]
+            fee = FeeStructure.objects.bulk_create([
+                FeeStructure(
+                    name='Tuition', academic_year=year, class_name=school_class, fee_type='TUITION',
+                    frequency='MONTHLY', amount=Decimal('500.00'), due_day=10, tenant=cls.tenant,
+                ),
+            ])[0]
+            students = Student.objects.bulk_create([
+                Student(
+                    admission_number=f'ADM-{n}', reg_no=f'REG-{n}', personal_email=f'student{n}@example.com',
+                    first_name='Student', last_name=str(n), date_of_birth=date(2015, 1, 1), gender='F',
+                    academic_year=year, current_class=school_class, tenant=cls.tenant,
+                )
+                for n in range(cls.ROWS)
+            ])
+            invoices = Invoice.objects.bulk_create([
+                Invoice(
+                    invoice_number=f'INV-{n}', student=student, academic_year=year, billing_period='2025-06',
+                    due_date=today, total_amount=Decimal('500.00'), due_amount=Decimal('500.00'),
+                    tenant=cls.tenant,
+                )
+                for n, student in enumerate(students)
+            ])
+            InvoiceItem.objects.bulk_create([
+                InvoiceItem(invoice=invoice, fee_structure=fee, amount=Decimal('500.00'), tenant=cls.tenant)
+                for invoice in invoices
+            ])
+            Payment.objects.bulk_create([
+                Payment(
+                    invoice=invoice, payment_number=f'PAY-{n}', amount=Decimal('100.00'),
+                    payment_method='CASH', received_by=cls.user, student=invoice.student, tenant=cls.tenant,
+                )
+                for n, invoice in enumerate(invoices)
+            ])
+            category = ExpenseCategory.objects.bulk_create([
+                ExpenseCategory(name='Supplies', code='SUP', category_type='ACADEMIC', tenant=cls.tenant),
+            ])[0]
+            Expense.objects.bulk_create([
+                Expense(
+                    expense_number=f'EXP-{n}', category=category, title='Chalk', description='Chalk',
+                    amount=Decimal('20.00'), vendor_name='Stationers', payment_method='CASH',
+                    submitted_by=cls.user, tenant=cls.tenant,
+                )
+                for n in range(cls.ROWS)
+            ])
+
+    def setUp(self):
+        context = schema_context(self.tenant.schema_name)
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+        # Set the search path before counting
+        User.objects.exists()
+
+    def assertListQueries(self, viewset, path, queries, rows=ROWS):
+        view = viewset.as_view({'get': 'list'})
+        request = factory.get(path)
+        force_authenticate(request, user=self.user)
+        with self.assertNumQueries(queries):
+            response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), rows)
+        return response.data['results']
+
+    def test_invoice_list_joins_and_prefetches_its_relations(self):
+        # COUNT, the page with student, class and year joined, items, discounts
+        results = self.assertListQueries(InvoiceAPIViewSet, '/', 4)
+        self.assertEqual(results[0]['class_name'], 'Grade 4')
+        self.assertEqual(results[0]['items'][0]['fee_structure_name'], 'Tuition')
+
+    def test_invoice_fieldset_loads_only_its_relations(self):
+        self.assertListQueries(InvoiceAPIViewSet, '/?fields=id,due_amount', 2)
+        results = self.assertListQueries(InvoiceAPIViewSet, '/?fields=id,student_name,items', 3)
+        self.assertEqual(set(results[0]), {'id', 'student_name', 'items'})
+
+    def test_invoice_cursor_pages_skip_the_count(self):
+        self.assertListQueries(InvoiceAPIViewSet, '/?pagination=cursor', 3)
+        self.assertListQueries(InvoiceAPIViewSet, '/?pagination=cursor&fields=id,student_name', 1)
+
+    def test_payment_list_is_one_joined_query_per_page(self):
+        results = self.assertListQueries(PaymentAPIViewSet, '/', 2)
+        self.assertEqual(results[0]['received_by_name'], 'Bursar User')
+        self.assertListQueries(PaymentAPIViewSet, '/?pagination=cursor&fields=id,invoice_number', 1)
+
+    def test_expense_list_is_one_joined_query_per_page(self):
+        results = self.assertListQueries(ExpenseAPIViewSet, '/', 2)
+        self.assertEqual(results[0]['category_name'], 'Supplies')
+        self.assertListQueries(ExpenseAPIViewSet, '/?fields=id,amount', 2)
+
+    def test_fee_structure_list_is_one_joined_query_per_page(self):
+        results = self.assertListQueries(FeeStructureAPIViewSet, '/', 2, rows=1)
+        self.assertEqual(results[0]['class_name_name'], 'Grade 4')
+
+
+class SparseFieldsetTests(SimpleTestCase):
+    def setUp(self):
+        school_class = SchoolClass(id=uuid.uuid4(), name='Grade 4')
+        student = Student(
+            id=uuid.uuid4(), first_name='Ada', last_name='Lovelace', current_class=school_class,
+        )
+        self.invoice = Invoice(
+            id=uuid.uuid4(), invoice_number='INV-1', student=student, billing_period='2025-06',
+            issue_date=date(2025, 6, 1), due_date=date(2025, 6, 15),
+            total_amount=Decimal('500.00'), paid_amount=Decimal('0.00'), due_amount=Decimal('500.00'),
+        )
+        fee = FeeStructure(id=uuid.uuid4(), name='Tuition', fee_type='TUITION')
+        item = InvoiceItem(id=uuid.uuid4(), invoice=self.invoice, fee_structure=fee, amount=Decimal('500.00'))
+        # What the viewset's prefetches leave on each invoice
+        self.invoice._prefetched_objects_cache = {'items': [item], 'discounts': []}
+
+    def test_only_the_requested_fields_are_serialized(self):
+        request = api_request('/?fields=id,invoice_number,class_name,items')
+
+        # SimpleTestCase forbids queries: serializing prefetched rows costs none
+        data = InvoiceSerializer([self.invoice], many=True, context={'request': request}).data
+
+        self.assertEqual(set(data[0]), {'id', 'invoice_number', 'class_name', 'items'})
+        self.assertEqual(data[0]['class_name'], 'Grade 4')
+        self.assertEqual(data[0]['items'][0]['fee_structure_name'], 'Tuition')
+
+    def test_writes_ignore_the_fieldset(self):
+        self.assertIsNone(requested_fields(api_request('/?fields=id', method='post')))
+        serializer = InvoiceSerializer(context={'request': api_request('/?fields=id', method='post')})
+        self.assertIn('due_date', serializer.fields)
+
+
+class PaginationTests(SimpleTestCase):
+    def test_cursor_pagination_is_opt_in(self):
+        self.assertFalse(PageOrCursorPagination.wants_cursor(api_request('/?page=3')))
+        self.assertTrue(PageOrCursorPagination.wants_cursor(api_request('/?pagination=cursor')))
+        self.assertTrue(PageOrCursorPagination.wants_cursor(api_request('/?cursor=cD0yMDI1')))
+        self.assertEqual(KeysetPagination.ordering, ('-created_at', '-id'))
@@ -0,0 +1,58 @@
+import gzip
+import json
+import tempfile
+from datetime import date, datetime, timezone
+
+from django.test import SimpleTestCase
+
+from apps.core.services.audit_archive import AuditArchive, add_months
+
+
+class AuditArchiveReaderTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archive = AuditArchive(self.tmp.name)
+        self._write('2025-01', 'all', [
+            {'id': '1', 'tenant_id': 't1', 'action': 'CREATE', 'timestamp': '2025-01-05T10:00:00Z'},
+            {'id': '2', 'tenant_id': 't2', 'action': 'UPDATE', 'timestamp': '2025-01-20T10:00:00Z'},
+        ])
+        self._write('2025-02', 'tenant-t1', [
+            {'id': '3', 'tenant_id': 't1', 'action': 'DELETE', 'timestamp': '2025-02-01T00:00:00Z'},
+        ])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, month, label, rows):
+        directory = self.archive.root / month
+        directory.mkdir(parents=True)
+        with gzip.open(directory / f'{label}.jsonl.gz', 'wt') as handle:
+            for row in rows:
+                handle.write(json.dumps(row) + '\n')
+
+    def test_reads_only_requested_range_and_tenant(self):
+        start = datetime(2025, 1, 10, tzinfo=timezone.utc)
+        end = datetime(2025, 3, 1, tzinfo=timezone.utc)
+        rows = list(self.archive.iter_records(start, end, tenant_id='t1'))
+        self.assertEqual([row['id'] for row in rows], ['3'])
+        self.assertEqual(rows[0]['timestamp'], datetime(2025, 2, 1, tzinfo=timezone.utc))
+
+    def test_boundary_is_end_of_newest_archived_month(self):
+        self.assertEqual(
+            self.archive.oldest_live_boundary(),
+            datetime(2025, 3, 1, tzinfo=timezone.utc)
+        )
+
+    def test_tenant_boundary_ignores_other_tenants_files(self):
+        self.assertEqual(
+            self.archive.oldest_live_boundary(tenant_id='t2'),
+            datetime(2025, 2, 1, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            self.archive.oldest_live_boundary(tenant_id='t1'),
+            datetime(2025, 3, 1, tzinfo=timezone.utc)
+        )
+
+    def test_add_months_wraps_years(self):
+        self.assertEqual(add_months(date(2025, 11, 1), 3), date(2026, 2, 1))
+        self.assertEqual(add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
@@ -0,0 +1,55 @@
+from django.test import SimpleTestCase
+
+from apps.core.services.audit_buffer import AuditBuffer
+
+
+class RecordingAuditBuffer(AuditBuffer):
+    """Audit buffer that records batches instead of inserting them"""
+
+    def __init__(self, config):
+        super().__init__(config=config)
+        self.batches = []
+
+    def _write_batch(self, batch, switch_to_public=False):
+        self.batches.append(list(batch))
+        self._incr('written', len(batch))
+        return len(batch)
+
+    def _ensure_started(self):
+        # Keep the flusher thread out of the tests; flush() drains inline
+        import os
+        import queue
+        if self._queue is None:
+            self._queue = queue.Queue(maxsize=self.config['BUFFER_MAX_SIZE'])
+            self._pid = os.getpid()
+
+
+class AuditBufferTests(SimpleTestCase):
+    def test_sync_mode_writes_inline(self):
+        buffer = RecordingAuditBuffer({'WRITE_MODE': 'sync'})
+        self.assertTrue(buffer.enqueue({'action': 'READ'}))
+        self.assertEqual(buffer.batches, [[{'action': 'READ'}]])
+
+    def test_flush_writes_in_batches(self):
+        buffer = RecordingAuditBuffer({'FLUSH_BATCH_SIZE': 2, 'FLUSH_INTERVAL_SECONDS': 60})
+        for i in range(5):
+            buffer.enqueue({'action': 'READ', 'n': i})
+        self.assertEqual(buffer.flush(), 5)
+        self.assertEqual([len(batch) for batch in buffer.batches], [2, 2, 1])
+        metrics = buffer.metrics()
+        self.assertEqual(metrics['flushes'], 3)
+        self.assertEqual(metrics['queue_depth'], 0)
+
+    def test_drop_policy_discards_overflow(self):
+        buffer = RecordingAuditBuffer({'BUFFER_MAX_SIZE': 1, 'OVERFLOW_POLICY': 'drop'})
+        self.assertTrue(buffer.enqueue({'n': 1}))
+        self.assertFalse(buffer.enqueue({'n': 2}))
+        self.assertEqual(buffer.metrics()['dropped'], 1)
+        self.assertEqual(buffer.batches, [])
+
+    def test_spill_policy_writes_overflow_inline(self):
+        buffer = RecordingAuditBuffer({'BUFFER_MAX_SIZE': 1, 'OVERFLOW_POLICY': 'spill'})
+        buffer.enqueue({'n': 1})
+        self.assertTrue(buffer.enqueue({'n': 2}))
+        self.assertEqual(buffer.batches, [[{'n': 2}]])
+        self.assertEqual(buffer.metrics()['spilled'], 1)
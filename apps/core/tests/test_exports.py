@@ -0,0 +1,173 @@
+import datetime
+import io
+from unittest import mock
+
+import openpyxl
+from django.core import signing
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils import timezone
+
+from apps.core.utils.exports import (
+    Column, download_token, export_header, export_rows, read_download_token, save_export,
+)
+from apps.core.views import ExportMixin
+from apps.students.exports import BASIC_EXPORT_COLUMNS, export_filters
+from apps.students.models import Student
+
+
+def fake_queryset(model, rows):
+    queryset = mock.Mock(model=model)
+    queryset.values_list.return_value.iterator.return_value = iter(rows)
+    return queryset
+
+
+class ExportRowsTests(SimpleTestCase):
+    def test_rows_come_from_one_chunked_values_list_query(self):
+        queryset = fake_queryset(Student, [
+            ('ADM-1', 'Ada', '', 'Lovelace', datetime.date(2010, 5, 1), 'F',
+             None, None, None, None, 'ACTIVE', 'GENERAL'),
+        ])
+
+        rows = list(export_rows(queryset, BASIC_EXPORT_COLUMNS, chunk_size=500))
+
+        queryset.values_list.assert_called_once_with(
+            'admission_number', 'first_name', 'middle_name', 'last_name', 'date_of_birth', 'gender',
+            'personal_email', 'mobile_primary', 'current_class__name', 'section__name', 'status', 'category',
+        )
+        queryset.values_list.return_value.iterator.assert_called_once_with(chunk_size=500)
+        self.assertEqual(rows[0][:5], ['ADM-1', 'Ada Lovelace', datetime.date(2010, 5, 1), 'Female', ''])
+        self.assertEqual(len(rows[0]), len(BASIC_EXPORT_COLUMNS))
+
+    def test_shared_fields_are_selected_once_and_values_are_writable(self):
+        created = timezone.make_aware(datetime.datetime(2024, 1, 2, 3, 4, 5, 678))
+        columns = (
+            Column('Name', 'first_name', 'last_name'),
+            Column('Initial', 'first_name', format=lambda name: name[0]),
+            Column('Created', 'created_at'),
+            Column('Id', 'id'),
+        )
+        queryset = fake_queryset(Student, [('Alan', 'Turing', created, mock.sentinel.uuid)])
+
+        row = next(export_rows(queryset, columns))
+
+        queryset.values_list.assert_called_once_with('first_name', 'last_name', 'created_at', 'id')
+        self.assertEqual(row[:2], ['Alan Turing', 'A'])
+        self.assertIsNone(row[2].tzinfo)
+        self.assertEqual(row[2].microsecond, 0)
+        self.assertIsInstance(row[3], str)
+
+
+class SavedExportTests(SimpleTestCase):
+    def save(self, export_format):
+        saved = {}
+
+        def store(path, content):
+            saved['content'] = content.read()
+            return path
+
+        progress = mock.Mock()
+        with mock.patch('apps.core.utils.exports.default_storage') as storage, \
+                override_settings(EXPORTS={'CHUNK_SIZE': 2}):
+            storage.save.side_effect = store
+            path, count = save_export(
+                'exports/north/abc/students.' + export_format, ['Name', 'Fee'],
+                iter([['Zoë', 10], ['Ravi', 20], ['Ada', 30]]), export_format, progress=progress,
+            )
+        self.assertEqual((path, count), ('exports/north/abc/students.' + export_format, 3))
+        self.assertEqual([call.args[0] for call in progress.call_args_list], [2, 3])
+        return saved['content']
+
+    def test_csv_is_written_with_a_byte_order_mark(self):
+        content = self.save('csv').decode('utf-8-sig')
+        self.assertEqual(content.splitlines(), ['Name,Fee', 'Zoë,10', 'Ravi,20', 'Ada,30'])
+
+    def test_xlsx_is_a_single_sheet_workbook(self):
+        workbook = openpyxl.load_workbook(io.BytesIO(self.save('xlsx')))
+        self.assertEqual(
+            list(workbook.active.values), [('Name', 'Fee'), ('Zoë', 10), ('Ravi', 20), ('Ada', 30)]
+        )
+
+    def test_download_token_is_bound_to_the_user(self):
+        token = download_token('exports/north/abc/students.csv', 7)
+
+        self.assertEqual(read_download_token(token, 7), 'exports/north/abc/students.csv')
+        with self.assertRaises(signing.BadSignature):
+            read_download_token(token, 8)
+        with override_settings(EXPORTS={'TOKEN_MAX_AGE': -1}), self.assertRaises(signing.SignatureExpired):
+            read_download_token(token, 7)
+
+
+class ExportMixinTests(SimpleTestCase):
+    def test_rows_without_columns_are_streamed_from_an_iterator(self):
+        class LegacyExport(ExportMixin):
+            export_filename = 'legacy'
+
+            def get_export_queryset(self):
+                return queryset
+
+            def get_export_headers(self):
+                return ['Name']
+
+            def get_export_row(self, obj):
+                return [obj]
+
+        queryset = mock.Mock()
+        queryset.iterator.return_value = iter(['Ada', 'Alan'])
+        request = RequestFactory().get('/export/', {'format': 'csv'})
+
+        response = LegacyExport().export(request)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), b'Name\r\nAda\r\nAlan\r\n')
+        self.assertIn('legacy.csv', response['Content-Disposition'])
+        queryset.iterator.assert_called_once()
+
+    def test_column_exports_declare_their_header(self):
+        self.assertEqual(export_header(BASIC_EXPORT_COLUMNS)[:2], ['Admission Number', 'Full Name'])
+
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'student-export-tests',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class StudentExportStatusTests(SimpleTestCase):
+    def setUp(self):
+        from apps.students.views import StudentExportStatusView, export_task_key
+
+        self.view = StudentExportStatusView()
+        cache.set(export_task_key('task-1'), '7')
+        self.addCleanup(cache.clear)
+
+    def request(self, user_id):
+        request = RequestFactory().get('/students/export/status/task-1/')
+        request.user = mock.Mock(id=user_id)
+        return request
+
+    def test_filters_keep_only_known_non_empty_keys(self):
+        self.assertEqual(
+            export_filters({'status': 'ACTIVE', 'class_id': '', 'format': 'csv', 'gender': 'F'}),
+            {'status': 'ACTIVE', 'gender': 'F'},
+        )
+
+    def test_finished_export_returns_the_download_link_to_its_owner(self):
+        result = mock.Mock(state='SUCCESS', result={
+            'success': True, 'filename': 'students.csv', 'row_count': 3, 'download_url': '/dl/abc/',
+        })
+        result.ready.return_value = result.successful.return_value = True
+        with mock.patch('apps.students.views.AsyncResult', return_value=result):
+            response = self.view.get(self.request(7), 'task-1')
+        self.assertJSONEqual(response.content, {
+            'task_id': 'task-1', 'state': 'SUCCESS', 'ready': True, 'success': True,
+            'filename': 'students.csv', 'row_count': 3, 'download_url': '/dl/abc/',
+        })
+
+    def test_other_users_cannot_poll_the_task(self):
+        with self.assertRaises(Http404):
+            self.view.get(self.request(8), 'task-1')
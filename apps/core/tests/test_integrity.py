@@ -0,0 +1,122 @@
+import uuid
+from unittest import mock
+from datetime import datetime
+from decimal import Decimal
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from apps.communications.models import Communication
+from apps.core.utils.integrity import sign_for_save, sign_objects, signature_plan
+
+
+def communication(**fields):
+    defaults = {
+        'id': uuid.uuid4(),
+        'tracking_id': uuid.uuid4(),
+        'tenant_id': uuid.uuid4(),
+        'title': 'Fees due',
+        'content': 'Term 2 fees are due on Friday',
+        'status': 'SENT',
+        'cost': Decimal('1.5'),
+        'scheduled_for': timezone.make_aware(datetime(2024, 5, 1, 9, 30)),
+    }
+    defaults.update(fields)
+    return Communication(**defaults)
+
+
+class SignaturePlanTests(SimpleTestCase):
+    def setUp(self):
+        self.plan = signature_plan(Communication)
+
+    def test_instance_and_database_row_sign_the_same(self):
+        obj = communication()
+        row = [getattr(obj, attname) for attname in self.plan.attnames]
+        # Values as the database hands them back
+        row = [str(value) if isinstance(value, uuid.UUID) else value for value in row]
+        self.assertEqual(self.plan.sign(obj), self.plan.digest(row))
+
+    def test_equivalent_values_sign_the_same(self):
+        obj = communication()
+        same = communication(
+            id=obj.id,
+            tracking_id=str(obj.tracking_id).upper(),
+            tenant_id=str(obj.tenant_id),
+            cost=Decimal('1.50'),
+            scheduled_for=datetime(2024, 5, 1, 9, 30),
+        )
+        self.assertEqual(self.plan.sign(obj), self.plan.sign(same))
+
+    def test_signed_field_change_changes_signature(self):
+        obj = communication()
+        before = self.plan.sign(obj)
+        obj.status = 'READ'
+        self.assertNotEqual(self.plan.sign(obj), before)
+
+    def test_timestamps_and_rate_limit_fields_are_not_signed(self):
+        obj = communication()
+        before = self.plan.sign(obj)
+        obj.updated_at = timezone.now()
+        obj.request_count = 10
+        self.assertEqual(self.plan.sign(obj), before)
+
+    def test_update_fields_gain_signature_only_for_signed_fields(self):
+        obj = communication()
+        self.assertEqual(
+            sign_for_save(obj, ['request_count', 'last_request_at']),
+            ['request_count', 'last_request_at'],
+        )
+        self.assertEqual(obj.data_signature, '')
+        self.assertEqual(sign_for_save(obj, ['status']), frozenset({'status', 'data_signature'}))
+        self.assertEqual(obj.data_signature, self.plan.sign(obj))
+        self.assertTrue(obj.verify_integrity())
+
+    @override_settings(DATA_INTEGRITY={'SIGNING': 'deferred'})
+    def test_deferred_signing_leaves_rows_for_the_signer(self):
+        obj = communication(data_signature='stale')
+        sign_for_save(obj)
+        self.assertEqual(obj.data_signature, '')
+        sign_objects([obj])
+        self.assertEqual(obj.data_signature, '')
+
+    def test_bulk_signing(self):
+        objs = [communication(), communication()]
+        sign_objects(objs)
+        self.assertEqual([obj.data_signature for obj in objs], [self.plan.sign(obj) for obj in objs])
+
+
+class SignedUpdateTests(SimpleTestCase):
+    def update(self, **kwargs):
+        queryset = Communication.objects.filter(status='SENT')
+        self.pks = [uuid.uuid4(), uuid.uuid4()]
+        locked = mock.Mock(**{'values_list.return_value': self.pks})
+        with mock.patch('django.db.models.QuerySet.update', return_value=2) as update, \
+                mock.patch('django.db.models.QuerySet.select_for_update', return_value=locked), \
+                mock.patch('django.db.transaction.atomic'), \
+                mock.patch('apps.core.utils.integrity.resign_rows') as resign_rows:
+            self.assertEqual(queryset.update(**kwargs), 2)
+        return update, resign_rows
+
+    def test_signed_field_update_resigns_the_changed_rows(self):
+        update, resign_rows = self.update(status='FAILED')
+        update.assert_called_once_with(status='FAILED')
+        changed = resign_rows.call_args.args[0]
+        self.assertIs(changed.model, Communication)
+        self.assertIn(self.pks[0].hex, str(changed.query))
+
+    def test_unsigned_field_update_is_not_resigned(self):
+        _, resign_rows = self.update(request_count=0)
+        resign_rows.assert_not_called()
+
+
+class TenantAwareSaveValidationTests(SimpleTestCase):
+    def test_unique_checks_keep_the_tenant_field(self):
+        record = communication()
+        with mock.patch.object(Communication, 'clean_fields'), \
+                mock.patch.object(Communication, 'clean'), \
+                mock.patch.object(Communication, 'validate_unique') as validate_unique, \
+                mock.patch.object(Communication, 'validate_constraints') as validate_constraints, \
+                mock.patch.object(Communication, 'save_base'):
+            record.save()
+        validate_unique.assert_called_once_with(exclude=['id'])
+        validate_constraints.assert_called_once_with(exclude=['id'])
@@ -0,0 +1,29 @@
+import uuid
+
+from django.test import SimpleTestCase
+
+from apps.core.managers import model_filter_flags
+from apps.core.models import AuditLog
+from apps.core.utils.tenant import tenant_context, get_current_tenant
+from apps.students.models import Student
+from apps.tenants.models import Tenant
+
+
+class ManagerFilterTests(SimpleTestCase):
+    def test_flags_resolved_per_model(self):
+        self.assertEqual(model_filter_flags(Student), (True, True))
+        self.assertEqual(model_filter_flags(AuditLog), (False, False))
+
+    def test_tenant_and_active_filters_applied_once(self):
+        tenant = Tenant(id=uuid.uuid4(), schema_name='school')
+        with tenant_context(tenant):
+            where = str(Student.objects.all().query).split(' WHERE ', 1)[1]
+        self.assertEqual(where.count('"is_active"'), 1)
+        self.assertIn(f'"tenant_id" = {tenant.id.hex}', where)
+
+    def test_no_tenant_filter_without_current_tenant(self):
+        self.assertIsNone(get_current_tenant())
+        self.assertNotIn('"tenant_id" =', str(Student.objects.all().query))
+
+    def test_deleted_returns_inactive_rows(self):
+        self.assertIn('NOT "students_student"."is_active"', str(Student.objects.deleted().query))
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from apps.communications.utils.notification_cache import NotificationBellCache
+from apps.core.utils.request_context import RequestContext
+
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'notification-bell-tests',
+    }
+}
+
+
+class CountingRequestContext(RequestContext):
+    def __init__(self, request):
+        super().__init__(request)
+        self.calls = 0
+
+    def _compute_unread_notifications_count(self):
+        self.calls += 1
+        return 3
+
+
+class RequestContextTests(SimpleTestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.values = CountingRequestContext.for_request(self.request)
+
+    def render(self, source, **context):
+        return Template(source).render(Context(context))
+
+    def test_value_is_not_computed_unless_referenced(self):
+        self.render('{{ other }}', unread_notifications_count=self.values.lazy('unread_notifications_count'))
+        self.assertEqual(self.values.calls, 0)
+
+    def test_value_is_computed_once_per_request(self):
+        lazy = self.values.lazy('unread_notifications_count')
+        output = self.render(
+            '{% if count > 0 %}{{ count }}{% endif %}/{{ again }}',
+            count=lazy,
+            again=CountingRequestContext.for_request(self.request).lazy('unread_notifications_count'),
+        )
+        self.assertEqual(output, '3/3')
+        self.assertEqual(self.values.calls, 1)
+
+    def test_context_is_shared_by_the_request(self):
+        self.assertIs(CountingRequestContext.for_request(self.request), self.values)
+        self.assertIsNot(CountingRequestContext.for_request(RequestFactory().get('/')), self.values)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class NotificationBellCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.bell = NotificationBellCache(config={'TTL': 60})
+        self.bell.shared_cache.clear()
+        self.user = SimpleNamespace(pk='user-1')
+        self.calls = 0
+
+    def compute(self, value):
+        def load():
+            self.calls += 1
+            return value
+        return load
+
+    def test_hit_skips_compute(self):
+        self.assertEqual(self.bell._cached(self.user, 'unread', self.compute(4)), 4)
+        self.assertEqual(self.bell._cached(self.user, 'unread', self.compute(5)), 4)
+        self.assertEqual(self.calls, 1)
+
+    def test_invalidate_drops_only_that_user(self):
+        other = SimpleNamespace(pk='user-2')
+        self.bell._cached(self.user, 'unread', self.compute(4))
+        self.bell._cached(other, 'unread', self.compute(1))
+
+        self.bell.invalidate(self.user.pk)
+
+        self.assertEqual(self.bell._cached(self.user, 'unread', self.compute(5)), 5)
+        self.assertEqual(self.bell._cached(other, 'unread', self.compute(2)), 1)
+
+    def test_value_stored_after_invalidation_is_not_served(self):
+        # A request read the generation, then a write invalidated before
+        # the request stored its (now stale) value
+        stale_key = f"{self.bell._user_prefix(self.user.pk)}:0:unread"
+        self.bell.invalidate(self.user.pk)
+        self.bell.shared_cache.set(stale_key, 4)
+
+        self.assertEqual(self.bell._cached(self.user, 'unread', self.compute(5)), 5)
+
+    def test_disabled_always_computes(self):
+        bell = NotificationBellCache(config={'ENABLED': False})
+        bell._cached(self.user, 'unread', self.compute(4))
+        bell._cached(self.user, 'unread', self.compute(4))
+        self.assertEqual(self.calls, 2)
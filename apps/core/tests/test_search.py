@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.core.utils.search import SearchIndexService, build_document, search_state, search_terms
+from apps.hr.models import Staff
+from apps.students.models import Student
+
+
+class SearchDocumentTests(SimpleTestCase):
+    def test_terms_drop_tsquery_operators(self):
+        self.assertEqual(search_terms("Ada & !Lov'elace (ADM-2024-North)"), ['ada', 'lov', 'elace', 'adm-2024-north'])
+        self.assertEqual(search_terms(' :* | '), [])
+
+    def test_document_is_lower_cased_with_phone_digits(self):
+        self.assertEqual(
+            build_document(['Ada', None, '  Lovelace ', 'ADM-2024-0001', '+91 98765-43210', '']),
+            'ada lovelace adm-2024-0001 +91 98765-43210 919876543210',
+        )
+
+    def test_state_covers_the_models_own_fields(self):
+        staff = Staff(employee_id='EMP-7', personal_email='a@b.c', personal_phone='123456789')
+        self.assertEqual(search_state(staff), ('EMP-7', 'a@b.c', '123456789'))
+
+
+class SearchQueryTests(SimpleTestCase):
+    def setUp(self):
+        self.service = SearchIndexService(config={'CONFIG': 'simple', 'BATCH_SIZE': 10, 'MIN_QUERY_LENGTH': 2})
+
+    def vendor(self, vendor):
+        return mock.patch(
+            'apps.core.utils.search.connections', {'default': SimpleNamespace(vendor=vendor)}
+        )
+
+    def test_short_queries_match_nothing(self):
+        with self.vendor('postgresql'):
+            queryset = self.service.search(Student.objects.all(), ' a ')
+        self.assertIn('NothingNode', str(queryset.query.where))
+
+    def test_postgres_search_is_ranked(self):
+        with self.vendor('postgresql'):
+            queryset = self.service.search(Student.objects.all(), 'Ada Lov')
+
+        self.assertEqual(queryset.query.order_by, ('-search_rank',))
+        self.assertIn('search_rank', queryset.query.annotations)
+        lookups = {child.lookup_name for child in queryset.query.where.children[-1].children}
+        self.assertEqual(lookups, {'exact', 'trigram_word_similar'})
+
+    def test_other_databases_match_every_term_in_the_document(self):
+        with self.vendor('sqlite'):
+            queryset = self.service.search(Student.objects.all(), 'Ada Lov')
+        lookups = [(child.lhs.target.name, child.rhs) for child in queryset.query.where.children]
+        self.assertEqual(lookups[-2:], [('search_document', 'ada'), ('search_document', 'lov')])
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.core.utils.sequences import DocumentSequenceService, highest_issued, split_template
+
+TENANT = SimpleNamespace(pk=7, schema_name='north')
+
+
+class SequenceFormattingTests(SimpleTestCase):
+    def test_prefix_is_the_template_before_the_counter(self):
+        self.assertEqual(split_template('PAY-{year}-{seq:05d}')[0], 'PAY-{year}-')
+        with self.assertRaises(ValueError):
+            split_template('PAY-{year}')
+
+    def test_highest_issued_reads_the_digits_after_the_prefix(self):
+        self.assertEqual(
+            highest_issued(['INV-2024-00007', 'INV-2024-00012-A', 'INV-2024-X', None], 'INV-2024-'), 12
+        )
+
+
+class SequenceAllocationTests(SimpleTestCase):
+    def setUp(self):
+        self.service = DocumentSequenceService()
+
+    def test_reserved_block_ends_at_the_new_counter_value(self):
+        with mock.patch.object(self.service, '_allocate', return_value=42) as allocate:
+            numbers = self.service.reserve('payment', TENANT, 3, year=2024)
+
+        self.assertEqual(numbers, ['PAY-2024-NORTH-00040', 'PAY-2024-NORTH-00041', 'PAY-2024-NORTH-00042'])
+        self.assertEqual(allocate.call_args.args[:4], (TENANT, 'payment', 'PAY-2024-NORTH-', 3))
+
+    def test_new_counter_is_seeded_from_the_highest_number_or_the_start(self):
+        cursor = mock.MagicMock()
+        cursor.fetchone.side_effect = [None, (101,)]
+        connection = mock.Mock()
+        connection.cursor.return_value.__enter__ = mock.Mock(return_value=cursor)
+        connection.cursor.return_value.__exit__ = mock.Mock(return_value=False)
+        connection.ops.quote_name = lambda name: f'"{name}"'
+
+        with mock.patch('apps.core.utils.sequences.connection', connection), \
+                mock.patch.object(self.service, '_highest_issued', return_value=3):
+            number = self.service.next_number('invoice', TENANT, start=100, prefix='INV', year=2024)
+
+        self.assertEqual(number, 'INV-2024-00101')
+        update, insert = cursor.execute.call_args_list
+        self.assertIn('UPDATE', update.args[0])
+        self.assertIn('ON CONFLICT', insert.args[0])
+        self.assertEqual(insert.args[1], [7, 'invoice', 'INV-2024-', 100, 1])
+
+    def test_numbers_without_a_tenant_follow_the_highest_issued(self):
+        with mock.patch.object(self.service, '_highest_issued', return_value=8):
+            self.assertEqual(self.service.next_number('application', None, cycle='C24'), 'APP-C24-00009')
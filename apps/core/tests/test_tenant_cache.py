@@ -0,0 +1,75 @@
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.utils.tenant_cache import TenantResolutionCache
+
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tenant-resolution-tests',
+    }
+}
+
+
+class FakeTenant:
+    def __init__(self, slug):
+        self.slug = slug
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TenantResolutionCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.resolver = TenantResolutionCache(config={'LOCAL_MAX_ENTRIES': 2})
+        self.resolver.shared_cache.clear()
+        self.calls = 0
+
+    def loader(self, result):
+        def load():
+            self.calls += 1
+            return result
+        return load
+
+    def test_local_hit_skips_loader(self):
+        tenant = FakeTenant('alpha')
+        self.assertIs(self.resolver.resolve('slug', 'alpha', self.loader(tenant)), tenant)
+        self.assertIs(self.resolver.resolve('slug', 'alpha', self.loader(tenant)), tenant)
+        self.assertEqual(self.calls, 1)
+        stats = self.resolver.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['local_hits'], 1)
+
+    def test_shared_tier_serves_other_processes(self):
+        self.resolver.resolve('slug', 'alpha', self.loader(FakeTenant('alpha')))
+        self.resolver.clear_local()
+        tenant = self.resolver.resolve('slug', 'alpha', self.loader(None))
+        self.assertEqual(tenant.slug, 'alpha')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.resolver.stats()['shared_hits'], 1)
+
+    def test_negative_results_are_cached(self):
+        self.assertIsNone(self.resolver.resolve('slug', 'dashboard', self.loader(None)))
+        self.assertIsNone(self.resolver.resolve('slug', 'dashboard', self.loader(None)))
+        self.assertEqual(self.calls, 1)
+
+    def test_keys_are_case_sensitive(self):
+        self.assertIsNone(self.resolver.resolve('slug', 'Alpha', self.loader(None)))
+        tenant = FakeTenant('alpha')
+        self.assertIs(self.resolver.resolve('slug', 'alpha', self.loader(tenant)), tenant)
+        self.assertEqual(self.calls, 2)
+
+    def test_invalidate_drops_both_tiers(self):
+        self.resolver.resolve('slug', 'alpha', self.loader(FakeTenant('alpha')))
+        self.resolver.invalidate()
+        self.resolver.resolve('slug', 'alpha', self.loader(FakeTenant('alpha')))
+        self.assertEqual(self.calls, 2)
+
+    def test_lru_evicts_oldest_entry(self):
+        for slug in ('a', 'b', 'c'):
+            self.resolver.resolve('slug', slug, self.loader(FakeTenant(slug)))
+        self.assertEqual(self.resolver.stats()['local_entries'], 2)
+
+    def test_disabled_cache_always_loads(self):
+        resolver = TenantResolutionCache(config={'ENABLED': False})
+        resolver.resolve('slug', 'alpha', self.loader(FakeTenant('alpha')))
+        resolver.resolve('slug', 'alpha', self.loader(FakeTenant('alpha')))
+        self.assertEqual(self.calls, 2)
@@ -0,0 +1,110 @@
+import asyncio
+from types import SimpleNamespace
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from apps.core.middleware.tenant import ContextVarMiddlewareMixin
+from apps.core.signals import (
+    TASK_CONTEXT_HEADER,
+    apply_tenant_context_to_task,
+    attach_tenant_context_to_task,
+)
+from apps.core.utils.tenant import (
+    clear_tenant,
+    clear_user,
+    get_current_tenant,
+    set_current_tenant,
+    set_current_user,
+    tenant_context,
+)
+
+
+class FakeTenant:
+    def __init__(self, pk):
+        self.pk = pk
+
+
+class SetsTenantMiddleware(ContextVarMiddlewareMixin):
+    def process_request(self, request):
+        set_current_tenant(request.GET['tenant'])
+
+
+class TenantContextTests(SimpleTestCase):
+    def tearDown(self):
+        clear_tenant()
+        clear_user()
+
+    def test_nested_tenant_context_restores_outer_tenant(self):
+        set_current_tenant('outer')
+        with tenant_context('inner'):
+            with tenant_context(None):
+                self.assertIsNone(get_current_tenant())
+            self.assertEqual(get_current_tenant(), 'inner')
+        self.assertEqual(get_current_tenant(), 'outer')
+
+    def test_concurrent_coroutines_keep_their_own_tenant(self):
+        async def handle(tenant):
+            set_current_tenant(tenant)
+            await asyncio.sleep(0)
+            return get_current_tenant()
+
+        async def main():
+            return await asyncio.gather(*(handle(f't{i}') for i in range(20)))
+
+        self.assertEqual(asyncio.run(main()), [f't{i}' for i in range(20)])
+        self.assertIsNone(get_current_tenant())
+
+    def test_async_middleware_exposes_tenant_to_view_and_restores_outer(self):
+        seen = []
+
+        async def view(request):
+            seen.append(get_current_tenant())
+            return HttpResponse()
+
+        middleware = SetsTenantMiddleware(view)
+
+        async def main():
+            set_current_tenant('outer')
+            await middleware(RequestFactory().get('/', {'tenant': 'alpha'}))
+            return get_current_tenant()
+
+        self.assertEqual(asyncio.run(main()), 'outer')
+        self.assertEqual(seen, ['alpha'])
+
+    def test_sync_middleware_restores_outer_tenant(self):
+        seen = []
+
+        def view(request):
+            seen.append(get_current_tenant())
+            return HttpResponse()
+
+        set_current_tenant('outer')
+        SetsTenantMiddleware(view)(RequestFactory().get('/', {'tenant': 'beta'}))
+        self.assertEqual(seen, ['beta'])
+        self.assertEqual(get_current_tenant(), 'outer')
+
+
+class CeleryTenantContextTests(SimpleTestCase):
+    def tearDown(self):
+        clear_tenant()
+        clear_user()
+
+    def test_publish_attaches_tenant_and_user(self):
+        set_current_tenant(FakeTenant('tenant-1'))
+        set_current_user(SimpleNamespace(pk=7, is_authenticated=True))
+        headers = {}
+        attach_tenant_context_to_task(headers=headers)
+        self.assertEqual(headers[TASK_CONTEXT_HEADER], {'tenant_id': 'tenant-1', 'user_id': '7'})
+
+    def test_publish_without_context_adds_no_header(self):
+        headers = {}
+        attach_tenant_context_to_task(headers=headers)
+        self.assertNotIn(TASK_CONTEXT_HEADER, headers)
+
+    def test_eager_task_keeps_callers_context(self):
+        set_current_tenant('caller')
+        task = SimpleNamespace(request=SimpleNamespace(is_eager=True))
+        apply_tenant_context_to_task(task=task)
+        self.assertEqual(get_current_tenant(), 'caller')
+        self.assertFalse(hasattr(task.request, 'tenant_context_snapshot'))
@@ -13,6 +13,8 @@ from .tenant import (
     clear_user,
     tenant_context,
     user_context,
+    snapshot_context,
+    restore_context,
     get_tenant_schema,
 )
 
@@ -61,6 +63,8 @@ __all__ = [
     'clear_user',
     'tenant_context',
     'user_context',
+    'snapshot_context',
+    'restore_context',
     'get_tenant_schema',
     
     # Audit utilities
@@ -0,0 +1,231 @@
+# apps/core/utils/exports.py
+"""
+Declarative, streaming exports
+
+An export is a queryset and a sequence of ``Column`` specs. The rows are
+read with one ``values_list`` projection of every column's fields,
+through ``.iterator(chunk_size=...)`` (a server-side cursor on
+Postgres), so neither model instances nor the whole result set are held
+in memory and related names come from joins instead of per-row queries.
+The rows are then written by ``apps.core.utils.streaming``: CSV line by
+line, XLSX with openpyxl's write-only workbook.
+
+Exports too large for a request are written by a Celery task to
+``default_storage`` under ``EXPORTS['STORAGE_DIR']`` and handed to the
+user as a signed download token that expires after
+``EXPORTS['TOKEN_MAX_AGE']`` seconds; the ``delete_expired_exports``
+task removes the files once ``EXPORTS['RETENTION_HOURS']`` have passed.
+"""
+
+import csv
+import io
+import uuid
+import tempfile
+import datetime
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.http import FileResponse
+from django.utils import timezone
+
+from apps.core.utils.streaming import XLSX_CONTENT_TYPE, write_xlsx
+
+DEFAULT_EXPORTS = {
+    'CHUNK_SIZE': 2000,  # rows fetched per round trip
+    'STORAGE_DIR': 'exports',
+    'TOKEN_MAX_AGE': 24 * 60 * 60,  # seconds a download link stays valid
+    'RETENTION_HOURS': 48,  # stored export files are deleted after this
+}
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': XLSX_CONTENT_TYPE,
+}
+
+_TOKEN_SALT = 'apps.core.exports'
+
+
+def export_settings():
+    config = dict(DEFAULT_EXPORTS)
+    config.update(getattr(settings, 'EXPORTS', {}))
+    return config
+
+
+def cell_value(value):
+    """A value CSV and openpyxl can both write"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.make_naive(value)
+        return value.replace(microsecond=0)
+    if isinstance(value, (str, int, float, Decimal, datetime.date, datetime.time)):
+        return value
+    return str(value)
+
+
+def join_names(*parts) -> str:
+    """Non-empty parts separated by spaces, e.g. first, middle and last name"""
+    return ' '.join(str(part) for part in parts if part)
+
+
+class Column:
+    """
+    One export column: its header and the ``values_list`` paths it reads.
+
+    With one field the value is written as is, or as its choice label when
+    ``display`` is set; ``format`` receives the values of all fields in
+    order, and defaults to joining the non-empty ones.
+    """
+
+    def __init__(self, header: str, *fields: str, display: bool = False,
+                 format: Optional[Callable] = None):
+        if not fields:
+            raise ValueError(f"Export column {header!r} reads no fields")
+        self.header = header
+        self.fields = fields
+        self.display = display
+        self.format = format
+
+    def __repr__(self):
+        return f"Column({self.header!r}, {', '.join(map(repr, self.fields))})"
+
+    def formatter(self, model) -> Callable:
+        """Callable turning this column's values into the cell value"""
+        if self.format is not None:
+            return self.format
+        if self.display:
+            choices = {key: str(label) for key, label in _resolve_field(model, self.fields[0]).flatchoices}
+            return lambda value: choices.get(value, value)
+        if len(self.fields) > 1:
+            return join_names
+        return lambda value: value
+
+
+def _resolve_field(model, path: str):
+    """Model field at the end of a ``values_list`` path such as ``section__name``"""
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def export_header(columns: Sequence[Column]) -> List[str]:
+    return [column.header for column in columns]
+
+
+def export_rows(queryset, columns: Sequence[Column], chunk_size: Optional[int] = None) -> Iterator[list]:
+    """
+    Rows of ``queryset`` for ``columns``, read in chunks from a single
+    ``values_list`` query
+    """
+    fields = []
+    for column in columns:
+        fields.extend(field for field in column.fields if field not in fields)
+    plan = [
+        (column.formatter(queryset.model), [fields.index(field) for field in column.fields])
+        for column in columns
+    ]
+    values = queryset.values_list(*fields).iterator(chunk_size=chunk_size or export_settings()['CHUNK_SIZE'])
+    for row in values:
+        yield [cell_value(render(*(row[index] for index in indexes))) for render, indexes in plan]
+
+
+# ---------------- stored exports ----------------
+
+def export_path(filename: str, schema: Optional[str] = None) -> str:
+    """Storage path of a new export, in a directory of its own"""
+    config = export_settings()
+    return f"{config['STORAGE_DIR']}/{schema or 'public'}/{uuid.uuid4().hex}/{filename}"
+
+
+def save_export(path: str, header: Sequence, rows: Iterable[Sequence], export_format: str,
+                title: str = 'Export', progress: Optional[Callable[[int], None]] = None):
+    """
+    Write ``rows`` to ``path`` in ``default_storage`` as CSV or XLSX;
+    returns (stored path, row count). ``progress`` is called with the
+    number of rows written after every chunk.
+    """
+    if export_format not in EXPORT_CONTENT_TYPES:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    chunk_size = export_settings()['CHUNK_SIZE']
+    written = 0
+
+    def counted():
+        nonlocal written
+        for row in rows:
+            yield row
+            written += 1
+            if progress is not None and written % chunk_size == 0:
+                progress(written)
+
+    with tempfile.TemporaryFile() as fileobj:
+        if export_format == 'csv':
+            # utf-8-sig so Excel opens non-ASCII names correctly
+            text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+            writer = csv.writer(text)
+            writer.writerow(header)
+            writer.writerows(counted())
+            text.flush()
+            text.detach()
+        else:
+            write_xlsx(fileobj, header, counted(), title=title)
+        fileobj.seek(0)
+        stored = default_storage.save(path, File(fileobj, name=path.rsplit('/', 1)[-1]))
+
+    if progress is not None:
+        progress(written)
+    return stored, written
+
+
+def download_token(path: str, user_id) -> str:
+    """Signed, expiring token allowing ``user_id`` to download ``path``"""
+    return signing.dumps({'path': path, 'user': str(user_id)}, salt=_TOKEN_SALT, compress=True)
+
+
+def read_download_token(token: str, user_id) -> str:
+    """
+    Path of the export behind ``token``; raises signing.BadSignature
+    (SignatureExpired once TOKEN_MAX_AGE has passed) for a token that is
+    invalid, expired or issued to another user
+    """
+    data = signing.loads(token, salt=_TOKEN_SALT, max_age=export_settings()['TOKEN_MAX_AGE'])
+    if data.get('user') != str(user_id):
+        raise signing.BadSignature('Export download token was issued to another user')
+    return data['path']
+
+
+def export_file_response(path: str) -> FileResponse:
+    """Stream a stored export as an attachment"""
+    filename = path.rsplit('/', 1)[-1]
+    extension = filename.rsplit('.', 1)[-1].lower()
+    return FileResponse(
+        default_storage.open(path, 'rb'), as_attachment=True, filename=filename,
+        content_type=EXPORT_CONTENT_TYPES.get(extension, 'application/octet-stream'),
+    )
+
+
+def delete_expired_exports(now=None) -> int:
+    """Delete stored exports older than RETENTION_HOURS; returns the files deleted"""
+    config = export_settings()
+    cutoff = (now or timezone.now()) - datetime.timedelta(hours=config['RETENTION_HOURS'])
+    if not default_storage.exists(config['STORAGE_DIR']):
+        return 0
+
+    deleted = 0
+    pending = [config['STORAGE_DIR']]
+    while pending:
+        directory = pending.pop()
+        directories, files = default_storage.listdir(directory)
+        pending.extend(f"{directory}/{name}" for name in directories)
+        for name in files:
+            path = f"{directory}/{name}"
+            if default_storage.get_modified_time(path) < cutoff:
+                default_storage.delete(path)
+                deleted += 1
+    return deleted
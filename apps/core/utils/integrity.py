@@ -0,0 +1,272 @@
+# apps/core/utils/integrity.py
+"""
+Data integrity signatures for CryptographicModel rows
+
+A signature is the SHA-256 of a canonical encoding of the row's signed
+fields. The field list and one encoder per field are resolved once per
+model, so signing is a tuple walk instead of a JSON serialization, and
+verification can hash values_list() rows without building instances.
+
+Timestamps and the rate-limit counters are not signed: Django sets
+auto_now fields after save() computed the signature, and the counters
+are bumped with update_fields on every API request. Search documents
+are derived data, rewritten with bulk_update by apps.core.utils.search.
+"""
+
+import json
+import uuid
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+DEFAULT_DATA_INTEGRITY = {
+    # 'save': sign in save()/bulk_create(); 'deferred': leave the signature
+    # blank and let the sign_pending_records task fill it in
+    'SIGNING': 'save',
+    'BATCH_SIZE': 2000,
+}
+
+UNSIGNED_FIELDS = frozenset({
+    'data_signature',
+    'encryption_version',
+    'created_at',
+    'updated_at',
+    'request_count',
+    'last_request_at',
+    'search_document',
+    'search_vector',
+})
+
+_NULL = '\x00'
+_SEPARATOR = '\x1f'
+
+
+def integrity_settings():
+    config = dict(DEFAULT_DATA_INTEGRITY)
+    config.update(getattr(settings, 'DATA_INTEGRITY', {}))
+    return config
+
+
+def signing_deferred() -> bool:
+    return integrity_settings()['SIGNING'] == 'deferred'
+
+
+# ---------------- encoders ----------------
+
+def _encode_datetime(value):
+    if isinstance(value, str):
+        value = models.DateTimeField().to_python(value)
+    if isinstance(value, datetime):
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value.astimezone(dt_timezone.utc).isoformat()
+    return value.isoformat()
+
+
+def _encode_temporal(field):
+    def encode(value):
+        if isinstance(value, str):
+            value = field.to_python(value)
+        return value.isoformat()
+    return encode
+
+
+def _encode_decimal(field):
+    exponent = Decimal(1).scaleb(-(field.decimal_places or 0))
+
+    def encode(value):
+        value = value if isinstance(value, Decimal) else Decimal(str(value))
+        return format(value.quantize(exponent), 'f')
+    return encode
+
+
+def _encode_json(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def _encode_bool(value):
+    return '1' if value else '0'
+
+
+def _encode_float(value):
+    return repr(float(value))
+
+
+def _encode_int(value):
+    return str(int(value))
+
+
+def _encode_file(value):
+    return getattr(value, 'name', value) or ''
+
+
+def _encode_uuid(value):
+    return str(value if isinstance(value, uuid.UUID) else uuid.UUID(str(value)))
+
+
+def _encoder_for(field) -> Callable:
+    if field.is_relation:
+        # Foreign keys are signed by their raw value
+        field = field.target_field
+    if isinstance(field, models.UUIDField):
+        return _encode_uuid
+    if isinstance(field, models.DateTimeField):
+        return _encode_datetime
+    if isinstance(field, (models.DateField, models.TimeField)):
+        return _encode_temporal(field)
+    if isinstance(field, models.DecimalField):
+        return _encode_decimal(field)
+    if isinstance(field, models.JSONField):
+        return _encode_json
+    if isinstance(field, models.BooleanField):
+        return _encode_bool
+    if isinstance(field, models.FloatField):
+        return _encode_float
+    if isinstance(field, models.IntegerField):
+        return _encode_int
+    if isinstance(field, models.FileField):
+        return _encode_file
+    return str
+
+
+# ---------------- per-model plan ----------------
+
+class SignaturePlan:
+    """The signed fields of one model, in a fixed order, with their encoders"""
+
+    __slots__ = ('label', 'attnames', 'names', 'encoders')
+
+    def __init__(self, model):
+        fields = sorted(
+            (
+                field for field in model._meta.concrete_fields
+                if field.name not in UNSIGNED_FIELDS
+            ),
+            key=lambda field: field.attname,
+        )
+        self.label = model._meta.label_lower
+        self.attnames = tuple(field.attname for field in fields)
+        self.names = frozenset(field.name for field in fields) | frozenset(self.attnames)
+        self.encoders = tuple(_encoder_for(field) for field in fields)
+
+    def digest(self, values: Sequence) -> str:
+        """Signature of the signed field values, in ``attnames`` order"""
+        parts = [self.label]
+        for encode, value in zip(self.encoders, values):
+            parts.append(_NULL if value is None else encode(value))
+        return hashlib.sha256(_SEPARATOR.join(parts).encode()).hexdigest()
+
+    def sign(self, obj) -> str:
+        values = obj.__dict__
+        # getattr() only for deferred fields, which it loads
+        return self.digest([
+            values[attname] if attname in values else getattr(obj, attname)
+            for attname in self.attnames
+        ])
+
+    def touches(self, update_fields: Optional[Iterable[str]]) -> bool:
+        """Whether a save with these update_fields changes signed data"""
+        return update_fields is None or not self.names.isdisjoint(update_fields)
+
+
+_plans: Dict[type, SignaturePlan] = {}
+
+
+def signature_plan(model) -> SignaturePlan:
+    model = model._meta.concrete_model
+    plan = _plans.get(model)
+    if plan is None:
+        plan = _plans[model] = SignaturePlan(model)
+    return plan
+
+
+# ---------------- signing ----------------
+
+def compute_signature(obj) -> str:
+    return signature_plan(type(obj)).sign(obj)
+
+
+def sign_for_save(obj, update_fields=None) -> Optional[FrozenSet[str]]:
+    """
+    Refresh ``obj.data_signature`` ahead of save(); returns the
+    update_fields to save with (unchanged when the save touches no signed
+    field)
+    """
+    plan = signature_plan(type(obj))
+    if not plan.touches(update_fields):
+        return update_fields
+    obj.data_signature = '' if signing_deferred() else plan.sign(obj)
+    if update_fields is not None:
+        update_fields = frozenset(update_fields) | {'data_signature'}
+    return update_fields
+
+
+def sign_objects(objs: Iterable) -> None:
+    """Sign instances about to be bulk created"""
+    if signing_deferred():
+        return
+    for obj in objs:
+        obj.data_signature = signature_plan(type(obj)).sign(obj)
+
+
+def resign_rows(queryset, batch_size: int = 2000) -> int:
+    """
+    Re-sign the rows of ``queryset`` after a queryset update() changed
+    their signed fields: one read and one bulk UPDATE per batch. While
+    signing is deferred the signatures are blanked for
+    sign_pending_records instead.
+    """
+    model = queryset.model
+    if signing_deferred():
+        return queryset.update(data_signature='')
+
+    plan = signature_plan(model)
+    rows = queryset.order_by().values_list('pk', *plan.attnames)
+    batch, signed = [], 0
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(model(pk=row[0], data_signature=plan.digest(row[1:])))
+        if len(batch) >= batch_size:
+            model._base_manager.bulk_update(batch, ['data_signature'])
+            signed += len(batch)
+            batch = []
+    if batch:
+        model._base_manager.bulk_update(batch, ['data_signature'])
+        signed += len(batch)
+    return signed
+
+
+def is_signed_model(model) -> bool:
+    return any(field.name == 'data_signature' for field in model._meta.concrete_fields)
+
+
+# ---------------- verification ----------------
+
+def iter_signatures(queryset, chunk_size: int = 2000) -> Iterable[Tuple[object, str, str]]:
+    """Stream (pk, stored, expected) for every row of ``queryset``"""
+    plan = signature_plan(queryset.model)
+    rows = queryset.order_by().values_list('pk', 'data_signature', *plan.attnames)
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield row[0], row[1], plan.digest(row[2:])
+
+
+def sign_pending(queryset, batch_size: int = 2000) -> int:
+    """
+    Fill in blank signatures of ``queryset``'s rows. A row saved again
+    after it was read keeps its blank signature for the next run.
+    """
+    model = queryset.model
+    plan = signature_plan(model)
+    rows = queryset.filter(data_signature='').order_by().values_list(
+        'pk', 'updated_at', *plan.attnames
+    )
+    signed = 0
+    for row in rows.iterator(chunk_size=batch_size):
+        signed += model._base_manager.filter(
+            pk=row[0], updated_at=row[1], data_signature=''
+        ).update(data_signature=plan.digest(row[2:]))
+    return signed
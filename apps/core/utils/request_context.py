@@ -0,0 +1,121 @@
+# apps/core/utils/request_context.py
+import logging
+from functools import partial
+
+from django.utils.functional import SimpleLazyObject
+from django_tenants.utils import get_public_schema_name
+
+from apps.core.utils.tenant import get_current_tenant
+
+logger = logging.getLogger(__name__)
+
+# Module access flags shown in navigation, as (module, permission)
+MODULE_PERMISSIONS = (
+    ('academics', 'academics.view_course'),
+    ('finance', 'finance.view_finance'),
+    ('library', 'library.view_book'),
+    ('reports', 'reports.view_report'),
+    ('settings', 'settings.change_settings'),
+    ('inventory', 'inventory.view_item'),
+)
+
+
+class RequestContext:
+    """
+    Values the context processors expose, computed once per request.
+
+    Context processors hand templates lazy() proxies, so a value is only
+    computed when a template actually reads it, and every render during
+    the request shares the result.
+    """
+
+    REQUEST_ATTR = '_request_context'
+
+    def __init__(self, request):
+        self.request = request
+        self._values = {}
+
+    @classmethod
+    def for_request(cls, request):
+        context = getattr(request, cls.REQUEST_ATTR, None)
+        if context is None:
+            context = cls(request)
+            setattr(request, cls.REQUEST_ATTR, context)
+        return context
+
+    def get(self, name):
+        if name not in self._values:
+            self._values[name] = getattr(self, f'_compute_{name}')()
+        return self._values[name]
+
+    def lazy(self, name):
+        return SimpleLazyObject(partial(self.get, name))
+
+    # ---------------- tenant ----------------
+
+    @property
+    def tenant(self):
+        if 'tenant' not in self._values:
+            self._values['tenant'] = getattr(self.request, 'tenant', None) or get_current_tenant()
+        return self._values['tenant']
+
+    @property
+    def is_public(self):
+        tenant = self.tenant
+        return not tenant or tenant.schema_name == get_public_schema_name()
+
+    def _compute_user_count(self):
+        tenant = self.tenant
+        return tenant.get_user_count() if hasattr(tenant, 'get_user_count') else 0
+
+    def _compute_can_add_users(self):
+        return self.get('user_count') < self.tenant.max_users
+
+    # ---------------- user ----------------
+
+    @property
+    def user(self):
+        return self.request.user
+
+    def _compute_permissions(self):
+        try:
+            return self.user.get_all_permissions()
+        except Exception:
+            return set()
+
+    def _compute_can_access(self):
+        # has_perm() reads the permission cache filled by get_all_permissions()
+        try:
+            return {module: self.user.has_perm(perm) for module, perm in MODULE_PERMISSIONS}
+        except Exception:
+            return {}
+
+    # ---------------- notifications ----------------
+
+    def _compute_unread_notifications_count(self):
+        from apps.communications.utils.notification_cache import notification_bell_cache
+
+        try:
+            return notification_bell_cache.unread_count(self.user)
+        except Exception as e:
+            logger.debug(f"Unread notification count unavailable: {e}")
+            return 0
+
+    def _compute_header_notifications(self):
+        from apps.communications.utils.notification_cache import notification_bell_cache
+
+        try:
+            return notification_bell_cache.header_notifications(self.user)
+        except Exception as e:
+            logger.debug(f"Header notifications unavailable: {e}")
+            return []
+
+    def _compute_cart_items_count(self):
+        configuration = getattr(self.tenant, 'configuration', None)
+        if not getattr(configuration, 'enable_store', False):
+            return 0
+        try:
+            from apps.store.models import Cart
+            return Cart.objects.filter(user=self.user).count()
+        except Exception:
+            return 0
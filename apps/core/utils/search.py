@@ -0,0 +1,188 @@
+# apps/core/utils/search.py
+"""
+Ranked search over denormalized search documents
+
+Indexed models carry a ``search_document`` (the lower-cased text of the
+fields people search by, including related rows such as a student's
+guardians) and a ``search_vector`` (its tsvector). On Postgres both have
+GIN indexes, a tsvector one for prefix matches and a pg_trgm one for
+fuzzy matches, so a search is an index lookup instead of a sequential
+scan of ``icontains`` predicates across joins.
+
+A query matches rows whose document contains every term as a word
+prefix ("ada lov" finds "Ada Lovelace"), or whose document is
+trigram-similar to the query (misspellings); rows are ranked by both.
+Other databases fall back to substring matching on the document.
+
+Documents are rebuilt set-based by ``search_index.refresh`` from the
+signal handlers of the indexed models and by ``rebuild_search_index``.
+"""
+
+import re
+import logging
+from typing import Dict, Iterable, List
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q, Value
+
+DEFAULT_SEARCH_INDEX = {
+    'CONFIG': 'simple',  # text search configuration; names are not stemmed
+    'BATCH_SIZE': 1000,  # documents rebuilt per query
+    'MIN_QUERY_LENGTH': 2,
+}
+
+# Indexed model -> fields of the document and of related rows,
+# (model, foreign key to the indexed model, fields)
+SEARCH_DOCUMENTS = {
+    'students.Student': {
+        'fields': (
+            'first_name', 'middle_name', 'last_name', 'admission_number', 'reg_no',
+            'personal_email', 'institutional_email', 'mobile_primary',
+        ),
+        'related': (('students.Guardian', 'student_id', ('full_name', 'phone_primary')),),
+    },
+    'hr.Staff': {
+        'fields': (
+            'employee_id', 'user__first_name', 'user__last_name', 'user__email',
+            'personal_email', 'personal_phone',
+        ),
+        'related': (),
+    },
+}
+
+logger = logging.getLogger(__name__)
+
+_TERM = re.compile(r'[\w@.+]+(?:-[\w@.+]+)*')
+_PHONE = re.compile(r'\+?[\d\s\-().]{6,}')
+
+
+def _search_settings():
+    config = dict(DEFAULT_SEARCH_INDEX)
+    config.update(getattr(settings, 'SEARCH_INDEX', {}))
+    return config
+
+
+def search_terms(query: str) -> List[str]:
+    """Lower-cased words of ``query``, without tsquery operators"""
+    return [term.strip('.+') for term in _TERM.findall((query or '').lower()) if term.strip('.+')]
+
+
+def build_document(values: Iterable) -> str:
+    """
+    Search document of one row: its non-empty values, lower-cased, with
+    the digits of phone numbers added so "98765" matches "+91 98765..."
+    """
+    words = []
+    for value in values:
+        value = ' '.join(str(value or '').lower().split())
+        if not value:
+            continue
+        words.append(value)
+        if _PHONE.fullmatch(value) and not value.isdigit():
+            words.append(re.sub(r'\D', '', value))
+    return ' '.join(words)
+
+
+def search_state(instance) -> tuple:
+    """Values of the instance's own indexed fields, to detect changes"""
+    fields = SEARCH_DOCUMENTS[instance._meta.label]['fields']
+    return tuple(instance.__dict__.get(field) for field in fields if '__' not in field)
+
+
+class SearchIndexService:
+    """Maintains and queries search documents; the singleton is ``search_index``"""
+
+    def __init__(self, config=None):
+        self.config = config or _search_settings()
+
+    @staticmethod
+    def is_indexed(model) -> bool:
+        return model._meta.label in SEARCH_DOCUMENTS
+
+    # ---------------- maintenance ----------------
+
+    def documents(self, model, pks) -> Dict:
+        """{pk: document} of ``pks``, in one query per source model"""
+        definition = SEARCH_DOCUMENTS[model._meta.label]
+        parts = {
+            row[0]: list(row[1:])
+            for row in model._base_manager.filter(pk__in=pks).values_list('pk', *definition['fields'])
+        }
+        for label, foreign_key, fields in definition['related']:
+            related = apps.get_model(label)._base_manager.filter(**{f'{foreign_key}__in': list(parts)})
+            if any(field.name == 'is_active' for field in related.model._meta.concrete_fields):
+                related = related.filter(is_active=True)
+            for row in related.order_by().values_list(foreign_key, *fields):
+                parts[row[0]].extend(row[1:])
+        return {pk: build_document(values) for pk, values in parts.items()}
+
+    def refresh_on_commit(self, model, pks) -> None:
+        """Refresh ``pks`` once the current transaction commits"""
+        pks = list(pks)
+        if not pks:
+            return
+
+        def refresh():
+            try:
+                self.refresh(model, pks)
+            except Exception as e:
+                logger.error(f"Failed to refresh {model._meta.label} search documents: {e}", exc_info=True)
+
+        transaction.on_commit(refresh)
+
+    def refresh(self, model, pks) -> int:
+        """Rebuild the documents (and vectors) of ``pks``"""
+        pks = list(pks)
+        refreshed = 0
+        for start in range(0, len(pks), self.config['BATCH_SIZE']):
+            documents = self.documents(model, pks[start:start + self.config['BATCH_SIZE']])
+            rows = [model(pk=pk, search_document=document) for pk, document in documents.items()]
+            model._base_manager.bulk_update(rows, ['search_document'])
+            self._update_vectors(model._base_manager.filter(pk__in=list(documents)))
+            refreshed += len(rows)
+        return refreshed
+
+    def rebuild(self, queryset) -> int:
+        """Rebuild the documents of every row of ``queryset``"""
+        pks = queryset.order_by().values_list('pk', flat=True)
+        return self.refresh(queryset.model, list(pks.iterator(chunk_size=self.config['BATCH_SIZE'])))
+
+    def _update_vectors(self, queryset) -> None:
+        if connections[queryset.db].vendor != 'postgresql':
+            return
+        from django.contrib.postgres.search import SearchVector
+
+        queryset.update(search_vector=SearchVector('search_document', config=self.config['CONFIG']))
+
+    # ---------------- queries ----------------
+
+    def search(self, queryset, query: str):
+        """
+        Rows of ``queryset`` matching ``query``, best first on Postgres,
+        annotated with ``search_rank``; no rows for a too short query
+        """
+        terms = search_terms(query)
+        if not terms or len(' '.join(terms)) < self.config['MIN_QUERY_LENGTH']:
+            return queryset.none()
+
+        if connections[queryset.db].vendor != 'postgresql':
+            for term in terms:
+                queryset = queryset.filter(search_document__contains=term)
+            return queryset.annotate(search_rank=Value(0.0))
+
+        from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+
+        text = ' '.join(terms)
+        tsquery = SearchQuery(
+            ' & '.join(f"'{term}':*" for term in terms), search_type='raw', config=self.config['CONFIG'],
+        )
+        return queryset.filter(
+            Q(search_vector=tsquery) | Q(search_document__trigram_word_similar=text)
+        ).annotate(
+            search_rank=SearchRank(F('search_vector'), tsquery) + TrigramWordSimilarity(text, 'search_document')
+        ).order_by('-search_rank')
+
+
+search_index = SearchIndexService()
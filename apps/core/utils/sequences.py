@@ -0,0 +1,178 @@
+# apps/core/utils/sequences.py
+"""
+Document numbers from per-tenant counters
+
+Admission, invoice, payment and the other document numbers are a prefix
+("INV-2024-") followed by a counter. Each (tenant, kind, prefix) has one
+DocumentSequence row, and a number is issued with a single
+``UPDATE ... SET last_value = last_value + n RETURNING last_value``. The
+row lock serializes concurrent writers without scanning the document
+table, and a number taken inside a transaction that rolls back is
+handed out again.
+
+The first number of a new prefix seeds the counter from the highest
+number already issued, so counters pick up where the old
+scan-and-increment generators stopped.
+
+Templates are str.format strings with a ``{seq}`` field, e.g.
+``'PAY-{year}-{schema}-{seq:05d}'``; ``year`` and ``schema`` (the upper
+case tenant schema) are always available, other fields are passed by
+the caller. Templates can be overridden per kind through
+``settings.DOCUMENT_SEQUENCES['TEMPLATES']``.
+"""
+
+from typing import Callable, List
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+DEFAULT_DOCUMENT_SEQUENCES = {
+    'TEMPLATES': {
+        'admission': 'ADM-{year}-{schema}-{seq:04d}',
+        'registration': 'REG-{year}-{seq:06d}',
+        'invoice': '{prefix}-{year}-{seq:05d}',
+        'payment': 'PAY-{year}-{schema}-{seq:05d}',
+        'refund': 'REF-{year}-{schema}-{seq:05d}',
+        'expense': 'EXP-{year}-{schema}-{seq:05d}',
+        'book_issue': 'LIB-{year}-{schema}-{seq:05d}',
+        'purchase_order': 'PO-{year}-{schema}-{seq:05d}',
+        'issue_request': 'ISS-{year}-{schema}-{seq:05d}',
+        'application': 'APP-{cycle}-{seq:05d}',
+    },
+}
+
+# Kind -> (model, field) holding the numbers, to seed new counters
+SEQUENCE_SOURCES = {
+    'admission': ('students.Student', 'admission_number'),
+    'registration': ('students.Student', 'reg_no'),
+    'invoice': ('finance.Invoice', 'invoice_number'),
+    'payment': ('finance.Payment', 'payment_number'),
+    'refund': ('finance.Refund', 'refund_number'),
+    'expense': ('finance.Expense', 'expense_number'),
+    'book_issue': ('library.BookIssue', 'issue_number'),
+    'purchase_order': ('inventory.PurchaseOrder', 'po_number'),
+    'issue_request': ('inventory.IssueRequest', 'issue_number'),
+    'application': ('admission.OnlineApplication', 'application_number'),
+}
+
+
+def _sequence_settings():
+    config = getattr(settings, 'DOCUMENT_SEQUENCES', {})
+    return {
+        'TEMPLATES': {**DEFAULT_DOCUMENT_SEQUENCES['TEMPLATES'], **config.get('TEMPLATES', {})},
+    }
+
+
+def split_template(template: str):
+    """(prefix template, full template); the prefix is everything before {seq}"""
+    index = template.find('{seq')
+    if index < 0:
+        raise ValueError(f"Document number template {template!r} has no {{seq}} field")
+    return template[:index], template
+
+
+def highest_issued(values, prefix: str) -> int:
+    """Highest counter among numbers starting with ``prefix``"""
+    highest = 0
+    for value in values:
+        digits = ''
+        for char in (value or '')[len(prefix):]:
+            if not char.isdigit():
+                break
+            digits += char
+        if digits:
+            highest = max(highest, int(digits))
+    return highest
+
+
+class DocumentSequenceService:
+    """Issues document numbers; the singleton is ``sequences``"""
+
+    def __init__(self, config=None):
+        self.config = config or _sequence_settings()
+
+    # ---------------- public API ----------------
+
+    def next_number(self, kind: str, tenant, start: int = 1, **context) -> str:
+        """The next number of ``kind``"""
+        return self.reserve(kind, tenant, 1, start=start, **context)[0]
+
+    def reserve(self, kind: str, tenant, count: int, start: int = 1, **context) -> List[str]:
+        """
+        ``count`` consecutive numbers of ``kind`` in one statement, for
+        bulk jobs; ``start`` is the first number of a new prefix
+        """
+        if count < 1:
+            return []
+        prefix_template, template = split_template(self.config['TEMPLATES'][kind])
+        context = self._context(tenant, context)
+        prefix = prefix_template.format(**context)
+
+        def seed():
+            return max(self._highest_issued(kind, tenant, prefix), start - 1)
+
+        last = self._allocate(tenant, kind, prefix, count, seed)
+        return [template.format(seq=value, **context) for value in range(last - count + 1, last + 1)]
+
+    def prefix(self, kind: str, tenant, **context) -> str:
+        prefix_template, _ = split_template(self.config['TEMPLATES'][kind])
+        return prefix_template.format(**self._context(tenant, context))
+
+    # ---------------- counters ----------------
+
+    @staticmethod
+    def _context(tenant, context):
+        context = dict(context)
+        if context.get('year') is None:
+            context['year'] = timezone.now().year
+        if tenant is not None:
+            context.setdefault('schema', tenant.schema_name.upper())
+        return context
+
+    @staticmethod
+    def _highest_issued(kind: str, tenant, prefix: str) -> int:
+        label, field = SEQUENCE_SOURCES[kind]
+        model = apps.get_model(label)
+        numbers = model._base_manager.filter(**{f'{field}__startswith': prefix})
+        if tenant is not None:
+            numbers = numbers.filter(tenant=tenant)
+        return highest_issued(numbers.values_list(field, flat=True).iterator(), prefix)
+
+    @staticmethod
+    def _allocate(tenant, kind: str, prefix: str, count: int, seed: Callable[[], int]) -> int:
+        """
+        Advance the counter by ``count`` and return its new value. Without
+        a tenant there is no counter to lock, and the numbers follow the
+        highest one issued.
+        """
+        if tenant is None:
+            return seed() + count
+
+        from apps.core.models import DocumentSequence
+
+        table = connection.ops.quote_name(DocumentSequence._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET last_value = last_value + %s, updated_at = CURRENT_TIMESTAMP "
+                f"WHERE tenant_id = %s AND kind = %s AND prefix = %s RETURNING last_value",
+                [count, tenant.pk, kind, prefix],
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                return row[0]
+
+            # First number of this prefix; a writer that seeded it first wins
+            cursor.execute(
+                f"INSERT INTO {table} (tenant_id, kind, prefix, last_value, updated_at) "
+                f"VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP) "
+                f"ON CONFLICT (tenant_id, kind, prefix) DO UPDATE "
+                f"SET last_value = {table}.last_value + %s, updated_at = CURRENT_TIMESTAMP "
+                f"RETURNING last_value",
+                [tenant.pk, kind, prefix, seed() + count, count],
+            )
+            return cursor.fetchone()[0]
+
+
+sequences = DocumentSequenceService()
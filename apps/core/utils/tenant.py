@@ -1,56 +1,76 @@
 # apps/core/utils/tenant.py
-import threading
 from contextlib import contextmanager
+from contextvars import ContextVar
 from django.db import connection
 from django.contrib.auth import get_user_model
 
-# Thread-local storage for tenant context
-_thread_locals = threading.local()
+# Current tenant and user. ContextVars rather than thread-locals: each
+# request (ASGI task or WSGI thread) and each Celery task gets its own
+# value, and sync_to_async/async_to_sync carry them across the boundary.
+#
+# current_tenant is read on every tenant-filtered queryset, so managers bind
+# to the variable itself (see apps.core.managers) instead of calling
+# get_current_tenant().
+current_tenant = ContextVar('current_tenant', default=None)
+current_user = ContextVar('current_user', default=None)
 
 
 def set_current_tenant(tenant):
     """
-    Set the current tenant in thread-local storage
+    Set the current tenant for this context
     """
-    _thread_locals.tenant = tenant
+    current_tenant.set(tenant)
 
 
 def get_current_tenant():
     """
-    Get the current tenant from thread-local storage
+    Get the current tenant of this context
     """
-    return getattr(_thread_locals, 'tenant', None)
+    return current_tenant.get()
 
 
 def clear_tenant():
     """
-    Clear tenant from thread-local storage
+    Clear the current tenant of this context
     """
-    if hasattr(_thread_locals, 'tenant'):
-        delattr(_thread_locals, 'tenant')
+    current_tenant.set(None)
 
 
-# Add user-related thread-local storage functions
 def set_current_user(user):
     """
-    Set the current user in thread-local storage
+    Set the current user for this context
     """
-    _thread_locals.user = user
+    current_user.set(user)
 
 
 def get_current_user():
     """
-    Get the current user from thread-local storage
+    Get the current user of this context
     """
-    return getattr(_thread_locals, 'user', None)
+    return current_user.get()
 
 
 def clear_user():
     """
-    Clear user from thread-local storage
+    Clear the current user of this context
     """
-    if hasattr(_thread_locals, 'user'):
-        delattr(_thread_locals, 'user')
+    current_user.set(None)
+
+
+def snapshot_context():
+    """
+    Current (tenant, user) pair, for restore_context()
+    """
+    return current_tenant.get(), current_user.get()
+
+
+def restore_context(snapshot):
+    """
+    Re-apply a (tenant, user) pair taken with snapshot_context()
+    """
+    tenant, user = snapshot
+    current_tenant.set(tenant)
+    current_user.set(user)
 
 
 @contextmanager
@@ -58,12 +78,11 @@ def tenant_context(tenant):
     """
     Context manager for temporary tenant switching
     """
-    old_tenant = get_current_tenant()
-    set_current_tenant(tenant)
+    token = current_tenant.set(tenant)
     try:
         yield
     finally:
-        set_current_tenant(old_tenant)
+        current_tenant.reset(token)
 
 
 @contextmanager
@@ -71,12 +90,11 @@ def user_context(user):
     """
     Context manager for temporary user switching
     """
-    old_user = get_current_user()
-    set_current_user(user)
+    token = current_user.set(user)
     try:
         yield
     finally:
-        set_current_user(old_user)
+        current_user.reset(token)
 
 
 def get_tenant_schema(tenant):
@@ -85,4 +103,4 @@ def get_tenant_schema(tenant):
     """
     if hasattr(tenant, 'schema_name'):
         return tenant.schema_name
-    return 'public'
\ No newline at end of file
+    return 'public'
@@ -0,0 +1,215 @@
+# apps/core/utils/tenant_cache.py
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# Sentinel stored for lookups that resolved to no tenant, so that repeated
+# misses (e.g. path segments that are not tenant slugs) don't hit Postgres.
+_NOT_FOUND = '__tenant_not_found__'
+
+DEFAULT_TENANT_RESOLUTION_CACHE = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'tenant_resolution',
+    'LOCAL_MAX_ENTRIES': 1024,
+    'LOCAL_TTL': 30,        # seconds; bounds cross-process staleness
+    'SHARED_TTL': 300,      # seconds
+    'NEGATIVE_TTL': 30,     # seconds; TTL for "no tenant" results
+}
+
+
+class TenantResolutionCache:
+    """
+    Two-tier cache mapping request identifiers (host, slug, id) to a
+    resolved tenant.
+
+    Tier 1 is a per-process LRU with a TTL, tier 2 is the shared Django
+    cache (Redis). Shared entries are namespaced by a generation counter
+    which is bumped on invalidation, so every process drops stale entries
+    on its next tier-1 miss; tier-1 entries live at most LOCAL_TTL seconds.
+    """
+
+    def __init__(self, config=None):
+        self._config_override = config
+        self._config = None
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'local_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'invalidations': 0,
+        }
+
+    # ---------------- configuration ----------------
+
+    @property
+    def config(self):
+        if self._config is None:
+            config = dict(DEFAULT_TENANT_RESOLUTION_CACHE)
+            config.update(
+                self._config_override if self._config_override is not None
+                else getattr(settings, 'TENANT_RESOLUTION_CACHE', {})
+            )
+            self._config = config
+        return self._config
+
+    @property
+    def enabled(self):
+        return self.config['ENABLED']
+
+    @property
+    def shared_cache(self):
+        return caches[self.config['CACHE_ALIAS']]
+
+    # ---------------- public API ----------------
+
+    def resolve(self, kind, value, loader):
+        """
+        Return the tenant for ``(kind, value)``, calling ``loader()`` on a
+        miss. ``loader`` must return a tenant instance or None.
+        """
+        if not value:
+            return None
+        if not self.enabled:
+            return loader()
+
+        # Case-sensitive, like the loader's lookup: folding case here would
+        # let "Foo" and "foo" share whichever result was loaded first
+        key = f"{kind}:{value}"
+
+        found, tenant = self._get_local(key)
+        if found:
+            self._incr('local_hits')
+            return tenant
+
+        generation = self._get_generation()
+        found, tenant = self._get_shared(key, generation)
+        if found:
+            self._incr('shared_hits')
+            self._set_local(key, tenant)
+            return tenant
+
+        self._incr('misses')
+        tenant = loader()
+        self._set_local(key, tenant)
+        self._set_shared(key, generation, tenant)
+        return tenant
+
+    def invalidate(self):
+        """
+        Drop every cached resolution in this process and bump the shared
+        generation so other processes stop reading the old entries.
+        """
+        with self._lock:
+            self._local.clear()
+            self._stats['invalidations'] += 1
+        try:
+            generation_key = self._generation_key()
+            try:
+                self.shared_cache.incr(generation_key)
+            except ValueError:
+                self.shared_cache.set(generation_key, 1, None)
+        except Exception as e:
+            logger.warning(f"Tenant resolution cache invalidation failed: {e}")
+
+    def stats(self):
+        """Return hit/miss counters for this process"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_entries'] = len(self._local)
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_ratio'] = (
+            (stats['local_hits'] + stats['shared_hits']) / lookups if lookups else 0.0
+        )
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    # ---------------- tier 1: per-process LRU ----------------
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return False, None
+            expires_at, tenant = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return False, None
+            self._local.move_to_end(key)
+            return True, tenant
+
+    def _set_local(self, key, tenant):
+        ttl = self.config['LOCAL_TTL'] if tenant is not None else min(
+            self.config['LOCAL_TTL'], self.config['NEGATIVE_TTL']
+        )
+        with self._lock:
+            self._local[key] = (time.monotonic() + ttl, tenant)
+            self._local.move_to_end(key)
+            while len(self._local) > self.config['LOCAL_MAX_ENTRIES']:
+                self._local.popitem(last=False)
+
+    # ---------------- tier 2: shared cache ----------------
+
+    def _generation_key(self):
+        return f"{self.config['KEY_PREFIX']}:generation"
+
+    def _get_generation(self):
+        try:
+            return self.shared_cache.get(self._generation_key(), 0)
+        except Exception:
+            return None
+
+    def _shared_key(self, key, generation):
+        return f"{self.config['KEY_PREFIX']}:{generation}:{key}"
+
+    def _get_shared(self, key, generation):
+        if generation is None:
+            return False, None
+        try:
+            value = self.shared_cache.get(self._shared_key(key, generation))
+        except Exception:
+            return False, None
+        if value is None:
+            return False, None
+        if value == _NOT_FOUND:
+            return True, None
+        return True, value
+
+    def _set_shared(self, key, generation, tenant):
+        if generation is None:
+            return
+        try:
+            if tenant is None:
+                self.shared_cache.set(
+                    self._shared_key(key, generation), _NOT_FOUND,
+                    self.config['NEGATIVE_TTL']
+                )
+            else:
+                self.shared_cache.set(
+                    self._shared_key(key, generation), tenant,
+                    self.config['SHARED_TTL']
+                )
+        except Exception as e:
+            logger.debug(f"Tenant resolution cache write failed: {e}")
+
+    def _incr(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+
+tenant_resolution_cache = TenantResolutionCache()
@@ -29,6 +29,9 @@ from apps.core.permissions.mixins import (
     TenantRequiredMixin,
 )
 from apps.core.services.audit_service import AuditService
+from apps.core.utils.exports import export_header, export_rows, export_settings
+from apps.core.utils.search import search_index
+from apps.core.utils.streaming import stream_csv, stream_xlsx
 from apps.core.utils.tenant import get_current_tenant
 
 # ===================== PROJECT MODELS =====================
@@ -141,7 +144,7 @@ class BaseView(TenantRequiredMixin, RoleBasedViewMixin, View):
             # Audit the request
             if self.audit_enabled and request.user.is_authenticated:
                 try:
-                    AuditService.create_audit_entry(
+                    AuditService.enqueue_audit_entry(
                         action=self.get_audit_action(),
                         resource_type=self.get_audit_resource_type(),
                         user=request.user,
@@ -382,9 +385,13 @@ class BaseListView(BaseView, ListView):
             # Field doesn't exist or is not a database field
             pass
         
-        # Apply search
+        # Apply search: indexed models use their search document, best match first
         search_query = self.request.GET.get('q', '')
-        if search_query and self.search_fields:
+        ordering = [self.ordering] if isinstance(self.ordering, str) else list(self.ordering or [])
+        if search_query and search_index.is_indexed(self.model):
+            queryset = search_index.search(queryset, search_query)
+            ordering.insert(0, '-search_rank')
+        elif search_query and self.search_fields:
             from django.db.models import Q
             search_q = Q()
             for field in self.search_fields:
@@ -392,8 +399,8 @@ class BaseListView(BaseView, ListView):
             queryset = queryset.filter(search_q)
         
         # Apply ordering
-        if self.ordering:
-            queryset = queryset.order_by(*self.ordering)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
         
         # Apply additional filtering
         queryset = self.apply_additional_filters(queryset)
@@ -975,62 +982,50 @@ class BaseAPIView(BaseView):
 class ExportMixin:
     """
     Mixin for adding export functionality to views
+
+    Views declare ``export_columns`` (``apps.core.utils.exports.Column``
+    specs) and the rows are read with a chunked ``values_list`` query and
+    streamed as CSV or write-only XLSX. Views overriding
+    get_export_headers/get_export_row instead are streamed the same way,
+    one model instance at a time.
     """
     
     export_formats = ['csv', 'excel', 'pdf']
     export_filename = 'export'
+    export_columns = None
+    export_chunk_size = None
     
     def get_export_queryset(self):
         """Get queryset for export"""
         return self.get_queryset()
     
+    def get_export_columns(self):
+        """Column specs of the export; None to use get_export_row"""
+        return self.export_columns
+    
+    def get_export_filename(self):
+        return self.export_filename
+    
+    def get_export_data(self):
+        """(header, lazily produced rows) of the export"""
+        columns = self.get_export_columns()
+        queryset = self.get_export_queryset()
+        chunk_size = self.export_chunk_size or export_settings()['CHUNK_SIZE']
+        if columns:
+            return export_header(columns), export_rows(queryset, columns, chunk_size)
+        
+        objects = queryset.iterator(chunk_size=chunk_size) if hasattr(queryset, 'iterator') else queryset
+        return self.get_export_headers(), (self.get_export_row(obj) for obj in objects)
+    
     def export_csv(self, request, *args, **kwargs):
         """Export data as CSV"""
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{self.export_filename}.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Write headers
-        headers = self.get_export_headers()
-        writer.writerow(headers)
-        
-        # Write data
-        for obj in self.get_export_queryset():
-            writer.writerow(self.get_export_row(obj))
-        
-        return response
+        headers, rows = self.get_export_data()
+        return stream_csv(f"{self.get_export_filename()}.csv", headers, rows)
     
     def export_excel(self, request, *args, **kwargs):
         """Export data as Excel"""
-        import openpyxl
-        from django.http import HttpResponse
-        
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Export"
-        
-        # Write headers
-        headers = self.get_export_headers()
-        for col_idx, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col_idx, value=header)
-        
-        # Write data
-        for row_idx, obj in enumerate(self.get_export_queryset(), 2):
-            row_data = self.get_export_row(obj)
-            for col_idx, value in enumerate(row_data, 1):
-                ws.cell(row=row_idx, column=col_idx, value=value)
-        
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{self.export_filename}.xlsx"'
-        wb.save(response)
-        
-        return response
+        headers, rows = self.get_export_data()
+        return stream_xlsx(f"{self.get_export_filename()}.xlsx", headers, rows)
     
     def get_export_headers(self):
         """Get headers for export"""
@@ -1046,7 +1041,7 @@ class ExportMixin:
         
         if export_format == 'csv':
             return self.export_csv(request, *args, **kwargs)
-        elif export_format == 'excel':
+        elif export_format in ('excel', 'xlsx'):
             return self.export_excel(request, *args, **kwargs)
         elif export_format == 'pdf':
             # Implement PDF export if needed
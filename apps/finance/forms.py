@@ -156,10 +156,18 @@ class InvoiceItemForm(TenantAwareModelForm):
             )
 
 
+class BaseInvoiceItemFormSet(forms.BaseInlineFormSet):
+    def delete_existing(self, obj, commit=True):
+        # Items are soft deleted, which requires a reason
+        if commit:
+            obj.delete(reason='Removed from the invoice', category='USER_REQUEST')
+
+
 InvoiceItemFormSet = forms.inlineformset_factory(
     Invoice,
     InvoiceItem,
     form=InvoiceItemForm,
+    formset=BaseInvoiceItemFormSet,
     extra=1,
     can_delete=True
 )
@@ -0,0 +1,34 @@
+# apps/finance/management/commands/refresh_receivables.py
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from apps.tenants.models import Tenant
+from apps.finance.utils.receivables import receivables
+
+
+class Command(BaseCommand):
+    help = 'Rebuild ReceivableBalance rows from the invoices'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema',
+            help='Only refresh this tenant schema (default: all active tenants)',
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.filter(is_active=True).exclude(
+            schema_name=get_public_schema_name()
+        )
+        if options['schema']:
+            tenants = tenants.filter(schema_name=options['schema'])
+            if not tenants.exists():
+                raise CommandError(f"No active tenant with schema {options['schema']}")
+
+        total = 0
+        for tenant in tenants:
+            with schema_context(tenant.schema_name):
+                written = receivables.refresh(tenant.pk)
+            self.stdout.write(f"{tenant.schema_name}: {written} receivable balances")
+            total += written
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {total} receivable balances'))
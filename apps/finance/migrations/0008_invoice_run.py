@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tenants', '0003_tenantconfiguration_audit_retention_days'),
+        ('finance', '0007_budgettemplateitem_template_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True, verbose_name='Universal ID')),
+                ('data_signature', models.CharField(blank=True, editable=False, max_length=64, verbose_name='Data Integrity Signature')),
+                ('encryption_version', models.CharField(default='v1', editable=False, max_length=10, verbose_name='Encryption Scheme Version')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Creation Timestamp')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='Last Modification Timestamp')),
+                ('is_active', models.BooleanField(db_index=True, default=True, help_text='False indicates the record has been soft deleted', verbose_name='Active Status')),
+                ('deleted_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Deletion Timestamp')),
+                ('deletion_reason', models.TextField(blank=True, help_text='Mandatory for compliance: Reason for record deletion', null=True, verbose_name='Deletion Justification')),
+                ('deletion_category', models.CharField(blank=True, choices=[('USER_REQUEST', 'User Request'), ('ADMIN_ACTION', 'Administrative Action'), ('SYSTEM_CLEANUP', 'System Cleanup'), ('COMPLIANCE', 'Compliance Requirement'), ('OTHER', 'Other')], max_length=50, null=True, verbose_name='Deletion Category')),
+                ('request_count', models.PositiveIntegerField(default=0, verbose_name='API Request Count')),
+                ('last_request_at', models.DateTimeField(blank=True, null=True, verbose_name='Last API Request')),
+                ('rate_limit_key', models.CharField(blank=True, editable=False, max_length=100, verbose_name='Rate Limit Identifier')),
+                ('billing_period', models.CharField(max_length=100, verbose_name='Billing Period')),
+                ('frequency', models.CharField(choices=[('ONE_TIME', 'One Time'), ('MONTHLY', 'Monthly'), ('QUARTERLY', 'Quarterly'), ('HALF_YEARLY', 'Half Yearly'), ('YEARLY', 'Yearly'), ('PER_TERM', 'Per Term')], default='MONTHLY', max_length=20, verbose_name='Fee Frequency')),
+                ('issue_date', models.DateField(default=django.utils.timezone.now, verbose_name='Issue Date')),
+                ('due_date', models.DateField(verbose_name='Due Date')),
+                ('apply_discounts', models.BooleanField(default=True, verbose_name='Apply Discounts')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20, verbose_name='Status')),
+                ('task_id', models.CharField(blank=True, max_length=255, verbose_name='Task ID')),
+                ('total_students', models.PositiveIntegerField(default=0, verbose_name='Students To Invoice')),
+                ('processed_students', models.PositiveIntegerField(default=0, verbose_name='Students Processed')),
+                ('skipped_students', models.PositiveIntegerField(default=0, verbose_name='Students Without Fees')),
+                ('invoices_created', models.PositiveIntegerField(default=0, verbose_name='Invoices Created')),
+                ('items_created', models.PositiveIntegerField(default=0, verbose_name='Items Created')),
+                ('discounts_applied', models.PositiveIntegerField(default=0, verbose_name='Discounts Applied')),
+                ('amount_billed', models.DecimalField(decimal_places=2, default=0.0, max_digits=14, verbose_name='Amount Billed')),
+                ('last_student_id', models.UUIDField(blank=True, null=True, verbose_name='Last Student Processed')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('elapsed_seconds', models.FloatField(default=0, verbose_name='Processing Time (s)')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('academic_year', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoice_runs', to='academics.academicyear', verbose_name='Academic Year')),
+                ('class_name', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoice_runs', to='academics.schoolclass', verbose_name='Class')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+                ('deleted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_deleted', to=settings.AUTH_USER_MODEL, verbose_name='Deleted By')),
+                ('tenant', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s_records', to='tenants.tenant', verbose_name='Owning Tenant')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Last Modified By')),
+            ],
+            options={
+                'verbose_name': 'Invoice Run',
+                'verbose_name_plural': 'Invoice Runs',
+                'db_table': 'finance_invoice_runs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='finance_inv_status_b00a06_idx'), models.Index(fields=['billing_period', 'frequency'], name='finance_inv_billing_6588bf_idx')],
+            },
+        ),
+    ]
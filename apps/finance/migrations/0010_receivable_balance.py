@@ -0,0 +1,126 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:11
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+import django.db.models.deletion
+import uuid
+
+# Frozen copy of apps.finance.utils.receivables as of this migration
+EXCLUDED_STATUSES = ('DRAFT', 'CANCELLED', 'REFUNDED')
+AGE_BUCKETS = {
+    'days_0_30': (0, 30),
+    'days_31_60': (31, 60),
+    'days_61_90': (61, 90),
+    'days_over_90': (91, None),
+}
+BALANCE_FIELDS = (
+    'invoiced', 'collected', 'outstanding', 'not_due', *AGE_BUCKETS,
+    'open_invoices', 'overdue_invoices',
+)
+
+
+def balance_aggregates(today):
+    owing = Q(due_amount__gt=0)
+    overdue = owing & Q(due_date__lt=today)
+    aggregates = {
+        'invoiced': Sum('total_amount'),
+        'collected': Sum('paid_amount'),
+        'outstanding': Sum('due_amount', filter=owing),
+        'not_due': Sum('due_amount', filter=owing & Q(due_date__gte=today)),
+        'open_invoices': Count('pk', filter=owing),
+        'overdue_invoices': Count('pk', filter=overdue),
+        'oldest_due_date': Min('due_date', filter=owing),
+    }
+    for field, (low, high) in AGE_BUCKETS.items():
+        bucket = overdue & Q(due_date__lte=today - timedelta(days=max(low, 1)))
+        if high is not None:
+            bucket &= Q(due_date__gte=today - timedelta(days=high))
+        aggregates[field] = Sum('due_amount', filter=bucket)
+    return aggregates
+
+
+def build_receivable_balances(apps, schema_editor):
+    # Runs once per tenant schema; the dashboard and due-fees report read
+    # these rows, so fill them now instead of waiting for the nightly refresh
+    Tenant = apps.get_model('tenants', 'Tenant')
+    Invoice = apps.get_model('finance', 'Invoice')
+    ReceivableBalance = apps.get_model('finance', 'ReceivableBalance')
+    alias = schema_editor.connection.alias
+    schema_name = getattr(schema_editor.connection, 'schema_name', None)
+    tenant_id = Tenant.objects.using(alias).filter(schema_name=schema_name).values_list('pk', flat=True).first()
+    if not tenant_id:
+        return
+
+    today = timezone.now().date()
+    rows = Invoice._base_manager.using(alias).filter(tenant_id=tenant_id, is_active=True).exclude(
+        status__in=EXCLUDED_STATUSES
+    ).order_by().values('student_id', 'student__current_class_id').annotate(**balance_aggregates(today))
+    ReceivableBalance.objects.using(alias).bulk_create(
+        [
+            ReceivableBalance(
+                tenant_id=tenant_id,
+                student_id=row['student_id'],
+                class_name_id=row['student__current_class_id'],
+                as_of=today,
+                oldest_due_date=row['oldest_due_date'],
+                **{field: row[field] or 0 for field in BALANCE_FIELDS},
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tenants', '0003_tenantconfiguration_audit_retention_days'),
+        ('students', '0003_search_document'),
+        ('finance', '0009_payment_reminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceivableBalance',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True, verbose_name='Universal ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Creation Timestamp')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='Last Modification Timestamp')),
+                ('invoiced', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Invoiced')),
+                ('collected', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Collected')),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Outstanding')),
+                ('not_due', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Not Yet Due')),
+                ('days_0_30', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='0-30 Days')),
+                ('days_31_60', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='31-60 Days')),
+                ('days_61_90', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='61-90 Days')),
+                ('days_over_90', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='90+ Days')),
+                ('open_invoices', models.PositiveIntegerField(default=0, verbose_name='Open Invoices')),
+                ('overdue_invoices', models.PositiveIntegerField(default=0, verbose_name='Overdue Invoices')),
+                ('oldest_due_date', models.DateField(blank=True, null=True, verbose_name='Oldest Due Date')),
+                ('as_of', models.DateField(verbose_name='Aged As Of')),
+                ('class_name', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='receivable_balances', to='academics.schoolclass', verbose_name='Class')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receivable_balances', to='students.student', verbose_name='Student')),
+                ('tenant', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s_records', to='tenants.tenant', verbose_name='Owning Tenant')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='Last Modified By')),
+            ],
+            options={
+                'verbose_name': 'Receivable Balance',
+                'verbose_name_plural': 'Receivable Balances',
+                'db_table': 'finance_receivable_balances',
+                'ordering': ['-outstanding'],
+                'indexes': [models.Index(fields=['tenant', 'class_name'], name='finance_rec_tenant__a77951_idx'), models.Index(fields=['tenant', 'outstanding'], name='finance_rec_tenant__124ec4_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='receivablebalance',
+            constraint=models.UniqueConstraint(fields=('tenant', 'student'), name='unique_receivable_balance_per_student'),
+        ),
+        migrations.RunPython(build_receivable_balances, migrations.RunPython.noop),
+    ]
@@ -6,7 +6,7 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from decimal import Decimal
 from django.utils.translation import gettext_lazy as _
-from apps.core.models import BaseModel
+from apps.core.models import BaseModel, UUIDModel, TimeStampedModel, TenantAwareModel
 
 
 class FeeStructure(BaseModel):
@@ -431,6 +431,13 @@ class Invoice(BaseModel):
         if not self.invoice_number:
             self.invoice_number = self.generate_invoice_number()
         
+        self.refresh_status()
+        super().save(*args, **kwargs)
+
+    def refresh_status(self, today=None):
+        """Set due amount, payment status and overdue days from the amounts"""
+        today = today or timezone.now().date()
+
         # Calculate due amount
         self.due_amount = self.total_amount - self.paid_amount
         
@@ -443,39 +450,26 @@ class Invoice(BaseModel):
             self.status = "PAID"
         
         # Check overdue status
-        if self.due_date < timezone.now().date() and self.due_amount > 0:
+        if self.due_date < today and self.due_amount > 0:
             self.is_overdue = True
-            self.overdue_days = (timezone.now().date() - self.due_date).days
+            self.overdue_days = (today - self.due_date).days
             if self.status != "OVERDUE":
                 self.status = "OVERDUE"
         else:
             self.is_overdue = False
             self.overdue_days = 0
-        
-        super().save(*args, **kwargs)
 
     def generate_invoice_number(self):
         """Generate unique invoice number"""
         from apps.configuration.models import FinancialConfiguration
+        from apps.core.utils.sequences import sequences
         
         config = FinancialConfiguration.get_for_tenant(self.tenant)
-        prefix = f"{config.invoice_prefix}-{timezone.now().year}-"
-        
-        last_invoice = Invoice.objects.filter(
-            invoice_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('invoice_number').last()
-        
-        if last_invoice:
-            try:
-                last_num = int(last_invoice.invoice_number.split('-')[-1])
-                new_num = last_num + 1
-            except ValueError:
-                new_num = 1
-        else:
-            new_num = config.invoice_start_number
-            
-        return f"{prefix}{new_num:05d}"
+        return sequences.next_number(
+            'invoice', self.tenant,
+            start=config.invoice_start_number,
+            prefix=config.invoice_prefix
+        )
 
     @property
     def is_fully_paid(self):
@@ -488,33 +482,29 @@ class Invoice(BaseModel):
         return 0
 
     def add_invoice_item(self, fee_structure, amount, description=""):
-        """Add item to invoice"""
+        """Add item to invoice; the item's save() updates the totals"""
         InvoiceItem.objects.create(
             invoice=self,
             fee_structure=fee_structure,
             amount=amount,
             description=description
         )
-        self.calculate_totals()
 
     def calculate_totals(self):
-        """Calculate invoice totals from items"""
-        items = self.items.all()
-        self.subtotal = sum(item.amount for item in items)
-        self.total_tax = sum(item.tax_amount for item in items)
-        
-        # Calculate discounts
-        discount_items = self.discounts.all()
-        self.total_discount = sum(item.amount for item in discount_items)
-        
-        # Recalculate total
-        self.total_amount = self.subtotal - self.total_discount + self.total_tax + self.late_fee
-        self.due_amount = self.total_amount - self.paid_amount
-        
-        self.save()
+        """
+        Recalculate invoice totals from items and discounts, at the end of
+        the current invoice_totals.deferred() block if there is one
+        """
+        from apps.finance.utils.totals import invoice_totals
+
+        invoice_totals.invoice_changed(self)
 
     def apply_discount(self, discount, applied_by, reason=""):
-        """Apply discount to invoice"""
+        """Apply discount to invoice; the discount's save() updates the totals"""
+        from apps.finance.utils.totals import invoice_totals
+
+        # Items added in the same unit of work count towards the subtotal
+        invoice_totals.refresh(self)
         discount_amount = discount.calculate_discount_amount(self.subtotal)
         
         AppliedDiscount.objects.create(
@@ -524,8 +514,6 @@ class Invoice(BaseModel):
             applied_by=applied_by,
             reason=reason
         )
-        
-        self.calculate_totals()
 
     def add_payment(self, amount, payment_method, reference, paid_by=None):
         """Add payment to invoice"""
@@ -589,18 +577,17 @@ class InvoiceItem(BaseModel):
         return f"{self.invoice} - {self.fee_structure} - {self.amount}"
 
     def save(self, *args, **kwargs):
-        from apps.configuration.models import FinancialConfiguration
+        from apps.finance.utils.totals import invoice_totals
         
         # Auto-calculate tax if not provided
-        if not self.tax_amount and self.invoice.tenant:
-            config = FinancialConfiguration.get_for_tenant(self.invoice.tenant)
-            if config.tax_enabled:
-                self.tax_amount = round((self.amount * config.tax_rate) / 100, 2)
+        if not self.tax_amount and self.invoice.tenant_id:
+            self.tax_amount = invoice_totals.item_tax(self.amount, self.invoice.tenant)
                 
         super().save(*args, **kwargs)
         
-        # Update invoice totals
-        self.invoice.calculate_totals()
+        # Update invoice totals; by id when the invoice was never loaded
+        invoice_field = self._meta.get_field('invoice')
+        invoice_totals.invoice_changed(self.invoice if invoice_field.is_cached(self) else self.invoice_id)
 
 
 class AppliedDiscount(BaseModel):
@@ -648,6 +635,223 @@ class AppliedDiscount(BaseModel):
     def __str__(self):
         return f"{self.invoice} - {self.discount} - {self.amount}"
 
+    def save(self, *args, **kwargs):
+        from apps.finance.utils.totals import invoice_totals
+
+        super().save(*args, **kwargs)
+
+        # Update invoice totals; by id when the invoice was never loaded
+        invoice_field = self._meta.get_field('invoice')
+        invoice_totals.invoice_changed(self.invoice if invoice_field.is_cached(self) else self.invoice_id)
+
+
+class InvoiceRun(BaseModel):
+    """
+    A bulk invoice generation job for one billing period, processed in
+    chunks by apps.finance.utils.invoicing; last_student_id is the
+    checkpoint an interrupted run resumes from
+    """
+    STATUS_CHOICES = (
+        ("PENDING", _("Pending")),
+        ("RUNNING", _("Running")),
+        ("COMPLETED", _("Completed")),
+        ("FAILED", _("Failed")),
+    )
+
+    billing_period = models.CharField(max_length=100, verbose_name=_("Billing Period"))
+    frequency = models.CharField(
+        max_length=20,
+        choices=FeeStructure.FEE_FREQUENCY_CHOICES,
+        default="MONTHLY",
+        verbose_name=_("Fee Frequency")
+    )
+    academic_year = models.ForeignKey(
+        "academics.AcademicYear",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="invoice_runs",
+        verbose_name=_("Academic Year")
+    )
+    class_name = models.ForeignKey(
+        "academics.SchoolClass",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="invoice_runs",
+        verbose_name=_("Class")
+    )
+    issue_date = models.DateField(default=timezone.now, verbose_name=_("Issue Date"))
+    due_date = models.DateField(verbose_name=_("Due Date"))
+    apply_discounts = models.BooleanField(default=True, verbose_name=_("Apply Discounts"))
+
+    # Progress
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="PENDING",
+        verbose_name=_("Status")
+    )
+    task_id = models.CharField(max_length=255, blank=True, verbose_name=_("Task ID"))
+    total_students = models.PositiveIntegerField(default=0, verbose_name=_("Students To Invoice"))
+    processed_students = models.PositiveIntegerField(default=0, verbose_name=_("Students Processed"))
+    skipped_students = models.PositiveIntegerField(default=0, verbose_name=_("Students Without Fees"))
+    invoices_created = models.PositiveIntegerField(default=0, verbose_name=_("Invoices Created"))
+    items_created = models.PositiveIntegerField(default=0, verbose_name=_("Items Created"))
+    discounts_applied = models.PositiveIntegerField(default=0, verbose_name=_("Discounts Applied"))
+    amount_billed = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0.00,
+        verbose_name=_("Amount Billed")
+    )
+    last_student_id = models.UUIDField(null=True, blank=True, verbose_name=_("Last Student Processed"))
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Started At"))
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Finished At"))
+    elapsed_seconds = models.FloatField(default=0, verbose_name=_("Processing Time (s)"))
+    error = models.TextField(blank=True, verbose_name=_("Error"))
+
+    class Meta:
+        db_table = "finance_invoice_runs"
+        verbose_name = _("Invoice Run")
+        verbose_name_plural = _("Invoice Runs")
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+            models.Index(fields=['billing_period', 'frequency']),
+        ]
+
+    def __str__(self):
+        return f"{self.billing_period} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in ("COMPLETED", "FAILED")
+
+    @property
+    def invoices_per_second(self):
+        if self.elapsed_seconds > 0:
+            return self.invoices_created / self.elapsed_seconds
+        return 0
+
+    @property
+    def progress(self):
+        if self.total_students > 0:
+            return min(100, (self.processed_students / self.total_students) * 100)
+        return 100 if self.is_finished else 0
+
+
+class PaymentReminder(BaseModel):
+    """
+    One overdue invoice included in a payment reminder; written in bulk by
+    apps.finance.utils.reminders, which also reads them to throttle
+    """
+    STATUS_CHOICES = (
+        ("SENT", _("Sent")),
+        ("FAILED", _("Failed")),
+    )
+
+    invoice = models.ForeignKey(
+        Invoice,
+        on_delete=models.CASCADE,
+        related_name="reminders",
+        verbose_name=_("Invoice")
+    )
+    student = models.ForeignKey(
+        "students.Student",
+        on_delete=models.CASCADE,
+        related_name="payment_reminders",
+        verbose_name=_("Student")
+    )
+    recipient = models.EmailField(verbose_name=_("Recipient"))
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default="SENT",
+        verbose_name=_("Status")
+    )
+    due_amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name=_("Due Amount")
+    )
+    overdue_days = models.PositiveIntegerField(default=0, verbose_name=_("Overdue Days"))
+    sent_at = models.DateTimeField(default=timezone.now, verbose_name=_("Sent At"))
+    error = models.TextField(blank=True, verbose_name=_("Error"))
+
+    class Meta:
+        db_table = "finance_payment_reminders"
+        verbose_name = _("Payment Reminder")
+        verbose_name_plural = _("Payment Reminders")
+        ordering = ["-sent_at"]
+        indexes = [
+            models.Index(fields=['invoice', 'status', 'sent_at']),
+            models.Index(fields=['status', 'sent_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.invoice} - {self.recipient} ({self.get_status_display()})"
+
+
+class ReceivableBalance(UUIDModel, TimeStampedModel, TenantAwareModel):
+    """
+    What one student owes, aged by days past due as of ``as_of``;
+    maintained by apps.finance.utils.receivables from the invoices
+    """
+    student = models.ForeignKey(
+        "students.Student",
+        on_delete=models.CASCADE,
+        related_name="receivable_balances",
+        verbose_name=_("Student")
+    )
+    class_name = models.ForeignKey(
+        "academics.SchoolClass",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="receivable_balances",
+        verbose_name=_("Class")
+    )
+
+    invoiced = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_("Invoiced"))
+    collected = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_("Collected"))
+    outstanding = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_("Outstanding"))
+
+    # Outstanding amounts by days past the due date
+    not_due = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_("Not Yet Due"))
+    days_0_30 = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_("0-30 Days"))
+    days_31_60 = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_("31-60 Days"))
+    days_61_90 = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_("61-90 Days"))
+    days_over_90 = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_("90+ Days"))
+
+    open_invoices = models.PositiveIntegerField(default=0, verbose_name=_("Open Invoices"))
+    overdue_invoices = models.PositiveIntegerField(default=0, verbose_name=_("Overdue Invoices"))
+    oldest_due_date = models.DateField(null=True, blank=True, verbose_name=_("Oldest Due Date"))
+    as_of = models.DateField(verbose_name=_("Aged As Of"))
+
+    class Meta:
+        db_table = "finance_receivable_balances"
+        verbose_name = _("Receivable Balance")
+        verbose_name_plural = _("Receivable Balances")
+        ordering = ["-outstanding"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant', 'student'],
+                name='unique_receivable_balance_per_student'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['tenant', 'class_name']),
+            models.Index(fields=['tenant', 'outstanding']),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id}: {self.outstanding}"
+
+    @property
+    def overdue(self):
+        return self.days_0_30 + self.days_31_60 + self.days_61_90 + self.days_over_90
+
 
 class Payment(BaseModel):
     """
@@ -810,19 +1014,8 @@ class Payment(BaseModel):
 
     def generate_payment_number(self):
         """Generate unique payment number"""
-        prefix = f"PAY-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_payment = Payment.objects.filter(
-            payment_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('payment_number').last()
-        
-        if last_payment:
-            last_num = int(last_payment.payment_number.split('-')[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        from apps.core.utils.sequences import sequences
+        return sequences.next_number('payment', self.tenant)
 
     def verify_payment(self, user):
         """Verify payment"""
@@ -961,19 +1154,8 @@ class Refund(BaseModel):
 
     def generate_refund_number(self):
         """Generate unique refund number"""
-        prefix = f"REF-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_refund = Refund.objects.filter(
-            refund_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('refund_number').last()
-        
-        if last_refund:
-            last_num = int(last_refund.refund_number.split('-')[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        from apps.core.utils.sequences import sequences
+        return sequences.next_number('refund', self.tenant)
 
     def approve(self, user):
         """Approve refund"""
@@ -1212,19 +1394,8 @@ class Expense(BaseModel):
 
     def generate_expense_number(self):
         """Generate unique expense number"""
-        prefix = f"EXP-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_expense = Expense.objects.filter(
-            expense_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('expense_number').last()
-        
-        if last_expense:
-            last_num = int(last_expense.expense_number.split('-')[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        from apps.core.utils.sequences import sequences
+        return sequences.next_number('expense', self.tenant)
 
     def submit_for_approval(self):
         """Submit expense for approval"""
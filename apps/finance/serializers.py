@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.db import models
+from apps.core.utils.api import SparseFieldsetMixin
 from .models import (
     FeeStructure, FeeDiscount, Invoice, InvoiceItem,
     AppliedDiscount, Payment, Refund, ExpenseCategory,
@@ -10,7 +11,7 @@ from .models import (
 )
 
 
-class FeeStructureSerializer(serializers.ModelSerializer):
+class FeeStructureSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class_name_name = serializers.CharField(source='class_name.name', read_only=True)
     academic_year_name = serializers.CharField(source='academic_year.name', read_only=True)
     fee_type_display = serializers.CharField(source='get_fee_type_display', read_only=True)
@@ -131,7 +132,7 @@ class AppliedDiscountSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class InvoiceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.get_full_name', read_only=True)
     student_roll_number = serializers.CharField(source='student.roll_number', read_only=True)
     class_name = serializers.CharField(source='student.current_class.name', read_only=True)
@@ -173,7 +174,7 @@ class InvoiceSerializer(serializers.ModelSerializer):
         return data
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True)
     student_name = serializers.CharField(source='invoice.student.get_full_name', read_only=True)
     payment_method_display = serializers.CharField(source='get_payment_method_display', read_only=True)
@@ -310,7 +311,7 @@ class ExpenseCategorySerializer(serializers.ModelSerializer):
         return value
 
 
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     category_type = serializers.CharField(source='category.category_type', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
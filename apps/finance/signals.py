@@ -0,0 +1,31 @@
+# apps/finance/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.finance.models import Invoice, Payment
+from apps.finance.utils.receivables import receivables
+
+
+# ---------------- Receivable balances ----------------
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Invoice)
+def refresh_receivables_on_invoice_change(sender, instance, **kwargs):
+    receivables.students_changed(instance.tenant_id, [instance.student_id])
+
+
+def _payment_student_id(instance):
+    if instance.student_id:
+        return instance.student_id
+    invoice = instance._state.fields_cache.get('invoice')
+    if invoice is not None:
+        return invoice.student_id
+    if not instance.invoice_id:
+        return None
+    return Invoice._base_manager.filter(pk=instance.invoice_id).values_list('student_id', flat=True).first()
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def refresh_receivables_on_payment_change(sender, instance, **kwargs):
+    receivables.students_changed(instance.tenant_id, [_payment_student_id(instance)])
@@ -0,0 +1,145 @@
+"""
+Background tasks for finance operations using Celery
+"""
+
+import logging
+from typing import Dict, Optional
+
+from celery import shared_task
+from django_tenants.utils import get_public_schema_name, schema_context
+
+logger = logging.getLogger(__name__)
+
+
+# acks_late: a run whose worker dies is redelivered and resumes from its checkpoint
+@shared_task(acks_late=True)
+def process_invoice_run(schema_name: str, run_id: str) -> Dict:
+    """Generate the invoices of one InvoiceRun"""
+    from apps.finance.utils.invoicing import invoice_runs
+
+    try:
+        with schema_context(schema_name):
+            run = invoice_runs.execute(run_id)
+    except Exception as e:
+        logger.error(f"Error processing invoice run {run_id} in {schema_name}: {str(e)}", exc_info=True)
+        return {'success': False, 'error': str(e)}
+
+    return {
+        'success': True,
+        'status': run.status,
+        'invoices_created': run.invoices_created,
+        'elapsed_seconds': run.elapsed_seconds,
+        'invoices_per_second': run.invoices_per_second,
+    }
+
+
+@shared_task
+def resume_invoice_runs() -> Dict:
+    """Re-queue the invoice runs of every active tenant that stopped making progress"""
+    from apps.tenants.models import Tenant
+    from apps.finance.utils.invoicing import invoice_runs
+
+    tenants = Tenant.objects.filter(is_active=True).exclude(
+        schema_name=get_public_schema_name()
+    )
+
+    resumed, failed = 0, []
+    for tenant in tenants:
+        try:
+            with schema_context(tenant.schema_name):
+                for run_id in invoice_runs.stale_runs().values_list('pk', flat=True):
+                    process_invoice_run.delay(tenant.schema_name, str(run_id))
+                    resumed += 1
+        except Exception as e:
+            logger.error(
+                f"Error resuming invoice runs for {tenant.schema_name}: {str(e)}",
+                exc_info=True
+            )
+            failed.append(tenant.schema_name)
+
+    return {'success': not failed, 'resumed': resumed, 'failed_tenants': failed}
+
+
+@shared_task
+def sweep_overdue_invoices() -> Dict:
+    """Mark the overdue invoices of every active tenant"""
+    from apps.tenants.models import Tenant
+    from apps.finance.utils.reminders import fee_reminders
+
+    tenants = Tenant.objects.filter(is_active=True).exclude(
+        schema_name=get_public_schema_name()
+    )
+
+    updated, failed = 0, []
+    for tenant in tenants:
+        try:
+            with schema_context(tenant.schema_name):
+                updated += fee_reminders.sweep_overdue(tenant.pk)
+        except Exception as e:
+            logger.error(
+                f"Error sweeping overdue invoices for {tenant.schema_name}: {str(e)}",
+                exc_info=True
+            )
+            failed.append(tenant.schema_name)
+
+    return {'success': not failed, 'updated': updated, 'failed_tenants': failed}
+
+
+@shared_task
+def send_payment_reminders(schema_name: Optional[str] = None) -> Dict:
+    """
+    Sweep and remind the overdue invoices of one tenant, or of every
+    active tenant
+    """
+    from apps.tenants.models import Tenant
+    from apps.finance.utils.reminders import fee_reminders
+
+    tenants = Tenant.objects.filter(is_active=True).exclude(
+        schema_name=get_public_schema_name()
+    )
+    if schema_name:
+        tenants = tenants.filter(schema_name=schema_name)
+
+    totals, failed = {'sent': 0, 'failed': 0, 'deferred': 0}, []
+    for tenant in tenants:
+        try:
+            with schema_context(tenant.schema_name):
+                fee_reminders.sweep_overdue(tenant.pk)
+                result = fee_reminders.dispatch(tenant)
+            for key in totals:
+                totals[key] += result[key]
+        except Exception as e:
+            logger.error(
+                f"Error sending payment reminders for {tenant.schema_name}: {str(e)}",
+                exc_info=True
+            )
+            failed.append(tenant.schema_name)
+
+    return {'success': not failed, **totals, 'failed_tenants': failed}
+
+
+@shared_task
+def refresh_receivables(schema_name: Optional[str] = None) -> Dict:
+    """Recount the receivable balances of one tenant, or of every active tenant"""
+    from apps.tenants.models import Tenant
+    from apps.finance.utils.receivables import receivables
+
+    tenants = Tenant.objects.filter(is_active=True).exclude(
+        schema_name=get_public_schema_name()
+    )
+    if schema_name:
+        tenants = tenants.filter(schema_name=schema_name)
+
+    balances, failed = 0, []
+    for tenant in tenants:
+        try:
+            with schema_context(tenant.schema_name):
+                balances += receivables.refresh(tenant.pk)
+        except Exception as e:
+            logger.error(
+                f"Error refreshing receivables for {tenant.schema_name}: {str(e)}",
+                exc_info=True
+            )
+            failed.append(tenant.schema_name)
+
+    return {'success': not failed, 'balances': balances, 'failed_tenants': failed}
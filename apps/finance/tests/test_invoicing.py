@@ -0,0 +1,117 @@
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from apps.finance.models import FeeDiscount
+from apps.finance.utils.invoicing import (
+    DiscountRule, FeeLine, InvoicePlan, InvoiceRunService, StudentRow, discount_applies,
+)
+
+CLASS_A, CLASS_B, YEAR = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+
+def discount(**fields):
+    values = {
+        'pk': uuid.uuid4(), 'code': 'D', 'discount_type': 'PERCENTAGE', 'value': Decimal('10'),
+        'applicable_to': 'ALL_STUDENTS', 'max_usage_per_student': 0, 'total_usage_limit': None,
+        'applicable_categories': '',
+    }
+    values.update(fields)
+    return FeeDiscount(**values)
+
+
+def student(class_id=CLASS_A, category='GENERAL'):
+    return StudentRow(uuid.uuid4(), class_id, YEAR, category)
+
+
+class InvoiceBuildTests(SimpleTestCase):
+    def setUp(self):
+        self.service = InvoiceRunService(config={'CHUNK_SIZE': 500, 'STALE_AFTER_MINUTES': 15})
+        self.run = SimpleNamespace(
+            tenant_id=1, created_by_id=2, billing_period='March 2025',
+            issue_date=date(2025, 3, 1), due_date=timezone.now().date() + timedelta(days=10),
+        )
+
+    def plan(self, discounts=(), usage=None, tax_rate=Decimal('18.00')):
+        fees = {(CLASS_A, YEAR): [
+            FeeLine(uuid.uuid4(), 'Tuition', Decimal('1000.00')),
+            FeeLine(uuid.uuid4(), 'Transport', Decimal('333.33')),
+        ]}
+        return InvoicePlan(
+            tenant=None, fees=fees, tax_rate=tax_rate, discounts=list(discounts),
+            discount_usage=usage or {}, numbering={'start': 1, 'prefix': 'INV'}, applied_by_id=2,
+        )
+
+    def test_items_tax_and_totals_are_computed_in_memory(self):
+        invoices, items, applied = self.service.build(self.run, self.plan(), [student(), student(CLASS_B)], {})
+
+        self.assertEqual(len(invoices), 1)  # class B has no monthly fees
+        self.assertEqual([item.tax_amount for item in items], [Decimal('180.00'), Decimal('60.00')])
+        self.assertEqual(applied, [])
+        invoice = invoices[0]
+        self.assertEqual(invoice.subtotal, Decimal('1333.33'))
+        self.assertEqual(invoice.total_tax, Decimal('240.00'))
+        self.assertEqual(invoice.total_amount, Decimal('1573.33'))
+        self.assertEqual(invoice.due_amount, invoice.total_amount)
+        self.assertEqual(invoice.status, 'ISSUED')
+        self.assertIs(items[0].invoice, invoice)
+        self.assertEqual(items[1].description, 'Transport - March 2025')
+
+    def test_automatic_discounts_respect_eligibility_and_limits(self):
+        percent = discount(value=Decimal('10'), max_discount_amount=Decimal('100'))
+        fixed = discount(discount_type='FIXED_AMOUNT', value=Decimal('50'),
+                         applicable_to='CATEGORY_BASED', applicable_categories='OBC')
+        once = discount(discount_type='FIXED_AMOUNT', value=Decimal('5'), max_usage_per_student=1)
+        scarce = discount(discount_type='FIXED_AMOUNT', value=Decimal('1'), total_usage_limit=1)
+        rules = [DiscountRule(rule, frozenset()) for rule in (percent, fixed, once, scarce)]
+        general, obc = student(), student(category='OBC')
+
+        invoices, _, applied = self.service.build(
+            self.run, self.plan(rules), [general, obc], {(once.pk, general.pk): 1}
+        )
+
+        self.assertEqual(
+            [(entry.invoice.student_id, entry.discount, entry.amount) for entry in applied],
+            [
+                (general.pk, percent, Decimal('100.00')),
+                (general.pk, scarce, Decimal('1')),
+                (obc.pk, percent, Decimal('100.00')),
+                (obc.pk, fixed, Decimal('50')),
+                (obc.pk, once, Decimal('5')),
+            ],
+        )
+        self.assertEqual(invoices[1].total_discount, Decimal('155.00'))
+        self.assertEqual(invoices[1].total_amount, Decimal('1333.33') - Decimal('155.00') + Decimal('240.00'))
+
+    def test_past_due_invoices_are_created_overdue(self):
+        self.run.due_date = timezone.now().date() - timedelta(days=3)
+
+        invoice = self.service.build(self.run, self.plan(tax_rate=None), [student()], {})[0][0]
+
+        self.assertEqual((invoice.status, invoice.is_overdue, invoice.overdue_days), ('OVERDUE', True, 3))
+        self.assertEqual(invoice.total_tax, Decimal('0.00'))
+
+    def test_class_discounts_only_cover_their_classes(self):
+        rule = DiscountRule(discount(applicable_to='SPECIFIC_CLASS'), frozenset({CLASS_A}))
+        self.assertTrue(discount_applies(rule, student(CLASS_A)))
+        self.assertFalse(discount_applies(rule, student(CLASS_B)))
+        self.assertFalse(discount_applies(DiscountRule(discount(applicable_to='SIBLING'), frozenset()), student()))
+
+
+class InvoiceRunQueryTests(SimpleTestCase):
+    def test_candidates_skip_invoiced_students_and_resume_after_the_checkpoint(self):
+        checkpoint = uuid.uuid4()
+        run = SimpleNamespace(
+            tenant_id=1, billing_period='March 2025', class_name_id=CLASS_A,
+            academic_year_id=None, last_student_id=checkpoint,
+        )
+
+        sql = str(InvoiceRunService().candidates(run).query)
+
+        self.assertIn('NOT EXISTS', sql)
+        self.assertIn('U0."billing_period" = March 2025', sql)
+        self.assertIn(f'> {checkpoint.hex}', sql)
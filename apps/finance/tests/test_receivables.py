@@ -0,0 +1,85 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.finance.models import Invoice
+from apps.finance.utils.receivables import ReceivablesService
+
+TENANT = uuid.uuid4()
+
+
+class ReceivableRefreshTests(SimpleTestCase):
+    def setUp(self):
+        self.service = ReceivablesService(config={'BATCH_SIZE': 1000})
+        patcher = mock.patch.object(self.service, 'refresh', return_value=1)
+        self.refresh = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def connection(self, in_atomic_block):
+        connection = SimpleNamespace(in_atomic_block=in_atomic_block, run_on_commit=[])
+        patcher = mock.patch('apps.finance.utils.receivables.transaction')
+        transaction = patcher.start()
+        self.addCleanup(patcher.stop)
+        transaction.get_connection.return_value = connection
+        transaction.on_commit.side_effect = lambda func: connection.run_on_commit.append((set(), func, False))
+        return connection
+
+    def test_changes_in_a_transaction_are_recounted_once_on_commit(self):
+        connection = self.connection(in_atomic_block=True)
+        first, second = uuid.uuid4(), uuid.uuid4()
+
+        for student_id in (first, second, first, None):
+            self.service.students_changed(TENANT, [student_id])
+        self.refresh.assert_not_called()
+        self.assertEqual(len(connection.run_on_commit), 1)
+
+        connection.run_on_commit[0][1]()
+
+        self.refresh.assert_called_once_with(TENANT, {first, second})
+
+    def test_changes_outside_a_transaction_are_recounted_right_away(self):
+        self.connection(in_atomic_block=False)
+        student_id = uuid.uuid4()
+
+        self.service.students_changed(TENANT, [student_id])
+
+        self.refresh.assert_called_once_with(TENANT, {student_id})
+
+    def test_a_failed_recount_does_not_break_the_write(self):
+        self.connection(in_atomic_block=False)
+        self.refresh.side_effect = RuntimeError('database gone')
+
+        with self.assertLogs('apps.finance.utils.receivables', 'ERROR'):
+            self.service.students_changed(TENANT, [uuid.uuid4()])
+
+
+class ReceivableAgingTests(SimpleTestCase):
+    def test_buckets_split_the_overdue_amount_by_days_past_due(self):
+        today = date(2025, 6, 30)
+        sql = str(Invoice._base_manager.values('student_id').annotate(
+            **ReceivablesService.aggregates(today)
+        ).query)
+
+        # 0-30 days: due 2025-05-31 to 2025-06-29, 90+ days: due on or before 2025-04-01
+        for bound in ('2025-06-29', '2025-05-31', '2025-05-30', '2025-05-01', '2025-04-30', '2025-04-01'):
+            self.assertIn(bound, sql)
+        self.assertEqual(sql.count('SUM('), 8)
+
+    def test_class_totals_are_largest_first_with_the_overdue_sum(self):
+        rows = [
+            {'class_name_id': 1, 'class_name__name': 'Grade 1', 'outstanding': Decimal('100'),
+             'days_0_30': Decimal('40'), 'days_over_90': Decimal('10'), 'students': 2},
+            {'class_name_id': 2, 'class_name__name': 'Grade 2', 'outstanding': Decimal('900'),
+             'days_61_90': None, 'students': 5},
+        ]
+        with mock.patch('apps.finance.models.ReceivableBalance.objects') as objects:
+            objects.filter.return_value.order_by.return_value.values.return_value.annotate.return_value = rows
+            classes = ReceivablesService(config={}).totals_by_class(TENANT)
+
+        self.assertEqual([row['class_name'] for row in classes], ['Grade 2', 'Grade 1'])
+        self.assertEqual((classes[1]['overdue'], classes[1]['students']), (Decimal('50'), 2))
+        self.assertEqual(classes[0]['days_61_90'], 0)
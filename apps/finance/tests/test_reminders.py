@@ -0,0 +1,108 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from contextlib import nullcontext
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.finance.utils.reminders import DueInvoice, FeeReminderService, reminder_message
+
+SIBLING_A, SIBLING_B, OTHER = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+
+def due(student_id, number, email='', amount='500.00'):
+    return DueInvoice(
+        uuid.uuid4(), student_id, number, date(2025, 3, 10), Decimal(amount), 12, 'Asha', 'Rao', email,
+    )
+
+
+class ReminderGroupingTests(SimpleTestCase):
+    def test_siblings_share_their_guardians_reminder(self):
+        invoices = [
+            due(SIBLING_A, 'INV-1', 'asha@example.com'), due(SIBLING_A, 'INV-2'),
+            due(SIBLING_B, 'INV-3'), due(OTHER, 'INV-4', ' Ravi@Example.com'), due(uuid.uuid4(), 'INV-5'),
+        ]
+        guardians = {SIBLING_A: 'parent@example.com', SIBLING_B: 'PARENT@example.com'}
+
+        recipients = FeeReminderService(config={}).group_by_recipient(invoices, guardians)
+
+        self.assertEqual(
+            {email: [invoice.invoice_number for invoice in group] for email, group in recipients.items()},
+            {'parent@example.com': ['INV-1', 'INV-2', 'INV-3'], 'ravi@example.com': ['INV-4']},
+        )
+
+    def test_message_lists_every_invoice_and_the_total(self):
+        subject, body = reminder_message('Green Valley School', [due(SIBLING_A, 'INV-1'), due(SIBLING_B, 'INV-2')])
+
+        self.assertEqual(subject, 'Payment reminder: 2 overdue invoices')
+        self.assertIn('- INV-2 (Asha Rao): 500.00 due on 10 Mar 2025, 12 days overdue', body)
+        self.assertIn('Total outstanding: 1000.00', body)
+        self.assertTrue(body.rstrip().endswith('Green Valley School'))
+
+
+class ReminderDispatchTests(SimpleTestCase):
+    def setUp(self):
+        self.service = FeeReminderService(config={'INTERVAL_DAYS': 7, 'HOURLY_LIMIT': 3, 'BATCH_SIZE': 2})
+        self.tenant = SimpleNamespace(pk=1, name='Green Valley School', schema_name='green')
+        self.invoices = [due(uuid.uuid4(), f'INV-{n}', f'payer{n}@example.com') for n in range(5)]
+
+        patches = {
+            'due': mock.patch.object(self.service, 'due_reminders'),
+            'quota': mock.patch.object(self.service, 'remaining_quota', return_value=3),
+            'guardians': mock.patch.object(self.service, 'guardian_emails', return_value={}),
+            'connection': mock.patch('apps.finance.utils.reminders.get_connection'),
+            'bulk_create': mock.patch('apps.finance.models.PaymentReminder.objects.bulk_create'),
+            'lock': mock.patch.object(self.service, 'dispatch_lock', return_value=nullcontext(True)),
+        }
+        self.mocks = {name: patcher.start() for name, patcher in patches.items()}
+        for patcher in patches.values():
+            self.addCleanup(patcher.stop)
+        self.mocks['due'].return_value.order_by.return_value.values_list.return_value = self.invoices
+        self.connection = self.mocks['connection'].return_value.__enter__.return_value
+
+    def test_batches_share_a_connection_and_stop_at_the_hourly_limit(self):
+        result = self.service.dispatch(self.tenant)
+
+        sent = [
+            [message.to[0] for message in call.args[0]] for call in self.connection.send_messages.call_args_list
+        ]
+        self.assertEqual(sent, [['payer0@example.com', 'payer1@example.com'], ['payer2@example.com']])
+        self.assertEqual(self.mocks['bulk_create'].call_count, 2)
+        self.assertEqual(
+            (result['recipients'], result['sent'], result['failed'], result['deferred']), (5, 3, 0, 2)
+        )
+
+    def test_a_failed_batch_is_recorded_as_failed(self):
+        self.mocks['quota'].return_value = 2
+        self.connection.send_messages.side_effect = ConnectionRefusedError('SMTP down')
+
+        result = self.service.dispatch(self.tenant)
+
+        reminders = self.mocks['bulk_create'].call_args.args[0]
+        self.assertEqual([reminder.status for reminder in reminders], ['FAILED', 'FAILED'])
+        self.assertEqual(reminders[0].error, 'SMTP down')
+        self.assertEqual((result['sent'], result['failed']), (0, 2))
+
+    def test_a_dispatch_already_running_for_the_tenant_is_not_repeated(self):
+        self.mocks['lock'].return_value = nullcontext(False)
+
+        result = self.service.dispatch(self.tenant)
+
+        self.mocks['due'].assert_not_called()
+        self.connection.send_messages.assert_not_called()
+        self.assertEqual(result['sent'], 0)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ReminderDispatchLockTests(SimpleTestCase):
+    def test_cache_lock_admits_one_dispatch_per_tenant(self):
+        service = FeeReminderService(config={'LOCK_TIMEOUT': 60})
+        with mock.patch('apps.finance.utils.reminders.connection') as connection:
+            connection.vendor = 'sqlite'
+            with service.dispatch_lock(1) as first:
+                with service.dispatch_lock(1) as second, service.dispatch_lock(2) as other:
+                    self.assertEqual((first, second, other), (True, False, True))
+            with service.dispatch_lock(1) as again:
+                self.assertTrue(again)
@@ -0,0 +1,107 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from apps.finance.models import Invoice
+from apps.finance.utils.totals import InvoiceTotalsService
+
+
+def invoice(**fields):
+    values = {
+        'pk': uuid.uuid4(), 'late_fee': Decimal('0.00'), 'paid_amount': Decimal('0.00'),
+        'due_date': timezone.now().date() + timedelta(days=10),
+    }
+    values.update(fields)
+    return Invoice(**values)
+
+
+@mock.patch('apps.finance.utils.totals.transaction')
+class DeferredTotalsTests(SimpleTestCase):
+    def setUp(self):
+        self.service = InvoiceTotalsService()
+        patcher = mock.patch.object(self.service, 'recompute', return_value=0)
+        self.recompute = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_changes_inside_a_unit_of_work_are_recomputed_once(self, transaction):
+        first, other_id = invoice(), uuid.uuid4()
+
+        with self.service.deferred():
+            for _ in range(20):
+                self.service.invoice_changed(first)
+            self.service.invoice_changed(other_id)
+            with self.service.deferred():
+                self.service.invoice_changed(first)
+            self.recompute.assert_not_called()
+
+        self.recompute.assert_called_once()
+        ids, instances = self.recompute.call_args.args
+        self.assertEqual(list(ids), [first.pk, other_id])
+        self.assertEqual(instances, [first])
+
+    def test_changes_outside_a_unit_of_work_are_recomputed_right_away(self, transaction):
+        first = invoice()
+
+        self.service.invoice_changed(first)
+
+        self.recompute.assert_called_once_with([first.pk], [first])
+
+    def test_a_failed_unit_of_work_writes_nothing(self, transaction):
+        with self.assertRaises(ValueError), self.service.deferred():
+            self.service.invoice_changed(invoice())
+            raise ValueError
+
+        self.recompute.assert_not_called()
+        self.service.invoice_changed(uuid.uuid4())
+        self.recompute.assert_called_once()
+
+    def test_refresh_recomputes_a_pending_invoice_early(self, transaction):
+        first = invoice()
+
+        with self.service.deferred():
+            self.service.invoice_changed(first)
+            self.service.refresh(first)
+            self.recompute.assert_called_once_with([first.pk], [first])
+
+        self.recompute.assert_called_once()
+
+    def test_the_tax_rate_is_read_once_per_unit_of_work(self, transaction):
+        tenant = SimpleNamespace(pk=1)
+        config = SimpleNamespace(tax_enabled=True, tax_rate=Decimal('18.00'))
+        with mock.patch(
+            'apps.configuration.models.FinancialConfiguration.get_for_tenant', return_value=config
+        ) as get_for_tenant:
+            with self.service.deferred():
+                taxes = [self.service.item_tax(amount, tenant) for amount in (Decimal('333.33'), Decimal('10'))]
+            self.assertEqual(get_for_tenant.call_count, 1)
+
+            config.tax_enabled = False
+            self.assertEqual(self.service.item_tax(Decimal('100'), tenant), Decimal('0.00'))
+
+        self.assertEqual(taxes, [Decimal('60.00'), Decimal('1.80')])
+
+
+class ApplyTotalsTests(SimpleTestCase):
+    def test_totals_and_status_follow_the_children_sums(self):
+        partly_paid = invoice(late_fee=Decimal('25.00'), paid_amount=Decimal('100.00'))
+
+        InvoiceTotalsService.apply_totals(
+            partly_paid, Decimal('1000.00'), Decimal('180.00'), Decimal('50.00')
+        )
+
+        self.assertEqual(partly_paid.total_amount, Decimal('1155.00'))
+        self.assertEqual(partly_paid.due_amount, Decimal('1055.00'))
+        self.assertEqual(partly_paid.status, 'PARTIALLY_PAID')
+
+    def test_unpaid_invoices_past_their_due_date_are_overdue(self):
+        today = timezone.now().date()
+        late = invoice(due_date=today - timedelta(days=4))
+
+        InvoiceTotalsService.apply_totals(late, Decimal('500.00'), Decimal('0.00'), Decimal('0.00'), today)
+
+        self.assertEqual((late.status, late.is_overdue, late.overdue_days), ('OVERDUE', True, 4))
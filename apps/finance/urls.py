@@ -42,6 +42,7 @@ urlpatterns = [
         path('', login_required(views.InvoiceListView.as_view()), name='invoice_list'),
         path('create/', login_required(views.InvoiceCreateView.as_view()), name='invoice_create'),
         path('bulk-action/', login_required(views.BulkInvoiceActionView.as_view()), name='invoice_bulk_action'),
+        path('export/', login_required(views.InvoiceExportView.as_view()), name='invoice_export'),
         path('<uuid:pk>/', include([
             path('', login_required(views.InvoiceDetailView.as_view()), name='invoice_detail'),
             path('edit/', login_required(views.InvoiceUpdateView.as_view()), name='invoice_update'),
@@ -140,6 +141,7 @@ urlpatterns = [
     path('reports/', include([
         path('fee-collection/', login_required(views.FeeCollectionReportView.as_view()), name='report_fee_collection'),
         path('due-fees/', login_required(views.DueFeesReportView.as_view()), name='report_due_fees'),
+        path('due-fees/export/', login_required(views.DueFeesExportView.as_view()), name='report_due_fees_export'),
         path('expense-summary/', login_required(views.ExpenseSummaryReportView.as_view()), name='report_expense_summary'),
         path('budget-vs-actual/', login_required(views.BudgetVsActualReportView.as_view()), name='report_budget_vs_actual'),
     path('financial/', include([
@@ -161,6 +163,7 @@ urlpatterns = [
 
     # ==================== UTILITIES ====================
     path('generate-invoices/', login_required(views.GenerateMonthlyInvoicesView.as_view()), name='generate_invoices'),
+    path('invoice-runs/<uuid:pk>/status/', login_required(views.InvoiceRunStatusView.as_view()), name='invoice_run_status'),
     path('send-reminders/', login_required(views.SendPaymentRemindersView.as_view()), name='send_reminders'),
 
     # ==================== STUDENT / PARENT PORTAL ====================
@@ -0,0 +1,395 @@
+# apps/finance/utils/invoicing.py
+"""
+Set-based invoice runs
+
+An InvoiceRun bills every active student of a tenant (or of one class or
+academic year) for one billing period. Students are processed in chunks
+of ``CHUNK_SIZE``; each chunk is one transaction with a handful of
+statements whatever its size:
+
+- the next students without an invoice for the period (keyset on the
+  student id, NOT EXISTS against the invoices),
+- the usage of the automatic discounts by those students,
+- one UPDATE reserving the block of invoice numbers,
+- one bulk INSERT each for the invoices, their items and the applied
+  discounts, with items, tax, discounts and totals computed in memory,
+- the run's counters and checkpoint.
+
+The fee structures, tax rate and discounts are read once per run, not
+once per student, and no InvoiceItem.save() re-saves its invoice.
+
+The run row is locked for each chunk and remembers the last student
+processed, so a run whose worker died is picked up where it stopped by
+``resume_invoice_runs`` (or again by the redelivered task); students
+already invoiced for the period are never billed twice.
+"""
+
+import time
+import logging
+from collections import Counter, defaultdict, namedtuple
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INVOICE_RUNS = {
+    'CHUNK_SIZE': 500,  # students invoiced per transaction
+    'STALE_AFTER_MINUTES': 15,  # running runs without progress are resumed after this
+}
+
+# Discounts a run applies on its own; the others need a person's decision
+AUTOMATIC_DISCOUNTS = ('ALL_STUDENTS', 'SPECIFIC_CLASS', 'CATEGORY_BASED')
+
+CENT = Decimal('0.01')
+
+FeeLine = namedtuple('FeeLine', 'fee_id name amount')
+StudentRow = namedtuple('StudentRow', 'pk class_id academic_year_id category')
+DiscountRule = namedtuple('DiscountRule', 'discount class_ids')
+
+
+def invoice_run_settings():
+    config = dict(DEFAULT_INVOICE_RUNS)
+    config.update(getattr(settings, 'INVOICE_RUNS', {}))
+    return config
+
+
+def discount_applies(rule: DiscountRule, student: StudentRow) -> bool:
+    """Whether an automatic discount covers the student, as FeeDiscount.is_eligible decides"""
+    applicable_to = rule.discount.applicable_to
+    if applicable_to == 'SPECIFIC_CLASS':
+        return student.class_id in rule.class_ids
+    if applicable_to == 'CATEGORY_BASED':
+        return bool(student.category) and student.category in rule.discount.applicable_categories
+    return applicable_to == 'ALL_STUDENTS'
+
+
+class InvoicePlan:
+    """What a run bills with: fees, tax, discounts and invoice numbering, read once"""
+
+    def __init__(self, tenant, fees: Dict, tax_rate: Optional[Decimal], discounts: List[DiscountRule],
+                 discount_usage: Dict, numbering: Dict, applied_by_id=None):
+        self.tenant = tenant
+        self.fees = fees
+        self.tax_rate = tax_rate
+        self.discounts = discounts
+        # Times each discount was applied, to enforce total_usage_limit
+        self.discount_usage = discount_usage
+        self.numbering = numbering
+        self.applied_by_id = applied_by_id
+
+    def tax(self, amount: Decimal) -> Decimal:
+        # Same rounding as InvoiceItem.save()
+        if self.tax_rate is None:
+            return Decimal('0.00')
+        return round((amount * self.tax_rate) / 100, 2)
+
+
+class InvoiceRunService:
+    """Creates and processes invoice runs; the singleton is ``invoice_runs``"""
+
+    def __init__(self, config=None):
+        self.config = config or invoice_run_settings()
+
+    # ---------------- public API ----------------
+
+    def create(self, tenant, billing_period: str, due_date, user=None, **options):
+        """
+        New pending run; refuses a period already being billed by an
+        unfinished run
+        """
+        from apps.finance.models import InvoiceRun
+
+        frequency = options.get('frequency', 'MONTHLY')
+        if InvoiceRun.objects.filter(
+            tenant=tenant, billing_period=billing_period, frequency=frequency,
+            status__in=('PENDING', 'RUNNING'),
+        ).exists():
+            raise ValidationError(
+                _("Invoices for %(period)s are already being generated") % {'period': billing_period}
+            )
+        return InvoiceRun.objects.create(
+            tenant=tenant, billing_period=billing_period, due_date=due_date,
+            created_by=user, **options
+        )
+
+    def queue(self, run) -> None:
+        """Process ``run`` in the background once the current transaction commits"""
+        from apps.finance.tasks import process_invoice_run
+
+        schema_name = run.tenant.schema_name
+
+        def send():
+            result = process_invoice_run.delay(schema_name, str(run.pk))
+            run.task_id = result.id
+            run.save(update_fields=['task_id', 'updated_at'])
+
+        transaction.on_commit(send)
+
+    def execute(self, run_id):
+        """Process a run to the end, resuming from its checkpoint; returns the run"""
+        from apps.finance.models import InvoiceRun
+
+        run = InvoiceRun._base_manager.select_related('tenant', 'created_by').get(pk=run_id)
+        if run.is_finished:
+            return run
+        if run.status == 'PENDING':
+            run.status = 'RUNNING'
+            run.started_at = timezone.now()
+            run.total_students = self.candidates(run).count()
+            run.save(update_fields=['status', 'started_at', 'total_students', 'updated_at'])
+
+        try:
+            plan = self.plan(run)
+            while self._process_chunk(run.pk, plan):
+                pass
+        except Exception as e:
+            run = InvoiceRun._base_manager.get(pk=run.pk)
+            run.status = 'FAILED'
+            run.error = str(e)
+            run.finished_at = timezone.now()
+            run.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+            raise
+
+        run = InvoiceRun._base_manager.get(pk=run.pk)
+        logger.info(
+            f"Invoice run {run.pk} ({run.billing_period}): {run.invoices_created} invoices, "
+            f"{run.items_created} items in {run.elapsed_seconds:.1f}s "
+            f"({run.invoices_per_second:.0f} invoices/s)"
+        )
+        return run
+
+    def resume(self, run) -> None:
+        """Make a failed run runnable again; it continues from its checkpoint"""
+        if run.status == 'FAILED':
+            run.status = 'RUNNING'
+            run.error = ''
+            run.finished_at = None
+            run.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+
+    def stale_runs(self, now=None):
+        """Runs that should be progressing but have not for STALE_AFTER_MINUTES"""
+        from apps.finance.models import InvoiceRun
+
+        cutoff = (now or timezone.now()) - timedelta(minutes=self.config['STALE_AFTER_MINUTES'])
+        return InvoiceRun._base_manager.filter(
+            is_active=True, status__in=('PENDING', 'RUNNING'), updated_at__lt=cutoff
+        )
+
+    # ---------------- queries ----------------
+
+    def candidates(self, run):
+        """Active students of the run's scope without an invoice for its period"""
+        from apps.finance.models import Invoice
+        from apps.students.models import Student
+
+        invoiced = Invoice._base_manager.filter(
+            tenant_id=run.tenant_id, is_active=True,
+            billing_period=run.billing_period, student_id=OuterRef('pk'),
+        )
+        students = Student._base_manager.filter(
+            tenant_id=run.tenant_id, is_active=True, status='ACTIVE',
+            current_class__isnull=False, academic_year__isnull=False,
+        ).filter(~Exists(invoiced))
+        if run.class_name_id:
+            students = students.filter(current_class_id=run.class_name_id)
+        if run.academic_year_id:
+            students = students.filter(academic_year_id=run.academic_year_id)
+        if run.last_student_id:
+            students = students.filter(pk__gt=run.last_student_id)
+        return students
+
+    def plan(self, run) -> InvoicePlan:
+        from apps.configuration.models import FinancialConfiguration
+        from apps.finance.models import AppliedDiscount, FeeDiscount, FeeStructure
+
+        fee_structures = FeeStructure._base_manager.filter(
+            tenant_id=run.tenant_id, is_active=True, frequency=run.frequency
+        )
+        if run.class_name_id:
+            fee_structures = fee_structures.filter(class_name_id=run.class_name_id)
+        if run.academic_year_id:
+            fee_structures = fee_structures.filter(academic_year_id=run.academic_year_id)
+        fees = defaultdict(list)
+        for fee_id, class_id, year_id, name, amount in fee_structures.order_by('fee_type').values_list(
+            'pk', 'class_name_id', 'academic_year_id', 'name', 'amount'
+        ):
+            fees[(class_id, year_id)].append(FeeLine(fee_id, name, amount))
+
+        config = FinancialConfiguration.get_for_tenant(run.tenant)
+
+        discounts, usage = [], {}
+        # AppliedDiscount.applied_by is required, so only runs started by a user apply discounts
+        if run.apply_discounts and run.created_by_id:
+            rows = FeeDiscount._base_manager.filter(
+                tenant_id=run.tenant_id, is_active=True, applicable_to__in=AUTOMATIC_DISCOUNTS,
+                valid_from__lte=run.issue_date, valid_until__gte=run.issue_date,
+            ).prefetch_related('applicable_classes').order_by('valid_from', 'code')
+            discounts = [
+                DiscountRule(discount, frozenset(cls.pk for cls in discount.applicable_classes.all()))
+                for discount in rows
+            ]
+            limited = [rule.discount.pk for rule in discounts if rule.discount.total_usage_limit]
+            if limited:
+                usage = dict(
+                    AppliedDiscount._base_manager.filter(discount_id__in=limited, is_active=True)
+                    .values_list('discount_id').annotate(count=Count('id')).order_by()
+                )
+
+        return InvoicePlan(
+            tenant=run.tenant,
+            fees=dict(fees),
+            tax_rate=config.tax_rate if config.tax_enabled else None,
+            discounts=discounts,
+            discount_usage=usage,
+            numbering={'start': config.invoice_start_number, 'prefix': config.invoice_prefix},
+            applied_by_id=run.created_by_id,
+        )
+
+    def _student_usage(self, plan: InvoicePlan, student_ids) -> Dict:
+        """{(discount id, student id): times applied} for per-student limits"""
+        from apps.finance.models import AppliedDiscount
+
+        if not plan.discounts or not student_ids:
+            return {}
+        rows = AppliedDiscount._base_manager.filter(
+            is_active=True,
+            discount_id__in=[rule.discount.pk for rule in plan.discounts],
+            invoice__student_id__in=student_ids,
+        ).values_list('discount_id', 'invoice__student_id').annotate(count=Count('id')).order_by()
+        return {(discount_id, student_id): count for discount_id, student_id, count in rows}
+
+    # ---------------- building ----------------
+
+    def build(self, run, plan: InvoicePlan, students: List[StudentRow], student_usage: Dict):
+        """
+        (invoices, items, applied discounts) for ``students``, unsaved and
+        without invoice numbers; students without fees get no invoice
+        """
+        from apps.finance.models import AppliedDiscount, Invoice, InvoiceItem
+        from apps.finance.utils.totals import InvoiceTotalsService
+
+        today = timezone.now().date()
+        invoices, items, applied = [], [], []
+        # Uses in this chunk; plan.discount_usage only counts committed chunks
+        chunk_usage = Counter()
+        for student in students:
+            fees = plan.fees.get((student.class_id, student.academic_year_id))
+            if not fees:
+                continue
+
+            invoice = Invoice(
+                tenant_id=run.tenant_id, created_by_id=run.created_by_id,
+                student_id=student.pk, academic_year_id=student.academic_year_id,
+                billing_period=run.billing_period, issue_date=run.issue_date, due_date=run.due_date,
+                late_fee=Decimal('0.00'), paid_amount=Decimal('0.00'),
+            )
+            subtotal = total_tax = Decimal('0.00')
+            for fee in fees:
+                tax = plan.tax(fee.amount)
+                items.append(InvoiceItem(
+                    tenant_id=run.tenant_id, created_by_id=run.created_by_id, invoice=invoice,
+                    fee_structure_id=fee.fee_id, amount=fee.amount, tax_amount=tax,
+                    description=f"{fee.name} - {run.billing_period}",
+                ))
+                subtotal += fee.amount
+                total_tax += tax
+
+            total_discount = Decimal('0.00')
+            for rule in plan.discounts:
+                discount = rule.discount
+                if not discount_applies(rule, student):
+                    continue
+                if discount.max_usage_per_student and \
+                        student_usage.get((discount.pk, student.pk), 0) >= discount.max_usage_per_student:
+                    continue
+                if discount.total_usage_limit and \
+                        plan.discount_usage.get(discount.pk, 0) + chunk_usage[discount.pk] >= discount.total_usage_limit:
+                    continue
+                amount = min(
+                    discount.calculate_discount_amount(subtotal).quantize(CENT, rounding=ROUND_HALF_UP),
+                    subtotal - total_discount,
+                )
+                if amount <= 0:
+                    continue
+                applied.append(AppliedDiscount(
+                    tenant_id=run.tenant_id, created_by_id=run.created_by_id, invoice=invoice,
+                    discount=discount, amount=amount, applied_by_id=plan.applied_by_id,
+                    reason=f"Invoice run for {run.billing_period}",
+                ))
+                total_discount += amount
+                chunk_usage[discount.pk] += 1
+
+            InvoiceTotalsService.apply_totals(invoice, subtotal, total_tax, total_discount, today)
+            invoices.append(invoice)
+        return invoices, items, applied
+
+    # ---------------- processing ----------------
+
+    def _process_chunk(self, run_id, plan: InvoicePlan) -> bool:
+        """Invoice the next chunk of students; False once the run is done"""
+        from apps.core.utils.sequences import sequences
+        from apps.finance.models import AppliedDiscount, Invoice, InvoiceItem, InvoiceRun
+        from apps.finance.utils.receivables import receivables
+
+        with transaction.atomic():
+            run = InvoiceRun._base_manager.select_for_update().get(pk=run_id)
+            if run.status != 'RUNNING':
+                return False
+
+            started = time.perf_counter()
+            students = [
+                StudentRow(*row) for row in self.candidates(run).order_by('pk').values_list(
+                    'pk', 'current_class_id', 'academic_year_id', 'category'
+                )[:self.config['CHUNK_SIZE']]
+            ]
+            if not students:
+                run.status = 'COMPLETED'
+                run.finished_at = timezone.now()
+                run.save(update_fields=['status', 'finished_at', 'updated_at'])
+                return False
+
+            usage = self._student_usage(plan, [student.pk for student in students])
+            invoices, items, applied = self.build(run, plan, students, usage)
+            numbers = sequences.reserve(
+                'invoice', plan.tenant, len(invoices),
+                start=plan.numbering['start'], prefix=plan.numbering['prefix'],
+            )
+            for invoice, number in zip(invoices, numbers):
+                invoice.invoice_number = number
+
+            Invoice.objects.bulk_create(invoices)
+            InvoiceItem.objects.bulk_create(items)
+            AppliedDiscount.objects.bulk_create(applied)
+            transaction.on_commit(lambda: self._count_discount_usage(plan, applied))
+            receivables.students_changed(plan.tenant.pk, [invoice.student_id for invoice in invoices])
+
+            run.processed_students += len(students)
+            run.skipped_students += len(students) - len(invoices)
+            run.invoices_created += len(invoices)
+            run.items_created += len(items)
+            run.discounts_applied += len(applied)
+            run.amount_billed += sum((invoice.total_amount for invoice in invoices), Decimal('0.00'))
+            run.last_student_id = students[-1].pk
+            run.elapsed_seconds += time.perf_counter() - started
+            run.save(update_fields=[
+                'processed_students', 'skipped_students', 'invoices_created', 'items_created',
+                'discounts_applied', 'amount_billed', 'last_student_id', 'elapsed_seconds', 'updated_at',
+            ])
+        return True
+
+    @staticmethod
+    def _count_discount_usage(plan: InvoicePlan, applied) -> None:
+        """Add a committed chunk's discounts to the run's usage counts"""
+        for discount_id, count in Counter(entry.discount_id for entry in applied).items():
+            plan.discount_usage[discount_id] = plan.discount_usage.get(discount_id, 0) + count
+
+
+invoice_runs = InvoiceRunService()
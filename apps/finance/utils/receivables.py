@@ -0,0 +1,249 @@
+# apps/finance/utils/receivables.py
+"""
+ReceivableBalance maintenance and reads
+
+Each student with invoices has one ReceivableBalance row: invoiced,
+collected and outstanding amounts, with the outstanding amount aged into
+not-yet-due / 0-30 / 31-60 / 61-90 / 90+ days past due.
+
+Invoice and payment writes mark their student as changed; the changed
+students of a transaction are recounted once, when it commits, with one
+grouped query over their invoices and one upsert. A nightly refresh
+recounts every student of a tenant the same way, which also moves
+balances into older buckets as the days pass.
+
+The finance dashboard and the due-fees report and export read these
+rows, one per student, instead of aggregating invoices and payments on
+every page load.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECEIVABLES = {
+    'BATCH_SIZE': 1000,  # balances written per upsert
+}
+
+# Invoices that do not count towards receivables
+EXCLUDED_STATUSES = ('DRAFT', 'CANCELLED', 'REFUNDED')
+
+# Aging bucket field -> (min, max) days past due, None for unbounded
+AGE_BUCKETS = {
+    'days_0_30': (0, 30),
+    'days_31_60': (31, 60),
+    'days_61_90': (61, 90),
+    'days_over_90': (91, None),
+}
+# Report filter choices: field -> label
+RECEIVABLE_BUCKETS = (
+    ('not_due', 'Not yet due'),
+    ('days_0_30', '0-30 days'),
+    ('days_31_60', '31-60 days'),
+    ('days_61_90', '61-90 days'),
+    ('days_over_90', '90+ days'),
+)
+AMOUNT_FIELDS = ('invoiced', 'collected', 'outstanding', 'not_due', *AGE_BUCKETS)
+COUNT_FIELDS = ('open_invoices', 'overdue_invoices')
+BALANCE_FIELDS = (*AMOUNT_FIELDS, *COUNT_FIELDS, 'class_name', 'oldest_due_date', 'as_of')
+
+
+def receivables_settings():
+    config = dict(DEFAULT_RECEIVABLES)
+    config.update(getattr(settings, 'RECEIVABLES', {}))
+    return config
+
+
+def empty_totals() -> Dict:
+    totals = dict.fromkeys(AMOUNT_FIELDS, 0)
+    totals.update(dict.fromkeys(COUNT_FIELDS, 0))
+    totals['students'] = 0
+    totals['overdue'] = 0
+    return totals
+
+
+class ReceivablesService:
+    """Keeps ReceivableBalance rows in step with invoices; the singleton is ``receivables``"""
+
+    def __init__(self, config=None):
+        self.config = config or receivables_settings()
+
+    # ---------------- incremental ----------------
+
+    def students_changed(self, tenant_id, student_ids: Iterable) -> None:
+        """
+        Recount these students when the current transaction commits (right
+        away outside one); changes in one transaction are recounted together
+        """
+        student_ids = {student_id for student_id in student_ids if student_id}
+        if not tenant_id or not student_ids:
+            return
+
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            self._refresh_safely(tenant_id, student_ids)
+            return
+
+        # One flush per transaction; a rolled back savepoint drops the
+        # callback, and the next change registers a new one
+        pending = getattr(connection, '_receivables_pending', None)
+        if pending is None or not any(func == self._flush for _, func, _ in connection.run_on_commit):
+            pending = connection._receivables_pending = defaultdict(set)
+            transaction.on_commit(self._flush)
+        pending[tenant_id].update(student_ids)
+
+    def _flush(self):
+        connection = transaction.get_connection()
+        pending = getattr(connection, '_receivables_pending', None) or {}
+        connection._receivables_pending = None
+        for tenant_id, student_ids in pending.items():
+            self._refresh_safely(tenant_id, student_ids)
+
+    def _refresh_safely(self, tenant_id, student_ids):
+        """Balances that fail to update are repaired by the nightly refresh"""
+        try:
+            self.refresh(tenant_id, student_ids)
+        except Exception as e:
+            logger.error(f"Failed to refresh receivable balances: {e}", exc_info=True)
+
+    # ---------------- recounting ----------------
+
+    def refresh(self, tenant_id, student_ids: Optional[Iterable] = None, today=None) -> int:
+        """
+        Recount the balances of ``student_ids`` (every student when None)
+        from the invoices, and drop balances left without invoices.
+        Returns the number of balances written.
+        """
+        from apps.finance.models import ReceivableBalance
+
+        today = today or timezone.now().date()
+        started = timezone.now()
+        student_ids = None if student_ids is None else list(student_ids)
+        balances = self.count(tenant_id, today, student_ids)
+
+        with transaction.atomic():
+            if balances:
+                ReceivableBalance.objects.bulk_create(
+                    balances,
+                    batch_size=self.config['BATCH_SIZE'],
+                    update_conflicts=True,
+                    unique_fields=['tenant', 'student'],
+                    update_fields=[*BALANCE_FIELDS, 'updated_at'],
+                )
+            stale = ReceivableBalance.objects.filter(tenant_id=tenant_id)
+            if student_ids is None:
+                stale = stale.filter(updated_at__lt=started)
+            else:
+                stale = stale.filter(student_id__in=student_ids).exclude(
+                    student_id__in=[balance.student_id for balance in balances]
+                )
+            stale.delete()
+        return len(balances)
+
+    def count(self, tenant_id, today, student_ids=None):
+        """Unsaved ReceivableBalance rows, one grouped query over the invoices"""
+        from apps.finance.models import Invoice, ReceivableBalance
+
+        invoices = Invoice._base_manager.filter(tenant_id=tenant_id, is_active=True).exclude(
+            status__in=EXCLUDED_STATUSES
+        )
+        if student_ids is not None:
+            invoices = invoices.filter(student_id__in=student_ids)
+
+        rows = invoices.order_by().values('student_id', 'student__current_class_id').annotate(
+            **self.aggregates(today)
+        )
+        return [
+            ReceivableBalance(
+                tenant_id=tenant_id,
+                student_id=row['student_id'],
+                class_name_id=row['student__current_class_id'],
+                as_of=today,
+                oldest_due_date=row['oldest_due_date'],
+                **{field: row[field] or 0 for field in (*AMOUNT_FIELDS, *COUNT_FIELDS)},
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def aggregates(today) -> Dict:
+        """Balance field -> aggregate over a student's invoices"""
+        owing = Q(due_amount__gt=0)
+        overdue = owing & Q(due_date__lt=today)
+        aggregates = {
+            'invoiced': Sum('total_amount'),
+            'collected': Sum('paid_amount'),
+            'outstanding': Sum('due_amount', filter=owing),
+            'not_due': Sum('due_amount', filter=owing & Q(due_date__gte=today)),
+            'open_invoices': Count('pk', filter=owing),
+            'overdue_invoices': Count('pk', filter=overdue),
+            'oldest_due_date': Min('due_date', filter=owing),
+        }
+        for field, (low, high) in AGE_BUCKETS.items():
+            # Days past due are today - due_date, so bounds on age are
+            # reversed bounds on the due date
+            bucket = overdue & Q(due_date__lte=today - timedelta(days=max(low, 1)))
+            if high is not None:
+                bucket &= Q(due_date__gte=today - timedelta(days=high))
+            aggregates[field] = Sum('due_amount', filter=bucket)
+        return aggregates
+
+    # ---------------- reading ----------------
+
+    def balances(self, tenant_id, class_id=None, bucket: Optional[str] = None):
+        """Balances with something outstanding, optionally of one class or aging bucket"""
+        from apps.finance.models import ReceivableBalance
+
+        balances = ReceivableBalance.objects.filter(tenant_id=tenant_id, outstanding__gt=0)
+        if class_id:
+            balances = balances.filter(class_name_id=class_id)
+        if bucket in AGE_BUCKETS or bucket == 'not_due':
+            balances = balances.filter(**{f'{bucket}__gt': 0})
+        return balances
+
+    @staticmethod
+    def _sums():
+        sums = {field: Sum(field) for field in (*AMOUNT_FIELDS, *COUNT_FIELDS)}
+        sums['students'] = Count('pk', filter=Q(outstanding__gt=0))
+        return sums
+
+    @staticmethod
+    def _totals(row) -> Dict:
+        totals = empty_totals()
+        totals.update({field: value or 0 for field, value in row.items() if field in totals})
+        totals['overdue'] = sum(totals[field] for field in AGE_BUCKETS)
+        return totals
+
+    def totals(self, tenant_id, class_id=None) -> Dict:
+        """Tenant (or class) totals of every balance field, in one query"""
+        from apps.finance.models import ReceivableBalance
+
+        balances = ReceivableBalance.objects.filter(tenant_id=tenant_id)
+        if class_id:
+            balances = balances.filter(class_name_id=class_id)
+        return self._totals(balances.aggregate(**self._sums()))
+
+    def totals_by_class(self, tenant_id) -> list:
+        """Totals per class, largest outstanding first, in one query"""
+        from apps.finance.models import ReceivableBalance
+
+        rows = ReceivableBalance.objects.filter(tenant_id=tenant_id).order_by().values(
+            'class_name_id', 'class_name__name'
+        ).annotate(**self._sums())
+        classes = []
+        for row in rows:
+            totals = self._totals(row)
+            totals.update(class_id=row['class_name_id'], class_name=row['class_name__name'])
+            classes.append(totals)
+        return sorted(classes, key=lambda totals: totals['outstanding'], reverse=True)
+
+
+receivables = ReceivablesService()
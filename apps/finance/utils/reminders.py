@@ -0,0 +1,301 @@
+# apps/finance/utils/reminders.py
+"""
+Overdue sweeps and batched payment reminders
+
+Invoice.save() only notices that an invoice fell overdue when something
+saves it. ``sweep_overdue`` flips every open invoice past its due date
+to OVERDUE, with its overdue days, in one UPDATE per tenant, then
+re-signs the changed rows in batches.
+
+``dispatch`` reminds the payers of a tenant's overdue invoices:
+
+- one query for the invoices due a reminder: overdue, still owing, and
+  not reminded (successfully) in the last ``INTERVAL_DAYS``,
+- one query for the primary guardians' email addresses,
+- one message per address, listing every overdue invoice of the
+  students it pays for, so siblings share one reminder,
+- messages sent ``BATCH_SIZE`` at a time over one mail connection, each
+  batch recorded with one bulk INSERT of PaymentReminder rows.
+
+At most ``HOURLY_LIMIT`` messages leave a tenant per hour; the
+recipients over the limit are left for the next run. One dispatch runs
+per tenant at a time (a Postgres advisory lock, or a cache lock on other
+databases), so the daily run and a manual send never both remind the
+same invoices.
+"""
+
+import logging
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import (
+    Count, DateField, DurationField, Exists, ExpressionWrapper, F, OuterRef, Sum, Value,
+)
+from django.db.models.functions import ExtractDay
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEE_REMINDERS = {
+    'INTERVAL_DAYS': 7,  # days before an invoice is reminded again
+    'HOURLY_LIMIT': 1000,  # reminder messages per tenant per hour
+    'BATCH_SIZE': 100,  # messages per mail connection and INSERT
+    'LOCK_TIMEOUT': 60 * 60,  # seconds a cache lock outlives a crashed dispatch
+}
+
+# Invoices that can fall overdue
+OPEN_STATUSES = ('ISSUED', 'PARTIALLY_PAID', 'OVERDUE')
+
+DueInvoice = namedtuple(
+    'DueInvoice',
+    'pk student_id invoice_number due_date due_amount overdue_days first_name last_name student_email',
+)
+
+
+def fee_reminder_settings():
+    config = dict(DEFAULT_FEE_REMINDERS)
+    config.update(getattr(settings, 'FEE_REMINDERS', {}))
+    return config
+
+
+def reminder_message(tenant_name: str, invoices: List[DueInvoice]) -> Tuple[str, str]:
+    """Subject and body of one reminder"""
+    total = sum(invoice.due_amount for invoice in invoices)
+    lines = "\n".join(
+        f"- {invoice.invoice_number} ({invoice.first_name} {invoice.last_name}): "
+        f"{invoice.due_amount} due on {invoice.due_date:%d %b %Y}, {invoice.overdue_days} days overdue"
+        for invoice in invoices
+    )
+    subject = f"Payment reminder: {len(invoices)} overdue invoice{'s' if len(invoices) > 1 else ''}"
+    body = f"""
+Dear Parent/Guardian,
+
+The following fee invoices are overdue:
+
+{lines}
+
+Total outstanding: {total}
+
+Please clear the dues at the earliest. If you have already paid, please ignore this message.
+
+Regards,
+{tenant_name}
+"""
+    return subject, body
+
+
+class FeeReminderService:
+    """Overdue sweeps and reminder dispatch for one tenant; the singleton is ``fee_reminders``"""
+
+    def __init__(self, config=None):
+        self.config = config or fee_reminder_settings()
+
+    # ---------------- overdue sweep ----------------
+
+    def overdue_invoices(self, tenant_id, today=None):
+        """Open invoices past their due date with an amount still due"""
+        from apps.finance.models import Invoice
+
+        today = today or timezone.now().date()
+        return Invoice._base_manager.filter(
+            tenant_id=tenant_id, is_active=True, status__in=OPEN_STATUSES,
+            due_amount__gt=0, due_date__lt=today,
+        )
+
+    def sweep_overdue(self, tenant_id, today=None) -> int:
+        """Mark the tenant's overdue invoices as such; returns the invoices updated"""
+        from apps.core.utils.integrity import integrity_settings, resign_rows
+        from apps.finance.models import Invoice
+
+        today = today or timezone.now().date()
+        now = timezone.now()
+        days_late = ExpressionWrapper(
+            Value(today, output_field=DateField()) - F('due_date'), output_field=DurationField()
+        )
+        with transaction.atomic():
+            # Locked so the rows re-signed below are exactly the rows updated
+            pks = list(
+                self.overdue_invoices(tenant_id, today).exclude(
+                    status='OVERDUE', overdue_days=ExtractDay(days_late)
+                ).select_for_update().values_list('pk', flat=True)
+            )
+            updated = 0
+            if pks:
+                changed = Invoice._base_manager.filter(pk__in=pks)
+                updated = changed.update(
+                    status='OVERDUE', is_overdue=True, overdue_days=ExtractDay(days_late), updated_at=now,
+                )
+                # update() bypasses save(), which signs the rows
+                resign_rows(changed, batch_size=integrity_settings()['BATCH_SIZE'])
+        logger.info(f"Marked {updated} invoices overdue for tenant {tenant_id}")
+        return updated
+
+    def overdue_summary(self, tenant_id, today=None) -> Dict:
+        """Count, amount and students of the overdue invoices, in one query"""
+        summary = self.overdue_invoices(tenant_id, today).aggregate(
+            count=Count('pk'), amount=Sum('due_amount'), students=Count('student', distinct=True),
+        )
+        summary['amount'] = summary['amount'] or 0
+        return summary
+
+    # ---------------- reminders ----------------
+
+    def queue(self, schema_name: str) -> None:
+        """Send the tenant's reminders in the background once the transaction commits"""
+        from apps.finance.tasks import send_payment_reminders
+
+        transaction.on_commit(lambda: send_payment_reminders.delay(schema_name))
+
+    def due_reminders(self, tenant_id, now=None):
+        """Overdue invoices without a reminder in the last INTERVAL_DAYS"""
+        from apps.finance.models import Invoice, PaymentReminder
+
+        now = now or timezone.now()
+        reminded = PaymentReminder._base_manager.filter(
+            invoice_id=OuterRef('pk'), is_active=True, status='SENT',
+            sent_at__gte=now - timedelta(days=self.config['INTERVAL_DAYS']),
+        )
+        return Invoice._base_manager.filter(
+            tenant_id=tenant_id, is_active=True, status='OVERDUE', due_amount__gt=0,
+        ).filter(~Exists(reminded))
+
+    def remaining_quota(self, tenant_id, now=None) -> int:
+        """Messages the tenant may still send this hour"""
+        from apps.finance.models import PaymentReminder
+
+        now = now or timezone.now()
+        sent = PaymentReminder._base_manager.filter(
+            tenant_id=tenant_id, sent_at__gte=now - timedelta(hours=1),
+        ).values('recipient', 'sent_at').distinct().count()
+        return max(0, self.config['HOURLY_LIMIT'] - sent)
+
+    def guardian_emails(self, student_ids) -> Dict:
+        """{student id: primary guardian's email}"""
+        from apps.students.models import Guardian
+
+        return dict(
+            Guardian._base_manager.filter(
+                student_id__in=student_ids, is_primary=True, is_active=True,
+            ).exclude(email='').values_list('student_id', 'email')
+        )
+
+    def group_by_recipient(self, invoices: List[DueInvoice], guardian_emails: Dict) -> OrderedDict:
+        """{email: [invoices]}, the primary guardian's address before the student's"""
+        recipients = OrderedDict()
+        for invoice in invoices:
+            email = (guardian_emails.get(invoice.student_id) or invoice.student_email or '').strip().lower()
+            if email:
+                recipients.setdefault(email, []).append(invoice)
+        return recipients
+
+    @contextmanager
+    def dispatch_lock(self, tenant_id):
+        """Yields whether this process holds the tenant's dispatch lock"""
+        key = f'fee_reminders:dispatch:{tenant_id}'
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_lock(hashtext(%s))', [key])
+                acquired = cursor.fetchone()[0]
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT pg_advisory_unlock(hashtext(%s))', [key])
+            return
+
+        acquired = cache.add(key, True, self.config['LOCK_TIMEOUT'])
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                cache.delete(key)
+
+    def dispatch(self, tenant, now=None) -> Dict:
+        """Send the tenant's due reminders; returns what was sent, failed and left over"""
+        with self.dispatch_lock(tenant.pk) as acquired:
+            if not acquired:
+                logger.info(f"Payment reminders for {tenant.schema_name} are already being sent; skipping")
+                return self._empty_result()
+            return self._dispatch(tenant, now)
+
+    @staticmethod
+    def _empty_result() -> Dict:
+        return {'recipients': 0, 'sent': 0, 'failed': 0, 'invoices': 0, 'no_address': 0, 'deferred': 0}
+
+    def _dispatch(self, tenant, now=None) -> Dict:
+        now = now or timezone.now()
+        result = self._empty_result()
+
+        quota = self.remaining_quota(tenant.pk, now)
+        invoices = [
+            DueInvoice(*row) for row in self.due_reminders(tenant.pk, now).order_by(
+                'student_id', 'due_date'
+            ).values_list(
+                'pk', 'student_id', 'invoice_number', 'due_date', 'due_amount', 'overdue_days',
+                'student__first_name', 'student__last_name', 'student__personal_email',
+            )
+        ]
+        if not invoices:
+            return result
+
+        guardian_emails = self.guardian_emails({invoice.student_id for invoice in invoices})
+        recipients = self.group_by_recipient(invoices, guardian_emails)
+        result['no_address'] = len(invoices) - sum(len(group) for group in recipients.values())
+        result['recipients'] = len(recipients)
+
+        batch = []
+        for email, group in recipients.items():
+            if result['sent'] + result['failed'] + len(batch) >= quota:
+                result['deferred'] += 1
+                continue
+            batch.append((email, group))
+            if len(batch) >= self.config['BATCH_SIZE']:
+                self._send_batch(tenant, batch, now, result)
+                batch = []
+        if batch:
+            self._send_batch(tenant, batch, now, result)
+
+        logger.info(
+            f"Payment reminders for {tenant.schema_name}: {result['sent']} sent, "
+            f"{result['failed']} failed, {result['deferred']} deferred by the hourly limit"
+        )
+        return result
+
+    def _send_batch(self, tenant, batch, now, result: Dict) -> None:
+        """Send one batch over one connection and record it with one INSERT"""
+        from apps.finance.models import PaymentReminder
+
+        messages = []
+        for email, group in batch:
+            subject, body = reminder_message(tenant.name, group)
+            messages.append(EmailMessage(subject=subject, body=body, to=[email]))
+
+        error = ''
+        try:
+            with get_connection(fail_silently=False) as mail_connection:
+                mail_connection.send_messages(messages)
+        except Exception as e:
+            logger.error(f"Failed to send {len(messages)} payment reminders: {e}", exc_info=True)
+            error = str(e)
+        status = 'FAILED' if error else 'SENT'
+
+        PaymentReminder.objects.bulk_create([
+            PaymentReminder(
+                tenant_id=tenant.pk, invoice_id=invoice.pk, student_id=invoice.student_id,
+                recipient=email, status=status, due_amount=invoice.due_amount,
+                overdue_days=invoice.overdue_days, sent_at=now, error=error,
+            )
+            for email, group in batch for invoice in group
+        ])
+        result['failed' if error else 'sent'] += len(batch)
+        result['invoices'] += sum(len(group) for _, group in batch)
+
+
+fee_reminders = FeeReminderService()
@@ -0,0 +1,199 @@
+# apps/finance/utils/totals.py
+"""
+Invoice total recomputation
+
+An invoice's subtotal, tax, discount, total, due amount and status
+follow from its items and applied discounts. Every InvoiceItem and
+AppliedDiscount write marks its invoice as changed; outside a unit of
+work the invoice is recomputed right away, inside
+``invoice_totals.deferred()`` the invoices are collected and recomputed
+once when the block exits:
+
+- one aggregate query each over the items and the discounts of all the
+  changed invoices, grouped by invoice,
+- one bulk UPDATE writing the totals, status and signature of those
+  invoices,
+
+instead of re-reading the children and saving (and signing) the invoice
+after every child. The tenant's tax rate is looked up once per unit of
+work rather than once per item.
+
+The block is a transaction: if it raises, nothing is written and the
+pending recomputations are dropped.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.db import models, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0.00')
+
+# Invoice fields written by a recomputation
+TOTAL_FIELDS = (
+    'subtotal', 'total_tax', 'total_discount', 'total_amount', 'due_amount',
+    'status', 'is_overdue', 'overdue_days',
+)
+
+
+class UnitOfWork:
+    """Invoices changed inside one ``deferred()`` block, and its tax rates"""
+
+    def __init__(self):
+        # invoice id -> the instances to update in memory
+        self.pending: Dict[object, List] = {}
+        self.tax_rates: Dict[object, Optional[Decimal]] = {}
+
+    def add(self, invoice_id, instance=None) -> None:
+        instances = self.pending.setdefault(invoice_id, [])
+        if instance is not None and not any(known is instance for known in instances):
+            instances.append(instance)
+
+
+_unit_of_work: ContextVar[Optional[UnitOfWork]] = ContextVar('invoice_totals', default=None)
+
+
+class InvoiceTotalsService:
+    """Keeps invoice totals in step with their children; the singleton is ``invoice_totals``"""
+
+    # ---------------- public API ----------------
+
+    @contextmanager
+    def deferred(self):
+        """
+        Recompute the invoices changed inside the block once, when it
+        exits; nested blocks join the outermost one
+        """
+        if _unit_of_work.get() is not None:
+            with transaction.atomic():
+                yield
+            return
+
+        unit = UnitOfWork()
+        token = _unit_of_work.set(unit)
+        try:
+            with transaction.atomic():
+                yield
+                self._flush(unit)
+        finally:
+            _unit_of_work.reset(token)
+
+    def invoice_changed(self, invoice) -> None:
+        """Recompute ``invoice`` (an instance or its id) now, or when the unit of work ends"""
+        invoice_id, instance = (invoice.pk, invoice) if isinstance(invoice, models.Model) else (invoice, None)
+        unit = _unit_of_work.get()
+        if unit is not None:
+            unit.add(invoice_id, instance)
+        else:
+            self.recompute([invoice_id], [instance] if instance is not None else ())
+
+    def refresh(self, invoice) -> None:
+        """Bring a pending invoice up to date before its totals are read"""
+        unit = _unit_of_work.get()
+        if unit is not None and invoice.pk in unit.pending:
+            instances = unit.pending.pop(invoice.pk)
+            self.recompute([invoice.pk], [invoice, *(other for other in instances if other is not invoice)])
+
+    def tax_rate(self, tenant) -> Optional[Decimal]:
+        """The tenant's tax rate, None when tax is disabled; read once per unit of work"""
+        from apps.configuration.models import FinancialConfiguration
+
+        unit = _unit_of_work.get()
+        if unit is not None and tenant.pk in unit.tax_rates:
+            return unit.tax_rates[tenant.pk]
+        config = FinancialConfiguration.get_for_tenant(tenant)
+        rate = config.tax_rate if config.tax_enabled else None
+        if unit is not None:
+            unit.tax_rates[tenant.pk] = rate
+        return rate
+
+    def item_tax(self, amount: Decimal, tenant) -> Decimal:
+        """Tax on an item amount, rounded as it always was"""
+        rate = self.tax_rate(tenant)
+        if rate is None:
+            return ZERO
+        return round((amount * rate) / 100, 2)
+
+    def recompute(self, invoice_ids: Iterable, instances: Iterable = ()) -> int:
+        """
+        Recompute and write the totals of ``invoice_ids``; ``instances``
+        of those invoices are updated in memory too. Returns the number of
+        invoices written.
+        """
+        from apps.core.utils.integrity import signature_plan, signing_deferred
+        from apps.finance.models import AppliedDiscount, Invoice, InvoiceItem
+        from apps.finance.utils.receivables import receivables
+
+        invoice_ids = list(dict.fromkeys(invoice_ids))
+        if not invoice_ids:
+            return 0
+
+        items = {
+            row['invoice_id']: row for row in InvoiceItem._base_manager.filter(
+                invoice_id__in=invoice_ids, is_active=True
+            ).values('invoice_id').annotate(subtotal=Sum('amount'), tax=Sum('tax_amount')).order_by()
+        }
+        discounts = dict(
+            AppliedDiscount._base_manager.filter(
+                invoice_id__in=invoice_ids, is_active=True
+            ).values_list('invoice_id').annotate(total=Sum('amount')).order_by()
+        )
+
+        invoices = list(Invoice._base_manager.filter(pk__in=invoice_ids))
+        today = timezone.now().date()
+        now = timezone.now()
+        deferred = signing_deferred()
+        plan = signature_plan(Invoice)
+        for invoice in invoices:
+            row = items.get(invoice.pk, {})
+            self.apply_totals(
+                invoice, row.get('subtotal') or ZERO, row.get('tax') or ZERO,
+                discounts.get(invoice.pk) or ZERO, today,
+            )
+            invoice.updated_at = now
+            # bulk_update() bypasses save(), so sign as save() would
+            invoice.data_signature = '' if deferred else plan.sign(invoice)
+
+        Invoice._base_manager.bulk_update(invoices, [*TOTAL_FIELDS, 'data_signature', 'updated_at'])
+        # bulk_update() sends no post_save either
+        for tenant_id in {invoice.tenant_id for invoice in invoices}:
+            receivables.students_changed(
+                tenant_id, [invoice.student_id for invoice in invoices if invoice.tenant_id == tenant_id]
+            )
+
+        written = {invoice.pk: invoice for invoice in invoices}
+        for instance in instances:
+            source = written.get(instance.pk)
+            if source is not None:
+                for field in (*TOTAL_FIELDS, 'data_signature', 'updated_at'):
+                    setattr(instance, field, getattr(source, field))
+        return len(invoices)
+
+    @staticmethod
+    def apply_totals(invoice, subtotal: Decimal, tax: Decimal, discount: Decimal, today=None) -> None:
+        """Set an invoice's totals and status from the sums of its children"""
+        invoice.subtotal = subtotal
+        invoice.total_tax = tax
+        invoice.total_discount = discount
+        invoice.total_amount = subtotal - discount + tax + invoice.late_fee
+        invoice.refresh_status(today)
+
+    # ---------------- internals ----------------
+
+    def _flush(self, unit: UnitOfWork) -> None:
+        pending, unit.pending = unit.pending, {}
+        if not pending:
+            return
+        instances = [instance for group in pending.values() for instance in group]
+        count = self.recompute(pending, instances)
+        logger.debug(f"Recomputed the totals of {count} invoices")
+
+
+invoice_totals = InvoiceTotalsService()
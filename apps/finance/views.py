@@ -2,7 +2,7 @@ import csv
 from datetime import datetime, timedelta
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
-from django.db.models import Sum, Count, Q, F
+from django.db.models import Sum, Count, Q, F, Prefetch
 from django.db.models.functions import TruncMonth
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -36,8 +36,14 @@ from apps.core.permissions.mixins import (
 # Core Imports
 from apps.core.views import (
     BaseView, BaseListView, BaseDetailView, BaseCreateView, 
-    BaseUpdateView, BaseDeleteView, BaseTemplateView
+    BaseUpdateView, BaseDeleteView, BaseTemplateView, ExportMixin
 )
+from apps.core.utils.api import PageOrCursorPagination, RelatedQueryMixin
+from apps.core.utils.exports import Column
+from apps.finance.utils.invoicing import invoice_runs
+from apps.finance.utils.receivables import RECEIVABLE_BUCKETS, receivables
+from apps.finance.utils.reminders import fee_reminders
+from apps.finance.utils.totals import invoice_totals
 from apps.core.utils.tenant import get_current_tenant
 from apps.core.services.audit_service import AuditService
 
@@ -45,7 +51,8 @@ from apps.finance.models import (
     FeeStructure, FeeDiscount, Invoice, InvoiceItem, 
     AppliedDiscount, Payment, Refund, ExpenseCategory, 
     Expense, Budget, FinancialTransaction, BankAccount, FinancialReport,
-    BudgetCategory, BudgetItem, BudgetTemplate, BudgetTemplateItem
+    BudgetCategory, BudgetItem, BudgetTemplate, BudgetTemplateItem, InvoiceRun,
+    ReceivableBalance
 )
 from apps.finance.forms import (
     FeeStructureForm, FeeDiscountForm, InvoiceForm, 
@@ -182,6 +189,33 @@ class InvoiceListView(BaseListView):
         context['due_amount'] = queryset.aggregate(total=Sum('due_amount'))['total'] or 0
         return context
 
+class InvoiceExportView(ExportMixin, InvoiceListView):
+    """Export the filtered invoice list as CSV or Excel"""
+    export_filename = 'invoices'
+    export_columns = (
+        Column('Invoice Number', 'invoice_number'),
+        Column('Admission Number', 'student__admission_number'),
+        Column('Student Name', 'student__first_name', 'student__middle_name', 'student__last_name'),
+        Column('Academic Year', 'academic_year__name'),
+        Column('Billing Period', 'billing_period'),
+        Column('Issue Date', 'issue_date'),
+        Column('Due Date', 'due_date'),
+        Column('Subtotal', 'subtotal'),
+        Column('Discount', 'total_discount'),
+        Column('Tax', 'total_tax'),
+        Column('Late Fee', 'late_fee'),
+        Column('Total', 'total_amount'),
+        Column('Paid', 'paid_amount'),
+        Column('Due', 'due_amount'),
+        Column('Status', 'status', display=True),
+    )
+
+    def get(self, request, *args, **kwargs):
+        return self.export(request, *args, **kwargs)
+
+    def get_export_queryset(self):
+        return self.get_queryset().order_by('issue_date', 'invoice_number')
+
 class InvoiceCreateView(BaseCreateView):
     model = Invoice
     form_class = InvoiceForm
@@ -189,10 +223,26 @@ class InvoiceCreateView(BaseCreateView):
     success_url = reverse_lazy('finance:invoice_list')
     permission_required = 'finance.add_invoice'
     
+    def get_context_data(self, **kwargs):
+        data = super().get_context_data(**kwargs)
+        if 'items' not in kwargs:
+            data['items'] = InvoiceItemFormSet(self.request.POST or None)
+        return data
+
     def form_valid(self, form):
-        form.instance.issued_by = self.request.user
-        messages.success(self.request, 'Invoice created successfully!')
-        return super().form_valid(form)
+        items = InvoiceItemFormSet(self.request.POST)
+        
+        if items.is_valid():
+            # The totals are recomputed once, after all items are saved
+            with invoice_totals.deferred():
+                form.instance.issued_by = self.request.user
+                response = super().form_valid(form)
+                items.instance = self.object
+                items.save()
+            messages.success(self.request, 'Invoice created successfully!')
+            return response
+        else:
+            return self.render_to_response(self.get_context_data(form=form, items=items))
 
 class InvoiceUpdateView(BaseUpdateView):
     model = Invoice
@@ -201,6 +251,24 @@ class InvoiceUpdateView(BaseUpdateView):
     success_url = reverse_lazy('finance:invoice_list')
     permission_required = 'finance.change_invoice'
 
+    def get_context_data(self, **kwargs):
+        data = super().get_context_data(**kwargs)
+        if 'items' not in kwargs:
+            data['items'] = InvoiceItemFormSet(self.request.POST or None, instance=self.object)
+        return data
+
+    def form_valid(self, form):
+        items = InvoiceItemFormSet(self.request.POST, instance=self.object)
+        
+        if items.is_valid():
+            # The totals are recomputed once, after all items are saved
+            with invoice_totals.deferred():
+                response = super().form_valid(form)
+                items.save()
+            return response
+        else:
+            return self.render_to_response(self.get_context_data(form=form, items=items))
+
 class InvoiceDetailView(BaseDetailView):
     model = Invoice
     template_name = 'finance/invoice/detail.html'
@@ -272,10 +340,15 @@ class InvoiceApplyDiscountView(BaseView):
 
     def post(self, request, pk):
         invoice = get_object_or_404(Invoice, pk=pk, tenant=request.tenant)
-        discount_id = request.POST.get('discount')
-        if discount_id:
-            # Logic normally handles adding discount
+        form = ApplyDiscountForm(request.POST, invoice=invoice, user=request.user)
+        if form.is_valid():
+            with invoice_totals.deferred():
+                invoice.apply_discount(
+                    form.cleaned_data['discount'], request.user, form.cleaned_data['reason']
+                )
             messages.success(request, 'Discount applied.')
+        else:
+            messages.error(request, 'Select a discount this invoice is eligible for.')
         return redirect('finance:invoice_detail', pk=pk)
 
 class BulkInvoiceActionView(BaseView):
@@ -587,9 +660,10 @@ class FinanceDashboardView(BaseTemplateView):
             tenant=tenant, expense_date__month=current_month, expense_date__year=current_year, status='APPROVED'
         ).aggregate(Sum('amount'))['amount__sum'] or 0
         
-        context['pending_invoices'] = Invoice.objects.filter(
-            tenant=tenant, status__in=['DRAFT', 'ISSUED', 'PARTIAL']
-        ).count()
+        # Receivables come from the per-student balances, not the invoices
+        context['receivables'] = receivables.totals(tenant.pk)
+        context['receivables_by_class'] = receivables.totals_by_class(tenant.pk)[:10]
+        context['pending_invoices'] = context['receivables']['open_invoices']
         
         # Recent Activities
         context['recent_payments'] = Payment.objects.filter(tenant=tenant).order_by('-created_at')[:5]
@@ -602,15 +676,52 @@ class FeeCollectionReportView(BaseTemplateView):
     permission_required = 'finance.view_financialreport'
 
 class DueFeesReportView(BaseListView):
-    model = Invoice
+    model = ReceivableBalance
     template_name = 'finance/reports/due_fees.html'
-    context_object_name = 'invoices'
+    context_object_name = 'balances'
     permission_required = 'finance.view_financialreport'
+    paginate_by = 50
     
     def get_queryset(self):
-        qs = super().get_queryset()
-        # Custom logic for due fees if needed, or rely on template/filtering
-        return qs.filter(due_amount__gt=0)
+        # One row per student with dues, aged from the receivable balances
+        return receivables.balances(
+            get_current_tenant().pk,
+            class_id=self.request.GET.get('class_name') or None,
+            bucket=self.request.GET.get('bucket') or None,
+        ).select_related('student', 'class_name').order_by('-outstanding', 'student__first_name')
+
+    def get_context_data(self, **kwargs):
+        from apps.academics.models import SchoolClass
+
+        context = super().get_context_data(**kwargs)
+        tenant = get_current_tenant()
+        context['totals'] = receivables.totals(tenant.pk, class_id=self.request.GET.get('class_name') or None)
+        context['classes'] = SchoolClass.objects.filter(tenant=tenant, is_active=True).order_by('order', 'name')
+        context['buckets'] = RECEIVABLE_BUCKETS
+        return context
+
+class DueFeesExportView(ExportMixin, DueFeesReportView):
+    """Export the filtered due-fees report as CSV or Excel"""
+    export_filename = 'due_fees'
+    export_columns = (
+        Column('Admission Number', 'student__admission_number'),
+        Column('Student Name', 'student__first_name', 'student__middle_name', 'student__last_name'),
+        Column('Class', 'class_name__name'),
+        Column('Invoiced', 'invoiced'),
+        Column('Collected', 'collected'),
+        Column('Outstanding', 'outstanding'),
+        Column('Not Due', 'not_due'),
+        Column('0-30 Days', 'days_0_30'),
+        Column('31-60 Days', 'days_31_60'),
+        Column('61-90 Days', 'days_61_90'),
+        Column('90+ Days', 'days_over_90'),
+        Column('Open Invoices', 'open_invoices'),
+        Column('Oldest Due Date', 'oldest_due_date'),
+        Column('As Of', 'as_of'),
+    )
+
+    def get(self, request, *args, **kwargs):
+        return self.export(request, *args, **kwargs)
 
 
 # ==================== RAZORPAY & ONLINE PAYMENTS ====================
@@ -707,10 +818,22 @@ class PaymentCallbackView(View): # Keeping View + csrf_exempt as BaseView might
 # ==================== BULK & OTHERS ====================
 
 class GenerateMonthlyInvoicesView(BaseView):
+    """
+    Start an invoice run for a billing month; the invoices are generated
+    in the background by apps.finance.utils.invoicing
+    """
     permission_required = 'finance.add_invoice'
+    template_name = 'finance/utils/generate_invoices.html'
+
+    def get_context_data(self):
+        from apps.academics.models import SchoolClass
+        return {
+            'classes': SchoolClass.objects.filter(tenant=self.request.tenant).order_by('name'),
+            'runs': InvoiceRun.objects.filter(tenant=self.request.tenant)[:10],
+        }
 
     def get(self, request):
-        return render(request, 'finance/utils/generate_invoices.html')
+        return render(request, self.template_name, self.get_context_data())
 
     def post(self, request):
         billing_month_str = request.POST.get('billing_month')  # YYYY-MM
@@ -718,81 +841,58 @@ class GenerateMonthlyInvoicesView(BaseView):
 
         if not billing_month_str or not due_date_str:
             messages.error(request, _("Please provide both billing month and due date."))
-            return render(request, 'finance/utils/generate_invoices.html')
+            return render(request, self.template_name, self.get_context_data())
 
         try:
-            # Parse dates
-            from datetime import datetime
             billing_date = datetime.strptime(billing_month_str, '%Y-%m').date()
             due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
-            billing_period = billing_date.strftime('%B %Y')
-
-            # Get active students
-            from apps.students.models import Student
-            students = Student.objects.filter(
-                status='ACTIVE',
-                tenant=self.request.tenant
-            ).select_related('current_class', 'academic_year')
+        except ValueError:
+            messages.error(request, _("Please provide a valid billing month and due date."))
+            return render(request, self.template_name, self.get_context_data())
+        billing_period = billing_date.strftime('%B %Y')
 
-            invoices_created = 0
-            
+        try:
             with transaction.atomic():
-                for student in students:
-                    # Find applicable monthly fees for the student's class
-                    # For simplicity, we assume fees are linked to the student's current academic year
-                    fees = FeeStructure.objects.filter(
-                        tenant=self.request.tenant,
-                        class_name=student.current_class,
-                        academic_year=student.academic_year,
-                        frequency='MONTHLY' # Correct field name from model
-                    )
-
-                    if not fees.exists():
-                        continue
-
-                    # Check if invoice already exists for this period
-                    if Invoice.objects.filter(
-                        student=student, 
-                        billing_period=billing_period,
-                        tenant=self.request.tenant
-                    ).exists():
-                        continue
-
-                    # Create Invoice
-                    invoice = Invoice.objects.create(
-                        tenant=self.request.tenant,
-                        student=student,
-                        academic_year=student.academic_year,
-                        billing_period=billing_period,
-                        due_date=due_date,
-                        issue_date=timezone.now().date(),
-                        status='ISSUED' # Auto-issue monthly invoices
-                    )
+                run = invoice_runs.create(
+                    request.tenant, billing_period, due_date, user=request.user,
+                    frequency='MONTHLY',
+                    class_name_id=request.POST.get('class_name') or None,
+                    issue_date=timezone.now().date(),
+                )
+                invoice_runs.queue(run)
+        except ValidationError as e:
+            messages.error(request, ' '.join(e.messages))
+            return render(request, self.template_name, self.get_context_data())
+
+        messages.success(
+            request,
+            _("Invoice generation for %(period)s has started. Progress is shown below.") % {'period': billing_period}
+        )
+        return redirect('finance:generate_invoices')
 
-                    # Add Items
-                    for fee in fees:
-                        invoice.add_invoice_item(
-                            fee_structure=fee,
-                            amount=fee.amount,
-                            description=f"{fee.name} - {billing_period}"
-                        )
-                    
-                    invoices_created += 1
-
-            if invoices_created > 0:
-                messages.success(request, _(f"Successfully generated {invoices_created} invoices for {billing_period}."))
-            else:
-                messages.info(request, _(f"No new invoices were generated for {billing_period}."))
-                
-            return redirect('finance:invoice_list')
 
-        except Exception as e:
-            messages.error(request, _(f"Error generating invoices: {str(e)}"))
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Invoice generation error: {e}", exc_info=True)
-            return render(request, 'finance/utils/generate_invoices.html')
+class InvoiceRunStatusView(BaseView):
+    """Progress and throughput of an invoice run, as JSON"""
+    permission_required = 'finance.view_invoice'
 
+    def get(self, request, pk):
+        run = get_object_or_404(InvoiceRun, pk=pk, tenant=request.tenant)
+        return JsonResponse({
+            'id': str(run.pk),
+            'billing_period': run.billing_period,
+            'status': run.status,
+            'progress': round(run.progress, 1),
+            'total_students': run.total_students,
+            'processed_students': run.processed_students,
+            'skipped_students': run.skipped_students,
+            'invoices_created': run.invoices_created,
+            'items_created': run.items_created,
+            'discounts_applied': run.discounts_applied,
+            'amount_billed': str(run.amount_billed),
+            'elapsed_seconds': round(run.elapsed_seconds, 2),
+            'invoices_per_second': round(run.invoices_per_second, 1),
+            'error': run.error,
+        })
 
 
 class SendPaymentRemindersView(BaseView):
@@ -800,73 +900,22 @@ class SendPaymentRemindersView(BaseView):
 
 
     def get(self, request):
-        # Calculate stats for the confirm page
-        overdue_invoices = Invoice.objects.filter(
-            tenant=self.request.tenant,
-            status='OVERDUE'
-        )
-        
-        # Also check for invoices that are effectively overdue but status might not be updated yet
-        # (Though Invoice.save() handles it, batch job usually better)
-        current_date = timezone.now().date()
-        potential_overdue = Invoice.objects.filter(
-            tenant=self.request.tenant,
-            due_date__lt=current_date,
-            due_amount__gt=0
-        ).exclude(status='OVERDUE')
-        
-        # Calculate totals
-        total_overdue = overdue_invoices.count() + potential_overdue.count()
-        total_amount = overdue_invoices.aggregate(Sum('due_amount'))['due_amount__sum'] or 0
-        total_amount += potential_overdue.aggregate(Sum('due_amount'))['due_amount__sum'] or 0
-        
-        # Unique students
-        student_ids = set(overdue_invoices.values_list('student_id', flat=True))
-        student_ids.update(potential_overdue.values_list('student_id', flat=True))
-        
+        # Stats for the confirm page, including invoices the sweep has not marked yet
+        summary = fee_reminders.overdue_summary(self.request.tenant.pk)
         context = {
-            'overdue_count': total_overdue,
-            'overdue_amount': total_amount,
-            'students_affected': len(student_ids)
+            'overdue_count': summary['count'],
+            'overdue_amount': summary['amount'],
+            'students_affected': summary['students']
         }
         return render(request, 'finance/utils/send_reminders.html', context)
 
-    def post(self, request): 
-        # Logic to send reminders
-        # 1. auto-update statuses first
-        current_date = timezone.now().date()
-        potential_overdue = Invoice.objects.filter(
-            tenant=self.request.tenant,
-            due_date__lt=current_date,
-            due_amount__gt=0
-        ).exclude(status='OVERDUE')
-        
-        updated_count = 0
-        for inv in potential_overdue:
-            inv.status = 'OVERDUE'
-            inv.save() # This triggers is_overdue check in model
-            updated_count += 1
-            
-        # 2. Get all overdue
-        overdue_invoices = Invoice.objects.filter(
-            tenant=self.request.tenant,
-            status='OVERDUE'
-        ).select_related('student')
-        
-        # 3. "Send" reminders (Mocking email sending)
-        sent_count = 0
-        for inv in overdue_invoices:
-            # Here we would call: send_email(inv.student.personal_email, ...)
-            sent_count += 1
-            
-        if updated_count > 0:
-            messages.info(request, _(f"Updated status for {updated_count} invoices to Overdue."))
-            
-        if sent_count > 0:
-            messages.success(request, _(f"Successfully sent payment reminders for {sent_count} invoices."))
-        else:
-            messages.warning(request, _("No overdue invoices found to send reminders for."))
-            
+    def post(self, request):
+        # Sweeping and sending run in a background task, throttled per tenant
+        fee_reminders.queue(request.tenant.schema_name)
+        messages.success(
+            request,
+            _("Payment reminders are being sent in the background. Invoices reminded recently are skipped.")
+        )
         return redirect('finance:invoice_list')
 
 # Duplicate BulkInvoiceActionView removed
@@ -1279,22 +1328,55 @@ class BudgetVsActualReportView(BaseTemplateView):
     template_name = 'finance/reports/budget_vs_actual.html'
     permission_required = 'finance.view_reports'
 
-class FeeStructureAPIViewSet(viewsets.ModelViewSet):
+class FeeStructureAPIViewSet(RelatedQueryMixin, viewsets.ModelViewSet):
     queryset = FeeStructure.objects.all()
     serializer_class = FeeStructureSerializer
     permission_classes = [permissions.IsAuthenticated]
+    select_related_fields = {
+        'class_name_name': ['class_name'],
+        'academic_year_name': ['academic_year'],
+    }
 
-class InvoiceAPIViewSet(viewsets.ModelViewSet):
+class InvoiceAPIViewSet(RelatedQueryMixin, viewsets.ModelViewSet):
     queryset = Invoice.objects.all()
     serializer_class = InvoiceSerializer
     permission_classes = [permissions.IsAuthenticated]
-
-class PaymentAPIViewSet(viewsets.ModelViewSet):
+    pagination_class = PageOrCursorPagination
+    select_related_fields = {
+        'student_name': ['student'],
+        'student_roll_number': ['student'],
+        'class_name': ['student__current_class'],
+        'academic_year_name': ['academic_year'],
+    }
+    prefetch_related_fields = {
+        'items': [Prefetch('items', queryset=InvoiceItem.objects.select_related('fee_structure'))],
+        'discounts': [Prefetch(
+            'discounts',
+            queryset=AppliedDiscount.objects.select_related('discount', 'applied_by', 'approved_by'),
+        )],
+    }
+
+class PaymentAPIViewSet(RelatedQueryMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [permissions.IsAuthenticated]
-
-class ExpenseAPIViewSet(viewsets.ModelViewSet):
+    pagination_class = PageOrCursorPagination
+    select_related_fields = {
+        'invoice_number': ['invoice'],
+        'student_name': ['invoice__student'],
+        'received_by_name': ['received_by'],
+        'paid_by_name': ['paid_by'],
+        'verified_by_name': ['verified_by'],
+    }
+
+class ExpenseAPIViewSet(RelatedQueryMixin, viewsets.ModelViewSet):
     queryset = Expense.objects.all()
     serializer_class = ExpenseSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PageOrCursorPagination
+    select_related_fields = {
+        'category_name': ['category'],
+        'category_type': ['category'],
+        'submitted_by_name': ['submitted_by'],
+        'approved_by_name': ['approved_by'],
+    }
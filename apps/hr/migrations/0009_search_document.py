@@ -0,0 +1,104 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:52
+
+# Adds the search document of apps.core.utils.search. On Postgres the
+# document gets a GIN tsvector index (prefix matches) and a pg_trgm GIN
+# index (fuzzy matches); pg_trgm is installed in the public schema so
+# every tenant schema can use it. Existing rows get their documents
+# here; "manage.py rebuild_search_index" rebuilds them later on.
+
+import re
+
+import django.contrib.postgres.search
+from django.db import connections, migrations, models
+
+
+TABLE = 'hr_staff'
+STAFF_FIELDS = (
+    'employee_id', 'user__first_name', 'user__last_name', 'user__email',
+    'personal_email', 'personal_phone',
+)
+
+# Frozen copy of the apps.core.utils.search document as of this migration
+_PHONE = re.compile(r'\+?[\d\s\-().]{6,}')
+BATCH_SIZE = 1000
+
+
+def build_document(values):
+    words = []
+    for value in values:
+        value = ' '.join(str(value or '').lower().split())
+        if not value:
+            continue
+        words.append(value)
+        if _PHONE.fullmatch(value) and not value.isdigit():
+            words.append(re.sub(r'\D', '', value))
+    return ' '.join(words)
+
+
+def write_documents(model, alias, parts):
+    """Store {pk: values} as documents, plus their tsvectors on Postgres"""
+    rows = [model(pk=pk, search_document=build_document(values)) for pk, values in parts.items()]
+    model._base_manager.using(alias).bulk_update(rows, ['search_document'], batch_size=BATCH_SIZE)
+    if connections[alias].vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchVector
+
+        model._base_manager.using(alias).filter(pk__in=list(parts)).update(
+            search_vector=SearchVector('search_document', config='simple')
+        )
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(TABLE)
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {TABLE}_search_vector_gin ON {table} USING gin (search_vector)"
+    )
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {TABLE}_search_trgm_gin ON {table} USING gin (search_document gin_trgm_ops)"
+    )
+
+
+def build_search_documents(apps, schema_editor):
+    # Runs once per tenant schema, so every row here belongs to that tenant
+    Staff = apps.get_model('hr', 'Staff')
+    alias = schema_editor.connection.alias
+    pks = list(Staff._base_manager.using(alias).order_by().values_list('pk', flat=True))
+    for start in range(0, len(pks), BATCH_SIZE):
+        parts = {
+            row[0]: list(row[1:])
+            for row in Staff._base_manager.using(alias).filter(
+                pk__in=pks[start:start + BATCH_SIZE]
+            ).values_list('pk', *STAFF_FIELDS)
+        }
+        write_documents(Staff, alias, parts)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {TABLE}_search_trgm_gin")
+    schema_editor.execute(f"DROP INDEX IF EXISTS {TABLE}_search_vector_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0008_remove_employmenthistory_details'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='staff',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='staff',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,12 @@
 import uuid
+from decimal import Decimal
 from django.db import models
 from django.conf import settings
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django.contrib.postgres.search import SearchVectorField
 from apps.core.models import BaseModel
 
 # Phone regex for validation
@@ -556,6 +558,9 @@ class Staff(BaseModel):
     )
     work_email = models.EmailField(blank=True, verbose_name=_("Work Email"))
 
+    # Maintained by apps.core.utils.search; GIN indexed on Postgres
+    search_document = models.TextField(blank=True, default="", editable=False)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
 
     class Meta:
         db_table = "hr_staff"
@@ -849,9 +854,13 @@ class StaffAttendance(BaseModel):
         return f"{self.staff} - {self.date} - {self.status}"
 
     def save(self, *args, **kwargs):
-        # Calculate total hours if check_in and check_out are provided
+        self.calculate_total_hours()
+        super().save(*args, **kwargs)
+
+    def calculate_total_hours(self):
+        """Calculate total hours if check_in and check_out are provided"""
         if self.check_in and self.check_out:
-            from datetime import datetime, time
+            from datetime import datetime
             check_in_dt = datetime.combine(self.date, self.check_in)
             check_out_dt = datetime.combine(self.date, self.check_out)
             if check_out_dt < check_in_dt:
@@ -859,9 +868,7 @@ class StaffAttendance(BaseModel):
                 check_out_dt = datetime.combine(self.date + timezone.timedelta(days=1), self.check_out)
             
             duration = check_out_dt - check_in_dt
-            self.total_hours = duration.total_seconds() / 3600
-            
-        super().save(*args, **kwargs)
+            self.total_hours = Decimal(duration.total_seconds() / 3600).quantize(Decimal('0.01'))
 
     @property
     def is_present(self):
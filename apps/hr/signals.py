@@ -0,0 +1,48 @@
+# apps/hr/signals.py
+from django.db import connection
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+from django_tenants.utils import get_public_schema_name
+
+from apps.core.utils.search import search_index, search_state
+from apps.users.models import User
+from .models import Staff
+
+USER_SEARCH_FIELDS = ('first_name', 'last_name', 'email')
+
+
+def _user_search_state(instance):
+    return tuple(instance.__dict__.get(field) for field in USER_SEARCH_FIELDS)
+
+
+@receiver(post_init, sender=Staff)
+def remember_staff_search_state(sender, instance, **kwargs):
+    instance._search_state = search_state(instance)
+
+
+@receiver(post_save, sender=Staff)
+def refresh_staff_search_document(sender, instance, created, **kwargs):
+    state = search_state(instance)
+    previous = None if created else getattr(instance, '_search_state', None)
+    instance._search_state = state
+    if state != previous:
+        search_index.refresh_on_commit(Staff, [instance.pk])
+
+
+@receiver(post_init, sender=User)
+def remember_user_search_state(sender, instance, **kwargs):
+    instance._search_state = _user_search_state(instance)
+
+
+@receiver(post_save, sender=User)
+def refresh_staff_search_on_user_change(sender, instance, created, **kwargs):
+    """A staff member's name and email live on their user"""
+    state = _user_search_state(instance)
+    previous = getattr(instance, '_search_state', None)
+    instance._search_state = state
+    if created or state == previous:
+        return
+    # Users also live in the public schema, where there is no staff table
+    if getattr(connection, 'schema_name', get_public_schema_name()) == get_public_schema_name():
+        return
+    search_index.refresh_on_commit(Staff, Staff._base_manager.filter(user_id=instance.pk).values_list('pk', flat=True))
@@ -19,8 +19,11 @@ from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 
 from apps.core.permissions.mixins import PermissionRequiredMixin, RoleRequiredMixin, TenantAccessMixin
+from apps.core.utils.exports import Column
+from apps.core.utils.search import search_index
 from apps.core.utils.tenant import get_current_tenant
 from apps.core.utils.audit import audit_log
+from apps.attendance.utils.bulk import bulk_attendance
 from apps.core.views import (
     BaseView, BaseListView, BaseDetailView, BaseCreateView, 
     BaseUpdateView, BaseDeleteView, BaseTemplateView, ExportMixin
@@ -155,9 +158,7 @@ class StaffListView(BaseListView):
         ).prefetch_related('addresses')
         
         # Apply filters
-        self.apply_filters(queryset)
-        
-        return queryset
+        return self.apply_filters(queryset)
     
     def apply_filters(self, queryset):
         filters = Q()
@@ -182,18 +183,14 @@ class StaffListView(BaseListView):
         if emp_status and emp_status != 'all':
             filters &= Q(employment_status=emp_status)
         
+        queryset = queryset.filter(filters)
+        
         # Search
         search = self.request.GET.get('search', '').strip()
         if search:
-            filters &= (
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search) |
-                Q(user__email__icontains=search) |
-                Q(employee_id__icontains=search) |
-                Q(personal_phone__icontains=search)
-            )
+            queryset = search_index.search(queryset, search)
         
-        return queryset.filter(filters)
+        return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -564,27 +561,20 @@ class StaffExportView(ExportMixin, BaseListView):
     permission_required = 'hr.view_staff'
     model = Staff
     export_filename = 'staff_export'
+    # Same layout as the staff import template
+    export_columns = (
+        Column('first_name', 'user__first_name'),
+        Column('last_name', 'user__last_name'),
+        Column('email', 'user__email'),
+        Column('phone', 'personal_phone'),
+        Column('department_id', 'department_id'),
+        Column('designation_id', 'designation_id'),
+        Column('joining_date', 'joining_date'),
+        Column('date_of_birth', 'date_of_birth'),
+    )
     
     def get(self, request, *args, **kwargs):
         return self.export(request, *args, **kwargs)
-        
-    def get_queryset(self):
-        return super().get_queryset().select_related('user', 'department', 'designation')
-
-    def get_export_headers(self):
-        return ['first_name', 'last_name', 'email', 'phone', 'department_id', 'designation_id', 'joining_date', 'date_of_birth']
-    
-    def get_export_row(self, staff):
-        return [
-            staff.user.first_name,
-            staff.user.last_name,
-            staff.user.email,
-            staff.personal_phone,
-            str(staff.department.id) if staff.department else '',
-            str(staff.designation.id) if staff.designation else '',
-            staff.joining_date,
-            staff.date_of_birth
-        ]
 
 
 # ==================== DEPARTMENT VIEWS ====================
@@ -739,54 +729,26 @@ class AttendanceBulkCreateView(BaseTemplateView):
             messages.error(request, "Invalid date format")
             return redirect('hr:attendance_mark')
         
-        tenant = get_current_tenant()
-        created_count = 0
-        updated_count = 0
-        
-        for staff in Staff.objects.filter(tenant=tenant, is_active=True):
-            status_key = f"status_{staff.id}"
-            check_in_key = f"check_in_{staff.id}"
-            check_out_key = f"check_out_{staff.id}"
-            remarks_key = f"remarks_{staff.id}"
-            
-            status = request.POST.get(status_key)
-            if status:
-                # Parse check-in/out times
-                check_in_str = request.POST.get(check_in_key)
-                check_out_str = request.POST.get(check_out_key)
-                
-                check_in_time = None
-                if check_in_str:
-                    try:
-                        check_in_time = timezone.datetime.strptime(check_in_str, '%H:%M').time()
-                    except ValueError:
-                        pass
-                        
-                check_out_time = None
-                if check_out_str:
-                    try:
-                        check_out_time = timezone.datetime.strptime(check_out_str, '%H:%M').time()
-                    except ValueError:
-                        pass
+        entries = {}
+        for key, status in request.POST.items():
+            if not key.startswith('status_') or not status:
+                continue
+            staff_id = key[len('status_'):]
+            entries[staff_id] = {
+                'status': status,
+                'check_in': self._parse_time(request.POST.get(f"check_in_{staff_id}")),
+                'check_out': self._parse_time(request.POST.get(f"check_out_{staff_id}")),
+                'remarks': request.POST.get(f"remarks_{staff_id}", ''),
+            }
 
-                # Create or update StaffAttendance record
-                attendance_record, created = StaffAttendance.objects.update_or_create(
-                    tenant=tenant,
-                    staff=staff,
-                    date=attendance_date,
-                    defaults={
-                        'status': status,
-                        'check_in': check_in_time,
-                        'check_out': check_out_time,
-                        'remarks': request.POST.get(remarks_key, ''),
-                        'marked_by': request.user,
-                    }
-                )
-                
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
+        result = bulk_attendance.mark_staff(
+            tenant=get_current_tenant(),
+            date=attendance_date,
+            entries=entries,
+            marked_by=request.user,
+        )
+        created_count = result['created']
+        updated_count = result['updated']
         
         audit_log(
             user=request.user,
@@ -807,6 +769,15 @@ class AttendanceBulkCreateView(BaseTemplateView):
         
         return redirect('hr:attendance_list')
 
+    @staticmethod
+    def _parse_time(value):
+        if not value:
+            return None
+        try:
+            return timezone.datetime.strptime(value, '%H:%M').time()
+        except ValueError:
+            return None
+
 
 # ==================== LEAVE VIEWS ====================
 
@@ -1132,17 +1103,9 @@ class StaffAutocompleteView(BaseView):
         if len(query) < 2:
             return JsonResponse({'results': []})
         
-        filters = (
-            Q(user__first_name__icontains=query) |
-            Q(user__last_name__icontains=query) |
-            Q(user__email__icontains=query) |
-            Q(employee_id__icontains=query)
-        )
-
-        staff_list = Staff.objects.filter(
-            tenant=tenant,
-            is_active=True
-        ).filter(filters).select_related('user')[:10]
+        staff_list = search_index.search(
+            Staff.objects.filter(tenant=tenant, is_active=True), query
+        ).select_related('user', 'designation', 'department')[:10]
 
         results = []
         for staff in staff_list:
@@ -1203,58 +1166,40 @@ class LeaveBalanceCheckView(BaseView):
 
 # ==================== EXPORT VIEWS ====================
 
-class StaffExportView(BaseView):
+class StaffExportView(ExportMixin, BaseView):
     permission_required = 'hr.export_staff'
     roles_required = ['admin', 'hr_manager']
+    export_columns = (
+        Column('Employee ID', 'employee_id'),
+        Column('Name', 'user__first_name', 'user__last_name'),
+        Column('Email', 'user__email'),
+        Column('Phone', 'personal_phone'),
+        Column('Department', 'department__name'),
+        Column('Designation', 'designation__title'),
+        Column('Employment Type', 'employment_type', display=True),
+        Column('Joining Date', 'joining_date'),
+        Column('Basic Salary', 'basic_salary'),
+    )
+    
+    def get_export_queryset(self):
+        return Staff.objects.filter(
+            tenant=get_current_tenant(),
+            is_active=True
+        ).order_by('employee_id')
+    
+    def get_export_filename(self):
+        return 'staff_list_{}'.format(timezone.now().strftime('%Y%m%d_%H%M%S'))
     
     def get(self, request, *args, **kwargs):
-        import csv
-        from django.http import HttpResponse
-        
-        tenant = get_current_tenant()
-        
-        # Create the HttpResponse object with the appropriate CSV header
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="staff_list_{}.csv"'.format(
-            timezone.now().strftime('%Y%m%d_%H%M%S')
-        )
-        
-        writer = csv.writer(response)
-        
-        # Write headers
-        writer.writerow([
-            'Employee ID', 'Name', 'Email', 'Phone', 'Department',
-            'Designation', 'Employment Type', 'Joining Date', 'Basic Salary'
-        ])
-        
-        # Write data
-        staff_list = Staff.objects.filter(
-            tenant=tenant,
-            is_active=True
-        ).select_related('user', 'department', 'designation')
-        
-        for staff in staff_list:
-            writer.writerow([
-                staff.employee_id,
-                staff.full_name,
-                staff.user.email,
-                staff.personal_phone,
-                staff.department.name,
-                staff.designation.title,
-                staff.get_employment_type_display(),
-                staff.joining_date.strftime('%Y-%m-%d'),
-                str(staff.basic_salary)
-            ])
-        
         audit_log(
             user=request.user,
             action='EXPORT_STAFF',
             resource_type='Staff',
-            details={'format': 'csv', 'count': staff_list.count()},
+            details={'format': request.GET.get('format', 'csv'), 'count': self.get_export_queryset().count()},
             severity='INFO'
         )
         
-        return response
+        return self.export(request, *args, **kwargs)
 
 
 # ==================== DASHBOARD WIDGETS ====================
@@ -663,19 +663,8 @@ class PurchaseOrder(BaseModel):
 
     def generate_po_number(self):
         """Generate unique purchase order number"""
-        prefix = f"PO-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_po = PurchaseOrder.objects.filter(
-            po_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('po_number').last()
-        
-        if last_po:
-            last_num = int(last_po.po_number.split('-')[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        from apps.core.utils.sequences import sequences
+        return sequences.next_number('purchase_order', self.tenant)
 
     def calculate_totals(self):
         """Calculate order totals from items"""
@@ -919,19 +908,8 @@ class IssueRequest(BaseModel):
 
     def generate_issue_number(self):
         """Generate unique issue number"""
-        prefix = f"ISS-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_issue = IssueRequest.objects.filter(
-            issue_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('issue_number').last()
-        
-        if last_issue:
-            last_num = int(last_issue.issue_number.split('-')[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        from apps.core.utils.sequences import sequences
+        return sequences.next_number('issue_request', self.tenant)
 
     def approve(self, user):
         """Approve issue request"""
@@ -722,19 +722,8 @@ class BookIssue(BaseModel):
 
     def generate_issue_number(self):
         """Generate unique issue number"""
-        prefix = f"LIB-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_issue = BookIssue.objects.filter(
-            issue_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('issue_number').last()
-        
-        if last_issue:
-            last_num = int(last_issue.issue_number.split('-')[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        from apps.core.utils.sequences import sequences
+        return sequences.next_number('book_issue', self.tenant)
 
     @property
     def is_overdue(self):
@@ -0,0 +1,103 @@
+# apps/students/exports.py
+"""
+Column layouts of the student exports (see apps/core/utils/exports.py)
+"""
+
+from datetime import datetime
+
+from django.db.models import Q
+
+from apps.core.utils.exports import Column
+
+BASIC_EXPORT_COLUMNS = (
+    Column('Admission Number', 'admission_number'),
+    Column('Full Name', 'first_name', 'middle_name', 'last_name'),
+    Column('Date of Birth', 'date_of_birth'),
+    Column('Gender', 'gender', display=True),
+    Column('Email', 'personal_email'),
+    Column('Phone', 'mobile_primary'),
+    Column('Class', 'current_class__name'),
+    Column('Section', 'section__name'),
+    Column('Status', 'status', display=True),
+    Column('Category', 'category', display=True),
+)
+
+DETAILED_EXPORT_COLUMNS = (
+    *BASIC_EXPORT_COLUMNS[:8],
+    Column('Stream', 'stream__name'),
+    Column('Academic Year', 'academic_year__name'),
+    *BASIC_EXPORT_COLUMNS[8:],
+    Column('Blood Group', 'blood_group'),
+    Column('Nationality', 'nationality'),
+    Column('Religion', 'religion', display=True),
+    Column('Admission Date', 'enrollment_date'),
+    Column('Created At', 'created_at'),
+    Column('Updated At', 'updated_at'),
+)
+
+EXPORT_COLUMNS = {
+    'basic': BASIC_EXPORT_COLUMNS,
+    'detailed': DETAILED_EXPORT_COLUMNS,
+}
+
+
+def export_columns(export_type: str):
+    return EXPORT_COLUMNS.get(export_type, BASIC_EXPORT_COLUMNS)
+
+
+# Request parameters both the streamed and the background export filter on
+EXPORT_FILTERS = (
+    'status', 'class_id', 'section_id', 'academic_year_id', 'category', 'gender',
+    'created_from', 'created_to',
+)
+
+
+def export_filters(params) -> dict:
+    """The non-empty export filters of a QueryDict or dict"""
+    return {key: params[key] for key in EXPORT_FILTERS if params.get(key)}
+
+
+def apply_export_filters(queryset, filters):
+    """Apply export filters (see export_filters) to a student queryset"""
+    q_objects = Q()
+    
+    # Status filter
+    if filters.get('status'):
+        q_objects &= Q(status=filters['status'])
+    
+    # Class filter
+    if filters.get('class_id'):
+        q_objects &= Q(current_class_id=filters['class_id'])
+    
+    # Section filter
+    if filters.get('section_id'):
+        q_objects &= Q(section_id=filters['section_id'])
+    
+    # Academic year filter
+    if filters.get('academic_year_id'):
+        q_objects &= Q(academic_year_id=filters['academic_year_id'])
+    
+    # Category filter
+    if filters.get('category'):
+        q_objects &= Q(category=filters['category'])
+    
+    # Gender filter
+    if filters.get('gender'):
+        q_objects &= Q(gender=filters['gender'])
+    
+    # Date range filters
+    if filters.get('created_from'):
+        try:
+            date_from = datetime.strptime(filters['created_from'], '%Y-%m-%d').date()
+            q_objects &= Q(created_at__date__gte=date_from)
+        except ValueError:
+            pass
+    
+    if filters.get('created_to'):
+        try:
+            date_to = datetime.strptime(filters['created_to'], '%Y-%m-%d').date()
+            q_objects &= Q(created_at__date__lte=date_to)
+        except ValueError:
+            pass
+    
+    return queryset.filter(q_objects)
@@ -0,0 +1,606 @@
+# apps/students/importer.py
+"""
+Staged bulk student import
+
+1. Parse: rows are streamed one at a time from the CSV (csv.reader over a
+   text wrapper) or the XLSX workbook (openpyxl read-only mode).
+2. Validate: rows are cleaned in chunks by ``validate_rows``, a pure
+   function over lookup maps (classes, sections, choices) loaded once,
+   in a process pool when the worker is allowed to fork.
+3. Resolve: existing students are matched by email with one query per
+   thousand emails, admission and registration numbers are reserved in
+   one block each from the document sequences, and roll numbers continue
+   from one scan of the classes involved.
+4. Write: students, their identification and medical records and their
+   guardians are written with bulk_create/bulk_update, one transaction
+   per chunk. A chunk that fails is retried row by row so one bad row
+   does not sink its neighbours.
+"""
+
+import csv
+import io
+import re
+import logging
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from itertools import islice, repeat
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STUDENT_IMPORT = {
+    # Students written per transaction
+    'CHUNK_SIZE': 500,
+    # Rows sent to a validation worker at a time
+    'VALIDATION_CHUNK': 1000,
+    # Validation processes; 0 or 1 validates in the calling process
+    'VALIDATION_WORKERS': 4,
+}
+
+# Spreadsheet header -> field name
+HEADER_MAPPING = {
+    'firstname': 'first_name',
+    'lastname': 'last_name',
+    'dob': 'date_of_birth',
+    'email': 'personal_email',
+    'phone': 'mobile_primary',
+    'class': 'class_name',
+    'section': 'section_name',
+    'gender': 'gender',
+    'status': 'status',
+    'category': 'category'
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d')
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Column prefix -> guardian relation (None: read from <prefix>_relationship)
+GUARDIAN_COLUMNS = (('father', 'FATHER'), ('mother', 'MOTHER'), ('guardian', None))
+
+# Student fields an import sets, and may overwrite with update_existing
+STUDENT_FIELDS = (
+    'first_name', 'last_name', 'personal_email', 'gender', 'date_of_birth',
+    'mobile_primary', 'status', 'category', 'current_class_id', 'section_id',
+)
+
+GUARDIAN_FIELDS = ('full_name', 'email', 'phone_primary', 'occupation')
+
+ProgressCallback = Callable[[int, int, str], None]
+
+
+def _student_import_settings():
+    config = dict(DEFAULT_STUDENT_IMPORT)
+    config.update(getattr(settings, 'STUDENT_IMPORT', {}))
+    return config
+
+
+# ---------------- parsing ----------------
+
+def normalise_header(value, position: int) -> str:
+    if value is None or str(value).strip() == '':
+        return f'column_{position}'
+    header = str(value).strip().lower().replace(' ', '_')
+    return HEADER_MAPPING.get(header, header)
+
+
+def cell_text(value) -> str:
+    """Spreadsheet cell value as stripped text; dates as YYYY-MM-DD"""
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def parse_date(value) -> Optional[date]:
+    if not value:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _rows_from(header: List, rows: Iterable, first_row: int) -> Iterator[Tuple[int, Dict]]:
+    headers = [normalise_header(value, position) for position, value in enumerate(header, start=1)]
+    for row_number, row in enumerate(rows, start=first_row):
+        values = [cell_text(value) for value in row[:len(headers)]]
+        values.extend([''] * (len(headers) - len(values)))
+        yield row_number, dict(zip(headers, values))
+
+
+def iter_csv_rows(content) -> Iterator[Tuple[int, Dict]]:
+    """(row number, row) pairs of a CSV file, parsed as they are read"""
+    if isinstance(content, bytes):
+        stream = io.TextIOWrapper(io.BytesIO(content), encoding='utf-8-sig', newline='')
+    else:
+        stream = io.StringIO(content, newline='')
+
+    sample = stream.read(1024)
+    stream.seek(0)
+    delimiter_counts = {d: sample.count(d) for d in (',', ';', '\t', '|')}
+    delimiter = max(delimiter_counts, key=delimiter_counts.get) if any(delimiter_counts.values()) else ','
+
+    reader = csv.reader(stream, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    yield from _rows_from(header, reader, first_row=2)
+
+
+def iter_xlsx_rows(content) -> Iterator[Tuple[int, Dict]]:
+    """(row number, row) pairs of the active sheet, in read-only mode"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        yield from _rows_from(list(header), rows, first_row=2)
+    finally:
+        workbook.close()
+
+
+def estimate_rows(content, file_type: str) -> int:
+    """Data rows in the file, for progress reporting"""
+    if file_type == 'csv':
+        data = content if isinstance(content, bytes) else content.encode()
+        return max(data.count(b'\n') - (0 if data.endswith(b'\n') else -1) - 1, 0)
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(io.BytesIO(content), read_only=True)
+    try:
+        return max((workbook.active.max_row or 1) - 1, 0)
+    finally:
+        workbook.close()
+
+
+# ---------------- validation ----------------
+
+def _choice(value: str, choices, default: str) -> Optional[str]:
+    value = (value or default).strip().upper()
+    return value if value in choices else None
+
+
+def _split_guardians(row: Dict, lookups: Dict) -> Tuple[List[Dict], List[str]]:
+    guardians, warnings = [], []
+    for prefix, relation in GUARDIAN_COLUMNS:
+        full_name = ' '.join(row.get(f'{prefix}_name', '').split())
+        if not full_name:
+            continue
+        relation = relation or (row.get(f'{prefix}_relationship') or 'GUARDIAN').strip().upper()
+        if relation not in lookups['relations']:
+            relation = 'OTHER'
+        phone = re.sub(r'[\s\-()]', '', row.get(f'{prefix}_phone', ''))
+        if not lookups['phone_pattern'].match(phone):
+            warnings.append(f'{prefix.capitalize()} skipped: invalid or missing phone number')
+            continue
+        email = row.get(f'{prefix}_email', '').strip().lower()
+        occupation = row.get(f'{prefix}_occupation', '').strip().upper()
+        guardians.append({
+            'relation': relation,
+            'full_name': full_name[:100],
+            'email': email if EMAIL_PATTERN.match(email) else '',
+            'phone_primary': phone,
+            'occupation': occupation if occupation in lookups['occupations'] else ('OTHER' if occupation else ''),
+        })
+    return guardians, warnings
+
+
+def validate_row(row_number: int, row: Dict, lookups: Dict) -> Dict:
+    """
+    Clean one row into ``{'row', 'data', 'guardians', 'warnings',
+    'error'}``; ``data`` holds Student field values
+    """
+    result = {'row': row_number, 'data': None, 'guardians': [], 'warnings': [], 'error': None}
+
+    first_name = row.get('first_name', '').strip()
+    last_name = row.get('last_name', '').strip()
+    if not first_name and not last_name:
+        result['error'] = 'Missing both first and last name'
+        return result
+
+    personal_email = row.get('personal_email', '').strip().lower()
+    if not personal_email:
+        first_part = re.sub(r'[^a-z0-9]', '', first_name.lower())[:10]
+        last_part = re.sub(r'[^a-z0-9]', '', last_name.lower())[:10]
+        personal_email = f"{first_part}.{last_part}{row_number}@{lookups['email_domain']}"
+    if not EMAIL_PATTERN.match(personal_email):
+        result['error'] = f'Invalid email address {personal_email}'
+        return result
+
+    date_of_birth = parse_date(row.get('date_of_birth'))
+    if date_of_birth is None:
+        result['error'] = 'Invalid or missing date of birth'
+        return result
+
+    gender = _choice(row.get('gender', '')[:1], lookups['genders'], 'U')
+    status = _choice(row.get('status', ''), lookups['statuses'], 'ACTIVE')
+    category = _choice(row.get('category', ''), lookups['categories'], 'GENERAL')
+    for name, value in (('gender', gender), ('status', status), ('category', category)):
+        if value is None:
+            result['error'] = f'Invalid {name} {row.get(name)!r}'
+            return result
+
+    mobile = re.sub(r'[\s\-()]', '', row.get('mobile_primary', ''))
+    if not lookups['phone_pattern'].match(mobile):
+        result['error'] = f'Invalid mobile number {row.get("mobile_primary", "")!r}'
+        return result
+
+    class_id = section_id = None
+    class_name = row.get('class_name', '').strip()
+    if class_name:
+        class_id = lookups['classes'].get(class_name.upper())
+        if class_id is None:
+            result['warnings'].append(f'Unknown class {class_name!r}, left unassigned')
+        else:
+            section_name = row.get('section_name', '').strip()
+            if section_name:
+                section_id = lookups['sections'].get((class_id, section_name.upper()))
+                if section_id is None:
+                    result['warnings'].append(f'Unknown section {section_name!r} of class {class_name!r}')
+
+    result['data'] = {
+        'first_name': first_name[:50],
+        'last_name': last_name[:50],
+        'personal_email': personal_email,
+        'gender': gender,
+        'date_of_birth': date_of_birth,
+        'mobile_primary': mobile,
+        'status': status,
+        'category': category,
+        'current_class_id': class_id,
+        'section_id': section_id,
+    }
+    result['guardians'], warnings = _split_guardians(row, lookups)
+    result['warnings'].extend(warnings)
+    return result
+
+
+def validate_rows(rows: List[Tuple[int, Dict]], lookups: Dict) -> List[Dict]:
+    """Validate a chunk of rows; runs in validation worker processes"""
+    return [
+        validate_row(row_number, row, lookups) if any(value != '' for value in row.values())
+        else {'row': row_number, 'blank': True}
+        for row_number, row in rows
+    ]
+
+
+def _sign_changed(objs) -> None:
+    """Re-sign instances about to be bulk updated, as save() would"""
+    from apps.core.utils.integrity import signature_plan, signing_deferred
+
+    deferred = signing_deferred()
+    for obj in objs:
+        obj.data_signature = '' if deferred else signature_plan(type(obj)).sign(obj)
+
+
+# ---------------- import ----------------
+
+class StudentImporter:
+    """
+    Imports the rows of one upload for one tenant and academic year and
+    returns the ``{'created', 'updated', 'skipped', 'errors',
+    'warnings', 'success', 'total_rows', 'processed'}`` summary of the
+    bulk upload task
+    """
+
+    def __init__(self, tenant, academic_year=None, user=None, update_existing=False,
+                 skip_errors=False, send_welcome_email=False,
+                 progress: Optional[ProgressCallback] = None, config=None):
+        self.tenant = tenant
+        self.academic_year = academic_year
+        self.user = user
+        self.update_existing = update_existing
+        self.skip_errors = skip_errors
+        self.send_welcome_email = send_welcome_email
+        self.progress = progress or (lambda current, total, status: None)
+        self.config = config or _student_import_settings()
+
+    def run(self, rows: Iterable[Tuple[int, Dict]], total: int = 0) -> Dict:
+        results = {'created': 0, 'updated': 0, 'skipped': 0, 'errors': [], 'warnings': []}
+
+        if self.academic_year is None:
+            from apps.academics.models import AcademicYear
+            self.academic_year = AcademicYear.objects.filter(tenant=self.tenant, is_current=True).first()
+        if self.academic_year is None:
+            results['errors'].append('No academic year selected and no current academic year configured')
+            return self._finish(results, 0)
+
+        # Validate every row before anything is written
+        self.progress(0, total, 'Validating rows...')
+        valid = []
+        seen_emails = {}
+        for checked in self._validate(rows, self.build_lookups()):
+            row_number = checked['row']
+            if checked.get('blank'):
+                results['skipped'] += 1
+                continue
+            results['warnings'].extend(f"Row {row_number}: {warning}" for warning in checked['warnings'])
+            error = checked['error']
+            if error is None:
+                email = checked['data']['personal_email']
+                if email in seen_emails:
+                    error = f'Duplicate email {email} (also in row {seen_emails[email]})'
+                else:
+                    seen_emails[email] = row_number
+            if error:
+                self._reject(results, row_number, error)
+            else:
+                valid.append(checked)
+        total_rows = len(valid) + results['skipped'] + len(results['errors'])
+
+        existing = self._existing_students([checked['data']['personal_email'] for checked in valid])
+        if not self.update_existing:
+            kept = []
+            for checked in valid:
+                if checked['data']['personal_email'] in existing:
+                    self._reject(results, checked['row'],
+                                 f"Student with email {checked['data']['personal_email']} already exists")
+                else:
+                    kept.append(checked)
+            valid = kept
+
+        if results['errors'] and not self.skip_errors:
+            return self._finish(results, total_rows)
+
+        numbers = self._number_blocks(valid, existing)
+        domain = self._institutional_domain()
+        chunk_size = max(self.config['CHUNK_SIZE'], 1)
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            if not self._write_chunk(chunk, existing, numbers, domain, results):
+                break
+            self.progress(
+                min(start + chunk_size, len(valid)), len(valid),
+                f'Imported {min(start + chunk_size, len(valid))} of {len(valid)} students'
+            )
+        return self._finish(results, total_rows)
+
+    # ---------------- stages ----------------
+
+    def build_lookups(self) -> Dict:
+        """Picklable maps the validation workers clean rows against"""
+        from apps.academics.models import SchoolClass, Section
+        from apps.students.models import Guardian, Student, phone_regex
+
+        classes = {}
+        for pk, name in SchoolClass.objects.filter(tenant=self.tenant).values_list('pk', 'name'):
+            classes.setdefault(name.strip().upper(), pk)
+        sections = {}
+        for pk, class_id, name in Section.objects.filter(tenant=self.tenant).values_list('pk', 'class_name_id', 'name'):
+            sections.setdefault((class_id, name.strip().upper()), pk)
+
+        return {
+            'classes': classes,
+            'sections': sections,
+            'genders': {value for value, _ in Student.GENDER_CHOICES},
+            'statuses': {value for value, _ in Student.STATUS_CHOICES},
+            'categories': {value for value, _ in Student.CATEGORY_CHOICES},
+            'relations': {value for value, _ in Guardian.RELATION_CHOICES},
+            'occupations': {value for value, _ in Guardian.OCCUPATION_CHOICES},
+            'phone_pattern': re.compile(phone_regex.regex.pattern),
+            'email_domain': getattr(self.tenant, 'domain', f"{self.tenant.schema_name}.edu"),
+        }
+
+    def _validate(self, rows: Iterable[Tuple[int, Dict]], lookups: Dict) -> Iterator[Dict]:
+        size = max(self.config['VALIDATION_CHUNK'], 1)
+        rows = iter(rows)
+        chunks = iter(lambda: list(islice(rows, size)), [])
+
+        workers = self.config['VALIDATION_WORKERS']
+        # Celery prefork workers are daemonic and may not start children
+        if workers > 1 and not multiprocessing.current_process().daemon:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for checked in pool.map(validate_rows, chunks, repeat(lookups)):
+                    yield from checked
+        else:
+            for chunk in chunks:
+                yield from validate_rows(chunk, lookups)
+
+    def _existing_students(self, emails: List[str]) -> Dict:
+        from apps.students.models import Student
+
+        existing = {}
+        for start in range(0, len(emails), 1000):
+            for student in Student._base_manager.filter(
+                tenant=self.tenant, personal_email__in=emails[start:start + 1000]
+            ):
+                existing[student.personal_email] = student
+        return existing
+
+    def _number_blocks(self, valid: List[Dict], existing: Dict) -> Dict:
+        """
+        Admission and registration numbers reserved in one block each,
+        and the highest roll number per class and section
+        """
+        from apps.core.utils.sequences import sequences
+        from apps.students.models import Student
+
+        students = Student._base_manager.filter(tenant=self.tenant)
+        new_rows = [checked['data'] for checked in valid if checked['data']['personal_email'] not in existing]
+        class_ids = {data['current_class_id'] for data in new_rows}
+        numbers = {
+            'admission': iter(sequences.reserve('admission', self.tenant, len(new_rows))),
+            'reg_no': iter(sequences.reserve('registration', self.tenant, len(new_rows))),
+            'roll': {},
+        }
+        if new_rows:
+            highest = defaultdict(int)
+            classes = Q(current_class_id__in=[pk for pk in class_ids if pk])
+            if None in class_ids:
+                classes |= Q(current_class__isnull=True)
+            rolls = students.filter(classes, academic_year=self.academic_year)
+            for class_id, section_id, roll in rolls.values_list('current_class_id', 'section_id', 'roll_number'):
+                if roll and roll.isdigit():
+                    # Students without a section number on from the whole class
+                    highest[(class_id, section_id)] = max(highest[(class_id, section_id)], int(roll))
+                    highest[(class_id, None)] = max(highest[(class_id, None)], int(roll))
+            numbers['roll'] = highest
+        return numbers
+
+    def _institutional_domain(self) -> str:
+        domain = self.tenant.domains.filter(is_primary=True).values_list('domain', flat=True).first()
+        return domain or 'student.institution.edu'
+
+    # ---------------- writing ----------------
+
+    def _write_chunk(self, chunk: List[Dict], existing: Dict, numbers: Dict, domain: str,
+                     results: Dict) -> bool:
+        """Write a chunk in one transaction, or row by row if that fails"""
+        from apps.core.utils.search import search_index
+        from apps.students.models import Student
+
+        try:
+            with transaction.atomic():
+                created, updated = self._write(chunk, existing, numbers, domain)
+        except Exception as e:
+            if len(chunk) == 1:
+                self._reject(results, chunk[0]['row'], str(e))
+                return self.skip_errors
+            logger.warning(f"Student import chunk failed, retrying row by row: {e}")
+            for checked in chunk:
+                if not self._write_chunk([checked], existing, numbers, domain, results):
+                    return False
+            return True
+
+        results['created'] += len(created)
+        results['updated'] += len(updated)
+        # bulk_create/bulk_update skip the signals that maintain search documents
+        search_index.refresh_on_commit(Student, [student.pk for student in created + updated])
+        if self.send_welcome_email and created:
+            transaction.on_commit(lambda ids=[student.pk for student in created]: self._queue_welcome_emails(ids))
+        return True
+
+    def _write(self, chunk: List[Dict], existing: Dict, numbers: Dict, domain: str):
+        from apps.students.models import Student, StudentIdentification, StudentMedicalInfo
+
+        created, updated = [], []
+        for checked in chunk:
+            data = checked['data']
+            student = existing.get(data['personal_email'])
+            if student is None:
+                student = Student(tenant=self.tenant, academic_year=self.academic_year,
+                                  created_by=self.user, updated_by=self.user, **data)
+                if 'numbers' not in checked:
+                    # Kept on the row, so a row-by-row retry reuses them
+                    roll_key = (data['current_class_id'], data['section_id'])
+                    numbers['roll'][roll_key] = numbers['roll'].get(roll_key, 0) + 1
+                    checked['numbers'] = (
+                        next(numbers['admission']), next(numbers['reg_no']), str(numbers['roll'][roll_key])
+                    )
+                student.admission_number, student.reg_no, student.roll_number = checked['numbers']
+                student.institutional_email = f"{student.admission_number.lower()}@{domain}"
+                created.append(student)
+            else:
+                if student.status != data['status']:
+                    student.status_changed_date = timezone.now()
+                for field, value in data.items():
+                    setattr(student, field, value)
+                student.academic_year = self.academic_year
+                student.updated_by = self.user
+                updated.append(student)
+            checked['student'] = student
+
+        if created:
+            Student.objects.bulk_create(created)
+            # What the post_save signal creates for a single student
+            StudentIdentification.objects.bulk_create(
+                [StudentIdentification(student=student, tenant=self.tenant) for student in created]
+            )
+            StudentMedicalInfo.objects.bulk_create(
+                [StudentMedicalInfo(student=student, tenant=self.tenant) for student in created]
+            )
+        if updated:
+            now = timezone.now()
+            for student in updated:
+                student.updated_at = now
+            _sign_changed(updated)
+            Student._base_manager.bulk_update(updated, [
+                *STUDENT_FIELDS, 'academic_year', 'status_changed_date',
+                'updated_by', 'updated_at', 'data_signature',
+            ])
+
+        self._write_guardians(chunk, {student.pk for student in updated})
+        return created, updated
+
+    def _write_guardians(self, chunk: List[Dict], updated_ids) -> None:
+        """
+        Create the row's guardians, or update the student's guardian of
+        the same relation; the first guardian of a student without a
+        primary guardian becomes primary
+        """
+        from apps.students.models import Guardian
+
+        current, has_primary = {}, set()
+        if updated_ids:
+            for guardian in Guardian._base_manager.filter(student_id__in=updated_ids, is_active=True):
+                current.setdefault((guardian.student_id, guardian.relation), guardian)
+                if guardian.is_primary:
+                    has_primary.add(guardian.student_id)
+
+        new, changed = [], []
+        for checked in chunk:
+            student = checked['student']
+            for values in checked['guardians']:
+                guardian = current.get((student.pk, values['relation']))
+                if guardian is None:
+                    guardian = Guardian(
+                        tenant=self.tenant, student=student, created_by=self.user,
+                        is_primary=student.pk not in has_primary, **values,
+                    )
+                    has_primary.add(student.pk)
+                    current[(student.pk, values['relation'])] = guardian
+                    new.append(guardian)
+                elif not guardian._state.adding:
+                    for field, value in values.items():
+                        setattr(guardian, field, value)
+                    guardian.updated_by = self.user
+                    guardian.updated_at = timezone.now()
+                    changed.append(guardian)
+
+        if new:
+            Guardian.objects.bulk_create(new)
+        if changed:
+            _sign_changed(changed)
+            Guardian._base_manager.bulk_update(changed, [*GUARDIAN_FIELDS, 'updated_by', 'updated_at', 'data_signature'])
+
+    @staticmethod
+    def _queue_welcome_emails(student_ids) -> None:
+        from apps.students.tasks import send_student_welcome_email
+
+        for student_id in student_ids:
+            try:
+                send_student_welcome_email.delay(student_id)
+            except Exception as e:
+                logger.warning(f"Failed to queue welcome email: {str(e)}")
+
+    # ---------------- results ----------------
+
+    def _reject(self, results: Dict, row_number: int, error: str) -> None:
+        if self.skip_errors:
+            results['skipped'] += 1
+            results['warnings'].append(f"Row {row_number}: {error}")
+        else:
+            results['errors'].append(f"Row {row_number}: {error}")
+
+    @staticmethod
+    def _finish(results: Dict, total_rows: int) -> Dict:
+        results['success'] = not results['errors']
+        results['total_rows'] = total_rows
+        results['processed'] = results['created'] + results['updated'] + results['skipped']
+        return results
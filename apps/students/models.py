@@ -10,6 +10,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from encrypted_model_fields.fields import EncryptedCharField, EncryptedTextField
 
 # Import core base models
@@ -287,6 +288,9 @@ class Student(BaseModel):
     )
     
     # ==================== SYSTEM FIELDS ====================
+    # Maintained by apps.core.utils.search; GIN indexed on Postgres
+    search_document = models.TextField(blank=True, default="", editable=False)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
 
     class Meta:
         db_table = "students_student"
@@ -557,19 +561,8 @@ class Student(BaseModel):
 
     def generate_admission_number(self):
         """Generate unique admission number"""
-        prefix = f"ADM-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_student = Student.objects.filter(
-            admission_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('admission_number').last()
-        
-        if last_student:
-            last_number = int(last_student.admission_number.split('-')[-1])
-            new_number = last_number + 1
-        else:
-            new_number = 1
-            
-        return f"{prefix}{new_number:04d}"
+        from apps.core.utils.sequences import sequences
+        return sequences.next_number('admission', self.tenant)
 
     def generate_roll_number(self):
         """Generate incremental roll number based on class/section"""
@@ -594,24 +587,8 @@ class Student(BaseModel):
 
     def generate_reg_no(self):
         """Generate unique registration number: REG-{YYYY}-{SEQ}"""
-        year = timezone.now().year
-        prefix = f"REG-{year}-"
-        
-        last_student = Student.objects.filter(
-            reg_no__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('reg_no').last()
-        
-        if last_student:
-             try:
-                last_seq = int(last_student.reg_no.split('-')[-1])
-                new_seq = last_seq + 1
-             except ValueError:
-                new_seq = 1
-        else:
-            new_seq = 1
-            
-        return f"{prefix}{new_seq:06d}"
+        from apps.core.utils.sequences import sequences
+        return sequences.next_number('registration', self.tenant)
 
     @property
     def full_name(self):
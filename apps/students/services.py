@@ -131,6 +131,8 @@ class StudentService:
             Unique admission number string
         """
         try:
+            from apps.core.utils.sequences import sequences
+            
             # Get current academic year if not provided
             if not academic_year:
                 academic_year = AcademicYear.objects.filter(
@@ -138,50 +140,8 @@ class StudentService:
                     is_current=True
                 ).first()
             
-            # Generate prefix
-            prefix = "ADM"
-            if academic_year:
-                # Use last 2 digits of academic year
-                year_code = str(academic_year.start_date.year)[-2:]
-                prefix = f"ADM{year_code}"
-            
-            # Get tenant code (first 3 letters)
-            tenant_code = tenant.schema_name[:3].upper() if hasattr(tenant, 'schema_name') else "SCH"
-            
-            # Get last admission number for this tenant and academic year
-            last_student = Student.objects.filter(
-                tenant=tenant,
-                admission_number__isnull=False
-            ).exclude(admission_number='').order_by('-admission_number').first()
-            
-            if last_student and last_student.admission_number:
-                # Extract number from last admission number
-                match = re.search(r'\d+', last_student.admission_number)
-                if match:
-                    last_number = int(match.group())
-                    new_number = last_number + 1
-                else:
-                    new_number = 1
-            else:
-                new_number = 1
-            
-            # Format number with leading zeros
-            formatted_number = f"{new_number:05d}"
-            
-            # Construct admission number
-            admission_number = f"{tenant_code}/{prefix}/{formatted_number}"
-            
-            # Ensure uniqueness
-            counter = 1
-            original_number = admission_number
-            while Student.objects.filter(
-                tenant=tenant,
-                admission_number=admission_number
-            ).exists():
-                admission_number = f"{original_number}-{counter}"
-                counter += 1
-            
-            return admission_number
+            year = academic_year.start_date.year if academic_year else None
+            return sequences.next_number('admission', tenant, year=year)
             
         except Exception as e:
             logger.error(f"Error generating admission number: {str(e)}", exc_info=True)
@@ -521,16 +481,9 @@ class StudentService:
             if not query or len(query) < 2:
                 return []
             
-            # Search in multiple fields
-            results = students.filter(
-                Q(admission_number__icontains=query) |
-                Q(first_name__icontains=query) |
-                Q(last_name__icontains=query) |
-                Q(personal_email__icontains=query) |
-                Q(mobile_primary__icontains=query) |
-                Q(guardians__first_name__icontains=query) |
-                Q(guardians__last_name__icontains=query)
-            ).select_related('current_class', 'section').distinct()[:limit]
+            # Ranked match on name, admission number, email, phone and guardians
+            from apps.core.utils.search import search_index
+            results = search_index.search(students, query).select_related('current_class', 'section')[:limit]
             
             # Format results
             formatted_results = []
@@ -1,8 +1,9 @@
 # apps/students/signals.py
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import Student, StudentIdentification, StudentMedicalInfo
+from apps.core.utils.search import search_index, search_state
+from .models import Guardian, Student, StudentIdentification, StudentMedicalInfo
 
 
 @receiver(post_save, sender=Student)
@@ -25,4 +26,26 @@ def update_status_changed_date(sender, instance, **kwargs):
             if original.status != instance.status:
                 instance.status_changed_date = timezone.now()
         except Student.DoesNotExist:
-            pass
\ No newline at end of file
+            pass
+
+
+@receiver(post_init, sender=Student)
+def remember_student_search_state(sender, instance, **kwargs):
+    instance._search_state = search_state(instance)
+
+
+@receiver(post_save, sender=Student)
+def refresh_student_search_document(sender, instance, created, **kwargs):
+    state = search_state(instance)
+    previous = None if created else getattr(instance, '_search_state', None)
+    instance._search_state = state
+    if state != previous:
+        search_index.refresh_on_commit(Student, [instance.pk])
+
+
+@receiver(post_save, sender=Guardian)
+@receiver(post_delete, sender=Guardian)
+def refresh_student_search_on_guardian_change(sender, instance, **kwargs):
+    """Guardian names are part of the student's search document"""
+    if instance.student_id:
+        search_index.refresh_on_commit(Student, [instance.student_id])
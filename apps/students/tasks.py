@@ -8,12 +8,11 @@ import io
 import tempfile
 import os
 from typing import Dict, List, Optional, Any
-from datetime import datetime
 from celery import shared_task
 from django.utils import timezone
+from django.urls import reverse
 from django.core.files.base import ContentFile
 from django.db import transaction
-from django.db.models import Q
 from django.contrib.auth import get_user_model
 
 # Import models and services
@@ -22,6 +21,10 @@ from .services import StudentService, GuardianService, DocumentService, StudentI
 from apps.core.services.audit_service import AuditService
 from apps.core.services.notification_service import NotificationService
 from apps.academics.models import AcademicYear, SchoolClass, Section
+from apps.core.utils.exports import (
+    EXPORT_CONTENT_TYPES, download_token, export_header, export_path, export_rows, save_export,
+)
+from .exports import apply_export_filters, export_columns
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -69,21 +72,11 @@ def process_bulk_upload_async(self, upload_data: Dict) -> Dict:
         )
         
         # Process based on file type
-        if file_type.lower() == 'csv':
-            result = _process_csv_upload(
+        if file_type.lower() in ['csv', 'xls', 'xlsx']:
+            result = _process_upload(
+                task=self,
                 file_content=file_content,
-                file_name=file_name,
-                tenant=tenant,
-                academic_year=academic_year,
-                update_existing=update_existing,
-                skip_errors=skip_errors,
-                user=user,
-                send_welcome_email=send_welcome_email
-            )
-        elif file_type.lower() in ['xls', 'xlsx']:
-            result = _process_excel_upload(
-                file_content=file_content,
-                file_name=file_name,
+                file_type=file_type.lower(),
                 tenant=tenant,
                 academic_year=academic_year,
                 update_existing=update_existing,
@@ -129,482 +122,45 @@ def process_bulk_upload_async(self, upload_data: Dict) -> Dict:
             }
 
 
-def _process_csv_upload(file_content, file_name, tenant, academic_year, update_existing, skip_errors, user, send_welcome_email):
-    """Process CSV file upload"""
-    results = {
-        'created': 0,
-        'updated': 0,
-        'skipped': 0,
-        'errors': [],
-        'warnings': []
-    }
-    
-    try:
-        # Decode file content
-        if isinstance(file_content, bytes):
-            file_content = file_content.decode('utf-8')
-        
-        # Create CSV reader
-        csv_file = io.StringIO(file_content)
-        
-        # Detect delimiter
-        sample = csv_file.read(1024)
-        csv_file.seek(0)
-        
-        # Try common delimiters
-        delimiters = [',', ';', '\t', '|']
-        delimiter_counts = {d: sample.count(d) for d in delimiters}
-        delimiter = max(delimiter_counts, key=delimiter_counts.get) if any(delimiter_counts.values()) else ','
-        
-        # Read CSV
-        reader = csv.reader(csv_file, delimiter=delimiter)
-        rows = list(reader)
-        
-        if len(rows) < 2:
-            results['errors'].append('CSV file has insufficient data')
-            results['success'] = False
-            return results
-        
-        # Process headers
-        headers = [h.strip().lower().replace(' ', '_') for h in rows[0]]
-        
-        # Map headers to field names
-        header_mapping = {
-            'firstname': 'first_name',
-            'lastname': 'last_name',
-            'dob': 'date_of_birth',
-            'email': 'personal_email',
-            'phone': 'mobile_primary',
-            'class': 'class_name',
-            'section': 'section_name',
-            'gender': 'gender',
-            'status': 'status',
-            'category': 'category'
-        }
-        
-        headers = [header_mapping.get(h, h) for h in headers]
-        
-        # Process data rows
-        for i, row in enumerate(rows[1:], start=2):
-            try:
-                if len(row) < len(headers):
-                    row.extend([''] * (len(headers) - len(row)))
-                
-                # Create row dictionary
-                row_dict = {headers[j]: row[j].strip() for j in range(len(headers))}
-                
-                # Skip empty rows
-                if all(value == '' for value in row_dict.values()):
-                    results['skipped'] += 1
-                    continue
-                
-                # Process student
-                result = _process_student_row(
-                    row_dict=row_dict,
-                    row_number=i,
-                    tenant=tenant,
-                    academic_year=academic_year,
-                    update_existing=update_existing,
-                    user=user,
-                    send_welcome_email=send_welcome_email
-                )
-                
-                if result['success']:
-                    if result['action'] == 'created':
-                        results['created'] += 1
-                    elif result['action'] == 'updated':
-                        results['updated'] += 1
-                    else:
-                        results['skipped'] += 1
-                else:
-                    if skip_errors:
-                        results['skipped'] += 1
-                        results['warnings'].append(f"Row {i}: {result['error']}")
-                    else:
-                        results['errors'].append(f"Row {i}: {result['error']}")
-                        if not skip_errors:
-                            break
-                        
-            except Exception as e:
-                error_msg = f"Row {i}: {str(e)}"
-                if skip_errors:
-                    results['skipped'] += 1
-                    results['warnings'].append(error_msg)
-                else:
-                    results['errors'].append(error_msg)
-                    if not skip_errors:
-                        break
-        
-        results['success'] = len(results['errors']) == 0 or skip_errors
-        results['total_rows'] = len(rows) - 1
-        results['processed'] = results['created'] + results['updated'] + results['skipped']
-        
-        return results
-        
-    except Exception as e:
-        logger.error(f"Error processing CSV: {str(e)}", exc_info=True)
-        results['success'] = False
-        results['errors'].append(str(e))
-        return results
+def _process_upload(task, file_content, file_type, tenant, academic_year, update_existing, skip_errors, user, send_welcome_email):
+    """Import a CSV or Excel upload with the staged student importer"""
+    from .importer import StudentImporter, estimate_rows, iter_csv_rows, iter_xlsx_rows
 
+    def progress(current, total, status):
+        task.update_state(
+            state='PROGRESS',
+            meta={'current': current, 'total': total or 100, 'status': status}
+        )
 
-def _process_excel_upload(file_content, file_name, tenant, academic_year, update_existing, skip_errors, user, send_welcome_email):
-    """Process Excel file upload"""
-    results = {
-        'created': 0,
-        'updated': 0,
-        'skipped': 0,
-        'errors': [],
-        'warnings': []
-    }
-    
     try:
-        import openpyxl
-        from openpyxl import load_workbook
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as tmp_file:
-            tmp_file.write(file_content)
-            tmp_file_path = tmp_file.name
+        rows = iter_csv_rows(file_content) if file_type == 'csv' else iter_xlsx_rows(file_content)
+        importer = StudentImporter(
+            tenant=tenant,
+            academic_year=academic_year,
+            user=user,
+            update_existing=update_existing,
+            skip_errors=skip_errors,
+            send_welcome_email=send_welcome_email,
+            progress=progress
+        )
+        results = importer.run(rows, total=estimate_rows(file_content, file_type))
         
-        try:
-            # Load workbook
-            wb = load_workbook(filename=tmp_file_path, read_only=True, data_only=True)
-            ws = wb.active
-            
-            # Get headers from first row
-            headers = []
-            for cell in ws[1]:
-                if cell.value:
-                    header = str(cell.value).strip().lower().replace(' ', '_')
-                    headers.append(header)
-                else:
-                    headers.append(f'column_{cell.column}')
-            
-            # Map headers to field names
-            header_mapping = {
-                'firstname': 'first_name',
-                'lastname': 'last_name',
-                'dob': 'date_of_birth',
-                'email': 'personal_email',
-                'phone': 'mobile_primary',
-                'class': 'class_name',
-                'section': 'section_name',
-                'gender': 'gender',
-                'status': 'status',
-                'category': 'category'
-            }
-            
-            headers = [header_mapping.get(h, h) for h in headers]
-            
-            # Process data rows
-            for i, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-                try:
-                    # Skip empty rows
-                    if all(cell is None or (isinstance(cell, str) and cell.strip() == '') for cell in row):
-                        results['skipped'] += 1
-                        continue
-                    
-                    # Create row dictionary
-                    row_dict = {}
-                    for j, cell_value in enumerate(row):
-                        if j < len(headers):
-                            value = _convert_excel_value(cell_value)
-                            row_dict[headers[j]] = value
-                    
-                    # Process student
-                    result = _process_student_row(
-                        row_dict=row_dict,
-                        row_number=i,
-                        tenant=tenant,
-                        academic_year=academic_year,
-                        update_existing=update_existing,
-                        user=user,
-                        send_welcome_email=send_welcome_email
-                    )
-                    
-                    if result['success']:
-                        if result['action'] == 'created':
-                            results['created'] += 1
-                        elif result['action'] == 'updated':
-                            results['updated'] += 1
-                        else:
-                            results['skipped'] += 1
-                    else:
-                        if skip_errors:
-                            results['skipped'] += 1
-                            results['warnings'].append(f"Row {i}: {result['error']}")
-                        else:
-                            results['errors'].append(f"Row {i}: {result['error']}")
-                            if not skip_errors:
-                                break
-                            
-                except Exception as e:
-                    error_msg = f"Row {i}: {str(e)}"
-                    if skip_errors:
-                        results['skipped'] += 1
-                        results['warnings'].append(error_msg)
-                    else:
-                        results['errors'].append(error_msg)
-                        if not skip_errors:
-                            break
-            
-            results['success'] = len(results['errors']) == 0 or skip_errors
-            results['total_rows'] = ws.max_row - 1
-            results['processed'] = results['created'] + results['updated'] + results['skipped']
-            
-        finally:
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
+        if results['total_rows'] == 0 and not results['errors']:
+            results['errors'].append(f'{file_type.upper()} file has insufficient data')
+            results['success'] = False
         
         return results
         
     except Exception as e:
-        logger.error(f"Error processing Excel: {str(e)}", exc_info=True)
-        results['success'] = False
-        results['errors'].append(str(e))
-        return results
-
-
-def _convert_excel_value(value):
-    """Convert Excel cell value to string"""
-    if value is None:
-        return ''
-    elif isinstance(value, datetime):
-        return value.strftime('%Y-%m-%d')
-    else:
-        return str(value).strip()
-
-
-def _process_student_row(row_dict, row_number, tenant, academic_year, update_existing, user, send_welcome_email):
-    """Process a single student row"""
-    result = {
-        'success': False,
-        'action': 'skipped',
-        'error': None,
-        'student_id': None
-    }
-    
-    try:
-        with transaction.atomic():
-            # Extract basic information
-            first_name = row_dict.get('first_name', '').strip()
-            last_name = row_dict.get('last_name', '').strip()
-            personal_email = row_dict.get('personal_email', '').strip().lower()
-            
-            # Validate required fields
-            if not first_name and not last_name:
-                result['error'] = 'Missing both first and last name'
-                return result
-            
-            # Get or create email
-            if not personal_email:
-                # Generate email
-                import re
-                first_part = re.sub(r'[^a-z0-9]', '', first_name.lower())[:10]
-                last_part = re.sub(r'[^a-z0-9]', '', last_name.lower())[:10]
-                domain = getattr(tenant, 'domain', f"{tenant.schema_name}.edu")
-                personal_email = f"{first_part}.{last_part}{row_number}@{domain}"
-            
-            # Check if student exists
-            existing_student = Student.objects.filter(
-                tenant=tenant,
-                personal_email=personal_email
-            ).first()
-            
-            if existing_student and not update_existing:
-                result['error'] = f'Student with email {personal_email} already exists'
-                return result
-            
-            # Prepare student data
-            student_data = {
-                'tenant': tenant,
-                'first_name': first_name,
-                'last_name': last_name,
-                'personal_email': personal_email,
-                'gender': row_dict.get('gender', 'U').upper()[:1],
-                'date_of_birth': _parse_date(row_dict.get('date_of_birth')),
-                'mobile_primary': row_dict.get('mobile_primary', '')[:15],
-                'status': row_dict.get('status', 'ACTIVE').upper(),
-                'category': row_dict.get('category', 'GENERAL').upper(),
-            }
-            
-            # Set academic year
-            if academic_year:
-                student_data['academic_year'] = academic_year
-            
-            # Handle class
-            class_name = row_dict.get('class_name', '').strip()
-            if class_name:
-                school_class = SchoolClass.objects.filter(
-                    tenant=tenant,
-                    name__iexact=class_name
-                ).first()
-                
-                if school_class:
-                    student_data['current_class'] = school_class
-                    
-                    # Handle section
-                    section_name = row_dict.get('section_name', '').strip()
-                    if section_name:
-                        section = Section.objects.filter(
-                            class_name=school_class,
-                            name__iexact=section_name
-                        ).first()
-                        if section:
-                            student_data['section'] = section
-            
-            # Create or update student
-            if existing_student and update_existing:
-                # Update existing student
-                for key, value in student_data.items():
-                    if key != 'tenant':
-                        setattr(existing_student, key, value)
-                existing_student.save()
-                student = existing_student
-                result['action'] = 'updated'
-            else:
-                # Create new student
-                student = Student.objects.create(**student_data)
-                result['action'] = 'created'
-            
-            # Generate admission number if not present
-            if not student.admission_number:
-                student.admission_number = StudentService.generate_admission_number(tenant, academic_year)
-                student.save()
-            
-            # Handle guardian information
-            guardian_data = _extract_guardian_data(row_dict)
-            if guardian_data:
-                _process_guardian_info(student, guardian_data, tenant)
-            
-            # Send welcome email if requested
-            if send_welcome_email and result['action'] == 'created':
-                try:
-                    send_student_welcome_email.delay(student.id)
-                except Exception as e:
-                    logger.warning(f"Failed to queue welcome email: {str(e)}")
-            
-            # Create audit log for individual student
-            AuditService.create_audit_entry(
-                action='CREATE' if result['action'] == 'created' else 'UPDATE',
-                resource_type='Student',
-                user=user,
-                tenant=tenant,
-                request=None,
-                severity='INFO',
-                instance=student,
-                extra_data={
-                    'action': result['action'],
-                    'source': 'bulk_upload',
-                    'row_number': row_number
-                }
-            )
-            
-            result['success'] = True
-            result['student_id'] = student.id
-            return result
-            
-    except Exception as e:
-        logger.error(f"Error processing student row {row_number}: {str(e)}", exc_info=True)
-        result['error'] = str(e)
-        return result
-
-
-def _parse_date(date_str):
-    """Parse date string to date object"""
-    if not date_str:
-        return None
-    
-    date_formats = [
-        '%Y-%m-%d',
-        '%d-%m-%Y',
-        '%d/%m/%Y',
-        '%m/%d/%Y',
-        '%Y/%m/%d'
-    ]
-    
-    for fmt in date_formats:
-        try:
-            return datetime.strptime(str(date_str).strip(), fmt).date()
-        except ValueError:
-            continue
-    
-    return None
-
-
-def _extract_guardian_data(row_dict):
-    """Extract guardian information from row data"""
-    guardian_data = {}
-    
-    # Father information
-    if row_dict.get('father_name'):
-        guardian_data['father'] = {
-            'first_name': row_dict.get('father_name', '').split()[0] if row_dict.get('father_name') else '',
-            'last_name': ' '.join(row_dict.get('father_name', '').split()[1:]) if row_dict.get('father_name') else '',
-            'email': row_dict.get('father_email', ''),
-            'phone': row_dict.get('father_phone', ''),
-            'occupation': row_dict.get('father_occupation', ''),
-            'relationship': 'FATHER'
-        }
-    
-    # Mother information
-    if row_dict.get('mother_name'):
-        guardian_data['mother'] = {
-            'first_name': row_dict.get('mother_name', '').split()[0] if row_dict.get('mother_name') else '',
-            'last_name': ' '.join(row_dict.get('mother_name', '').split()[1:]) if row_dict.get('mother_name') else '',
-            'email': row_dict.get('mother_email', ''),
-            'phone': row_dict.get('mother_phone', ''),
-            'occupation': row_dict.get('mother_occupation', ''),
-            'relationship': 'MOTHER'
-        }
-    
-    # Guardian information
-    if row_dict.get('guardian_name'):
-        guardian_data['guardian'] = {
-            'first_name': row_dict.get('guardian_name', '').split()[0] if row_dict.get('guardian_name') else '',
-            'last_name': ' '.join(row_dict.get('guardian_name', '').split()[1:]) if row_dict.get('guardian_name') else '',
-            'email': row_dict.get('guardian_email', ''),
-            'phone': row_dict.get('guardian_phone', ''),
-            'occupation': row_dict.get('guardian_occupation', ''),
-            'relationship': row_dict.get('guardian_relationship', 'GUARDIAN')
+        logger.error(f"Error processing {file_type} upload: {str(e)}", exc_info=True)
+        return {
+            'created': 0,
+            'updated': 0,
+            'skipped': 0,
+            'errors': [str(e)],
+            'warnings': [],
+            'success': False
         }
-    
-    return guardian_data
-
-
-def _process_guardian_info(student, guardian_data, tenant):
-    """Process guardian information"""
-    for role, data in guardian_data.items():
-        try:
-            if data.get('first_name') or data.get('last_name'):
-                # Check if guardian already exists
-                existing_guardian = Guardian.objects.filter(
-                    tenant=tenant,
-                    email=data.get('email')
-                ).first() if data.get('email') else None
-                
-                if not existing_guardian:
-                    # Create new guardian
-                    guardian = Guardian.objects.create(
-                        tenant=tenant,
-                        first_name=data.get('first_name', ''),
-                        last_name=data.get('last_name', ''),
-                        email=data.get('email', ''),
-                        phone=data.get('phone', ''),
-                        occupation=data.get('occupation', ''),
-                        relationship=data.get('relationship', 'OTHER'),
-                        is_primary=(role == 'father')  # Father as primary by default
-                    )
-                else:
-                    guardian = existing_guardian
-                
-                # Add guardian to student
-                if guardian not in student.guardians.all():
-                    student.guardians.add(guardian)
-                    
-        except Exception as e:
-            logger.warning(f"Error processing guardian {role} for student {student.id}: {str(e)}")
 
 
 @shared_task
@@ -795,6 +351,10 @@ def export_student_data_async(self, export_params: Dict) -> Dict:
     """
     Export student data asynchronously
     
+    The rows are streamed from a chunked values_list query into a CSV or
+    XLSX file in media storage; the result carries a signed download
+    token for the requesting user instead of the file content.
+    
     Args:
         export_params: Dictionary containing export parameters
         
@@ -809,70 +369,89 @@ def export_student_data_async(self, export_params: Dict) -> Dict:
         tenant_id = export_params.get('tenant_id')
         user_id = export_params.get('user_id')
         
+        extension = 'xlsx' if export_format in ('excel', 'xlsx') else export_format
+        if extension not in EXPORT_CONTENT_TYPES:
+            return {
+                'success': False,
+                'error': f'Unsupported export format: {export_format}'
+            }
+        
         # Get related objects
         from django.apps import apps
-        Tenant = apps.get_model('core', 'Tenant')
+        from django_tenants.utils import schema_context
+        Tenant = apps.get_model('tenants', 'Tenant')
         
         tenant = Tenant.objects.get(id=tenant_id)
-        user = User.objects.get(id=user_id) if user_id else None
-        
-        # Update task status
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'current': 0,
-                'total': 100,
-                'status': 'Preparing export...'
-            }
-        )
-        
-        # Get filtered students
-        students = StudentService.get_secure_queryset(user, tenant)
-        
-        # Apply filters
-        if filters:
-            students = _apply_export_filters(students, filters)
-        
-        # Update task status
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'current': 50,
-                'total': 100,
-                'status': f'Processing {students.count()} students...'
-            }
-        )
-        
-        # Generate export file
-        if export_format == 'csv':
-            result = _generate_csv_export(students, export_type)
-        elif export_format == 'excel':
-            result = _generate_excel_export(students, export_type)
-        else:
-            result = {
-                'success': False,
-                'error': f'Unsupported export format: {export_format}'
-            }
         
-        # Create audit log
-        AuditService.create_audit_entry(
-            action='EXPORT',
-            resource_type='Student',
-            user=user,
-            tenant=tenant,
-            request=None,
-            severity='INFO',
-            extra_data={
-                'task_id': self.request.id,
-                'operation': 'data_export',
-                'format': export_format,
-                'type': export_type,
-                'student_count': students.count(),
-                'filters': filters
-            }
-        )
+        with schema_context(tenant.schema_name):
+            user = User.objects.get(id=user_id) if user_id else None
+            
+            # Update task status
+            self.update_state(
+                state='PROGRESS',
+                meta={
+                    'current': 0,
+                    'status': 'Preparing export...'
+                }
+            )
+            
+            # Get filtered students
+            students = StudentService.get_secure_queryset(user, tenant)
+            
+            # Apply filters
+            if filters:
+                students = apply_export_filters(students, filters)
+            
+            def progress(written):
+                self.update_state(
+                    state='PROGRESS',
+                    meta={
+                        'current': written,
+                        'status': f'Exported {written} students...'
+                    }
+                )
+            
+            # Write the export file
+            timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"students_export_{timestamp}.{extension}"
+            columns = export_columns(export_type)
+            file_path, row_count = save_export(
+                export_path(filename, tenant.schema_name),
+                export_header(columns),
+                export_rows(students.order_by('admission_number'), columns),
+                extension,
+                title='Students',
+                progress=progress,
+            )
+            
+            # Create audit log
+            AuditService.create_audit_entry(
+                action='EXPORT',
+                resource_type='Student',
+                user=user,
+                tenant=tenant,
+                request=None,
+                severity='INFO',
+                extra_data={
+                    'task_id': self.request.id,
+                    'operation': 'data_export',
+                    'format': export_format,
+                    'type': export_type,
+                    'student_count': row_count,
+                    'filters': filters
+                }
+            )
         
-        return result
+        token = download_token(file_path, user_id)
+        return {
+            'success': True,
+            'filename': filename,
+            'file_path': file_path,
+            'row_count': row_count,
+            'content_type': EXPORT_CONTENT_TYPES[extension],
+            'download_token': token,
+            'download_url': reverse('students:student_export_download', kwargs={'token': token}),
+        }
         
     except Exception as e:
         logger.error(f"Error in export task: {str(e)}", exc_info=True)
@@ -888,244 +467,6 @@ def export_student_data_async(self, export_params: Dict) -> Dict:
             }
 
 
-def _apply_export_filters(queryset, filters):
-    """Apply filters to student queryset"""
-    q_objects = Q()
-    
-    # Status filter
-    if filters.get('status'):
-        q_objects &= Q(status=filters['status'])
-    
-    # Class filter
-    if filters.get('class_id'):
-        q_objects &= Q(current_class_id=filters['class_id'])
-    
-    # Section filter
-    if filters.get('section_id'):
-        q_objects &= Q(section_id=filters['section_id'])
-    
-    # Academic year filter
-    if filters.get('academic_year_id'):
-        q_objects &= Q(academic_year_id=filters['academic_year_id'])
-    
-    # Category filter
-    if filters.get('category'):
-        q_objects &= Q(category=filters['category'])
-    
-    # Gender filter
-    if filters.get('gender'):
-        q_objects &= Q(gender=filters['gender'])
-    
-    # Date range filters
-    if filters.get('created_from'):
-        try:
-            date_from = datetime.strptime(filters['created_from'], '%Y-%m-%d').date()
-            q_objects &= Q(created_at__date__gte=date_from)
-        except ValueError:
-            pass
-    
-    if filters.get('created_to'):
-        try:
-            date_to = datetime.strptime(filters['created_to'], '%Y-%m-%d').date()
-            q_objects &= Q(created_at__date__lte=date_to)
-        except ValueError:
-            pass
-    
-    return queryset.filter(q_objects).distinct()
-
-
-def _generate_csv_export(students, export_type):
-    """Generate CSV export"""
-    try:
-        import csv
-        from django.http import HttpResponse
-        
-        # Create response
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        response['Content-Disposition'] = f'attachment; filename="students_export_{timestamp}.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Write headers based on export type
-        if export_type == 'detailed':
-            headers = [
-                'Admission Number', 'Full Name', 'Date of Birth', 'Gender',
-                'Email', 'Phone', 'Class', 'Section', 'Stream', 'Academic Year',
-                'Status', 'Category', 'Blood Group', 'Nationality', 'Religion',
-                'Caste', 'Admission Date', 'Created At', 'Updated At'
-            ]
-        else:
-            headers = [
-                'Admission Number', 'Full Name', 'Date of Birth', 'Gender',
-                'Email', 'Phone', 'Class', 'Section', 'Status', 'Category'
-            ]
-        
-        writer.writerow(headers)
-        
-        # Write data
-        for student in students.select_related('current_class', 'section', 'stream', 'academic_year'):
-            if export_type == 'detailed':
-                row = [
-                    student.admission_number,
-                    student.full_name,
-                    student.date_of_birth,
-                    student.get_gender_display(),
-                    student.personal_email,
-                    student.mobile_primary,
-                    student.current_class.name if student.current_class else '',
-                    student.section.name if student.section else '',
-                    student.stream.name if student.stream else '',
-                    student.academic_year.name if student.academic_year else '',
-                    student.get_status_display(),
-                    student.get_category_display(),
-                    student.blood_group or '',
-                    student.nationality or '',
-                    student.religion or '',
-                    student.caste or '',
-                    student.admission_date or '',
-                    student.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    student.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-                ]
-            else:
-                row = [
-                    student.admission_number,
-                    student.full_name,
-                    student.date_of_birth,
-                    student.get_gender_display(),
-                    student.personal_email,
-                    student.mobile_primary,
-                    student.current_class.name if student.current_class else '',
-                    student.section.name if student.section else '',
-                    student.get_status_display(),
-                    student.get_category_display()
-                ]
-            
-            writer.writerow(row)
-        
-        return {
-            'success': True,
-            'content': response.content,
-            'content_type': 'text/csv',
-            'filename': f"students_export_{timestamp}.csv"
-        }
-        
-    except Exception as e:
-        logger.error(f"Error generating CSV export: {str(e)}", exc_info=True)
-        return {
-            'success': False,
-            'error': str(e)
-        }
-
-
-def _generate_excel_export(students, export_type):
-    """Generate Excel export"""
-    try:
-        import openpyxl
-        from openpyxl import Workbook
-        
-        # Create workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Students"
-        
-        # Write headers based on export type
-        if export_type == 'detailed':
-            headers = [
-                'Admission Number', 'Full Name', 'Date of Birth', 'Gender',
-                'Email', 'Phone', 'Class', 'Section', 'Stream', 'Academic Year',
-                'Status', 'Category', 'Blood Group', 'Nationality', 'Religion',
-                'Caste', 'Admission Date', 'Created At', 'Updated At'
-            ]
-        else:
-            headers = [
-                'Admission Number', 'Full Name', 'Date of Birth', 'Gender',
-                'Email', 'Phone', 'Class', 'Section', 'Status', 'Category'
-            ]
-        
-        # Write headers with formatting
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.font = openpyxl.styles.Font(bold=True)
-            cell.fill = openpyxl.styles.PatternFill(
-                start_color="CCCCCC",
-                end_color="CCCCCC",
-                fill_type="solid"
-            )
-        
-        # Write data
-        for row_idx, student in enumerate(
-            students.select_related('current_class', 'section', 'stream', 'academic_year'),
-            start=2
-        ):
-            if export_type == 'detailed':
-                ws.cell(row=row_idx, column=1, value=student.admission_number)
-                ws.cell(row=row_idx, column=2, value=student.full_name)
-                ws.cell(row=row_idx, column=3, value=str(student.date_of_birth))
-                ws.cell(row=row_idx, column=4, value=student.get_gender_display())
-                ws.cell(row=row_idx, column=5, value=student.personal_email)
-                ws.cell(row=row_idx, column=6, value=student.mobile_primary)
-                ws.cell(row=row_idx, column=7, value=student.current_class.name if student.current_class else '')
-                ws.cell(row=row_idx, column=8, value=student.section.name if student.section else '')
-                ws.cell(row=row_idx, column=9, value=student.stream.name if student.stream else '')
-                ws.cell(row=row_idx, column=10, value=student.academic_year.name if student.academic_year else '')
-                ws.cell(row=row_idx, column=11, value=student.get_status_display())
-                ws.cell(row=row_idx, column=12, value=student.get_category_display())
-                ws.cell(row=row_idx, column=13, value=student.blood_group or '')
-                ws.cell(row=row_idx, column=14, value=student.nationality or '')
-                ws.cell(row=row_idx, column=15, value=student.religion or '')
-                ws.cell(row=row_idx, column=16, value=student.caste or '')
-                ws.cell(row=row_idx, column=17, value=str(student.admission_date) if student.admission_date else '')
-                ws.cell(row=row_idx, column=18, value=student.created_at.strftime('%Y-%m-%d %H:%M:%S'))
-                ws.cell(row=row_idx, column=19, value=student.updated_at.strftime('%Y-%m-%d %H:%M:%S'))
-            else:
-                ws.cell(row=row_idx, column=1, value=student.admission_number)
-                ws.cell(row=row_idx, column=2, value=student.full_name)
-                ws.cell(row=row_idx, column=3, value=str(student.date_of_birth))
-                ws.cell(row=row_idx, column=4, value=student.get_gender_display())
-                ws.cell(row=row_idx, column=5, value=student.personal_email)
-                ws.cell(row=row_idx, column=6, value=student.mobile_primary)
-                ws.cell(row=row_idx, column=7, value=student.current_class.name if student.current_class else '')
-                ws.cell(row=row_idx, column=8, value=student.section.name if student.section else '')
-                ws.cell(row=row_idx, column=9, value=student.get_status_display())
-                ws.cell(row=row_idx, column=10, value=student.get_category_display())
-        
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 30)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Save to BytesIO
-        import io
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        
-        return {
-            'success': True,
-            'content': output.getvalue(),
-            'content_type': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            'filename': f"students_export_{timestamp}.xlsx"
-        }
-        
-    except Exception as e:
-        logger.error(f"Error generating Excel export: {str(e)}", exc_info=True)
-        return {
-            'success': False,
-            'error': str(e)
-        }
-
-
 @shared_task
 def sync_student_user_accounts(tenant_id: int) -> Dict:
     """
@@ -0,0 +1,141 @@
+import io
+import re
+from datetime import date
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+from openpyxl import Workbook
+
+from apps.students.importer import (
+    StudentImporter, estimate_rows, iter_csv_rows, iter_xlsx_rows, validate_row, validate_rows,
+)
+
+LOOKUPS = {
+    'classes': {'GRADE 5': 'class-5'},
+    'sections': {('class-5', 'A'): 'section-5a'},
+    'genders': {'M', 'F', 'O', 'U'},
+    'statuses': {'ACTIVE', 'INACTIVE'},
+    'categories': {'GENERAL', 'OBC'},
+    'relations': {'FATHER', 'MOTHER', 'GUARDIAN', 'OTHER'},
+    'occupations': {'ENGINEER', 'OTHER'},
+    'phone_pattern': re.compile(r'^\+?1?\d{9,15}$'),
+    'email_domain': 'school.edu',
+}
+
+
+def row(**values):
+    data = {
+        'first_name': 'Ada', 'last_name': 'Lovelace', 'personal_email': 'Ada@Example.com',
+        'date_of_birth': '2012-03-04', 'mobile_primary': '98765 43210', 'gender': 'female',
+        'class_name': 'Grade 5', 'section_name': 'a',
+    }
+    data.update(values)
+    return data
+
+
+class ImportParsingTests(SimpleTestCase):
+    def test_csv_rows_are_streamed_with_mapped_headers(self):
+        content = 'FirstName;LastName;DOB;Email\nAda;Lovelace;04/03/2012\n'.encode('utf-8-sig')
+        rows = list(iter_csv_rows(content))
+        self.assertEqual(rows, [(2, {
+            'first_name': 'Ada', 'last_name': 'Lovelace', 'date_of_birth': '04/03/2012', 'personal_email': '',
+        })])
+        self.assertEqual(estimate_rows(content, 'csv'), 1)
+
+    def test_xlsx_cells_are_read_as_text(self):
+        workbook = Workbook()
+        workbook.active.append(['First Name', 'DOB', 'Phone'])
+        workbook.active.append(['Ada', date(2012, 3, 4), 9876543210.0])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+
+        self.assertEqual(list(iter_xlsx_rows(buffer.getvalue())), [(2, {
+            'first_name': 'Ada', 'date_of_birth': '2012-03-04', 'mobile_primary': '9876543210',
+        })])
+
+
+class ImportValidationTests(SimpleTestCase):
+    def test_row_is_cleaned_against_the_lookups(self):
+        result = validate_row(2, row(father_name='Charles  Babbage', father_phone='+919876543210',
+                                     father_occupation='engineer'), LOOKUPS)
+
+        self.assertIsNone(result['error'])
+        self.assertEqual(result['data'], {
+            'first_name': 'Ada', 'last_name': 'Lovelace', 'personal_email': 'ada@example.com',
+            'gender': 'F', 'date_of_birth': date(2012, 3, 4), 'mobile_primary': '9876543210',
+            'status': 'ACTIVE', 'category': 'GENERAL', 'current_class_id': 'class-5', 'section_id': 'section-5a',
+        })
+        self.assertEqual(result['guardians'], [{
+            'relation': 'FATHER', 'full_name': 'Charles Babbage', 'email': '',
+            'phone_primary': '+919876543210', 'occupation': 'ENGINEER',
+        }])
+
+    def test_invalid_rows_report_an_error(self):
+        self.assertEqual(validate_row(3, row(first_name='', last_name=''), LOOKUPS)['error'],
+                         'Missing both first and last name')
+        self.assertEqual(validate_row(3, row(date_of_birth='tomorrow'), LOOKUPS)['error'],
+                         'Invalid or missing date of birth')
+        self.assertIn('Invalid status', validate_row(3, row(status='graduated'), LOOKUPS)['error'])
+        self.assertIn('Invalid mobile number', validate_row(3, row(mobile_primary='12'), LOOKUPS)['error'])
+
+    def test_unknown_class_and_guardian_without_phone_are_warnings(self):
+        result = validate_row(4, row(class_name='Grade 9', personal_email='', mother_name='Anne'), LOOKUPS)
+
+        self.assertIsNone(result['error'])
+        self.assertEqual(result['data']['personal_email'], 'ada.lovelace4@school.edu')
+        self.assertIsNone(result['data']['current_class_id'])
+        self.assertEqual(result['guardians'], [])
+        self.assertEqual(len(result['warnings']), 2)
+
+    def test_blank_rows_are_marked(self):
+        self.assertEqual(validate_rows([(5, {'first_name': '', 'last_name': ''})], LOOKUPS), [{'row': 5, 'blank': True}])
+
+
+class ImportRunTests(SimpleTestCase):
+    def importer(self, **options):
+        importer = StudentImporter(
+            tenant=SimpleNamespace(schema_name='school'), academic_year='year',
+            config={'CHUNK_SIZE': 2, 'VALIDATION_CHUNK': 2, 'VALIDATION_WORKERS': 1}, **options,
+        )
+        patches = {
+            'build_lookups': mock.Mock(return_value=LOOKUPS),
+            '_existing_students': mock.Mock(return_value={'taken@example.com': object()}),
+            '_number_blocks': mock.Mock(return_value={}),
+            '_institutional_domain': mock.Mock(return_value='school.edu'),
+            '_write_chunk': mock.Mock(return_value=True),
+        }
+        for name, value in patches.items():
+            setattr(importer, name, value)
+        return importer
+
+    def rows(self):
+        return [
+            (2, row()),
+            (3, row(personal_email='ada@example.com')),
+            (4, row(personal_email='taken@example.com')),
+            (5, row(personal_email='grace@example.com')),
+            (6, {'first_name': ''}),
+        ]
+
+    def test_nothing_is_written_when_a_row_fails_without_skip_errors(self):
+        importer = self.importer()
+        results = importer.run(self.rows())
+
+        self.assertFalse(results['success'])
+        self.assertEqual(results['errors'], [
+            'Row 3: Duplicate email ada@example.com (also in row 2)',
+            'Row 4: Student with email taken@example.com already exists',
+        ])
+        importer._write_chunk.assert_not_called()
+
+    def test_valid_rows_are_written_in_chunks_with_skip_errors(self):
+        importer = self.importer(skip_errors=True)
+        results = importer.run(self.rows())
+
+        self.assertTrue(results['success'])
+        self.assertEqual((results['skipped'], results['total_rows']), (3, 5))
+        self.assertEqual(
+            [[checked['row'] for checked in call.args[0]] for call in importer._write_chunk.call_args_list],
+            [[2, 5]],
+        )
@@ -58,6 +58,8 @@ urlpatterns = [
 
     # Export
     path('export/', views.StudentExportView.as_view(), name='student_export'),
+    path('export/download/<str:token>/', views.StudentExportDownloadView.as_view(), name='student_export_download'),
+    path('export/status/<str:task_id>/', views.StudentExportStatusView.as_view(), name='student_export_status'),
 
     # Special Actions
     path('promote/<uuid:pk>/', views.StudentPromoteView.as_view(), name='student_promote'),
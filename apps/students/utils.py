@@ -52,28 +52,7 @@ def validate_student_data(data, tenant, instance=None):
 def generate_admission_number(tenant, year=None):
     """
     Generate a unique admission number for a student
-    Format: INST-YYYY-XXXXX
+    Format: ADM-YYYY-SCHEMA-XXXX (see apps.core.utils.sequences)
     """
-    if not year:
-        year = timezone.now().year
-    
-    # Get institution code from tenant
-    inst_code = tenant.code if hasattr(tenant, 'code') else 'INST'
-    
-    # Find the last admission number for this year
-    last_student = Student.objects.filter(
-        tenant=tenant,
-        admission_number__startswith=f"{inst_code}-{year}-"
-    ).order_by('-admission_number').first()
-    
-    if last_student:
-        try:
-            last_number = int(last_student.admission_number.split('-')[-1])
-            next_number = last_number + 1
-        except (ValueError, IndexError):
-            next_number = 1
-    else:
-        next_number = 1
-    
-    # Format with leading zeros
-    return f"{inst_code}-{year}-{next_number:05d}"
\ No newline at end of file
+    from apps.core.utils.sequences import sequences
+    return sequences.next_number('admission', tenant, year=year)
\ No newline at end of file
@@ -8,7 +8,11 @@ from django.utils import timezone
 from django.conf import Settings
 logger = logging.getLogger(__name__)
 
+from celery.result import AsyncResult
+from django.core import signing
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.db import transaction, IntegrityError
@@ -16,11 +20,13 @@ from django.db import models
 from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from django.http import HttpResponse, FileResponse, Http404, JsonResponse
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 
 # Core imports
-from apps.core.views import BaseView, BaseListView, BaseCreateView, BaseUpdateView, BaseDeleteView,BaseDetailView, BaseTemplateView
+from apps.core.views import BaseView, BaseListView, BaseCreateView, BaseUpdateView, BaseDeleteView,BaseDetailView, BaseTemplateView, ExportMixin
 from apps.core.services.audit_service import AuditService
+from apps.core.utils.exports import export_file_response, export_settings, read_download_token
+from apps.core.utils.search import search_index
 from apps.core.middleware.tenant import get_dynamic_tenant
 from apps.core.permissions.mixins import ( PermissionRequiredMixin, RoleRequiredMixin, 
 TenantAccessMixin, ObjectPermissionMixin,
@@ -35,6 +41,7 @@ from .forms import (
     StudentTransportForm, StudentHostelForm, StudentHistoryForm,
     StudentFilterForm, StudentStatusForm, StudentClassForm
 )
+from .exports import apply_export_filters, export_columns, export_filters
 from .idcard import StudentIDCardGenerator
 
 # Import models for new sections
@@ -260,13 +267,7 @@ class StudentListView(BaseListView):
         # Apply filters
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(admission_number__icontains=search) |
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(personal_email__icontains=search) |
-                Q(mobile_primary__icontains=search)
-            )
+            queryset = search_index.search(queryset, search)
         
         # Apply other filters
         status = self.request.GET.get('status')
@@ -354,21 +355,22 @@ class StudentDetailView(BaseDetailView):
         return context
     
     def calculate_attendance_rate(self, student):
-        """Calculate student attendance rate"""
-        # This would integrate with attendance module
+        """Calculate student attendance rate over the current academic year"""
         try:
-            from apps.attendance.models import Attendance
-            total_days = Attendance.objects.filter(
-                student=student,
-                academic_year=student.academic_year
-            ).count()
-            present_days = Attendance.objects.filter(
-                student=student,
-                academic_year=student.academic_year,
-                status='PRESENT'
-            ).count()
-            
-            return (present_days / total_days * 100) if total_days > 0 else 0
+            from apps.attendance.utils.bitmap import attendance_bitmap, status_counts
+
+            year = student.academic_year
+            if year is None:
+                return 0
+            codes = attendance_bitmap.codes_between(
+                student.tenant_id, student.pk, year.start_date,
+                min(year.end_date, timezone.now().date())
+            )
+            if codes is None:
+                return 0
+            counts = status_counts(codes)
+            total_days = sum(counts.values())
+            return (counts['PRESENT'] / total_days * 100) if total_days > 0 else 0
         except Exception:
             return 0
     
@@ -1494,32 +1496,35 @@ class BulkUploadValidateView(BaseView):
 # EXPORT VIEWS
 # ============================================================================
 
-class StudentExportView(BaseView):
-    """Export student data with filtering"""
+class StudentExportView(ExportMixin, BaseView):
+    """
+    Export student data with filtering
+
+    Streams CSV or XLSX; with ``?async=1`` the export is written to media
+    storage by a background task and fetched through
+    StudentExportDownloadView.
+    """
     permission_required = 'students.export_student_data'
+    export_filename = 'students_export'
     
     def get(self, request, *args, **kwargs):
-        format_type = request.GET.get('format', 'csv')
-        queryset = self.get_filtered_queryset(request)
-        
-        if format_type == 'excel':
-            return self.export_excel(queryset)
-        else:
-            return self.export_csv(queryset)
+        if request.GET.get('async'):
+            return self.export_async(request)
+        self.log_export(request)
+        return self.export(request, *args, **kwargs)
+    
+    def get_export_columns(self):
+        return export_columns(self.request.GET.get('type', 'basic'))
+    
+    def get_export_queryset(self):
+        return self.get_filtered_queryset(self.request).order_by('admission_number')
     
     def get_filtered_queryset(self, request):
+        # Same filters as the background export
         queryset = Student.get_secure_queryset(request.user)
-        
-        # Apply filters from request
-        status = request.GET.get('status')
-        if status:
-            queryset = queryset.filter(status=status)
-        
-        class_id = request.GET.get('class_id')
-        if class_id:
-            queryset = queryset.filter(current_class_id=class_id)
-        
-        # Log the export
+        return apply_export_filters(queryset, export_filters(request.GET))
+    
+    def log_export(self, request):
         AuditService.create_audit_entry(
             action='EXPORT',
             resource_type='Student',
@@ -1528,69 +1533,78 @@ class StudentExportView(BaseView):
             severity='INFO',
             extra_data={
                 'export_format': request.GET.get('format', 'csv'),
-                'record_count': queryset.count(),
+                'record_count': self.get_filtered_queryset(request).count(),
                 'filters': dict(request.GET)
             }
         )
-        
-        return queryset
     
-    def export_csv(self, queryset):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="students_export.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Admission Number', 'Full Name', 'Date of Birth', 'Gender',
-            'Email', 'Phone', 'Class', 'Section', 'Status', 'Category'
-        ])
-        
-        for student in queryset:
-            writer.writerow([
-                student.admission_number,
-                student.full_name,
-                student.date_of_birth,
-                student.get_gender_display(),
-                student.personal_email,
-                student.mobile_primary,
-                student.current_class.name if student.current_class else '',
-                student.section.name if student.section else '',
-                student.get_status_display(),
-                student.get_category_display()
-            ])
-        
-        return response
+    def export_async(self, request):
+        """
+        Queue the export; StudentExportStatusView reports its progress and
+        the download link once the file is stored
+        """
+        from .tasks import export_student_data_async
+        
+        task = export_student_data_async.delay({
+            'format': request.GET.get('format', 'csv'),
+            'type': request.GET.get('type', 'basic'),
+            'filters': export_filters(request.GET),
+            'tenant_id': request.tenant.id,
+            'user_id': str(request.user.id),
+        })
+        # Only the requesting user may poll the task
+        cache.set(export_task_key(task.id), str(request.user.id), export_settings()['TOKEN_MAX_AGE'])
+        return JsonResponse({
+            'success': True,
+            'task_id': task.id,
+            'status_url': reverse('students:student_export_status', kwargs={'task_id': task.id}),
+        }, status=202)
+
+
+def export_task_key(task_id):
+    return f'students:export_task:{task_id}'
+
+
+class StudentExportStatusView(BaseView):
+    """Progress of an export queued with ``?async=1``, and its download link when done"""
+    permission_required = 'students.export_student_data'
     
-    def export_excel(self, queryset):
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Students"
-        
-        # Headers
-        headers = ['Admission Number', 'Full Name', 'Date of Birth', 'Gender',
-                  'Email', 'Phone', 'Class', 'Section', 'Status', 'Category']
-        for col_idx, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col_idx, value=header)
-        
-        # Data
-        for row_idx, student in enumerate(queryset, 2):
-            ws.cell(row=row_idx, column=1, value=student.admission_number)
-            ws.cell(row=row_idx, column=2, value=student.full_name)
-            ws.cell(row=row_idx, column=3, value=str(student.date_of_birth))
-            ws.cell(row=row_idx, column=4, value=student.get_gender_display())
-            ws.cell(row=row_idx, column=5, value=student.personal_email)
-            ws.cell(row=row_idx, column=6, value=student.mobile_primary)
-            ws.cell(row=row_idx, column=7, value=student.current_class.name if student.current_class else '')
-            ws.cell(row=row_idx, column=8, value=student.section.name if student.section else '')
-            ws.cell(row=row_idx, column=9, value=student.get_status_display())
-            ws.cell(row=row_idx, column=10, value=student.get_category_display())
-        
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = 'attachment; filename="students_export.xlsx"'
-        wb.save(response)
-        return response
+    def get(self, request, task_id, *args, **kwargs):
+        if cache.get(export_task_key(task_id)) != str(request.user.id):
+            raise Http404(_("No such export"))
+        
+        result = AsyncResult(task_id)
+        data = {'task_id': task_id, 'state': result.state, 'ready': result.ready()}
+        if result.state == 'PROGRESS' and isinstance(result.info, dict):
+            data.update(current=result.info.get('current'), status=result.info.get('status'))
+        elif result.successful() and isinstance(result.result, dict):
+            outcome = result.result
+            data['success'] = outcome.get('success', False)
+            if data['success']:
+                data.update(
+                    filename=outcome['filename'],
+                    row_count=outcome['row_count'],
+                    download_url=outcome['download_url'],
+                )
+            else:
+                data['error'] = outcome.get('error')
+        elif result.failed():
+            data.update(success=False, error=_("The export failed"))
+        return JsonResponse(data)
+
+
+class StudentExportDownloadView(BaseView):
+    """Download an export written by export_student_data_async"""
+    permission_required = 'students.export_student_data'
+    
+    def get(self, request, token, *args, **kwargs):
+        try:
+            path = read_download_token(token, request.user.id)
+        except signing.BadSignature:
+            raise Http404(_("This export link is invalid or has expired"))
+        if not default_storage.exists(path):
+            raise Http404(_("This export is no longer available"))
+        return export_file_response(path)
 
 
 # ============================================================================
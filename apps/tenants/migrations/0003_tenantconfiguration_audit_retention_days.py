@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenantconfiguration',
+            name='audit_retention_days',
+            field=models.PositiveIntegerField(blank=True, help_text='Days audit logs stay in the live table before archival. Defaults to AUDIT_LOG_SETTINGS["RETENTION_DAYS"].', null=True, verbose_name='Audit Log Retention (days)'),
+        ),
+    ]
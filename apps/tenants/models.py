@@ -449,6 +449,15 @@ class TenantConfiguration(UUIDModel, TimeStampedModel):
         default=90,
         verbose_name='Password Expiry (days)'
     )
+
+    # Audit log retention
+    audit_retention_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Audit Log Retention (days)',
+        help_text='Days audit logs stay in the live table before archival. '
+                  'Defaults to AUDIT_LOG_SETTINGS["RETENTION_DAYS"].'
+    )
     
     # Feature Flags
     enable_library = models.BooleanField(
@@ -37,6 +37,7 @@ SHARED_APPS = [
     'django.contrib.admin',  # Platform Admin
     'django.contrib.staticfiles',
     'django.contrib.humanize',
+    'django.contrib.postgres',  # full-text and trigram search lookups
     
     # Third-party apps
     "crispy_forms",
@@ -156,6 +157,32 @@ AUDIT_LOG_SETTINGS = {
     'AUTO_CLEANUP': True,
     'EXPORT_FORMATS': ['PDF', 'CSV', 'JSON'],
     'MAX_EXPORT_RECORDS': 10000,
+
+    # Buffered writer used on the request path (apps.core.services.audit_buffer)
+    'WRITE_MODE': 'buffered',  # buffered, sync
+    'BUFFER_MAX_SIZE': 10000,
+    'FLUSH_BATCH_SIZE': 500,
+    'FLUSH_INTERVAL_SECONDS': 2.0,
+    'OVERFLOW_POLICY': 'spill',  # spill, drop, block
+
+    # Monthly audit_logs partitions (apps.core.services.audit_archive);
+    # RETENTION_DAYS can be overridden per tenant in TenantConfiguration
+    'PARTITIONS_AHEAD': 3,
+    'ARCHIVE_DIR': BASE_DIR / 'archives' / 'audit_logs',
+    'ARCHIVE_CHUNK_SIZE': 5000,
+
+    # Hourly/daily rollups behind AuditAnalyzer (apps.analytics.utils.rollup)
+    'ROLLUP_LATE_ARRIVAL_HOURS': 1,
+    'ROLLUP_CHUNK_HOURS': 24,
+    'ROLLUP_BATCH_SIZE': 2000,
+
+    # Sliding-window detector fed by written audit entries, windows shared
+    # through the cache (apps.analytics.utils.stream_detector); thresholds
+    # come from AuditPattern
+    'STREAM_DETECTION_ENABLED': True,
+    'STREAM_WINDOW_SLOTS': 30,
+    'STREAM_CACHE': 'default',
+    'STREAM_PATTERN_CACHE_SECONDS': 60,
 }
 
 
@@ -521,6 +548,57 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+CELERY_BEAT_SCHEDULE = {
+    'maintain-audit-partitions': {
+        'task': 'apps.core.tasks.maintain_audit_partitions',
+        'schedule': timedelta(days=1),
+    },
+    'rollup-audit-metrics': {
+        'task': 'apps.analytics.tasks.rollup_audit_metrics',
+        'schedule': timedelta(minutes=15),
+    },
+    'reconcile-notification-inboxes': {
+        'task': 'apps.communications.tasks.reconcile_notification_inboxes',
+        'schedule': timedelta(hours=1),
+    },
+    'refresh-attendance-summaries': {
+        'task': 'apps.attendance.tasks.refresh_attendance_summaries',
+        'schedule': timedelta(days=1),
+    },
+    'rebuild-face-indexes': {
+        'task': 'apps.attendance.tasks.rebuild_face_indexes',
+        'schedule': timedelta(days=1),
+    },
+    # No-op unless DATA_INTEGRITY['SIGNING'] is 'deferred'
+    'sign-pending-records': {
+        'task': 'apps.core.tasks.sign_pending_records',
+        'schedule': timedelta(minutes=5),
+    },
+    # Picks up invoice runs whose worker stopped
+    'resume-invoice-runs': {
+        'task': 'apps.finance.tasks.resume_invoice_runs',
+        'schedule': timedelta(minutes=10),
+    },
+    'delete-expired-exports': {
+        'task': 'apps.core.tasks.delete_expired_exports',
+        'schedule': timedelta(hours=6),
+    },
+    'sweep-overdue-invoices': {
+        'task': 'apps.finance.tasks.sweep_overdue_invoices',
+        'schedule': timedelta(hours=6),
+    },
+    # Sweeps each tenant again before reminding
+    'send-payment-reminders': {
+        'task': 'apps.finance.tasks.send_payment_reminders',
+        'schedule': timedelta(days=1),
+    },
+    # Moves outstanding balances into older aging buckets
+    'refresh-receivables': {
+        'task': 'apps.finance.tasks.refresh_receivables',
+        'schedule': timedelta(days=1),
+    },
+}
+
 # File upload limits
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
@@ -529,6 +607,106 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 TENANT_LIMIT_SET_CACHE = True
 TENANT_CACHE_TIMEOUT = 300  # 5 minutes
 
+# Tenant resolution cache used by TenantMiddleware
+# (per-process LRU in front of CACHES['default'])
+TENANT_RESOLUTION_CACHE = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'LOCAL_MAX_ENTRIES': 1024,
+    'LOCAL_TTL': 30,  # seconds
+    'SHARED_TTL': TENANT_CACHE_TIMEOUT,
+    'NEGATIVE_TTL': 30,  # seconds
+}
+
+# Header bell: unread count and recent communications per user
+# (in CACHES['default'], invalidated by Communication saves)
+NOTIFICATION_BELL_CACHE = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TTL': 300,  # seconds
+    'HEADER_SIZE': 5,
+}
+
+# Per-user NotificationInbox counters behind the bell
+NOTIFICATION_INBOX = {
+    'RECENT_SIZE': 20,
+    'CHANNEL_TYPES': ['IN_APP', 'PUSH'],
+}
+
+# Set-based attendance marking (apps.attendance.utils.bulk)
+BULK_ATTENDANCE = {
+    'BATCH_SIZE': 1000,  # rows per INSERT ... ON CONFLICT statement
+}
+
+# Batched check-ins posted by attendance kiosks (apps/attendance/api_views.py)
+KIOSK_INGEST = {
+    'MAX_EVENTS': 500,  # scans accepted per request
+    'CHECK_OUT_AFTER_MINUTES': 60,  # later staff scans count as check-out after this
+}
+
+# Precomputed ORB descriptors for face attendance, one memory-mapped
+# index per tenant schema under ROOT (see apps/attendance/utils/face_index.py)
+FACE_INDEX = {
+    'ROOT': os.environ.get('FACE_INDEX_ROOT', os.path.join(BASE_DIR, 'face_index')),
+    'MATCH_THRESHOLD': 15,  # good matches needed to accept a face
+    'PREFILTER_CANDIDATES': 10,  # people verified with the exact matcher
+    'WORKERS': 4,  # threads scanning the index
+}
+
+# Staged bulk student import (apps/students/importer.py)
+STUDENT_IMPORT = {
+    'CHUNK_SIZE': 500,  # students written per transaction
+    'VALIDATION_CHUNK': 1000,  # rows sent to a validation worker at a time
+    'VALIDATION_WORKERS': 4,  # validation processes; 1 validates inline
+}
+
+# Student and staff search documents (apps/core/utils/search.py)
+SEARCH_INDEX = {
+    'CONFIG': 'simple',  # text search configuration; names are not stemmed
+    'BATCH_SIZE': 1000,  # documents rebuilt per query
+}
+
+# Streaming exports (apps/core/utils/exports.py); background exports are
+# stored under MEDIA_ROOT/STORAGE_DIR behind signed download links
+EXPORTS = {
+    'CHUNK_SIZE': 2000,  # rows fetched per round trip
+    'STORAGE_DIR': 'exports',
+    'TOKEN_MAX_AGE': 24 * 60 * 60,  # seconds a download link stays valid
+    'RETENTION_HOURS': 48,  # stored export files are deleted after this
+}
+
+# Bulk invoice generation (apps/finance/utils/invoicing.py)
+INVOICE_RUNS = {
+    'CHUNK_SIZE': 500,  # students invoiced per transaction
+    'STALE_AFTER_MINUTES': 15,  # running runs without progress are resumed after this
+}
+
+# Overdue sweeps and payment reminders (apps/finance/utils/reminders.py)
+FEE_REMINDERS = {
+    'INTERVAL_DAYS': 7,  # days before an invoice is reminded again
+    'HOURLY_LIMIT': 1000,  # reminder messages per tenant per hour
+    'BATCH_SIZE': 100,  # messages per mail connection and INSERT
+}
+
+# Receivable balances per student (apps/finance/utils/receivables.py)
+RECEIVABLES = {
+    'BATCH_SIZE': 1000,  # balances written per upsert
+}
+
+# Document number templates per kind, overriding the defaults in
+# apps/core/utils/sequences.py, e.g. {'payment': 'RCPT-{year}-{seq:06d}'}
+DOCUMENT_SEQUENCES = {
+    'TEMPLATES': {},
+}
+
+# Data integrity signatures of CryptographicModel rows. 'save' signs in
+# save()/bulk_create(); 'deferred' leaves new and changed rows unsigned
+# for the sign_pending_records task (verify with verify_integrity_bulk)
+DATA_INTEGRITY = {
+    'SIGNING': 'save',
+    'BATCH_SIZE': 2000,
+}
+
 # Encryption key for encrypted model fields
 # Generate a secure key: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
 # Encryption key for encrypted model fields